@@ -18,9 +18,11 @@ import uvicorn
 from ..src.config import API_HOST, API_PORT, api_config
 from ..src.models.unified_model import UnifiedClaimDetectorModel
 from ..improved_training import ImprovedFBAClaimsModel
-from ..src.database import get_db, FeedbackCRUD, MetricsCRUD, PredictionCRUD
+from ..src.database import get_db, FeedbackCRUD, MetricsCRUD, PredictionCRUD, PredictionLogWriter
+from ..src.database.session import SessionLocal
 from ..src.security import get_current_user, SecurityMiddleware, HTTPSRedirectMiddleware
 from ..src.security.rate_limiter import check_rate_limit, get_remaining_requests
+from ..src.explainability.shap_explainer import SHAPExplainer
 from ..src.evidence.controllers import evidence_router
 from ..src.ev.router import ev_router
 from ..src.monitoring.router import monitoring_router
@@ -60,10 +62,19 @@ app.include_router(disputes_router)
 
 # Initialize unified model
 model = None
+explainer: Optional[SHAPExplainer] = None
 # Use the working improved model instead of empty unified model
 model_path = Path("models/improved_fba_claims_model.pkl")
 pipeline_path = Path("models/preprocessing_pipeline.pkl")
 
+# Predictions are written in batches by a background task, off the request path
+prediction_log = PredictionLogWriter(
+    SessionLocal,
+    max_queue_size=api_config.PREDICTION_LOG_QUEUE_SIZE,
+    batch_size=api_config.PREDICTION_LOG_BATCH_SIZE,
+    flush_interval=api_config.PREDICTION_LOG_FLUSH_INTERVAL
+)
+
 # Pydantic models for API requests/responses
 class ClaimRequest(BaseModel):
     """Request model for claim prediction"""
@@ -134,6 +145,7 @@ class TokenResponse(BaseModel):
 async def startup_event():
     """Initialize the model on startup"""
     global model
+    prediction_log.start()
     try:
         # Try to load the improved model first (working model)
         if model_path.exists():
@@ -153,6 +165,54 @@ async def startup_event():
                 logger.warning("No trained model found. Please train the model first.")
     except Exception as e:
         logger.error(f"Error loading model: {e}")
+    
+    init_explainer()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued prediction logs before exiting"""
+    await prediction_log.stop()
+
+def init_explainer():
+    """Attach a cached SHAP explainer for the loaded model
+    
+    Models that bring their own ``prepare_features`` are explained on its
+    output; otherwise claims go through the saved preprocessing pipeline.
+    """
+    global explainer
+    if model is None or not model.is_trained:
+        return
+    try:
+        feature_pipeline = None
+        if not hasattr(model, 'prepare_features') and pipeline_path.exists():
+            from ..src.preprocessing.pipeline import PreprocessingPipeline
+            feature_pipeline = PreprocessingPipeline(str(pipeline_path))
+        explainer = SHAPExplainer.for_model(
+            model,
+            feature_pipeline,
+            cache_size=api_config.EXPLANATION_CACHE_SIZE,
+            approximate=api_config.EXPLANATION_APPROXIMATE
+        )
+        if explainer is None:
+            logger.warning("Loaded model cannot be explained with SHAP, using model explanations")
+    except Exception as e:
+        explainer = None
+        logger.warning(f"SHAP explainer unavailable, falling back to model explanations: {e}")
+
+def explain_claims(df: pd.DataFrame, predictions: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+    """Top feature contributions for every row of ``df``
+    
+    Uses one batched, cached SHAP call (``explain_batch_predictions``) on the
+    model's feature matrix when the explainer is available and falls back to
+    the model's per-row explanation otherwise.
+    """
+    top_n = api_config.MAX_FEATURE_CONTRIBUTIONS
+    if explainer is not None:
+        return explainer.explain_claims(df, predictions, top_n)
+    return [
+        model.explain_prediction(df.iloc[i:i + 1])['feature_contributions']
+        for i in range(len(df))
+    ]
 
 def prepare_single_claim(claim_data: ClaimRequest) -> pd.DataFrame:
     """Prepare a single claim for prediction"""
@@ -167,40 +227,20 @@ def prepare_single_claim(claim_data: ClaimRequest) -> pd.DataFrame:
     
     return df
 
-async def log_prediction_to_db(
-    db,
-    claim_id: str,
-    seller_id: str,
-    predicted_claimable: bool,
-    probability: float,
-    confidence: float,
-    feature_contributions: List[Dict[str, Any]],
-    model_components: Dict[str, float],
-    processing_time_ms: float,
-    request: Request
-):
-    """Log prediction to database"""
-    try:
-        # Get client IP and user agent
-        client_ip = request.client.host if request.client else "unknown"
-        user_agent = request.headers.get("user-agent", "unknown")
-        
-        # Create prediction record
-        PredictionCRUD.create_prediction(
-            db=db,
-            claim_id=claim_id,
-            seller_id=seller_id,
-            predicted_claimable=predicted_claimable,
-            probability=probability,
-            confidence=confidence,
-            feature_contributions=feature_contributions,
-            model_components=model_components,
-            processing_time_ms=processing_time_ms,
-            ip_address=client_ip,
-            user_agent=user_agent
-        )
-    except Exception as e:
-        logger.error(f"Error logging prediction to database: {e}")
+def prediction_log_row(response: ClaimResponse, seller_id: str, request: Request) -> Dict[str, Any]:
+    """Build the ``predictions`` row recorded for one response"""
+    return {
+        "claim_id": response.claim_id,
+        "seller_id": seller_id,
+        "predicted_claimable": response.claimable,
+        "probability": response.probability,
+        "confidence": response.confidence,
+        "feature_contributions": response.feature_contributions,
+        "model_components": response.model_components,
+        "processing_time_ms": response.processing_time_ms,
+        "ip_address": request.client.host if request.client else "unknown",
+        "user_agent": request.headers.get("user-agent", "unknown")
+    }
 
 @app.get("/")
 async def root():
@@ -254,9 +294,12 @@ async def get_model_info():
 async def predict_claim(
     claim: ClaimRequest,
     request: Request,
-    db=Depends(get_db)
+    explain: bool = True
 ):
-    """Predict claimability for a single claim"""
+    """Predict claimability for a single claim
+    
+    Feature contributions are only computed when ``explain`` is true.
+    """
     if model is None or not model.is_trained:
         raise HTTPException(status_code=503, detail="Model not loaded or trained")
     
@@ -276,8 +319,8 @@ async def predict_claim(
         # Make prediction using unified model (includes preprocessing)
         prediction_results = model.predict(df)
         
-        # Get feature explanations
-        explanation = model.explain_prediction(df)
+        # Get feature explanations (lazily, only when requested)
+        feature_contributions = explain_claims(df, prediction_results)[0] if explain else []
         
         # Prepare response
         response = ClaimResponse(
@@ -285,24 +328,13 @@ async def predict_claim(
             claimable=bool(prediction_results['predictions'][0]),
             probability=float(prediction_results['probabilities'][0]),
             confidence=float(prediction_results['confidence'][0]),
-            feature_contributions=explanation['feature_contributions'],
+            feature_contributions=feature_contributions,
             model_components=model.weights,
             processing_time_ms=prediction_results['processing_time_ms']
         )
         
-        # Log prediction to database
-        await log_prediction_to_db(
-            db=db,
-            claim_id=claim.claim_id,
-            seller_id=claim.seller_id,
-            predicted_claimable=response.claimable,
-            probability=response.probability,
-            confidence=response.confidence,
-            feature_contributions=response.feature_contributions,
-            model_components=response.model_components,
-            processing_time_ms=response.processing_time_ms,
-            request=request
-        )
+        # Queue the prediction for the background database writer
+        await prediction_log.log(prediction_log_row(response, claim.seller_id, request))
         
         return response
     
@@ -316,9 +348,13 @@ async def predict_claim(
 async def predict_claims_batch(
     batch_request: BatchClaimRequest,
     request: Request,
-    db=Depends(get_db)
+    explain: bool = True
 ):
-    """Predict claimability for multiple claims"""
+    """Predict claimability for multiple claims
+    
+    Explanations for the whole batch are computed in a single SHAP call and
+    only when ``explain`` is true.
+    """
     if model is None or not model.is_trained:
         raise HTTPException(status_code=503, detail="Model not loaded or trained")
     
@@ -335,43 +371,43 @@ async def predict_claims_batch(
         predictions = []
         total_processing_time = 0
         
-        for claim in batch_request.claims:
-            # Prepare claim data
-            df = prepare_single_claim(claim)
-            
-            # Make prediction
-            prediction_results = model.predict(df)
-            
-            # Get feature explanations
-            explanation = model.explain_prediction(df)
-            
+        claim_frames = [prepare_single_claim(claim) for claim in batch_request.claims]
+        batch_results = [model.predict(df) for df in claim_frames]
+        
+        # Explain the whole batch at once instead of claim by claim
+        if explain and claim_frames:
+            batch_contributions = explain_claims(
+                pd.concat(claim_frames, ignore_index=True),
+                {
+                    key: np.concatenate([np.asarray(r[key]) for r in batch_results])
+                    for key in ('predictions', 'probabilities')
+                }
+            )
+        else:
+            batch_contributions = [[] for _ in claim_frames]
+        
+        for claim, prediction_results, feature_contributions in zip(
+            batch_request.claims, batch_results, batch_contributions
+        ):
             # Prepare response
             prediction_response = ClaimResponse(
                 claim_id=claim.claim_id,
                 claimable=bool(prediction_results['predictions'][0]),
                 probability=float(prediction_results['probabilities'][0]),
                 confidence=float(prediction_results['confidence'][0]),
-                feature_contributions=explanation['feature_contributions'],
+                feature_contributions=feature_contributions,
                 model_components=model.weights,
                 processing_time_ms=prediction_results['processing_time_ms']
             )
             
             predictions.append(prediction_response)
             total_processing_time += prediction_results['processing_time_ms']
-            
-            # Log prediction to database
-            await log_prediction_to_db(
-                db=db,
-                claim_id=claim.claim_id,
-                seller_id=claim.seller_id,
-                predicted_claimable=prediction_response.claimable,
-                probability=prediction_response.probability,
-                confidence=prediction_response.confidence,
-                feature_contributions=prediction_response.feature_contributions,
-                model_components=prediction_response.model_components,
-                processing_time_ms=prediction_response.processing_time_ms,
-                request=request
-            )
+        
+        # Queue the whole batch for the background database writer
+        await prediction_log.log_many([
+            prediction_log_row(p, claim.seller_id, request)
+            for p, claim in zip(predictions, batch_request.claims)
+        ])
         
         # Calculate batch metrics
         probabilities = [p.probability for p in predictions]
@@ -490,7 +526,8 @@ async def get_model_metrics(db=Depends(get_db)):
             "prediction_stats": prediction_stats,
             "feedback_stats": feedback_stats,
             "model_loaded": True,
-            "feature_count": len(model.feature_names)
+            "feature_count": len(model.feature_names),
+            "prediction_logging": prediction_log.get_stats()
         }
     
     except Exception as e:
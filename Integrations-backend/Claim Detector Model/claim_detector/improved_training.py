@@ -17,12 +17,16 @@ logger = logging.getLogger(__name__)
 class ImprovedFBAClaimsModel:
     """Improved FBA claims detection model with better class imbalance handling"""
     
+    # Training rows kept with the model as the SHAP background
+    BACKGROUND_SIZE = 50
+    
     def __init__(self):
         self.model = None
         self.feature_columns = None
         self.is_trained = False
         self.feature_importance = {}
         self.threshold = 0.5
+        self.background = None
         
     def prepare_features(self, df):
         """Prepare features with better engineering"""
@@ -85,7 +89,11 @@ class ImprovedFBAClaimsModel:
         X = X.replace([np.inf, -np.inf], np.nan)
         X = X.fillna(X.median())
         
-        self.feature_columns = X.columns.tolist()
+        if self.is_trained and self.feature_columns:
+            # Scoring: keep the trained column order instead of redefining it
+            X = X.reindex(columns=self.feature_columns, fill_value=0)
+        else:
+            self.feature_columns = X.columns.tolist()
         logger.info(f"Prepared {len(self.feature_columns)} improved features")
         
         return X
@@ -198,6 +206,7 @@ class ImprovedFBAClaimsModel:
         
         self.is_trained = True
         self.feature_importance = feature_scores
+        self.background = X.sample(n=min(self.BACKGROUND_SIZE, len(X)), random_state=42)
         
         logger.info(f"Model training completed! Accuracy: {accuracy:.4f}")
         return self.model
@@ -349,6 +358,7 @@ class ImprovedFBAClaimsModel:
             'is_trained': self.is_trained,
             'feature_importance': self.feature_importance,
             'threshold': self.threshold,
+            'background': self.background,
             'training_date': datetime.now().isoformat()
         }
         
@@ -367,6 +377,7 @@ class ImprovedFBAClaimsModel:
         self.is_trained = model_data['is_trained']
         self.feature_importance = model_data['feature_importance']
         self.threshold = model_data.get('threshold', 0.5)
+        self.background = model_data.get('background')
         
         logger.info(f"Model loaded from {filepath}")
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark prediction logging on the /predict/batch request path
+
+Times the logging share of a 1,000-claim batch request two ways: the old
+synchronous path (one ``PredictionCRUD.create_prediction`` commit per claim)
+and the background ``PredictionLogWriter`` (rows queued, written later in
+multi-row INSERTs). Reports p50/p99 request latency for each.
+
+Usage: python scripts/benchmark_prediction_logging.py [--requests 20] [--claims 1000] [--database-url URL]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def make_rows(request_no: int, claims: int):
+    return [
+        {
+            "claim_id": f"claim-{request_no}-{i}",
+            "seller_id": f"seller-{i % 50}",
+            "predicted_claimable": i % 3 == 0,
+            "probability": 0.87,
+            "confidence": 0.74,
+            "feature_contributions": [{"feature": "amount", "contribution": 0.12}] * 10,
+            "model_components": {"lightgbm": 0.4, "catboost": 0.3, "text": 0.2, "anomaly": 0.1},
+            "processing_time_ms": 2.5,
+            "ip_address": "10.0.0.1",
+            "user_agent": "benchmark"
+        }
+        for i in range(claims)
+    ]
+
+
+async def bench_sync(session_factory, requests: int, claims: int):
+    from src.database import PredictionCRUD
+
+    latencies = []
+    for n in range(requests):
+        rows = make_rows(n, claims)
+        start = time.perf_counter()
+        db = session_factory()
+        try:
+            for row in rows:
+                PredictionCRUD.create_prediction(db=db, **row)
+        finally:
+            db.close()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def bench_async(session_factory, requests: int, claims: int):
+    from src.config import api_config
+    from src.database import PredictionLogWriter
+
+    writer = PredictionLogWriter(
+        session_factory,
+        max_queue_size=api_config.PREDICTION_LOG_QUEUE_SIZE,
+        batch_size=api_config.PREDICTION_LOG_BATCH_SIZE,
+        flush_interval=api_config.PREDICTION_LOG_FLUSH_INTERVAL
+    )
+    writer.start()
+    latencies = []
+    for n in range(requests):
+        rows = make_rows(n, claims)
+        start = time.perf_counter()
+        await writer.log_many(rows)
+        latencies.append((time.perf_counter() - start) * 1000)
+        # Let the writer run between requests, as it would between real ones
+        await asyncio.sleep(0)
+    drain_start = time.perf_counter()
+    await writer.stop()
+    drain_ms = (time.perf_counter() - drain_start) * 1000
+    return latencies, drain_ms, writer.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prediction logging latency benchmark")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--claims", type=int, default=1000)
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmpdir.name}/bench.db"
+
+    from src.database.session import SessionLocal
+
+    sync_latencies = asyncio.run(bench_sync(SessionLocal, args.requests, args.claims))
+    async_latencies, drain_ms, stats = asyncio.run(bench_async(SessionLocal, args.requests, args.claims))
+
+    print(f"{args.requests} requests x {args.claims} claims ({os.environ['DATABASE_URL']})")
+    print(f"{'logging':>12} {'p50 ms':>10} {'p99 ms':>10}")
+    for name, latencies in [("synchronous", sync_latencies), ("background", async_latencies)]:
+        print(f"{name:>12} {np.percentile(latencies, 50):>10.1f} {np.percentile(latencies, 99):>10.1f}")
+    print(f"background writer: {stats['written']} rows in {stats['batches']} batches, "
+          f"{stats['backpressure_waits']} backpressure waits, {drain_ms:.0f} ms to drain on stop")
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
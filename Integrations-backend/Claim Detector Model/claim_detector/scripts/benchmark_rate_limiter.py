@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the GCRA rate limiter
+
+Measures the cost of one ``is_allowed`` check as the number of distinct
+client keys grows, with the LRU both large enough for every key and smaller
+than the key set (so checks also evict). Per-check cost should stay flat.
+
+Usage: python scripts/benchmark_rate_limiter.py [--checks 500000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.security.rate_limiter import InMemoryGCRAStore, RateLimiter
+
+
+def bench(distinct_keys: int, max_keys: int, checks: int):
+    store = InMemoryGCRAStore(max_keys=max_keys)
+    limiter = RateLimiter(store)
+    ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(distinct_keys)]
+
+    # Warm up so every key (up to max_keys) is resident
+    for ip in ips:
+        limiter.is_allowed(ip, "predict", 100, 60)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for n in range(checks):
+        limiter.is_allowed(ips[n % distinct_keys], "predict", 100, 60)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / checks * 1e9, len(store), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GCRA rate limiter microbenchmark")
+    parser.add_argument("--checks", type=int, default=500_000)
+    args = parser.parse_args()
+
+    print(f"{'distinct keys':>14} {'max keys':>9} {'ns/check':>9} {'resident':>9} {'peak alloc':>11}")
+    for distinct_keys, max_keys in [(1_000, 100_000), (10_000, 100_000), (100_000, 100_000), (100_000, 10_000)]:
+        ns, resident, peak = bench(distinct_keys, max_keys, args.checks)
+        print(f"{distinct_keys:>14,} {max_keys:>9,} {ns:>9.0f} {resident:>9,} {peak / 1024:>9.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -93,6 +93,8 @@ class FeatureConfig:
     TEXT_COLUMNS = ['description', 'reason', 'notes']
     TEXT_MAX_LENGTH = 512
     TEXT_BATCH_SIZE = 32
+    # Persistent embedding cache, shared by training and scoring runs (empty disables it)
+    TEXT_EMBEDDING_CACHE_DIR = os.getenv("TEXT_EMBEDDING_CACHE_DIR", str(MODELS_DIR / "embedding_cache"))
     
     # Anomaly features
     ANOMALY_FEATURES = ['amount', 'frequency', 'timing']
@@ -142,6 +144,15 @@ class APIConfig:
     CONFIDENCE_THRESHOLD = 0.7
     MAX_FEATURE_CONTRIBUTIONS = 10
     
+    # Explanation settings
+    EXPLANATION_CACHE_SIZE = 10000
+    EXPLANATION_APPROXIMATE = False  # path-dependent attributions instead of exact TreeSHAP
+
+    # Prediction logging (written in the background, off the request path)
+    PREDICTION_LOG_QUEUE_SIZE = 10000  # requests wait for space once this many rows are pending
+    PREDICTION_LOG_BATCH_SIZE = 500  # rows per multi-row INSERT
+    PREDICTION_LOG_FLUSH_INTERVAL = 1.0  # seconds a partial batch may wait
+
     # Rate limiting
     RATE_LIMIT_PER_MINUTE = 1000
     
@@ -13,7 +13,6 @@ import json
 from pathlib import Path
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import pickle
 
 # Configure logging
@@ -55,6 +54,7 @@ class RejectionNormalizer:
         self.rejection_patterns = self._load_rejection_patterns()
         self.tfidf_vectorizer = None
         self.pattern_embeddings = None
+        self._compile_patterns()
         self._build_pattern_embeddings()
         
         # Standard rejection categories
@@ -233,6 +233,22 @@ class RejectionNormalizer:
             )
         ]
     
+    def _compile_patterns(self):
+        """Compile regexes and word sets once per pattern set"""
+        self._compiled_patterns = [
+            re.compile(pattern.pattern, re.IGNORECASE) for pattern in self.rejection_patterns
+        ]
+        # One alternation over every pattern rejects non-matching text in a single
+        # scan; per-pattern regexes are only consulted (in priority order) on a hit
+        self._combined_pattern = re.compile(
+            "|".join(f"(?:{pattern.pattern})" for pattern in self.rejection_patterns),
+            re.IGNORECASE
+        ) if self.rejection_patterns else None
+        self._pattern_word_sets = [
+            frozenset(re.findall(r'\w+', pattern.pattern.lower()))
+            for pattern in self.rejection_patterns
+        ]
+    
     def _build_pattern_embeddings(self):
         """Build TF-IDF embeddings for pattern matching"""
         try:
@@ -251,29 +267,52 @@ class RejectionNormalizer:
     
     def normalize_rejection(self, amazon_reason: str) -> NormalizedRejection:
         """Convert Amazon's rejection text to structured format"""
-        if not amazon_reason or not amazon_reason.strip():
-            return self._create_unknown_rejection(amazon_reason)
-        
-        # Clean the rejection text
-        cleaned_reason = self._clean_rejection_text(amazon_reason)
+        return self.normalize_batch([amazon_reason])[0]
+    
+    def normalize_batch(self, amazon_reasons: List[str]) -> List[NormalizedRejection]:
+        """
+        Normalize many rejection texts at once
         
-        # Try exact pattern matching first
-        exact_match = self._find_exact_pattern_match(cleaned_reason)
-        if exact_match:
-            return exact_match
+        Each distinct cleaned text is matched once. Exact and fuzzy matching use
+        precompiled patterns and cached word sets, and the texts left over are
+        matched semantically with a single sparse TF-IDF matrix product.
+        """
+        cleaned_reasons: List[Optional[str]] = [
+            self._clean_rejection_text(reason) if reason and reason.strip() else None
+            for reason in amazon_reasons
+        ]
         
-        # Try fuzzy pattern matching
-        fuzzy_match = self._find_fuzzy_pattern_match(cleaned_reason)
-        if fuzzy_match:
-            return fuzzy_match
+        # Match each distinct cleaned text once: (pattern index, confidence override)
+        matches: Dict[str, Optional[Tuple[int, Optional[float]]]] = {}
+        unmatched: List[str] = []
+        for cleaned_reason in cleaned_reasons:
+            if cleaned_reason is None or cleaned_reason in matches:
+                continue
+            
+            # Try exact pattern matching first, then fuzzy pattern matching
+            match = self._match_exact(cleaned_reason)
+            if match is None:
+                match = self._match_fuzzy(cleaned_reason)
+            matches[cleaned_reason] = match
+            if match is None:
+                unmatched.append(cleaned_reason)
         
         # Try semantic similarity matching
-        semantic_match = self._find_semantic_match(cleaned_reason)
-        if semantic_match:
-            return semantic_match
+        if unmatched:
+            matches.update(zip(unmatched, self._match_semantic(unmatched)))
         
-        # Fallback to unknown category
-        return self._create_unknown_rejection(amazon_reason)
+        results = []
+        for reason, cleaned_reason in zip(amazon_reasons, cleaned_reasons):
+            match = matches.get(cleaned_reason) if cleaned_reason is not None else None
+            if match is None:
+                # Fallback to unknown category
+                results.append(self._create_unknown_rejection(reason))
+            else:
+                pattern_index, confidence = match
+                results.append(self._create_normalized_rejection(
+                    self.rejection_patterns[pattern_index], cleaned_reason, confidence=confidence
+                ))
+        return results
     
     def _clean_rejection_text(self, text: str) -> str:
         """Clean and normalize rejection text"""
@@ -291,62 +330,71 @@ class RejectionNormalizer:
         
         return text.strip()
     
-    def _find_exact_pattern_match(self, cleaned_reason: str) -> Optional[NormalizedRejection]:
-        """Find exact pattern match using regex"""
-        for pattern in self.rejection_patterns:
-            if re.search(pattern.pattern, cleaned_reason, re.IGNORECASE):
-                return self._create_normalized_rejection(pattern, cleaned_reason)
+    def _match_exact(self, cleaned_reason: str) -> Optional[Tuple[int, Optional[float]]]:
+        if self._combined_pattern is None or not self._combined_pattern.search(cleaned_reason):
+            return None
+        for index, compiled in enumerate(self._compiled_patterns):
+            if compiled.search(cleaned_reason):
+                return index, None
         return None
     
-    def _find_fuzzy_pattern_match(self, cleaned_reason: str) -> Optional[NormalizedRejection]:
-        """Find fuzzy pattern match using partial matching"""
-        best_match = None
+    def _match_fuzzy(self, cleaned_reason: str) -> Optional[Tuple[int, Optional[float]]]:
+        reason_words = set(cleaned_reason.split())
+        best_index = None
         best_score = 0.0
         
-        for pattern in self.rejection_patterns:
-            # Split pattern into words
-            pattern_words = set(re.findall(r'\w+', pattern.pattern.lower()))
-            reason_words = set(cleaned_reason.split())
-            
+        for index, pattern_words in enumerate(self._pattern_word_sets):
             # Calculate word overlap
-            overlap = len(pattern_words.intersection(reason_words))
-            total_words = len(pattern_words.union(reason_words))
-            
+            total_words = len(pattern_words | reason_words)
             if total_words > 0:
-                score = overlap / total_words
+                score = len(pattern_words & reason_words) / total_words
                 if score > best_score and score > 0.3:  # Threshold for fuzzy matching
                     best_score = score
-                    best_match = pattern
-        
-        if best_match:
-            return self._create_normalized_rejection(best_match, cleaned_reason, confidence=best_score * 0.8)
+                    best_index = index
         
-        return None
+        if best_index is None:
+            return None
+        return best_index, best_score * 0.8
     
-    def _find_semantic_match(self, cleaned_reason: str) -> Optional[NormalizedRejection]:
-        """Find semantic match using TF-IDF similarity"""
+    def _match_semantic(self, cleaned_reasons: List[str]) -> List[Optional[Tuple[int, Optional[float]]]]:
         if self.tfidf_vectorizer is None or self.pattern_embeddings is None:
-            return None
+            return [None] * len(cleaned_reasons)
         
         try:
-            # Vectorize the input reason
-            reason_vector = self.tfidf_vectorizer.transform([cleaned_reason])
-            
-            # Calculate similarity with all patterns
-            similarities = cosine_similarity(reason_vector, self.pattern_embeddings).flatten()
-            
-            # Find best match
-            best_idx = np.argmax(similarities)
-            best_similarity = similarities[best_idx]
-            
-            if best_similarity > 0.2:  # Threshold for semantic matching
-                best_pattern = self.rejection_patterns[best_idx]
-                return self._create_normalized_rejection(best_pattern, cleaned_reason, confidence=best_similarity * 0.7)
-        
+            # TF-IDF rows are L2-normalised, so one sparse product gives every cosine similarity
+            reason_vectors = self.tfidf_vectorizer.transform(cleaned_reasons)
+            similarities = (reason_vectors @ self.pattern_embeddings.T).toarray()
+            best_indices = similarities.argmax(axis=1)
+            best_similarities = similarities[np.arange(len(cleaned_reasons)), best_indices]
         except Exception as e:
             logger.error(f"❌ Error in semantic matching: {e}")
+            return [None] * len(cleaned_reasons)
         
-        return None
+        return [
+            (int(index), float(similarity) * 0.7) if similarity > 0.2 else None  # Threshold for semantic matching
+            for index, similarity in zip(best_indices, best_similarities)
+        ]
+    
+    def _find_exact_pattern_match(self, cleaned_reason: str) -> Optional[NormalizedRejection]:
+        """Find exact pattern match using regex"""
+        match = self._match_exact(cleaned_reason)
+        if match is None:
+            return None
+        return self._create_normalized_rejection(self.rejection_patterns[match[0]], cleaned_reason)
+    
+    def _find_fuzzy_pattern_match(self, cleaned_reason: str) -> Optional[NormalizedRejection]:
+        """Find fuzzy pattern match using partial matching"""
+        match = self._match_fuzzy(cleaned_reason)
+        if match is None:
+            return None
+        return self._create_normalized_rejection(self.rejection_patterns[match[0]], cleaned_reason, confidence=match[1])
+    
+    def _find_semantic_match(self, cleaned_reason: str) -> Optional[NormalizedRejection]:
+        """Find semantic match using TF-IDF similarity"""
+        match = self._match_semantic([cleaned_reason])[0]
+        if match is None:
+            return None
+        return self._create_normalized_rejection(self.rejection_patterns[match[0]], cleaned_reason, confidence=match[1])
     
     def _create_normalized_rejection(self, pattern: RejectionPattern, original_text: str, confidence: Optional[float] = None) -> NormalizedRejection:
         """Create normalized rejection from pattern"""
@@ -399,12 +447,14 @@ class RejectionNormalizer:
     def add_custom_pattern(self, pattern: RejectionPattern):
         """Add a custom rejection pattern"""
         self.rejection_patterns.append(pattern)
+        self._compile_patterns()
         self._build_pattern_embeddings()  # Rebuild embeddings
         logger.info(f"✅ Added custom pattern: {pattern.category}")
     
     def remove_pattern(self, category: str):
         """Remove a rejection pattern by category"""
         self.rejection_patterns = [p for p in self.rejection_patterns if p.category != category]
+        self._compile_patterns()
         self._build_pattern_embeddings()  # Rebuild embeddings
         logger.info(f"✅ Removed pattern: {category}")
     
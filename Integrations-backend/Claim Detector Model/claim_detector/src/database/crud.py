@@ -2,7 +2,7 @@
 CRUD operations for the Claim Detector Model database
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, insert
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from .models import Feedback, Metrics, Prediction
@@ -166,7 +166,20 @@ class PredictionCRUD:
         db.commit()
         db.refresh(prediction)
         return prediction
-    
+
+    @staticmethod
+    def create_predictions_bulk(db: Session, rows: List[Dict[str, Any]]) -> int:
+        """Insert many prediction rows in one transaction
+
+        ``rows`` are dicts of ``Prediction`` column values; they are sent as
+        multi-row INSERT statements rather than one round trip per row.
+        """
+        if not rows:
+            return 0
+        db.execute(insert(Prediction), rows)
+        db.commit()
+        return len(rows)
+
     @staticmethod
     def get_prediction_by_claim_id(db: Session, claim_id: str) -> Optional[Prediction]:
         """Get prediction by claim ID"""
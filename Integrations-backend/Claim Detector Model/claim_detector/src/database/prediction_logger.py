@@ -0,0 +1,151 @@
+"""
+Background prediction logging for the Claim Detector Model
+
+Requests hand prediction rows to a bounded in-process queue and return; a
+background task drains it and writes the rows with multi-row INSERTs.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from .crud import PredictionCRUD
+
+logger = logging.getLogger(__name__)
+
+class PredictionLogWriter:
+    """
+    Bounded queue of prediction rows flushed in batches
+
+    A batch is written when ``batch_size`` rows are pending or
+    ``flush_interval`` seconds after its first row arrived, whichever comes
+    first. When ``max_queue_size`` rows are pending, ``log`` waits for the
+    writer to catch up, so a slow database slows requests down instead of
+    growing memory without limit.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0
+    ):
+        self.session_factory = session_factory
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"enqueued": 0, "written": 0, "failed": 0, "retries": 0, "batches": 0, "backpressure_waits": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the writer task on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Prediction log writer started")
+
+    async def stop(self):
+        """Flush everything still queued, then stop the writer task"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Prediction log writer stopped")
+
+    async def log(self, row: Dict[str, Any]):
+        """Queue one prediction row, waiting for space if the queue is full"""
+        await self.log_many([row])
+
+    async def log_many(self, rows: List[Dict[str, Any]]):
+        """Queue prediction rows, waiting for space if the queue is full
+
+        Without a running writer (e.g. scripts that never start it) rows are
+        written immediately so nothing is lost.
+        """
+        if not self.running:
+            await asyncio.to_thread(self._write, list(rows))
+            return
+        for row in rows:
+            if self._queue.full():
+                self.stats["backpressure_waits"] += 1
+            await self._queue.put(row)
+            self.stats["enqueued"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus the current queue depth"""
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running
+        }
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception as e:
+                # Never let one batch stop the writer; later rows still get logged
+                self.stats["failed"] += len(batch)
+                logger.error(f"Prediction log writer failed on {len(batch)} rows: {e}")
+
+    def _write(self, rows: List[Dict[str, Any]]):
+        """Write a batch, retrying it once; rows that still fail are counted as failed"""
+        if not rows:
+            return
+        for attempt in range(2):
+            error = self._insert(rows)
+            if error is None:
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+                return
+            if attempt == 0:
+                self.stats["retries"] += 1
+                logger.warning(f"Error writing {len(rows)} predictions to database, retrying: {error}")
+        self.stats["failed"] += len(rows)
+        logger.error(f"Dropped {len(rows)} predictions after retry: {error}")
+
+    def _insert(self, rows: List[Dict[str, Any]]) -> Optional[Exception]:
+        db = None
+        try:
+            db = self.session_factory()
+            PredictionCRUD.create_predictions_bulk(db, rows)
+            return None
+        except Exception as e:
+            if db is not None:
+                try:
+                    db.rollback()
+                except Exception:
+                    pass
+            return e
+        finally:
+            if db is not None:
+                try:
+                    db.close()
+                except Exception:
+                    pass
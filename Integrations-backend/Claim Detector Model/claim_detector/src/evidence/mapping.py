@@ -1,20 +1,144 @@
 """
 Mapping service for invoice SKUs to catalog SKUs/ASINs
 """
+import hashlib
 import logging
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import re
+import numpy as np
+from collections import OrderedDict, defaultdict
 from difflib import SequenceMatcher
 
 logger = logging.getLogger(__name__)
 
+class CatalogIndex:
+    """
+    Lookup index over one catalog
+    
+    Holds an exact SKU hash map and a trigram inverted index. Fuzzy lookups
+    only score catalog SKUs that share trigrams with the query (ranked by
+    shared trigram count), instead of running SequenceMatcher against the
+    whole catalog.
+    """
+    
+    MAX_FUZZY_CANDIDATES = 64
+    
+    def __init__(self, catalog_data: Dict[str, Any]):
+        self.sku_info: Dict[str, Dict[str, Any]] = {}
+        self.skus: List[str] = []
+        
+        # sku_list entries first so that the skus dict wins on conflicts,
+        # matching the lookup order of the linear scan
+        for sku_info in catalog_data.get('sku_list', []):
+            sku = sku_info.get('sku')
+            if sku and sku not in self.sku_info:
+                self.sku_info[sku] = sku_info
+        for sku, sku_info in catalog_data.get('skus', {}).items():
+            if sku:
+                self.sku_info[sku] = {'sku': sku, **(sku_info or {})}
+        
+        # Fuzzy scan order: skus dict keys, then sku_list
+        seen = set()
+        for sku in list(catalog_data.get('skus', {}).keys()) + [
+            sku_info.get('sku') for sku_info in catalog_data.get('sku_list', [])
+        ]:
+            if sku and sku not in seen:
+                seen.add(sku)
+                self.skus.append(sku)
+        
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for position, sku in enumerate(self.skus):
+            for gram in self.trigrams_of(sku):
+                postings[gram].append(position)
+        self.trigrams: Dict[str, np.ndarray] = {
+            gram: np.asarray(positions, dtype=np.int32) for gram, positions in postings.items()
+        }
+    
+    def __len__(self) -> int:
+        return len(self.skus)
+    
+    @staticmethod
+    def trigrams_of(sku: str) -> set:
+        padded = f"  {sku.lower()} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        return self.sku_info.get(sku)
+    
+    def candidates(self, sku: str, limit: int = MAX_FUZZY_CANDIDATES) -> List[str]:
+        """
+        Catalog SKUs sharing the most trigrams with ``sku``
+        
+        Args:
+            sku: Query SKU
+            limit: Maximum number of candidates
+            
+        Returns:
+            Candidate SKUs, most shared trigrams first (ties in catalog order)
+        """
+        postings = [self.trigrams[gram] for gram in self.trigrams_of(sku) if gram in self.trigrams]
+        if not postings:
+            return []
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.skus))
+        matched = np.flatnonzero(shared)
+        if len(matched) > limit:
+            # Stable sort keeps catalog order among equal counts
+            matched = matched[np.argsort(-shared[matched], kind='stable')[:limit]]
+        # Return in catalog order so ties in similarity resolve like a full scan
+        return [self.skus[position] for position in np.sort(matched)]
+
 class SKUMappingService:
     """Service for mapping invoice SKUs to catalog SKUs and ASINs"""
     
-    def __init__(self, fuzzy_threshold: float = 0.8):
+    def __init__(self, fuzzy_threshold: float = 0.8, max_cached_catalogs: int = 64):
         self.fuzzy_threshold = fuzzy_threshold
-        self.catalog_cache = {}  # Cache for catalog lookups
+        self.max_cached_catalogs = max_cached_catalogs
+        self.catalog_cache: "OrderedDict[Any, Tuple[Tuple, CatalogIndex]]" = OrderedDict()  # Cache for catalog lookups
+    
+    def _catalog_fingerprint(self, catalog_data: Dict[str, Any]) -> Tuple:
+        digest = hashlib.sha256()
+        for sku in catalog_data.get('skus') or {}:
+            digest.update(str(sku).encode('utf-8'))
+            digest.update(b'\0')
+        digest.update(b'\1')
+        for sku_info in catalog_data.get('sku_list') or []:
+            digest.update(str(sku_info.get('sku')).encode('utf-8'))
+            digest.update(b'\0')
+        return (catalog_data.get('version'), catalog_data.get('updated_at'), digest.hexdigest())
+    
+    def get_catalog_index(self, catalog_data: Dict[str, Any]) -> CatalogIndex:
+        """
+        Get the cached index for a catalog, rebuilding it when the catalog changes
+        
+        Catalogs are cached per ``seller_id`` when present, otherwise by their
+        fingerprint. Computing the fingerprint hashes every SKU, so callers
+        look the index up once per invoice/batch and pass it down. A catalog counts as changed when its ``version``/``updated_at``
+        or its set of SKUs changes; call ``invalidate_catalog`` after editing the
+        details of existing SKUs without bumping ``version``/``updated_at``.
+        """
+        fingerprint = self._catalog_fingerprint(catalog_data)
+        key = catalog_data.get('seller_id') or fingerprint
+        
+        cached = self.catalog_cache.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            self.catalog_cache.move_to_end(key)
+            return cached[1]
+        
+        index = CatalogIndex(catalog_data)
+        self.catalog_cache[key] = (fingerprint, index)
+        self.catalog_cache.move_to_end(key)
+        while len(self.catalog_cache) > self.max_cached_catalogs:
+            self.catalog_cache.popitem(last=False)
+        logger.debug(f"Built catalog index with {len(index)} SKUs")
+        return index
+    
+    def invalidate_catalog(self, seller_id: Optional[str] = None):
+        """Drop the cached index for a seller, or every cached index"""
+        if seller_id is None:
+            self.catalog_cache.clear()
+        else:
+            self.catalog_cache.pop(seller_id, None)
         
     def map_invoice_skus(self, invoice_items: List[Dict[str, Any]], 
                          catalog_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -30,6 +154,7 @@ class SKUMappingService:
         """
         try:
             mapped_items = []
+            index = self.get_catalog_index(catalog_data)
             
             for item in invoice_items:
                 raw_sku = item.get('raw_sku')
@@ -46,7 +171,7 @@ class SKUMappingService:
                     continue
                 
                 # Try to map the SKU
-                mapping_result = self._map_single_sku(raw_sku, catalog_data)
+                mapping_result = self._map_single_sku(raw_sku, index)
                 
                 mapped_item = item.copy()
                 mapped_item.update(mapping_result)
@@ -58,13 +183,13 @@ class SKUMappingService:
             logger.error(f"SKU mapping failed: {e}")
             raise
     
-    def _map_single_sku(self, raw_sku: str, catalog_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _map_single_sku(self, raw_sku: str, index: CatalogIndex) -> Dict[str, Any]:
         """
         Map a single SKU to catalog data
         
         Args:
             raw_sku: Raw SKU from invoice
-            catalog_data: Catalog data
+            index: Index of the catalog (from ``get_catalog_index``)
             
         Returns:
             Mapping result with mapped_sku, asin, confidence, and status
@@ -74,7 +199,7 @@ class SKUMappingService:
             cleaned_sku = self._clean_sku(raw_sku)
             
             # Try exact match first
-            exact_match = self._find_exact_match(cleaned_sku, catalog_data)
+            exact_match = self._find_exact_match(cleaned_sku, index)
             if exact_match:
                 return {
                     'mapped_sku': exact_match['sku'],
@@ -84,7 +209,7 @@ class SKUMappingService:
                 }
             
             # Try normalized match
-            normalized_match = self._find_normalized_match(cleaned_sku, catalog_data)
+            normalized_match = self._find_normalized_match(cleaned_sku, index)
             if normalized_match:
                 return {
                     'mapped_sku': normalized_match['sku'],
@@ -94,7 +219,7 @@ class SKUMappingService:
                 }
             
             # Try fuzzy match
-            fuzzy_match = self._find_fuzzy_match(cleaned_sku, catalog_data)
+            fuzzy_match = self._find_fuzzy_match(cleaned_sku, index)
             if fuzzy_match:
                 return {
                     'mapped_sku': fuzzy_match['sku'],
@@ -139,28 +264,17 @@ class SKUMappingService:
         
         return cleaned.strip()
     
-    def _find_exact_match(self, cleaned_sku: str, catalog_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _find_exact_match(self, cleaned_sku: str, index: CatalogIndex) -> Optional[Dict[str, Any]]:
         """Find exact match in catalog"""
-        catalog_skus = catalog_data.get('skus', {})
-        
-        # Direct key lookup
-        if cleaned_sku in catalog_skus:
-            return catalog_skus[cleaned_sku]
-        
-        # Check in SKU list
-        for sku_info in catalog_data.get('sku_list', []):
-            if sku_info.get('sku') == cleaned_sku:
-                return sku_info
-        
-        return None
+        return index.get(cleaned_sku)
     
-    def _find_normalized_match(self, cleaned_sku: str, catalog_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _find_normalized_match(self, cleaned_sku: str, index: CatalogIndex) -> Optional[Dict[str, Any]]:
         """Find normalized match in catalog"""
         # Try different normalization variations
         variations = self._generate_sku_variations(cleaned_sku)
         
         for variation in variations:
-            match = self._find_exact_match(variation, catalog_data)
+            match = self._find_exact_match(variation, index)
             if match:
                 return match
         
@@ -186,36 +300,21 @@ class SKUMappingService:
         
         return list(set(variations))  # Remove duplicates
     
-    def _find_fuzzy_match(self, cleaned_sku: str, catalog_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _find_fuzzy_match(self, cleaned_sku: str, index: CatalogIndex) -> Optional[Dict[str, Any]]:
         """Find fuzzy match in catalog using similarity scoring"""
         best_match = None
         best_similarity = 0.0
         
-        # Get all catalog SKUs
-        catalog_skus = []
-        
-        # Add from skus dict
-        catalog_skus.extend(catalog_data.get('skus', {}).keys())
-        
-        # Add from sku_list
-        for sku_info in catalog_data.get('sku_list', []):
-            if 'sku' in sku_info:
-                catalog_skus.append(sku_info['sku'])
-        
-        # Calculate similarity with each catalog SKU
-        for catalog_sku in catalog_skus:
-            if not catalog_sku:
-                continue
-            
+        # Calculate similarity with the catalog SKUs that share trigrams
+        for catalog_sku in index.candidates(cleaned_sku):
             similarity = self._calculate_similarity(cleaned_sku, catalog_sku)
             
             if similarity > best_similarity and similarity >= self.fuzzy_threshold:
                 best_similarity = similarity
-                best_match = self._get_sku_info(catalog_sku, catalog_data)
+                best_match = catalog_sku
         
         if best_match:
-            best_match['similarity'] = best_similarity
-            return best_match
+            return {**self._get_sku_info(best_match, index), 'similarity': best_similarity}
         
         return None
     
@@ -237,19 +336,10 @@ class SKUMappingService:
         
         return min(1.0, similarity)
     
-    def _get_sku_info(self, sku: str, catalog_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _get_sku_info(self, sku: str, index: CatalogIndex) -> Dict[str, Any]:
         """Get SKU information from catalog data"""
-        # Try skus dict first
-        if sku in catalog_data.get('skus', {}):
-            return catalog_data['skus'][sku]
-        
-        # Try sku_list
-        for sku_info in catalog_data.get('sku_list', []):
-            if sku_info.get('sku') == sku:
-                return sku_info
-        
         # Return basic info if not found
-        return {'sku': sku}
+        return index.get(sku) or {'sku': sku}
     
     def batch_map_skus(self, sku_list: List[str], catalog_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         """
@@ -263,9 +353,10 @@ class SKUMappingService:
             Dict mapping SKU to mapping result
         """
         results = {}
+        index = self.get_catalog_index(catalog_data)
         
         for sku in sku_list:
-            mapping_result = self._map_single_sku(sku, catalog_data)
+            mapping_result = self._map_single_sku(sku, index)
             results[sku] = mapping_result
         
         return results
@@ -337,6 +428,7 @@ class SKUMappingService:
             List of improvement suggestions
         """
         suggestions = []
+        index = self.get_catalog_index(catalog_data)
         
         for item in mapped_items:
             if item.get('mapping_status') in ['no_match', 'error'] or item.get('mapping_confidence', 0) < 0.5:
@@ -345,7 +437,7 @@ class SKUMappingService:
                     continue
                 
                 # Find potential matches with lower threshold
-                potential_matches = self._find_potential_matches(raw_sku, catalog_data, threshold=0.3)
+                potential_matches = self._find_potential_matches(raw_sku, index, threshold=0.3)
                 
                 if potential_matches:
                     suggestions.append({
@@ -356,27 +448,17 @@ class SKUMappingService:
         
         return suggestions
     
-    def _find_potential_matches(self, raw_sku: str, catalog_data: Dict[str, Any], 
+    def _find_potential_matches(self, raw_sku: str, index: CatalogIndex, 
                                threshold: float = 0.3) -> List[Dict[str, Any]]:
         """Find potential matches with lower threshold for suggestions"""
         potential_matches = []
         
-        # Get all catalog SKUs
-        catalog_skus = []
-        catalog_skus.extend(catalog_data.get('skus', {}).keys())
-        for sku_info in catalog_data.get('sku_list', []):
-            if 'sku' in sku_info:
-                catalog_skus.append(sku_info['sku'])
-        
-        # Calculate similarity with each catalog SKU
-        for catalog_sku in catalog_skus:
-            if not catalog_sku:
-                continue
-            
+        # Calculate similarity with the catalog SKUs that share trigrams
+        for catalog_sku in index.candidates(raw_sku):
             similarity = self._calculate_similarity(raw_sku, catalog_sku)
             
             if similarity >= threshold:
-                sku_info = self._get_sku_info(catalog_sku, catalog_data)
+                sku_info = self._get_sku_info(catalog_sku, index)
                 potential_matches.append({
                     'suggested_sku': catalog_sku,
                     'similarity': similarity,
@@ -6,17 +6,75 @@ import logging
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
+from collections import OrderedDict
 import json
+import time
 
 logger = logging.getLogger(__name__)
 
+class ComparisonCache:
+    """
+    Bounded LRU cache with a per-entry TTL, indexed by seller
+    
+    Reads, writes and evictions are O(1); clearing one seller only touches
+    that seller's entries.
+    """
+    
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._seller_keys: Dict[str, set] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.get(key) is not None
+    
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if time.monotonic() >= expires_at:
+            # Remove expired cache entry
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return data
+    
+    def set(self, key: Tuple[str, str], data: Dict[str, Any]):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, data)
+        self._entries.move_to_end(key)
+        self._seller_keys.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+    
+    def _remove(self, key: Tuple[str, str]):
+        self._entries.pop(key, None)
+        seller_keys = self._seller_keys.get(key[0])
+        if seller_keys is not None:
+            seller_keys.discard(key)
+            if not seller_keys:
+                del self._seller_keys[key[0]]
+    
+    def clear(self, seller_id: Optional[str] = None):
+        if seller_id is None:
+            self._entries.clear()
+            self._seller_keys.clear()
+            return
+        for key in self._seller_keys.pop(seller_id, ()):
+            self._entries.pop(key, None)
+
 class ValueComparisonService:
     """Service for comparing Amazon default vs Opside True Value"""
     
-    def __init__(self):
+    def __init__(self, cache_ttl_hours: float = 24, max_cache_entries: int = 1000):
+        self.cache_ttl_hours = cache_ttl_hours  # Cache for 24 hours
         # Cache for value comparisons (in-memory for now, could be Redis)
-        self.comparison_cache = {}
-        self.cache_ttl_hours = 24  # Cache for 24 hours
+        self.comparison_cache = ComparisonCache(max_cache_entries, cache_ttl_hours * 3600)
         
     def compare_values(self, seller_id: str, sku: str, 
                       landed_cost_data: Optional[Dict[str, Any]] = None,
@@ -35,7 +93,7 @@ class ValueComparisonService:
         """
         try:
             # Check cache first
-            cache_key = f"{seller_id}:{sku}"
+            cache_key = (seller_id, sku)
             cached_result = self._get_cached_comparison(cache_key)
             if cached_result:
                 logger.info(f"Returning cached comparison for {sku}")
@@ -76,26 +134,45 @@ class ValueComparisonService:
             List of comparison results
         """
         try:
-            results = []
+            results: Dict[int, Dict[str, Any]] = {}
+            misses: Dict[str, List[int]] = {}
+            
+            for position, sku in enumerate(skus):
+                cached_result = self._get_cached_comparison((seller_id, sku))
+                if cached_result:
+                    results[position] = cached_result
+                else:
+                    misses.setdefault(sku, []).append(position)
             
-            for sku in skus:
-                try:
-                    comparison = self.compare_values(seller_id, sku)
-                    results.append(comparison)
-                except Exception as e:
-                    logger.error(f"Failed to compare values for {sku}: {e}")
-                    # Add error result
-                    results.append({
-                        'sku': sku,
-                        'error': str(e),
-                        'amazon_default': None,
-                        'opside_true_value': None,
-                        'net_gain': None,
-                        'proof': None,
-                        'updated_at': datetime.now().isoformat()
-                    })
+            if misses:
+                # One lookup each for landed costs and Amazon defaults
+                miss_skus = list(misses)
+                landed_costs = self._get_latest_landed_costs(seller_id, miss_skus)
+                amazon_defaults = self._get_amazon_default_values(seller_id, miss_skus)
+                
+                for sku, positions in misses.items():
+                    try:
+                        comparison = self._calculate_comparison(
+                            sku, landed_costs.get(sku), amazon_defaults.get(sku)
+                        )
+                        self._cache_comparison((seller_id, sku), comparison)
+                    except Exception as e:
+                        logger.error(f"Failed to compare values for {sku}: {e}")
+                        # Add error result
+                        comparison = {
+                            'sku': sku,
+                            'error': str(e),
+                            'amazon_default': None,
+                            'opside_true_value': None,
+                            'net_gain': None,
+                            'proof': None,
+                            'updated_at': datetime.now().isoformat()
+                        }
+                    for position in positions:
+                        results[position] = comparison
             
-            return results
+            logger.info(f"Compared values for {len(skus)} SKUs ({len(misses)} not cached)")
+            return [results[position] for position in range(len(skus))]
             
         except Exception as e:
             logger.error(f"Batch value comparison failed: {e}")
@@ -112,21 +189,38 @@ class ValueComparisonService:
         Returns:
             Latest landed cost data or None
         """
-        # TODO: Implement database lookup for latest landed cost
+        return self._get_latest_landed_costs(seller_id, [sku]).get(sku)
+    
+    def _get_latest_landed_costs(self, seller_id: str, skus: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get latest landed cost data for many SKUs in one lookup
+        
+        Args:
+            seller_id: Seller identifier
+            skus: SKUs to get landed costs for
+            
+        Returns:
+            Dict mapping SKU to its latest landed cost data (missing SKUs omitted)
+        """
+        # TODO: Implement database lookup for latest landed costs, e.g.
+        # SELECT DISTINCT ON (sku) ... WHERE seller_id = %s AND sku = ANY(%s)
+        # ORDER BY sku, calculated_at DESC
         # For now, return mock data
-        mock_landed_cost = {
-            'sku': sku,
-            'landed_per_unit': 25.50,
-            'unit_cost': 20.00,
-            'freight_alloc': 2.50,
-            'duties_alloc': 1.00,
-            'prep_alloc': 1.00,
-            'other_alloc': 1.00,
-            'calculated_at': datetime.now().isoformat(),
-            'invoice_id': 'mock_invoice_123'
+        calculated_at = datetime.now().isoformat()
+        return {
+            sku: {
+                'sku': sku,
+                'landed_per_unit': 25.50,
+                'unit_cost': 20.00,
+                'freight_alloc': 2.50,
+                'duties_alloc': 1.00,
+                'prep_alloc': 1.00,
+                'other_alloc': 1.00,
+                'calculated_at': calculated_at,
+                'invoice_id': 'mock_invoice_123'
+            }
+            for sku in set(skus)
         }
-        
-        return mock_landed_cost
     
     def _get_amazon_default_value(self, seller_id: str, sku: str) -> Optional[Dict[str, Any]]:
         """
@@ -139,17 +233,33 @@ class ValueComparisonService:
         Returns:
             Amazon default value data or None
         """
-        # TODO: Implement lookup from SP-API sync data or reimbursement history
+        return self._get_amazon_default_values(seller_id, [sku]).get(sku)
+    
+    def _get_amazon_default_values(self, seller_id: str, skus: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get Amazon default reimbursement values for many SKUs in one lookup
+        
+        Args:
+            seller_id: Seller identifier
+            skus: SKUs to get Amazon defaults for
+            
+        Returns:
+            Dict mapping SKU to its Amazon default value data (missing SKUs omitted)
+        """
+        # TODO: Implement lookup from SP-API sync data or reimbursement history,
+        # filtered with sku = ANY(%s) so the whole list is one query
         # For now, return mock data
-        mock_amazon_default = {
-            'sku': sku,
-            'default_value': 22.00,
-            'currency': 'USD',
-            'last_updated': datetime.now().isoformat(),
-            'source': 'mock_data'
+        last_updated = datetime.now().isoformat()
+        return {
+            sku: {
+                'sku': sku,
+                'default_value': 22.00,
+                'currency': 'USD',
+                'last_updated': last_updated,
+                'source': 'mock_data'
+            }
+            for sku in set(skus)
         }
-        
-        return mock_amazon_default
     
     def _calculate_comparison(self, sku: str, landed_cost_data: Optional[Dict[str, Any]], 
                             amazon_default_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -270,38 +380,13 @@ class ValueComparisonService:
         else:
             return 'no_difference'
     
-    def _get_cached_comparison(self, cache_key: str) -> Optional[Dict[str, Any]]:
+    def _get_cached_comparison(self, cache_key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
         """Get cached comparison result"""
-        if cache_key in self.comparison_cache:
-            cached_data = self.comparison_cache[cache_key]
-            cached_time = datetime.fromisoformat(cached_data['cached_at'])
-            
-            # Check if cache is still valid
-            if datetime.now() - cached_time < timedelta(hours=self.cache_ttl_hours):
-                return cached_data['data']
-            else:
-                # Remove expired cache entry
-                del self.comparison_cache[cache_key]
-        
-        return None
+        return self.comparison_cache.get(cache_key)
     
-    def _cache_comparison(self, cache_key: str, comparison_data: Dict[str, Any]):
+    def _cache_comparison(self, cache_key: Tuple[str, str], comparison_data: Dict[str, Any]):
         """Cache comparison result"""
-        self.comparison_cache[cache_key] = {
-            'data': comparison_data,
-            'cached_at': datetime.now().isoformat()
-        }
-        
-        # Limit cache size (keep only last 1000 entries)
-        if len(self.comparison_cache) > 1000:
-            # Remove oldest entries
-            oldest_keys = sorted(
-                self.comparison_cache.keys(),
-                key=lambda k: self.comparison_cache[k]['cached_at']
-            )[:100]
-            
-            for key in oldest_keys:
-                del self.comparison_cache[key]
+        self.comparison_cache.set(cache_key, comparison_data)
     
     def get_comparison_statistics(self, seller_id: str, days: int = 30) -> Dict[str, Any]:
         """
@@ -406,9 +491,7 @@ class ValueComparisonService:
         """
         if seller_id:
             # Clear cache for specific seller
-            keys_to_remove = [k for k in self.comparison_cache.keys() if k.startswith(f"{seller_id}:")]
-            for key in keys_to_remove:
-                del self.comparison_cache[key]
+            self.comparison_cache.clear(seller_id)
             logger.info(f"Cleared cache for seller {seller_id}")
         else:
             # Clear entire cache
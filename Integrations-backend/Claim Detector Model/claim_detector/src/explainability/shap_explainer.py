@@ -3,8 +3,9 @@ SHAP explainability module for FBA reimbursement claim detection
 """
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
+from collections import OrderedDict
 import shap
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -16,43 +17,257 @@ logger = logging.getLogger(__name__)
 class SHAPExplainer:
     """SHAP-based explainability for the ensemble model"""
     
-    def __init__(self, model=None):
+    # Permutations per sample for models without a tree component
+    PERMUTATIONS = 10
+    APPROXIMATE_PERMUTATIONS = 3
+    
+    def __init__(self, model=None, cache_size: int = 10000, approximate: bool = False,
+                 feature_transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None):
         """
         Initialize SHAP explainer
         
         Args:
             model: Trained ensemble model
+            cache_size: Maximum number of per-sample explanations kept in memory
+            approximate: Use fast path-dependent TreeSHAP contributions instead of the exact explainer
+            feature_transform: Turns raw claim rows into the model's feature matrix (see ``explain_claims``)
         """
         self.model = model
         self.explainer = None
+        self.tree_explainer = False
+        self.feature_transform = feature_transform
         self.feature_names = []
         self.baseline_values = {}
+        self.cache_size = cache_size
+        self.approximate = approximate
+        self.model_version = self._resolve_model_version(model)
+        self._explanation_cache: "OrderedDict[Tuple[str, bool, int], np.ndarray]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    @classmethod
+    def for_model(cls, model, feature_pipeline=None, cache_size: int = 10000,
+                  approximate: bool = False) -> Optional['SHAPExplainer']:
+        """
+        Explainer for a loaded claims model, or None if it cannot be explained
         
-    def initialize_explainer(self, model, feature_names: List[str]):
+        Raw claim rows are turned into the model's feature matrix by
+        ``feature_pipeline`` when given (the ensemble's preprocessing pipeline),
+        else by the model's own ``prepare_features``. Models with a LightGBM
+        component get TreeSHAP; other models are explained model-agnostically
+        against the ``background`` feature sample saved with them.
+        
+        Args:
+            model: Trained model
+            feature_pipeline: Fitted preprocessing pipeline, if the model uses one
+            cache_size: Maximum number of per-sample explanations kept in memory
+            approximate: Use the fast approximate attributions
+            
+        Returns:
+            Initialized explainer, or None
+        """
+        if feature_pipeline is not None:
+            feature_transform = feature_pipeline.transform
+        else:
+            feature_transform = getattr(model, 'prepare_features', None)
+        feature_names = list(getattr(model, 'feature_names', None) or getattr(model, 'feature_columns', None) or [])
+        if feature_transform is None or not feature_names:
+            return None
+        
+        explainer = cls(model, cache_size=cache_size, approximate=approximate,
+                        feature_transform=feature_transform)
+        explainer.initialize_explainer(model, feature_names, background=getattr(model, 'background', None))
+        return explainer if explainer.explainer is not None else None
+    
+    @staticmethod
+    def _resolve_model_version(model) -> str:
+        metadata = getattr(model, 'metadata', None) or {}
+        return str(metadata.get('model_version', 'unknown'))
+        
+    def initialize_explainer(self, model, feature_names: List[str],
+                             background: Optional[pd.DataFrame] = None):
         """
         Initialize SHAP explainer with the model
         
         Args:
             model: Trained ensemble model
             feature_names: List of feature names
+            background: Feature sample for explaining models without a LightGBM component
         """
         self.model = model
         self.feature_names = feature_names
+        self.model_version = self._resolve_model_version(model)
+        self.clear_cache()
         
         # Initialize explainer for LightGBM (most interpretable)
         if hasattr(model, 'models') and 'lightgbm' in model.models:
             self.explainer = shap.TreeExplainer(model.models['lightgbm'])
+            self.tree_explainer = True
             logger.info("SHAP TreeExplainer initialized for LightGBM")
+        elif background is not None and len(background):
+            self.explainer = shap.PermutationExplainer(
+                self._predict_probabilities, background.reindex(columns=feature_names, fill_value=0.0)
+            )
+            self.tree_explainer = False
+            logger.info(f"SHAP PermutationExplainer initialized against {len(background)} background rows")
         else:
             logger.warning("LightGBM model not found, SHAP explainer not initialized")
     
-    def explain_prediction(self, sample: pd.DataFrame, top_n: int = 10) -> Dict[str, Any]:
+    def _predict_probabilities(self, features) -> np.ndarray:
+        frame = pd.DataFrame(np.asarray(features), columns=self.feature_names)
+        return np.asarray(self.model.predict(frame)['probabilities'], dtype=float)
+    
+    def clear_cache(self):
+        """Drop all cached explanations"""
+        self._explanation_cache.clear()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Explanation cache size and hit rate"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'size': len(self._explanation_cache),
+            'max_size': self.cache_size,
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / lookups if lookups else 0.0
+        }
+    
+    def _positive_class(self, shap_values):
+        # For binary classification, use positive class values
+        if isinstance(shap_values, list):
+            shap_values = shap_values[1]  # Positive class
+        shap_values = np.asarray(shap_values)
+        if shap_values.ndim == 3:
+            shap_values = shap_values[:, :, -1]
+        return shap_values
+    
+    def _compute_shap_values(self, samples: pd.DataFrame, approximate: bool) -> np.ndarray:
+        if not self.tree_explainer:
+            # Model-agnostic: fewer permutations is the approximate mode
+            permutations = self.APPROXIMATE_PERMUTATIONS if approximate else self.PERMUTATIONS
+            return self._positive_class(self.explainer.shap_values(samples, npermutations=permutations))
+        if approximate:
+            # LightGBM ships a native path-dependent TreeSHAP; the last column is the bias term
+            tree_model = getattr(self.model, 'models', {}).get('lightgbm')
+            if tree_model is not None and hasattr(tree_model, 'predict'):
+                try:
+                    return np.asarray(tree_model.predict(samples, pred_contrib=True))[:, :-1]
+                except Exception as e:
+                    logger.debug(f"Native contributions unavailable: {e}")
+            try:
+                return self._positive_class(self.explainer.shap_values(samples, approximate=True))
+            except Exception as e:
+                logger.debug(f"Approximate SHAP unavailable, using exact values: {e}")
+        return self._positive_class(self.explainer.shap_values(samples))
+    
+    def get_shap_values(self, samples: pd.DataFrame, approximate: Optional[bool] = None) -> np.ndarray:
+        """
+        SHAP values for every row, computing only rows missing from the cache
+        
+        Rows are keyed by a hash of their feature values plus the model version,
+        and all cache misses are explained in a single SHAP call.
+        
+        Args:
+            samples: DataFrame with one or more samples
+            approximate: Override the explainer-level approximate setting
+            
+        Returns:
+            Array of shape (n_samples, n_features)
+        """
+        if self.explainer is None:
+            raise ValueError("SHAP explainer not initialized")
+        
+        approximate = self.approximate if approximate is None else approximate
+        row_hashes = pd.util.hash_pandas_object(samples, index=False).to_numpy()
+        keys = [(self.model_version, approximate, int(h)) for h in row_hashes]
+        
+        rows: List[Optional[np.ndarray]] = []
+        missing = []
+        for position, key in enumerate(keys):
+            cached = self._explanation_cache.get(key)
+            if cached is None:
+                missing.append(position)
+            else:
+                self._explanation_cache.move_to_end(key)
+            rows.append(cached)
+        
+        self.cache_hits += len(keys) - len(missing)
+        self.cache_misses += len(missing)
+        
+        if missing:
+            computed = self._compute_shap_values(samples.iloc[missing], approximate)
+            for offset, position in enumerate(missing):
+                rows[position] = computed[offset]
+                if self.cache_size > 0:
+                    self._explanation_cache[keys[position]] = computed[offset]
+            while len(self._explanation_cache) > self.cache_size:
+                self._explanation_cache.popitem(last=False)
+        
+        return np.vstack(rows)
+    
+    def _top_contributions(self, values: np.ndarray, top_n: int) -> List[Dict[str, Any]]:
+        n_features = min(len(values), len(self.feature_names))
+        values = values[:n_features]
+        abs_values = np.abs(values)
+        if top_n < n_features:
+            # Partial selection first, then sort only the top_n
+            top = np.argpartition(-abs_values, top_n)[:top_n]
+        else:
+            top = np.arange(n_features)
+        top = top[np.argsort(-abs_values[top], kind='stable')]
+        return [
+            {
+                'feature_name': self.feature_names[i],
+                'contribution': float(values[i]),
+                'abs_contribution': float(abs_values[i])
+            }
+            for i in top
+        ]
+    
+    def explain_samples(self, samples: pd.DataFrame, top_n: int = 10,
+                        approximate: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """
+        Per-sample explanations for a batch, computed with one SHAP call
+        
+        Args:
+            samples: DataFrame with one or more samples
+            top_n: Number of top features to return per sample
+            approximate: Override the explainer-level approximate setting
+            
+        Returns:
+            List of per-sample explanation dictionaries
+        """
+        shap_values = self.get_shap_values(samples, approximate)
+        base_value = self._base_value()
+        
+        explanations = []
+        for values in shap_values:
+            contributions = self._top_contributions(values, top_n)
+            explanations.append({
+                'base_value': base_value,
+                'feature_contributions': contributions,
+                'total_contribution': float(np.sum(np.abs(values))),
+                'positive_contributions': [fc for fc in contributions if fc['contribution'] > 0],
+                'negative_contributions': [fc for fc in contributions if fc['contribution'] < 0]
+            })
+        return explanations
+    
+    def _base_value(self) -> float:
+        expected_value = getattr(self.explainer, 'expected_value', None)
+        if expected_value is None:
+            return 0.0
+        expected_value = np.atleast_1d(expected_value)
+        return float(expected_value[-1])
+    
+    def explain_prediction(self, sample: pd.DataFrame, top_n: int = 10,
+                           approximate: Optional[bool] = None) -> Dict[str, Any]:
         """
         Explain a single prediction
         
         Args:
             sample: Single sample DataFrame
             top_n: Number of top features to return
+            approximate: Override the explainer-level approximate setting
             
         Returns:
             Dictionary with explanation details
@@ -60,50 +275,32 @@ class SHAPExplainer:
         if self.explainer is None:
             raise ValueError("SHAP explainer not initialized")
         
-        # Get SHAP values
-        shap_values = self.explainer.shap_values(sample)
-        
-        # For binary classification, use positive class values
-        if isinstance(shap_values, list):
-            shap_values = shap_values[1]  # Positive class
-        
-        # Get feature contributions
-        feature_contributions = []
-        for i, feature in enumerate(self.feature_names):
-            if i < len(shap_values[0]):
-                contribution = shap_values[0][i]
-                feature_contributions.append({
-                    'feature_name': feature,
-                    'contribution': float(contribution),
-                    'abs_contribution': abs(contribution)
-                })
-        
-        # Sort by absolute contribution
-        feature_contributions.sort(key=lambda x: x['abs_contribution'], reverse=True)
+        explanation = self.explain_samples(sample.iloc[:1], top_n, approximate)[0]
         
         # Get prediction details
         prediction = self.model.predict(sample)
         probability = prediction['probabilities'][0] if 'probabilities' in prediction else 0.5
         
-        explanation = {
+        explanation.update({
             'prediction': bool(prediction['predictions'][0]) if 'predictions' in prediction else False,
-            'probability': float(probability),
-            'base_value': float(self.explainer.expected_value[1]) if hasattr(self.explainer, 'expected_value') else 0.0,
-            'feature_contributions': feature_contributions[:top_n],
-            'total_contribution': sum(abs(fc['contribution']) for fc in feature_contributions),
-            'positive_contributions': [fc for fc in feature_contributions[:top_n] if fc['contribution'] > 0],
-            'negative_contributions': [fc for fc in feature_contributions[:top_n] if fc['contribution'] < 0]
-        }
+            'probability': float(probability)
+        })
         
         return explanation
     
-    def explain_batch_predictions(self, samples: pd.DataFrame, top_n: int = 10) -> Dict[str, Any]:
+    def explain_batch_predictions(self, samples: pd.DataFrame, top_n: int = 10,
+                                  include_samples: bool = False,
+                                  approximate: Optional[bool] = None,
+                                  predictions: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Explain multiple predictions
         
         Args:
             samples: DataFrame with multiple samples
             top_n: Number of top features to return
+            include_samples: Also return per-sample top contributions
+            approximate: Override the explainer-level approximate setting
+            predictions: The model's predictions for ``samples``, if already made
             
         Returns:
             Dictionary with batch explanation details
@@ -111,12 +308,8 @@ class SHAPExplainer:
         if self.explainer is None:
             raise ValueError("SHAP explainer not initialized")
         
-        # Get SHAP values for all samples
-        shap_values = self.explainer.shap_values(samples)
-        
-        # For binary classification, use positive class values
-        if isinstance(shap_values, list):
-            shap_values = shap_values[1]  # Positive class
+        # Get SHAP values for all samples (cached rows are not recomputed)
+        shap_values = self.get_shap_values(samples, approximate)
         
         # Calculate feature importance across all samples
         feature_importance = {}
@@ -129,7 +322,8 @@ class SHAPExplainer:
         sorted_features = sorted(feature_importance.items(), key=lambda x: x[1], reverse=True)
         
         # Get predictions
-        predictions = self.model.predict(samples)
+        if predictions is None:
+            predictions = self.model.predict(samples)
         
         batch_explanation = {
             'sample_count': len(samples),
@@ -147,8 +341,34 @@ class SHAPExplainer:
             }
         }
         
+        if include_samples:
+            batch_explanation['sample_contributions'] = [
+                self._top_contributions(values, top_n) for values in shap_values
+            ]
+        
         return batch_explanation
     
+    def explain_claims(self, claims: pd.DataFrame, predictions: Optional[Dict[str, Any]] = None,
+                       top_n: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Top feature contributions for raw claim rows, explained as one batch
+        
+        The rows go through ``feature_transform`` first, so SHAP sees the same
+        engineered feature matrix the model scores.
+        
+        Args:
+            claims: Raw claim rows
+            predictions: The model's predictions for ``claims``, if already made
+            top_n: Number of top features to return per claim
+            
+        Returns:
+            Per-claim lists of feature contributions
+        """
+        features = claims if self.feature_transform is None else self.feature_transform(claims)
+        features = features.reindex(columns=self.feature_names, fill_value=0.0)
+        batch = self.explain_batch_predictions(features, top_n, include_samples=True, predictions=predictions)
+        return batch['sample_contributions']
+    
     def generate_feature_importance_plot(self, samples: pd.DataFrame, 
                                        output_path: str = None) -> Dict[str, Any]:
         """
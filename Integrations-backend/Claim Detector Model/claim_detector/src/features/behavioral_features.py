@@ -7,6 +7,8 @@ from typing import List, Dict, Tuple
 import logging
 from datetime import datetime, timedelta
 
+from .seller_feature_store import SellerFeatureStore
+
 logger = logging.getLogger(__name__)
 
 class BehavioralFeatureEngineer:
@@ -55,50 +57,10 @@ class BehavioralFeatureEngineer:
         # Merge back to original dataframe
         df_features = df_features.merge(seller_stats, on='seller_id', how='left')
         
-        # Rolling window features for each seller
-        for window in self.windows:
-            # Amount rolling features
-            df_features[f'amount_rolling_mean_{window}d'] = (
-                df_features.groupby('seller_id')['amount']
-                .rolling(window=window, min_periods=1)
-                .mean()
-                .reset_index(0, drop=True)
-            )
-            
-            df_features[f'amount_rolling_std_{window}d'] = (
-                df_features.groupby('seller_id')['amount']
-                .rolling(window=window, min_periods=1)
-                .std()
-                .reset_index(0, drop=True)
-            )
-            
-            # Claim frequency rolling features
-            df_features[f'claim_freq_{window}d'] = (
-                df_features.groupby('seller_id')['claim_id']
-                .rolling(window=window, min_periods=1)
-                .count()
-                .reset_index(0, drop=True)
-            )
-            
-            # Claimable rate rolling features
-            df_features[f'claimable_rate_{window}d'] = (
-                df_features.groupby('seller_id')['claimable']
-                .rolling(window=window, min_periods=1)
-                .mean()
-                .reset_index(0, drop=True)
-            )
-        
-        # Time-based features
-        df_features['days_since_last_claim'] = (
-            df_features.groupby('seller_id')['claim_date']
-            .diff()
-            .dt.days
-        )
-        
-        df_features['days_since_first_claim'] = (
-            df_features.groupby('seller_id')['claim_date']
-            .transform(lambda x: (x - x.min()).dt.days)
-        )
+        # Time-windowed seller features (true day windows, point-in-time),
+        # replayed through the same store used for online serving
+        seller_features = SellerFeatureStore(self.windows).backfill(df_features)
+        df_features = df_features.join(seller_features)
         
         # Fill NaN values
         numeric_columns = df_features.select_dtypes(include=[np.number]).columns
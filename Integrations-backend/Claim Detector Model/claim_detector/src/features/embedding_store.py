@@ -0,0 +1,163 @@
+"""
+Persistent, memory-mapped text embedding cache
+"""
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingStore:
+    """
+    On-disk embedding cache keyed by text hash, one store per model
+
+    Vectors live in a float32 memory-mapped file, so lookups only page in the
+    rows that are read and the corpus never has to fit in RAM. The hash index
+    is a small in-memory dict persisted alongside the vectors on ``flush``.
+    The store is meant for a single writer process.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, directory: str, model_name: str, dim: Optional[int] = None):
+        """
+        Initialize embedding store
+
+        Args:
+            directory: Root cache directory
+            model_name: Embedding model name; each model gets its own store
+            dim: Embedding dimension (read from disk for existing stores)
+        """
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.path = Path(directory) / safe_name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+
+        self._meta_path = self.path / "meta.json"
+        self._keys_path = self.path / "keys.npy"
+        self._vectors_path = self.path / "vectors.f32"
+
+        self.dim = dim
+        self.count = 0
+        self.capacity = 0
+        self._index: Dict[str, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._dirty = False
+
+        if self._meta_path.exists():
+            self._load()
+
+    @staticmethod
+    def text_key(text: str) -> str:
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _load(self):
+        meta = json.loads(self._meta_path.read_text())
+        if self.dim is not None and meta['dim'] != self.dim:
+            raise ValueError(
+                f"Embedding store {self.path} has dim {meta['dim']}, expected {self.dim}"
+            )
+        self.dim = meta['dim']
+        self.count = meta['count']
+        self.capacity = meta['capacity']
+        keys = np.load(self._keys_path, allow_pickle=False) if self._keys_path.exists() else []
+        self._index = {str(key): row for row, key in enumerate(keys[:self.count])}
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode='r+', shape=(self.capacity, self.dim)
+        )
+        logger.info(f"Loaded {self.count} cached embeddings from {self.path}")
+
+    def _ensure_capacity(self, needed: int):
+        if needed <= self.capacity:
+            return
+        new_capacity = max(self.INITIAL_CAPACITY, self.capacity)
+        while new_capacity < needed:
+            new_capacity *= 2
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        # Grow the backing file in place; existing rows keep their offsets
+        with open(self._vectors_path, 'ab') as f:
+            f.truncate(new_capacity * self.dim * np.dtype(np.float32).itemsize)
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=np.float32, mode='r+', shape=(new_capacity, self.dim)
+        )
+        self.capacity = new_capacity
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, texts: List[str]) -> Tuple[np.ndarray, List[int]]:
+        """
+        Find cached rows for texts
+
+        Args:
+            texts: Texts to look up
+
+        Returns:
+            Tuple of (row number per text, -1 when missing) and positions of misses
+        """
+        rows = np.array([self._index.get(self.text_key(text), -1) for text in texts], dtype=np.int64)
+        missing = np.flatnonzero(rows < 0).tolist()
+        return rows, missing
+
+    def get(self, rows: np.ndarray) -> np.ndarray:
+        """Read vectors for row numbers returned by ``lookup``"""
+        if self._vectors is None:
+            return np.zeros((len(rows), self.dim or 0), dtype=np.float32)
+        return np.asarray(self._vectors[rows])
+
+    def add(self, texts: List[str], vectors: np.ndarray) -> np.ndarray:
+        """
+        Append vectors for texts not yet in the store
+
+        Args:
+            texts: Texts that were encoded
+            vectors: Array of shape (len(texts), dim)
+
+        Returns:
+            Row number of every text
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+
+        rows = np.empty(len(texts), dtype=np.int64)
+        new_positions = []
+        for position, text in enumerate(texts):
+            key = self.text_key(text)
+            row = self._index.get(key)
+            if row is None:
+                row = self.count + len(new_positions)
+                self._index[key] = row
+                new_positions.append(position)
+            rows[position] = row
+
+        if new_positions:
+            self._ensure_capacity(self.count + len(new_positions))
+            self._vectors[self.count:self.count + len(new_positions)] = vectors[new_positions]
+            self.count += len(new_positions)
+            self._dirty = True
+
+        return rows
+
+    def flush(self):
+        """Persist vectors and the hash index"""
+        if not self._dirty:
+            return
+        self._vectors.flush()
+        keys = np.empty(self.count, dtype='U32')
+        for key, row in self._index.items():
+            keys[row] = key
+        np.save(self._keys_path, keys, allow_pickle=False)
+        self._meta_path.write_text(json.dumps({
+            'model_name': self.model_name,
+            'dim': self.dim,
+            'count': self.count,
+            'capacity': self.capacity
+        }))
+        self._dirty = False
@@ -5,42 +5,62 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 import logging
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import PCA
 import joblib
 from pathlib import Path
 
+from .embedding_store import EmbeddingStore
+
 logger = logging.getLogger(__name__)
 
 class TextEmbeddingEngineer:
     """Engineer text embedding features from FBA reimbursement data"""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", max_length: int = 512):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", max_length: int = 512,
+                 cache_dir: Optional[str] = None, batch_size: int = 256):
         """
         Initialize text embedding engineer
         
         Args:
             model_name: Name of the sentence transformer model
             max_length: Maximum sequence length for the model
+            cache_dir: Directory for the persistent embedding cache (disabled if None)
+            batch_size: Encoder batch size for texts missing from the cache
         """
         self.model_name = model_name
         self.max_length = max_length
+        self.batch_size = batch_size
         self.model = None
         self.pca = None
         self.text_columns = ['description', 'reason', 'notes']
+        self.embedding_store = EmbeddingStore(cache_dir, model_name) if cache_dir else None
         
-    def load_model(self):
+    def load_encoder(self):
         """Load the sentence transformer model"""
         if self.model is None:
+            from sentence_transformers import SentenceTransformer
+            
             logger.info(f"Loading sentence transformer model: {self.model_name}")
             self.model = SentenceTransformer(self.model_name)
             logger.info("Model loaded successfully")
     
-    def generate_embeddings(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+    def _encode(self, texts: List[str], batch_size: int) -> np.ndarray:
+        self.load_encoder()
+        return self.model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=len(texts) > batch_size,
+            convert_to_numpy=True
+        )
+    
+    def generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None) -> np.ndarray:
         """
         Generate embeddings for a list of texts
         
+        Duplicate texts are encoded once, and when a cache directory is
+        configured only texts never seen by this model are sent to the encoder.
+        
         Args:
             texts: List of text strings
             batch_size: Batch size for processing
@@ -48,21 +68,46 @@ class TextEmbeddingEngineer:
         Returns:
             Array of embeddings
         """
-        self.load_model()
+        batch_size = batch_size or self.batch_size
         
         # Clean and prepare texts
-        cleaned_texts = [str(text) if pd.notna(text) else "" for text in texts]
+        cleaned_texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+        # Hash-based, first-seen order; avoids sorting and a fixed-width unicode copy
+        codes, uniques = pd.factorize(cleaned_texts)
+        unique_texts = uniques.tolist()
+        
+        if self.embedding_store is None:
+            unique_embeddings = self._encode(unique_texts, batch_size)
+            encoded = len(unique_texts)
+        else:
+            rows, missing = self.embedding_store.lookup(unique_texts)
+            if missing:
+                missing_texts = [unique_texts[i] for i in missing]
+                rows[missing] = self.embedding_store.add(
+                    missing_texts, self._encode(missing_texts, batch_size)
+                )
+                self.embedding_store.flush()
+            unique_embeddings = self.embedding_store.get(rows)
+            encoded = len(missing)
         
-        # Generate embeddings
-        embeddings = self.model.encode(
-            cleaned_texts, 
-            batch_size=batch_size,
-            show_progress_bar=True,
-            convert_to_numpy=True
+        logger.info(
+            f"Generated embeddings for {len(texts)} texts "
+            f"({len(unique_texts)} unique, {encoded} encoded)"
         )
-        
-        logger.info(f"Generated embeddings for {len(texts)} texts")
-        return embeddings
+        return unique_embeddings[codes]
+    
+    @staticmethod
+    def _embedding_frame(embeddings: np.ndarray, prefix: str, index: pd.Index,
+                         stats: Tuple[str, ...]) -> pd.DataFrame:
+        """Embedding columns plus summary statistics as one DataFrame"""
+        frame = pd.DataFrame(
+            embeddings,
+            index=index,
+            columns=[f'{prefix}_embedding_{i}' for i in range(embeddings.shape[1])]
+        )
+        for stat in stats:
+            frame[f'{prefix}_embedding_{stat}'] = getattr(embeddings, stat)(axis=1)
+        return frame
     
     def engineer_text_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -78,45 +123,35 @@ class TextEmbeddingEngineer:
         
         df_features = df.copy()
         
+        feature_frames = []
+        
         # Generate embeddings for each text column
         for col in self.text_columns:
             if col in df_features.columns:
                 logger.info(f"Generating embeddings for column: {col}")
                 
-                # Generate embeddings
                 embeddings = self.generate_embeddings(df_features[col].tolist())
-                
-                # Add embedding columns
-                for i in range(embeddings.shape[1]):
-                    df_features[f'{col}_embedding_{i}'] = embeddings[:, i]
-                
-                # Add aggregated features
-                df_features[f'{col}_embedding_mean'] = embeddings.mean(axis=1)
-                df_features[f'{col}_embedding_std'] = embeddings.std(axis=1)
-                df_features[f'{col}_embedding_max'] = embeddings.max(axis=1)
-                df_features[f'{col}_embedding_min'] = embeddings.min(axis=1)
+                feature_frames.append(self._embedding_frame(
+                    embeddings, col, df_features.index, ('mean', 'std', 'max', 'min')
+                ))
         
         # Generate combined text embeddings
         if all(col in df_features.columns for col in self.text_columns):
             logger.info("Generating combined text embeddings")
             
             # Combine all text fields
-            combined_texts = []
-            for _, row in df_features.iterrows():
-                combined_text = " ".join([
-                    str(row.get(col, "")) for col in self.text_columns
-                ])
-                combined_texts.append(combined_text)
-            
-            # Generate combined embeddings
-            combined_embeddings = self.generate_embeddings(combined_texts)
+            text_frame = df_features[self.text_columns].fillna("").astype(str)
+            combined_texts = text_frame[self.text_columns[0]].str.cat(
+                [text_frame[col] for col in self.text_columns[1:]], sep=" "
+            )
             
-            # Add combined embedding features
-            for i in range(combined_embeddings.shape[1]):
-                df_features[f'combined_text_embedding_{i}'] = combined_embeddings[:, i]
-            
-            df_features['combined_text_embedding_mean'] = combined_embeddings.mean(axis=1)
-            df_features['combined_text_embedding_std'] = combined_embeddings.std(axis=1)
+            combined_embeddings = self.generate_embeddings(combined_texts.tolist())
+            feature_frames.append(self._embedding_frame(
+                combined_embeddings, 'combined_text', df_features.index, ('mean', 'std')
+            ))
+        
+        if feature_frames:
+            df_features = pd.concat([df_features] + feature_frames, axis=1)
         
         return df_features
     
@@ -14,20 +14,126 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+class FeatureSketch:
+    """
+    Fixed-size histogram sketch of a numerical feature.
+    
+    Bin edges are taken from baseline quantiles, so each bin holds roughly the
+    same share of baseline mass regardless of skew. The sketch keeps only bin
+    counts plus running sum / sum of squares, so memory is O(bins) and updates
+    are incremental.
+    """
+    
+    def __init__(self, edges: np.ndarray):
+        self.edges = np.asarray(edges, dtype=float)
+        # len(edges) - 1 interior bins plus one open-ended bin on each side
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.n = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+    
+    @classmethod
+    def from_baseline(cls, values, n_bins: int = 20) -> 'FeatureSketch':
+        """Build a sketch whose edges are the baseline quantiles"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            edges = np.array([0.0])
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)))
+        sketch = cls(edges)
+        sketch.update(values)
+        return sketch
+    
+    def empty_like(self) -> 'FeatureSketch':
+        """New empty sketch sharing these bin edges"""
+        return FeatureSketch(self.edges)
+    
+    def update(self, values) -> None:
+        """Add a batch of observations to the sketch"""
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        bins = np.searchsorted(self.edges, values, side='right')
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.n += len(values)
+        self.total += float(values.sum())
+        self.total_sq += float(np.square(values).sum())
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.n if self.n else 0.0
+    
+    @property
+    def std(self) -> float:
+        if self.n < 2:
+            return 0.0
+        variance = (self.total_sq - self.n * self.mean ** 2) / (self.n - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+    
+    def proportions(self) -> np.ndarray:
+        return self.counts / self.n if self.n else np.zeros(len(self.counts))
+    
+    def psi(self, other: 'FeatureSketch', epsilon: float = 1e-4) -> float:
+        """Population stability index of ``other`` against this sketch"""
+        expected = np.clip(self.proportions(), epsilon, None)
+        actual = np.clip(other.proportions(), epsilon, None)
+        return float(np.sum((actual - expected) * np.log(actual / expected)))
+    
+    def ks(self, other: 'FeatureSketch') -> Tuple[float, float]:
+        """Two-sample KS statistic and p-value evaluated at the bin edges"""
+        if self.n == 0 or other.n == 0:
+            return 0.0, 1.0
+        ks_stat = float(np.max(np.abs(
+            np.cumsum(self.proportions()) - np.cumsum(other.proportions())
+        )))
+        effective_n = max(1, int(round(self.n * other.n / (self.n + other.n))))
+        p_value = float(stats.kstwo.sf(ks_stat, effective_n))
+        return ks_stat, p_value
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'edges': self.edges.tolist(),
+            'counts': self.counts.tolist(),
+            'n': self.n,
+            'total': self.total,
+            'total_sq': self.total_sq
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FeatureSketch':
+        sketch = cls(np.array(data['edges']))
+        sketch.counts = np.array(data['counts'], dtype=np.int64)
+        sketch.n = data['n']
+        sketch.total = data['total']
+        sketch.total_sq = data['total_sq']
+        return sketch
+
 class DriftDetector:
     """Detect data and model drift in FBA reimbursement claims"""
     
-    def __init__(self, window_size: int = 30, drift_threshold: float = 0.05):
+    CATEGORICAL_FEATURES = ['category', 'subcategory', 'reason_code', 'marketplace']
+    
+    def __init__(self, window_size: int = 30, drift_threshold: float = 0.05,
+                 n_bins: int = 20, psi_threshold: float = 0.2):
         """
         Initialize drift detector
         
         Args:
             window_size: Size of monitoring window in days
             drift_threshold: Threshold for drift detection
+            n_bins: Number of quantile bins per numerical feature sketch
+            psi_threshold: PSI above which a feature is flagged as drifted
         """
         self.window_size = window_size
         self.drift_threshold = drift_threshold
+        self.n_bins = n_bins
+        self.psi_threshold = psi_threshold
         self.baseline_stats = {}
+        self.baseline_sketches: Dict[str, FeatureSketch] = {}
+        self.current_sketches: Dict[str, FeatureSketch] = {}
+        self.current_categorical: Dict[str, Dict[Any, int]] = {}
         self.drift_history = []
         self.scaler = StandardScaler()
         
@@ -50,6 +156,7 @@ class DriftDetector:
         exclude_columns = ['claimable', 'claim_id']
         feature_columns = [col for col in numerical_features if col not in exclude_columns]
         
+        self.baseline_sketches = {}
         for feature in feature_columns:
             if feature in df.columns:
                 baseline_stats[feature] = {
@@ -61,6 +168,9 @@ class DriftDetector:
                     'min': df[feature].min(),
                     'max': df[feature].max()
                 }
+                self.baseline_sketches[feature] = FeatureSketch.from_baseline(
+                    df[feature].to_numpy(), self.n_bins
+                )
         
         # Categorical feature statistics
         categorical_features = ['category', 'subcategory', 'reason_code', 'marketplace']
@@ -89,107 +199,142 @@ class DriftDetector:
             }
         
         self.baseline_stats = baseline_stats
+        self.reset_current_window()
         logger.info(f"Baseline statistics computed for {len(baseline_stats)} features")
         
         return baseline_stats
     
-    def detect_feature_drift(self, current_data: pd.DataFrame) -> Dict[str, Any]:
+    def reset_current_window(self) -> None:
+        """Start a new, empty monitoring window"""
+        self.current_sketches = {
+            feature: sketch.empty_like() for feature, sketch in self.baseline_sketches.items()
+        }
+        self.current_categorical = {
+            feature: {} for feature in self.CATEGORICAL_FEATURES if feature in self.baseline_stats
+        }
+    
+    def update_current_window(self, data) -> None:
+        """
+        Incrementally add streamed observations to the current window
+        
+        Args:
+            data: DataFrame, list of records or a single record dict
+        """
+        if isinstance(data, dict):
+            data = [data]
+        if not isinstance(data, pd.DataFrame):
+            data = pd.DataFrame(data)
+        
+        for feature, sketch in self.current_sketches.items():
+            if feature in data.columns:
+                sketch.update(pd.to_numeric(data[feature], errors='coerce').to_numpy())
+        
+        for feature, counts in self.current_categorical.items():
+            if feature in data.columns:
+                for value, count in data[feature].value_counts().items():
+                    counts[value] = counts.get(value, 0) + int(count)
+    
+    def detect_feature_drift(self, current_data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
         """
         Detect drift in individual features
         
+        Numerical features are compared as histogram sketches (PSI and binned
+        KS), so the comparison costs O(bins) per feature regardless of volume.
+        
         Args:
-            current_data: Current data window
+            current_data: Current data window. When omitted, the incrementally
+                maintained streaming window is used.
             
         Returns:
             Dictionary with drift detection results
         """
         logger.info("Detecting feature drift")
         
+        if current_data is not None:
+            saved_window = (self.current_sketches, self.current_categorical)
+            self.reset_current_window()
+            self.update_current_window(current_data)
+            current_sketches, current_categorical = self.current_sketches, self.current_categorical
+            self.current_sketches, self.current_categorical = saved_window
+        else:
+            current_sketches, current_categorical = self.current_sketches, self.current_categorical
+        
         drift_results = {}
         
         # Check numerical features
-        numerical_features = current_data.select_dtypes(include=[np.number]).columns.tolist()
-        exclude_columns = ['claimable', 'claim_id']
-        feature_columns = [col for col in numerical_features if col not in exclude_columns]
-        
-        for feature in feature_columns:
-            if feature in self.baseline_stats and feature in current_data.columns:
-                baseline = self.baseline_stats[feature]
-                current = current_data[feature]
-                
-                # Statistical tests for drift
-                drift_detected = False
-                drift_score = 0.0
-                
-                # KS test for distribution drift
-                if len(current) > 10:
-                    try:
-                        # Create synthetic baseline data for comparison
-                        baseline_data = np.random.normal(
-                            baseline['mean'], baseline['std'], 
-                            size=min(1000, len(current))
-                        )
-                        
-                        ks_stat, p_value = stats.ks_2samp(baseline_data, current)
-                        drift_score = 1 - p_value
-                        drift_detected = p_value < self.drift_threshold
-                        
-                    except Exception as e:
-                        logger.warning(f"KS test failed for {feature}: {e}")
-                        drift_score = 0.0
-                        drift_detected = False
-                
-                # Mean shift detection
-                mean_shift = abs(current.mean() - baseline['mean']) / (baseline['std'] + 1e-8)
-                mean_drift = mean_shift > 2.0  # 2 standard deviations
-                
-                drift_results[feature] = {
-                    'drift_detected': drift_detected or mean_drift,
-                    'drift_score': max(drift_score, mean_shift),
-                    'current_mean': current.mean(),
-                    'baseline_mean': baseline['mean'],
-                    'mean_shift': mean_shift,
-                    'ks_p_value': p_value if 'p_value' in locals() else None
-                }
+        for feature, current in current_sketches.items():
+            if feature not in self.baseline_stats or current.n == 0:
+                continue
+            baseline = self.baseline_sketches[feature]
+            baseline_mean = self.baseline_stats[feature]['mean']
+            baseline_std = self.baseline_stats[feature]['std']
+            
+            # Statistical tests for drift
+            drift_detected = False
+            drift_score = 0.0
+            ks_stat, p_value = None, None
+            psi = baseline.psi(current)
+            
+            # KS test for distribution drift
+            if current.n > 10:
+                ks_stat, p_value = baseline.ks(current)
+                drift_score = 1 - p_value
+                drift_detected = p_value < self.drift_threshold or psi > self.psi_threshold
+            
+            # Mean shift detection
+            mean_shift = abs(current.mean - baseline_mean) / (baseline_std + 1e-8)
+            mean_drift = mean_shift > 2.0  # 2 standard deviations
+            
+            drift_results[feature] = {
+                'drift_detected': drift_detected or mean_drift,
+                'drift_score': max(drift_score, mean_shift),
+                'current_mean': current.mean,
+                'baseline_mean': baseline_mean,
+                'mean_shift': mean_shift,
+                'psi': psi,
+                'ks_statistic': ks_stat,
+                'ks_p_value': p_value
+            }
         
         # Check categorical features
-        categorical_features = ['category', 'subcategory', 'reason_code', 'marketplace']
-        for feature in categorical_features:
-            if feature in self.baseline_stats and feature in current_data.columns:
-                baseline_dist = self.baseline_stats[feature]['value_counts']
-                current_dist = current_data[feature].value_counts(normalize=True)
-                
-                # Chi-square test for categorical drift
-                drift_detected = False
-                drift_score = 0.0
+        for feature, counts in current_categorical.items():
+            total = sum(counts.values())
+            if total == 0:
+                continue
+            baseline_dist = self.baseline_stats[feature]['value_counts']
+            current_dist = {value: count / total for value, count in counts.items()}
+            
+            # Chi-square test for categorical drift
+            drift_detected = False
+            drift_score = 0.0
+            
+            try:
+                # Align distributions
+                all_categories = set(baseline_dist.keys()) | set(current_dist.keys())
+                baseline_aligned = [baseline_dist.get(cat, 0) for cat in all_categories]
+                current_aligned = [current_dist.get(cat, 0) for cat in all_categories]
                 
-                try:
-                    # Align distributions
-                    all_categories = set(baseline_dist.keys()) | set(current_dist.keys())
-                    baseline_aligned = [baseline_dist.get(cat, 0) for cat in all_categories]
-                    current_aligned = [current_dist.get(cat, 0) for cat in all_categories]
-                    
-                    if sum(baseline_aligned) > 0 and sum(current_aligned) > 0:
-                        chi2_stat, p_value = stats.chi2_contingency([
-                            baseline_aligned, current_aligned
-                        ])
-                        drift_score = 1 - p_value
-                        drift_detected = p_value < self.drift_threshold
-                    else:
-                        drift_score = 0.0
-                        drift_detected = False
-                        
-                except Exception as e:
-                    logger.warning(f"Chi-square test failed for {feature}: {e}")
+                if sum(baseline_aligned) > 0 and sum(current_aligned) > 0:
+                    chi2_stat, p_value = stats.chi2_contingency([
+                        baseline_aligned, current_aligned
+                    ])[:2]
+                    drift_score = 1 - p_value
+                    drift_detected = p_value < self.drift_threshold
+                else:
                     drift_score = 0.0
                     drift_detected = False
-                
-                drift_results[feature] = {
-                    'drift_detected': drift_detected,
-                    'drift_score': drift_score,
-                    'current_distribution': current_dist.to_dict(),
-                    'baseline_distribution': baseline_dist
-                }
+                    
+            except Exception as e:
+                logger.warning(f"Chi-square test failed for {feature}: {e}")
+                drift_score = 0.0
+                drift_detected = False
+            
+            drift_results[feature] = {
+                'drift_detected': drift_detected,
+                'drift_score': drift_score,
+                'current_distribution': current_dist,
+                'baseline_distribution': baseline_dist
+            }
         
         return drift_results
     
@@ -18,10 +18,15 @@ logger = logging.getLogger(__name__)
 class PreprocessingPipeline:
     """Complete preprocessing pipeline for claim data"""
     
-    def __init__(self, pipeline_path: Optional[str] = None):
-        """Initialize the preprocessing pipeline"""
+    def __init__(self, pipeline_path: Optional[str] = None,
+                 embedding_cache_dir: Optional[str] = feature_config.TEXT_EMBEDDING_CACHE_DIR):
+        """Initialize the preprocessing pipeline
+        
+        Text embeddings are cached under ``embedding_cache_dir``
+        (``TEXT_EMBEDDING_CACHE_DIR``); pass None to always re-encode.
+        """
         self.behavioral_engineer = BehavioralFeatureEngineer()
-        self.text_engineer = TextEmbeddingEngineer()
+        self.text_engineer = TextEmbeddingEngineer(cache_dir=embedding_cache_dir or None)
         self.anomaly_engineer = AnomalySignalEngineer()
         
         # Load saved pipeline if path provided
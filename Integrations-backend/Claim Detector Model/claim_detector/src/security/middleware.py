@@ -5,9 +5,10 @@ from fastapi import Request, Response
 from fastapi.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
+import math
 import time
 from typing import Callable
-from .rate_limiter import check_rate_limit, get_remaining_requests
+from .rate_limiter import check_rate_limit, get_remaining_requests, get_retry_after
 
 class SecurityMiddleware(BaseHTTPMiddleware):
     """Security middleware for additional protection"""
@@ -28,14 +29,15 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             endpoint = request.url.path.split('/')[-1] or 'default'
             if not check_rate_limit(client_ip, endpoint):
                 remaining = get_remaining_requests(client_ip, endpoint)
+                retry_after = max(1, math.ceil(get_retry_after(client_ip, endpoint)))
                 return JSONResponse(
                     status_code=429,
                     content={
                         "error": "Rate limit exceeded",
                         "remaining_requests": remaining,
-                        "retry_after": 60
+                        "retry_after": retry_after
                     },
-                    headers={"Retry-After": "60"}
+                    headers={"Retry-After": str(retry_after)}
                 )
         
         # Add security headers
@@ -1,9 +1,12 @@
 """
 Rate limiting system for the Claim Detector Model
 """
+import abc
+import os
+import threading
 import time
-from typing import Dict, Tuple
-from collections import defaultdict
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -20,53 +23,135 @@ RATE_LIMITS = {
     "metrics": "200/minute"
 }
 
-class CustomRateLimiter:
-    """Custom rate limiter with IP-based tracking"""
-    
-    def __init__(self):
-        self.requests = defaultdict(list)
-        self.blocked_ips = set()
-        self.block_duration = 3600  # 1 hour
-    
+# Most client/endpoint keys tracked in memory before the least recently seen is dropped
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+class GCRAStore(abc.ABC):
+    """
+    State for the GCRA limiter: one theoretical arrival time (TAT) per key
+
+    ``update`` must apply a check atomically, so a store shared by several
+    API processes (e.g. ``RedisGCRAStore``) enforces one limit across them.
+    """
+
+    @abc.abstractmethod
+    def update(self, key: str, emission_interval: float, window: float, cost: int = 1) -> Tuple[bool, float]:
+        """
+        Spend ``cost`` requests for ``key`` if the limit allows it
+
+        Returns (allowed, backlog): backlog is how far the key's TAT is ahead
+        of now, in seconds, after the check. ``cost=0`` only reads.
+        """
+
+class InMemoryGCRAStore(GCRAStore):
+    """
+    Per-process store: a float per key in a bounded LRU
+
+    A key whose TAT is in the past is equivalent to a missing key, so evicting
+    idle clients loses nothing; only a client active within the last window
+    that is evicted gets a fresh allowance.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._tats: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def update(self, key: str, emission_interval: float, window: float, cost: int = 1) -> Tuple[bool, float]:
+        with self._lock:
+            now = self.clock()
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + emission_interval * cost
+            if new_tat - now > window:
+                # A client being rejected is still active; keep it resident
+                if key in self._tats:
+                    self._tats.move_to_end(key)
+                return False, tat - now
+            if cost:
+                self._tats[key] = new_tat
+                self._tats.move_to_end(key)
+                if len(self._tats) > self.max_keys:
+                    self._tats.popitem(last=False)
+            return True, new_tat - now
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+class RedisGCRAStore(GCRAStore):
+    """
+    Store shared by all API processes through Redis
+
+    Takes a ``redis.Redis`` client. Each check is one Lua script call that
+    reads the TAT, decides and writes it back with an expiry, using the Redis
+    server clock so API hosts need not agree on time.
+    """
+
+    SCRIPT = """
+    local now_parts = redis.call('TIME')
+    local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+    local interval = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local cost = tonumber(ARGV[3])
+    local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+    if tat < now then tat = now end
+    local new_tat = tat + interval * cost
+    if new_tat - now > window then
+        return {0, tostring(tat - now)}
+    end
+    if cost > 0 then
+        redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+    end
+    return {1, tostring(new_tat - now)}
+    """
+
+    def __init__(self, client, prefix: str = "claim_detector:ratelimit:"):
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    def update(self, key: str, emission_interval: float, window: float, cost: int = 1) -> Tuple[bool, float]:
+        allowed, backlog = self._script(keys=[self.prefix + key], args=[emission_interval, window, cost])
+        return bool(int(allowed)), float(backlog)
+
+class RateLimiter:
+    """
+    GCRA (generic cell rate algorithm) limiter keyed by client IP and endpoint
+
+    ``limit`` requests per ``window`` seconds means one request every
+    ``window / limit`` seconds, with bursts of up to ``limit``. Each check
+    is O(1) and each key costs one float, whatever the request rate.
+    """
+
+    def __init__(self, store: Optional[GCRAStore] = None):
+        self.store = store if store is not None else InMemoryGCRAStore()
+
     def is_allowed(self, ip: str, endpoint: str, limit: int, window: int) -> bool:
-        """Check if request is allowed"""
-        current_time = time.time()
-        
-        # Check if IP is blocked
-        if ip in self.blocked_ips:
-            # Check if block period has expired
-            if current_time - self.requests[ip][-1] > self.block_duration:
-                self.blocked_ips.remove(ip)
-            else:
-                return False
-        
-        # Clean old requests
-        self.requests[ip] = [req_time for req_time in self.requests[ip] 
-                            if current_time - req_time < window]
-        
-        # Check rate limit
-        if len(self.requests[ip]) >= limit:
-            # Block IP if too many requests
-            if len(self.requests[ip]) >= limit * 2:
-                self.blocked_ips.add(ip)
-            return False
-        
-        # Add current request
-        self.requests[ip].append(current_time)
-        return True
-    
+        """Check if request is allowed, counting it if so"""
+        allowed, _ = self.store.update(f"{endpoint}:{ip}", window / limit, window)
+        return allowed
+
     def get_remaining_requests(self, ip: str, endpoint: str, limit: int, window: int) -> int:
-        """Get remaining requests for an IP"""
-        current_time = time.time()
-        
-        # Clean old requests
-        self.requests[ip] = [req_time for req_time in self.requests[ip] 
-                            if current_time - req_time < window]
-        
-        return max(0, limit - len(self.requests[ip]))
+        """Requests the client could make right now"""
+        emission_interval = window / limit
+        _, backlog = self.store.update(f"{endpoint}:{ip}", emission_interval, window, cost=0)
+        return max(0, int((window - backlog) / emission_interval + 1e-9))
+
+    def get_retry_after(self, ip: str, endpoint: str, limit: int, window: int) -> float:
+        """Seconds until the next request would be allowed"""
+        emission_interval = window / limit
+        _, backlog = self.store.update(f"{endpoint}:{ip}", emission_interval, window, cost=0)
+        return max(0.0, backlog + emission_interval - window)
 
 # Global rate limiter instance
-custom_limiter = CustomRateLimiter()
+custom_limiter = RateLimiter()
+
+def configure_store(store: GCRAStore):
+    """Switch the global limiter to another store, e.g. ``RedisGCRAStore`` for a shared limit"""
+    custom_limiter.store = store
 
 def get_rate_limit_config(endpoint: str) -> Tuple[int, int]:
     """Get rate limit configuration for an endpoint"""
@@ -91,5 +176,7 @@ def get_remaining_requests(ip: str, endpoint: str) -> int:
     limit, window = get_rate_limit_config(endpoint)
     return custom_limiter.get_remaining_requests(ip, endpoint, limit, window)
 
-
-
+def get_retry_after(ip: str, endpoint: str) -> float:
+    """Get seconds until an IP may call an endpoint again"""
+    limit, window = get_rate_limit_config(endpoint)
+    return custom_limiter.get_retry_after(ip, endpoint, limit, window)
@@ -0,0 +1,101 @@
+"""
+Tests for indexed SKU mapping
+"""
+import random
+import string
+
+from src.evidence.mapping import SKUMappingService
+
+
+def make_catalog(n=2000, seed=7):
+    rng = random.Random(seed)
+    sku_list = []
+    for i in range(n):
+        prefix = ''.join(rng.choices(string.ascii_uppercase, k=3))
+        sku_list.append({'sku': f"{prefix}-{i:05d}", 'asin': f"B{i:09d}"})
+    return {'seller_id': 'seller-1', 'sku_list': sku_list}
+
+
+def brute_force_best(service, sku, catalog_data):
+    best, best_similarity = None, 0.0
+    for sku_info in catalog_data['sku_list']:
+        similarity = service._calculate_similarity(sku, sku_info['sku'])
+        if similarity > best_similarity and similarity >= service.fuzzy_threshold:
+            best, best_similarity = sku_info['sku'], similarity
+    return best, best_similarity
+
+
+class TestCatalogIndex:
+    
+    def test_exact_match_from_skus_dict(self):
+        service = SKUMappingService()
+        catalog_data = {'skus': {'SKU-001': {'asin': 'B07XYZ123'}}}
+        
+        result = service.map_invoice_skus([{'raw_sku': 'sku-001'}], catalog_data)
+        
+        assert result[0]['mapped_sku'] == 'SKU-001'
+        assert result[0]['asin'] == 'B07XYZ123'
+        assert result[0]['mapping_status'] == 'exact_match'
+    
+    def test_fuzzy_matches_full_scan(self):
+        service = SKUMappingService()
+        catalog_data = make_catalog()
+        index = service.get_catalog_index(catalog_data)
+        rng = random.Random(3)
+        
+        for sku_info in rng.sample(catalog_data['sku_list'], 50):
+            # Drop one character so the SKU misses the exact and normalized paths
+            sku = sku_info['sku']
+            position = rng.randrange(4, len(sku))
+            query = sku[:position] + sku[position + 1:]
+            
+            expected_sku, expected_similarity = brute_force_best(service, query, catalog_data)
+            match = service._find_fuzzy_match(query, index)
+            
+            assert match is not None
+            assert (match['sku'], match['similarity']) == (expected_sku, expected_similarity)
+    
+    def test_index_is_cached_and_rebuilt_on_change(self):
+        service = SKUMappingService()
+        catalog_data = make_catalog(n=10)
+        
+        index = service.get_catalog_index(catalog_data)
+        assert service.get_catalog_index(catalog_data) is index
+        
+        catalog_data['sku_list'].append({'sku': 'NEW-SKU', 'asin': 'B000000NEW'})
+        assert service.get_catalog_index(catalog_data) is not index
+        assert service.batch_map_skus(['NEW-SKU'], catalog_data)['NEW-SKU']['asin'] == 'B000000NEW'
+        
+        service.invalidate_catalog('seller-1')
+        assert not service.catalog_cache
+    
+    def test_cache_key_follows_catalog_content(self):
+        service = SKUMappingService()
+        catalog_data = make_catalog(n=10)
+        index = service.get_catalog_index(catalog_data)
+        
+        # Same SKUs in a fresh dict (e.g. reloaded per request) reuse the index
+        reloaded = {'seller_id': 'seller-1', 'sku_list': [dict(s) for s in catalog_data['sku_list']]}
+        assert service.get_catalog_index(reloaded) is index
+        
+        # Swapping a SKU in place keeps the list's identity and length
+        catalog_data['sku_list'][0] = {'sku': 'SWAPPED-SKU', 'asin': 'B0000SWAP1'}
+        assert service.get_catalog_index(catalog_data) is not index
+        
+        # Without a seller_id, catalogs are keyed by content
+        anonymous = {'skus': {'SKU-001': {'asin': 'B07XYZ123'}}}
+        anonymous_index = service.get_catalog_index(anonymous)
+        assert service.get_catalog_index({'skus': {'SKU-001': {'asin': 'B07XYZ123'}}}) is anonymous_index
+    
+    def test_catalog_is_indexed_once_per_invoice(self):
+        service = SKUMappingService()
+        catalog_data = make_catalog(n=50)
+        fingerprints = []
+        fingerprint = service._catalog_fingerprint
+        service._catalog_fingerprint = lambda data: fingerprints.append(1) or fingerprint(data)
+        
+        items = [{'raw_sku': s['sku']} for s in catalog_data['sku_list'][:20]] + [{'raw_sku': 'ZZZ-99999'}]
+        mapped = service.map_invoice_skus(items, catalog_data)
+        
+        assert len(fingerprints) == 1
+        assert [m['mapping_status'] for m in mapped[:20]] == ['exact_match'] * 20
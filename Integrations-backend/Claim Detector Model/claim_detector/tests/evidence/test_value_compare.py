@@ -0,0 +1,58 @@
+"""
+Tests for value comparison caching and batch lookups
+"""
+from unittest.mock import patch
+
+from src.evidence.value_compare import ComparisonCache, ValueComparisonService
+
+
+class TestComparisonCache:
+    
+    def test_lru_eviction(self):
+        cache = ComparisonCache(max_entries=2)
+        cache.set(('s1', 'A'), {'sku': 'A'})
+        cache.set(('s1', 'B'), {'sku': 'B'})
+        cache.get(('s1', 'A'))
+        cache.set(('s1', 'C'), {'sku': 'C'})
+        
+        assert ('s1', 'A') in cache
+        assert ('s1', 'B') not in cache
+        assert len(cache) == 2
+    
+    def test_ttl_expiry(self):
+        cache = ComparisonCache(ttl_seconds=10)
+        with patch('src.evidence.value_compare.time.monotonic', return_value=100.0):
+            cache.set(('s1', 'A'), {'sku': 'A'})
+        with patch('src.evidence.value_compare.time.monotonic', return_value=111.0):
+            assert cache.get(('s1', 'A')) is None
+        assert len(cache) == 0
+    
+    def test_seller_scoped_clear(self):
+        cache = ComparisonCache()
+        cache.set(('s1', 'A'), {'sku': 'A'})
+        cache.set(('s2', 'A'), {'sku': 'A'})
+        
+        cache.clear('s1')
+        
+        assert ('s1', 'A') not in cache
+        assert ('s2', 'A') in cache
+
+
+class TestBatchCompareValues:
+    
+    def test_batch_uses_one_lookup_per_source(self):
+        service = ValueComparisonService()
+        skus = [f"SKU-{i:04d}" for i in range(500)] + ['SKU-0000']
+        
+        with patch.object(service, '_get_latest_landed_costs',
+                          wraps=service._get_latest_landed_costs) as landed, \
+             patch.object(service, '_get_amazon_default_values',
+                          wraps=service._get_amazon_default_values) as defaults:
+            results = service.batch_compare_values('seller-1', skus)
+            service.batch_compare_values('seller-1', skus)
+        
+        assert landed.call_count == 1
+        assert defaults.call_count == 1
+        assert [r['sku'] for r in results] == skus
+        assert results[0]['net_gain'] == 3.5
+        assert results[0] == service.compare_values('seller-1', 'SKU-0000')
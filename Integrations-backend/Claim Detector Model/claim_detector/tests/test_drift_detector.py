@@ -0,0 +1,65 @@
+"""
+Tests for sketch-based drift detection
+"""
+import numpy as np
+import pandas as pd
+
+from src.monitoring.drift_detector import DriftDetector, FeatureSketch
+
+
+def make_claims(n, amount_scale=50.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'amount': rng.lognormal(mean=np.log(amount_scale), sigma=1.0, size=n),
+        'quantity': rng.integers(1, 10, size=n),
+        'marketplace': rng.choice(['US', 'CA', 'UK'], size=n, p=[0.7, 0.2, 0.1])
+    })
+
+
+def test_sketch_memory_is_fixed():
+    sketch = FeatureSketch.from_baseline(np.arange(1000), n_bins=10)
+    size = len(sketch.counts)
+    sketch.update(np.arange(100000))
+    assert len(sketch.counts) == size
+    assert sketch.n == 101000
+
+
+def test_sketch_round_trip():
+    sketch = FeatureSketch.from_baseline(np.random.default_rng(1).normal(size=500))
+    restored = FeatureSketch.from_dict(sketch.to_dict())
+    assert restored.n == sketch.n
+    assert np.array_equal(restored.counts, sketch.counts)
+    assert restored.psi(sketch) == 0.0
+
+
+def test_no_drift_on_same_distribution():
+    detector = DriftDetector()
+    detector.compute_baseline_statistics(make_claims(5000, seed=1))
+    results = detector.detect_feature_drift(make_claims(2000, seed=2))
+    assert not results['amount']['drift_detected']
+    assert results['amount']['psi'] < 0.1
+
+
+def test_drift_on_shifted_skewed_amounts():
+    detector = DriftDetector()
+    detector.compute_baseline_statistics(make_claims(5000, seed=1))
+    results = detector.detect_feature_drift(make_claims(2000, amount_scale=150.0, seed=2))
+    assert results['amount']['drift_detected']
+    assert results['amount']['psi'] > 0.2
+
+
+def test_streaming_window_matches_batch():
+    detector = DriftDetector()
+    detector.compute_baseline_statistics(make_claims(5000, seed=1))
+    current = make_claims(1000, amount_scale=150.0, seed=3)
+
+    for start in range(0, len(current), 100):
+        detector.update_current_window(current.iloc[start:start + 100])
+    detector.update_current_window({'amount': 10.0, 'quantity': 1, 'marketplace': 'US'})
+
+    streamed = detector.detect_feature_drift()
+    batch = detector.detect_feature_drift(pd.concat([
+        current, pd.DataFrame([{'amount': 10.0, 'quantity': 1, 'marketplace': 'US'}])
+    ]))
+    assert streamed['amount']['psi'] == batch['amount']['psi']
+    assert streamed['marketplace']['current_distribution'] == batch['marketplace']['current_distribution']
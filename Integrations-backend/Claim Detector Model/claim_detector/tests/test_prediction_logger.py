@@ -0,0 +1,147 @@
+"""
+Tests for the background prediction log writer
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database.models import Base, Prediction
+from src.database.prediction_logger import PredictionLogWriter
+
+
+def make_row(i: int) -> dict:
+    return {
+        "claim_id": f"claim-{i}",
+        "seller_id": "seller-1",
+        "predicted_claimable": i % 2 == 0,
+        "probability": 0.9,
+        "confidence": 0.8,
+        "feature_contributions": [{"feature": "amount", "contribution": 0.1}],
+        "model_components": {"lightgbm": 0.4},
+        "processing_time_ms": 1.5,
+        "ip_address": "127.0.0.1",
+        "user_agent": "pytest"
+    }
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    factory.inserts = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record_inserts(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO predictions"):
+            factory.inserts.append(statement)
+
+    return factory
+
+
+def count_predictions(session_factory) -> int:
+    db = session_factory()
+    try:
+        return db.query(Prediction).count()
+    finally:
+        db.close()
+
+
+def test_rows_are_written_in_multi_row_batches(session_factory):
+    writer = PredictionLogWriter(session_factory, batch_size=100, flush_interval=5)
+
+    async def scenario():
+        writer.start()
+        await writer.log_many([make_row(i) for i in range(250)])
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert count_predictions(session_factory) == 250
+    assert writer.stats["batches"] == 3 and writer.stats["written"] == 250
+    # One statement per batch, each carrying many VALUES tuples
+    assert len(session_factory.inserts) == 3
+
+
+def test_partial_batch_is_flushed_after_the_interval(session_factory):
+    writer = PredictionLogWriter(session_factory, batch_size=100, flush_interval=0.05)
+
+    async def scenario():
+        writer.start()
+        await writer.log(make_row(1))
+        await asyncio.sleep(0.3)
+        written = count_predictions(session_factory)
+        await writer.stop()
+        return written
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_full_queue_applies_backpressure(session_factory):
+    writer = PredictionLogWriter(session_factory, max_queue_size=5, batch_size=5, flush_interval=0.01)
+
+    async def scenario():
+        writer.start()
+        await writer.log_many([make_row(i) for i in range(50)])
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert writer.stats["backpressure_waits"] > 0
+    assert count_predictions(session_factory) == 50
+
+
+def test_writes_inline_when_not_started(session_factory):
+    writer = PredictionLogWriter(session_factory)
+    asyncio.run(writer.log(make_row(1)))
+    assert count_predictions(session_factory) == 1
+
+
+def test_failed_batch_is_retried_once(session_factory):
+    calls = {"n": 0}
+
+    def flaky_factory():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("connection refused")
+        return session_factory()
+
+    writer = PredictionLogWriter(flaky_factory)
+    asyncio.run(writer.log(make_row(1)))
+
+    assert count_predictions(session_factory) == 1
+    assert writer.stats["retries"] == 1 and writer.stats["failed"] == 0
+
+
+def test_writer_survives_failing_batches(session_factory):
+    healthy = {"value": False}
+
+    def factory():
+        if not healthy["value"]:
+            raise RuntimeError("database down")
+        return session_factory()
+
+    writer = PredictionLogWriter(factory, batch_size=10, flush_interval=0.01)
+
+    async def scenario():
+        writer.start()
+        await writer.log_many([make_row(i) for i in range(3)])
+        await asyncio.sleep(0.1)
+        healthy["value"] = True
+        await writer.log_many([make_row(i) for i in range(3, 5)])
+        await writer.stop()
+
+    asyncio.run(scenario())
+
+    assert writer.stats["failed"] == 3
+    assert count_predictions(session_factory) == 2
@@ -0,0 +1,81 @@
+"""
+Tests for the GCRA rate limiter
+"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.security.rate_limiter import GCRAStore, InMemoryGCRAStore, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def limiter(clock):
+    return RateLimiter(InMemoryGCRAStore(max_keys=100, clock=clock))
+
+
+def test_burst_up_to_limit_then_reject(limiter):
+    assert limiter.get_remaining_requests("1.1.1.1", "predict", 10, 60) == 10
+    assert all(limiter.is_allowed("1.1.1.1", "predict", 10, 60) for _ in range(10))
+    assert not limiter.is_allowed("1.1.1.1", "predict", 10, 60)
+    assert limiter.get_remaining_requests("1.1.1.1", "predict", 10, 60) == 0
+    assert limiter.get_retry_after("1.1.1.1", "predict", 10, 60) == pytest.approx(6.0)
+
+
+def test_allowance_refills_at_the_emission_rate(limiter, clock):
+    for _ in range(10):
+        limiter.is_allowed("1.1.1.1", "predict", 10, 60)
+
+    clock.now += 5.9
+    assert not limiter.is_allowed("1.1.1.1", "predict", 10, 60)
+    clock.now += 0.1
+    assert limiter.is_allowed("1.1.1.1", "predict", 10, 60)
+
+    clock.now += 60
+    assert limiter.get_remaining_requests("1.1.1.1", "predict", 10, 60) == 10
+
+
+def test_keys_are_per_client_and_endpoint(limiter):
+    for _ in range(2):
+        limiter.is_allowed("1.1.1.1", "batch_predict", 2, 60)
+
+    assert not limiter.is_allowed("1.1.1.1", "batch_predict", 2, 60)
+    assert limiter.is_allowed("1.1.1.1", "predict", 2, 60)
+    assert limiter.is_allowed("2.2.2.2", "batch_predict", 2, 60)
+
+
+def test_store_keeps_one_float_per_key_with_lru_eviction(clock):
+    store = InMemoryGCRAStore(max_keys=3, clock=clock)
+    limiter = RateLimiter(store)
+    for ip in ["a", "b", "c"]:
+        limiter.is_allowed(ip, "predict", 1, 60)
+
+    # Touching "a" makes "b" the least recently used
+    limiter.is_allowed("a", "predict", 1, 60)
+    limiter.is_allowed("d", "predict", 1, 60)
+
+    assert len(store) == 3
+    assert limiter.get_remaining_requests("b", "predict", 1, 60) == 1
+    assert limiter.get_remaining_requests("c", "predict", 1, 60) == 0
+
+
+def test_store_must_implement_update():
+    class NoUpdateStore(GCRAStore):
+        pass
+
+    with pytest.raises(TypeError):
+        NoUpdateStore()
@@ -0,0 +1,64 @@
+"""
+Tests for batch rejection normalization
+"""
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_collection.rejection_normalizer import RejectionNormalizer, RejectionPattern
+
+
+REASONS = [
+    "Documentation missing - please provide invoice",
+    "Item is outside the 18-month eligibility window",
+    "Damage was caused by the seller during packaging",
+    "Claim already filed for this shipment",
+    "invoice proof papers",
+    "completely unrelated gibberish text",
+    "",
+    "Documentation missing - please provide invoice",
+]
+
+
+@pytest.fixture(scope="module")
+def normalizer():
+    return RejectionNormalizer()
+
+
+def test_batch_matches_single(normalizer):
+    batch = normalizer.normalize_batch(REASONS)
+
+    assert len(batch) == len(REASONS)
+    for reason, result in zip(REASONS, batch):
+        single = normalizer.normalize_rejection(reason)
+        assert result.category == single.category
+        assert result.subcategory == single.subcategory
+        assert result.confidence == pytest.approx(single.confidence)
+
+
+def test_unknown_for_empty_text(normalizer):
+    result = normalizer.normalize_batch(["", "   "])
+
+    assert [r.category for r in result] == ["unknown", "unknown"]
+
+
+def test_patterns_recompiled_after_change(normalizer):
+    normalizer.add_custom_pattern(RejectionPattern(
+        pattern=r"zz custom rejection",
+        category="custom",
+        subcategory=None,
+        confidence=0.9,
+        required_evidence=[],
+        is_fixable=False,
+        policy_reference=None,
+        time_constraint=None,
+        amount_constraint=None
+    ))
+    try:
+        assert normalizer.normalize_batch(["ZZ custom rejection here"])[0].category == "custom"
+    finally:
+        normalizer.remove_pattern("custom")
+
+    assert normalizer.normalize_batch(["ZZ custom rejection here"])[0].category != "custom"
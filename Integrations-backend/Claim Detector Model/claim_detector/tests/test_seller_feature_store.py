@@ -0,0 +1,71 @@
+"""
+Tests for the online per-seller feature store
+"""
+import pandas as pd
+import pytest
+
+from src.features.seller_feature_store import SellerFeatureStore
+from src.features.behavioral_features import BehavioralFeatureEngineer
+
+
+@pytest.fixture
+def claims():
+    return pd.DataFrame({
+        'claim_id': ['C1', 'C2', 'C3', 'C4', 'C5'],
+        'seller_id': ['S1', 'S1', 'S2', 'S1', 'S1'],
+        'amount': [100.0, 50.0, 10.0, 30.0, 20.0],
+        'claimable': [1, 0, 1, 1, 0],
+        'claim_date': pd.to_datetime([
+            '2024-01-01', '2024-01-05', '2024-01-06', '2024-01-20', '2024-04-15'
+        ])
+    })
+
+
+def test_windows_are_measured_in_days(claims):
+    store = SellerFeatureStore(windows=[7, 30, 90])
+    for row in claims.head(4).itertuples():
+        store.ingest(row.seller_id, row.claim_date, row.amount, row.claimable)
+
+    features = store.get_features('S1', '2024-01-21')
+    assert features['claim_freq_7d'] == 1
+    assert features['claim_freq_30d'] == 3
+    assert features['amount_rolling_mean_30d'] == pytest.approx(60.0)
+    assert features['claimable_rate_30d'] == pytest.approx(2 / 3)
+    assert features['days_since_last_claim'] == 1
+
+    last = claims.iloc[4]
+    store.ingest(last['seller_id'], last['claim_date'], last['amount'], last['claimable'])
+    later = store.get_features('S1', '2024-05-01')
+    assert later['claim_freq_30d'] == 1
+    assert later['claim_freq_90d'] == 1
+    assert later['seller_total_claims'] == 4
+
+
+def test_unknown_seller_gets_zeros():
+    features = SellerFeatureStore().get_features('nobody', '2024-01-01')
+    assert all(value == 0.0 for value in features.values())
+
+
+def test_backfill_matches_online_serving(claims):
+    offline = SellerFeatureStore().backfill(claims)
+
+    online = SellerFeatureStore()
+    for index, row in claims.sort_values('claim_date').iterrows():
+        served = online.get_features(row['seller_id'], row['claim_date'])
+        assert served == offline.loc[index].to_dict()
+        online.ingest(row['seller_id'], row['claim_date'], row['amount'], row['claimable'])
+
+
+def test_backfill_is_point_in_time(claims):
+    offline = SellerFeatureStore().backfill(claims)
+    # The first claim of each seller sees no history, including its own label
+    assert offline.loc[0, 'claim_freq_7d'] == 0
+    assert offline.loc[2, 'claimable_rate_90d'] == 0
+    assert offline.loc[1, 'claimable_rate_7d'] == 1.0
+
+
+def test_engineer_uses_time_windows(claims):
+    result = BehavioralFeatureEngineer(windows=[7, 30]).engineer_seller_behavior(claims)
+    c4 = result[result['claim_id'] == 'C4'].iloc[0]
+    assert c4['claim_freq_7d'] == 0
+    assert c4['claim_freq_30d'] == 2
@@ -0,0 +1,132 @@
+"""
+Tests for batched, cached SHAP explanations
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+lightgbm = pytest.importorskip("lightgbm")
+
+from src.explainability.shap_explainer import SHAPExplainer
+
+
+class EnsembleStub:
+    """Minimal ensemble exposing the attributes SHAPExplainer relies on"""
+
+    def __init__(self, booster):
+        self.models = {'lightgbm': booster}
+        self.metadata = {'model_version': '1.2.3'}
+
+    def predict(self, X):
+        probabilities = self.models['lightgbm'].predict_proba(X)[:, 1]
+        return {'probabilities': probabilities, 'predictions': probabilities > 0.5}
+
+
+@pytest.fixture
+def samples():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(200, 6)), columns=[f"f{i}" for i in range(6)])
+
+
+@pytest.fixture
+def explainer(samples):
+    labels = (samples['f0'] + samples['f1'] > 0).astype(int)
+    booster = lightgbm.LGBMClassifier(n_estimators=20, verbose=-1).fit(samples, labels)
+    model = EnsembleStub(booster)
+    shap_explainer = SHAPExplainer(model, cache_size=100)
+    shap_explainer.initialize_explainer(model, list(samples.columns))
+    return shap_explainer
+
+
+def test_batch_matches_single_explanations(explainer, samples):
+    batch = explainer.explain_samples(samples.head(5), top_n=3)
+    explainer.clear_cache()
+    single = explainer.explain_prediction(samples.iloc[[2]], top_n=3)
+
+    assert len(batch) == 5
+    assert batch[2]['feature_contributions'] == single['feature_contributions']
+    assert len(single['feature_contributions']) == 3
+
+
+def test_cache_hits_and_eviction(explainer, samples):
+    explainer.get_shap_values(samples.head(10))
+    explainer.get_shap_values(samples.head(10))
+    assert explainer.cache_stats()['hits'] == 10
+
+    explainer.get_shap_values(samples)
+    assert explainer.cache_stats()['size'] == 100
+
+
+def test_cache_is_keyed_by_model_version(explainer, samples):
+    explainer.get_shap_values(samples.head(5))
+    explainer.model_version = '2.0.0'
+    explainer.get_shap_values(samples.head(5))
+    assert explainer.cache_stats()['misses'] == 10
+
+
+def test_approximate_mode_returns_top_k(explainer, samples):
+    explanations = explainer.explain_samples(samples.head(3), top_n=2, approximate=True)
+    for explanation in explanations:
+        contributions = [fc['abs_contribution'] for fc in explanation['feature_contributions']]
+        assert len(contributions) == 2
+        assert contributions == sorted(contributions, reverse=True)
+
+
+def test_batch_predictions_include_samples(explainer, samples):
+    result = explainer.explain_batch_predictions(samples.head(4), top_n=2, include_samples=True)
+    assert len(result['sample_contributions']) == 4
+
+
+def test_feature_pipeline_runs_before_explaining(explainer, samples):
+    class Pipeline:
+        def transform(self, claims):
+            return claims.drop(columns=['description'])
+
+    claims = samples.head(3).assign(description="lost in transit")
+    ensemble = SHAPExplainer.for_model(
+        type('Ensemble', (EnsembleStub,), {'feature_names': list(samples.columns)})(explainer.model.models['lightgbm']),
+        Pipeline()
+    )
+
+    contributions = ensemble.explain_claims(claims, top_n=2)
+    expected = explainer.explain_samples(samples.head(3), top_n=2)
+    assert contributions == [e['feature_contributions'] for e in expected]
+
+
+def test_loaded_rule_model_is_explained_on_its_features(tmp_path):
+    from improved_training import ImprovedFBAClaimsModel
+
+    rng = np.random.default_rng(1)
+    n = 120
+    claims = pd.DataFrame({
+        'claim_id': range(n),
+        'amount': rng.gamma(2, 50, n),
+        'units': rng.integers(1, 20, n),
+        'word_count': rng.integers(5, 50, n),
+        'text_length': rng.integers(20, 300, n),
+        'marketplace': rng.choice(['US', 'CA', 'UK'], n),
+        'claim_type': rng.choice(['fba_lost_inventory', 'non-claim'], n),
+        'text': 'item lost in warehouse',
+        'claimable': rng.integers(0, 2, n)
+    })
+    trained = ImprovedFBAClaimsModel()
+    trained.train_improved_model(trained.prepare_features(claims), claims['claimable'])
+    trained.save_model(str(tmp_path / "model.pkl"))
+
+    model = ImprovedFBAClaimsModel()
+    model.load_model(str(tmp_path / "model.pkl"))
+    shap_explainer = SHAPExplainer.for_model(model, approximate=True)
+    assert shap_explainer is not None
+
+    batch = claims.head(3)
+    predictions = model.predict(model.prepare_features(batch))
+    contributions = shap_explainer.explain_claims(batch, predictions, top_n=3)
+
+    assert len(contributions) == 3
+    for row in contributions:
+        assert len(row) == 3
+        assert {fc['feature_name'] for fc in row} <= set(model.feature_columns)
+    assert model.feature_columns == trained.feature_columns
+
+    shap_explainer.explain_claims(batch, predictions, top_n=3)
+    assert shap_explainer.cache_stats()['hits'] == 3
@@ -0,0 +1,96 @@
+"""
+Tests for cached, vectorized text embedding features
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.embedding_store import EmbeddingStore
+from src.features.text_embeddings import TextEmbeddingEngineer
+
+
+class CountingEncoder:
+    """Deterministic stand-in for SentenceTransformer that records calls"""
+
+    def __init__(self, dim=4):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        self.encoded.extend(texts)
+        return np.array([
+            [len(text), sum(map(ord, text)) % 97, text.count(' '), i % 3]
+            for i, text in enumerate(texts)
+        ], dtype=np.float32)[:, :self.dim]
+
+
+@pytest.fixture
+def claims():
+    return pd.DataFrame({
+        'description': ['iPhone 13 Pro', 'Novel by Author', 'iPhone 13 Pro'],
+        'reason': ['Damaged during shipping', 'Lost in transit', None],
+        'notes': ['Screen cracked', 'Package never arrived', 'Water damage']
+    })
+
+
+def make_engineer(cache_dir=None):
+    engineer = TextEmbeddingEngineer(cache_dir=str(cache_dir) if cache_dir else None)
+    engineer.model = CountingEncoder()
+    return engineer
+
+
+def test_duplicates_are_encoded_once(claims):
+    engineer = make_engineer()
+    embeddings = engineer.generate_embeddings(claims['description'].tolist())
+
+    assert engineer.model.encoded.count('iPhone 13 Pro') == 1
+    assert np.array_equal(embeddings[0], embeddings[2])
+
+
+def test_cache_reuses_vectors_across_runs(claims, tmp_path):
+    first = make_engineer(tmp_path)
+    expected = first.generate_embeddings(claims['notes'].tolist())
+
+    second = make_engineer(tmp_path)
+    cached = second.generate_embeddings(claims['notes'].tolist() + ['New note'])
+
+    assert second.model.encoded == ['New note']
+    assert np.array_equal(cached[:3], expected)
+
+
+def test_store_grows_past_initial_capacity(tmp_path):
+    store = EmbeddingStore(str(tmp_path), 'model/name')
+    texts = [f"text {i}" for i in range(EmbeddingStore.INITIAL_CAPACITY + 10)]
+    vectors = np.arange(len(texts) * 2, dtype=np.float32).reshape(-1, 2)
+    store.add(texts, vectors)
+    store.flush()
+
+    reopened = EmbeddingStore(str(tmp_path), 'model/name')
+    rows, missing = reopened.lookup(texts[-3:] + ['unknown'])
+    assert missing == [3]
+    assert np.array_equal(reopened.get(rows[:3]), vectors[-3:])
+
+
+def test_engineer_text_features_columns(claims):
+    engineer = make_engineer()
+    result = engineer.engineer_text_features(claims)
+
+    assert 'description_embedding_3' in result.columns
+    assert 'combined_text_embedding_mean' in result.columns
+    assert 'iPhone 13 Pro  Water damage' in engineer.model.encoded
+    assert len(result) == len(claims)
+
+
+def test_preprocessing_pipeline_uses_the_cache(claims, tmp_path):
+    from src.preprocessing.pipeline import PreprocessingPipeline
+
+    first = PreprocessingPipeline(embedding_cache_dir=str(tmp_path))
+    first.text_engineer.model = CountingEncoder()
+    first.text_engineer.engineer_text_features(claims)
+
+    second = PreprocessingPipeline(embedding_cache_dir=str(tmp_path))
+    second.text_engineer.model = CountingEncoder()
+    second.text_engineer.engineer_text_features(claims)
+
+    assert first.text_engineer.model.encoded
+    assert second.text_engineer.model.encoded == []
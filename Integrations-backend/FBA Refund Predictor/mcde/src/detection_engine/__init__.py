@@ -9,6 +9,7 @@ Modules:
     - types: Data types and interfaces
     - rules: Detection rule implementations
     - evidence: Evidence building and S3 artifact management
+    - sharding: SKU-range sharding and fair-share job scheduling
     - worker: Main worker process for job processing
 """
 
@@ -23,6 +24,7 @@ from .rules import (
 )
 
 from .evidence import EvidenceBuilder
+from .sharding import FairShareScheduler, shard_rule_input, merge_anomalies
 from .worker import DetectionWorker
 
 __version__ = "1.0.0"
@@ -36,6 +38,9 @@ __all__ = [
     "BaseRule", "LostUnitsRule", "OverchargedFeesRule", "DamagedStockRule", "ALL_RULES",
     
     # Core components
-    "EvidenceBuilder", "DetectionWorker"
+    "EvidenceBuilder", "DetectionWorker",
+
+    # Sharding / scheduling
+    "FairShareScheduler", "shard_rule_input", "merge_anomalies"
 ]
 
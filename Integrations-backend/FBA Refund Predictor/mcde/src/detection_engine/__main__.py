@@ -51,7 +51,10 @@ def load_config(config_path: str = None) -> dict:
         'worker': {
             'max_concurrency': int(os.getenv('DETECTION_WORKER_CONCURRENCY', '5')),
             'poll_interval_ms': int(os.getenv('DETECTION_WORKER_POLL_INTERVAL_MS', '5000')),
-            'max_retries': int(os.getenv('DETECTION_WORKER_MAX_RETRIES', '3'))
+            'max_retries': int(os.getenv('DETECTION_WORKER_MAX_RETRIES', '3')),
+            'max_jobs_per_seller': int(os.getenv('DETECTION_WORKER_MAX_JOBS_PER_SELLER', '1')),
+            'shard_size': int(os.getenv('DETECTION_WORKER_SHARD_SIZE', '5000')),
+            'shard_processes': int(os.getenv('DETECTION_WORKER_SHARD_PROCESSES', str(os.cpu_count() or 1)))
         }
     }
 
@@ -0,0 +1,148 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Any, List, Iterable
+
+from .types import Anomaly, RuleInput, RuleContext, DetectionJob
+from .rules import ALL_RULES
+
+logger = logging.getLogger(__name__)
+
+# Per-item collections in the rule input that can be split by SKU. Everything
+# else in the payload (totals, expected fees) is seller-wide context and is
+# copied into every shard unchanged so rule scores stay identical.
+SHARDABLE_KEYS = ("inventory", "fees", "damagedStock")
+
+
+def count_shardable_items(data: Dict[str, Any]) -> int:
+    """Count the per-SKU items a rule input carries."""
+    return sum(len(data.get(key) or []) for key in SHARDABLE_KEYS)
+
+
+def shard_rule_input(rule_input: RuleInput, shard_size: int) -> List[RuleInput]:
+    """Split a rule input into SKU-range shards of roughly ``shard_size`` items.
+
+    SKUs are sorted and cut into contiguous ranges, so every item for a given
+    SKU (across inventory, fees and damaged stock) lands in the same shard.
+    """
+    data = rule_input.data
+    if shard_size <= 0 or count_shardable_items(data) <= shard_size:
+        return [rule_input]
+
+    items_per_sku: Dict[str, int] = defaultdict(int)
+    for key in SHARDABLE_KEYS:
+        for item in data.get(key) or []:
+            items_per_sku[str(item.get("sku") or "")] += 1
+
+    # Walk SKUs in order and close a range once it holds enough items
+    sku_to_shard: Dict[str, int] = {}
+    shard_index = 0
+    shard_items = 0
+    for sku in sorted(items_per_sku):
+        if shard_items >= shard_size:
+            shard_index += 1
+            shard_items = 0
+        sku_to_shard[sku] = shard_index
+        shard_items += items_per_sku[sku]
+
+    shard_data: List[Dict[str, Any]] = []
+    for _ in range(shard_index + 1):
+        base = {k: v for k, v in data.items() if k not in SHARDABLE_KEYS}
+        for key in SHARDABLE_KEYS:
+            if key in data:
+                base[key] = []
+        shard_data.append(base)
+
+    for key in SHARDABLE_KEYS:
+        for item in data.get(key) or []:
+            shard_data[sku_to_shard[str(item.get("sku") or "")]][key].append(item)
+
+    return [
+        RuleInput(seller_id=rule_input.seller_id, sync_id=rule_input.sync_id, data=d)
+        for d in shard_data
+    ]
+
+
+def apply_rules(rule_input: RuleInput, context: RuleContext) -> List[Anomaly]:
+    """Run every rule against one input.
+
+    Module-level so it can be shipped to a process pool worker.
+    """
+    anomalies: List[Anomaly] = []
+    for rule in ALL_RULES:
+        try:
+            anomalies.extend(rule.apply(rule_input, context))
+        except Exception as e:
+            # One failing rule must not drop the anomalies of the others
+            logger.error(f"Error applying rule {rule.rule_type}: {e}")
+    return anomalies
+
+
+def merge_anomalies(shard_results: Iterable[List[Anomaly]]) -> List[Anomaly]:
+    """Merge per-shard anomalies, dropping duplicates by rule type and dedupe hash."""
+    merged: List[Anomaly] = []
+    seen = set()
+    for anomalies in shard_results:
+        for anomaly in anomalies:
+            key = (anomaly.rule_type, anomaly.dedupe_hash)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(anomaly)
+    return merged
+
+
+class FairShareScheduler:
+    """Pick jobs so that no single seller monopolises the worker.
+
+    Candidates are granted round-robin across sellers, starting with the sellers
+    that currently have the fewest jobs in flight, and a seller never exceeds
+    ``max_jobs_per_seller`` concurrent jobs. Within a seller the incoming
+    (priority, age) order is preserved.
+    """
+
+    def __init__(self, max_jobs_per_seller: int = 1):
+        self.max_jobs_per_seller = max(1, max_jobs_per_seller)
+        self.active_by_seller: Dict[str, int] = defaultdict(int)
+
+    def busy_sellers(self) -> List[str]:
+        """Sellers that are at their concurrency cap."""
+        return [
+            seller_id for seller_id, count in self.active_by_seller.items()
+            if count >= self.max_jobs_per_seller
+        ]
+
+    def select(self, candidates: List[DetectionJob], slots: int) -> List[DetectionJob]:
+        """Choose up to ``slots`` jobs from ``candidates``."""
+        queues: Dict[str, List[DetectionJob]] = defaultdict(list)
+        for job in candidates:
+            queues[job.seller_id].append(job)
+
+        planned: Dict[str, int] = {
+            seller_id: self.active_by_seller.get(seller_id, 0) for seller_id in queues
+        }
+        selected: List[DetectionJob] = []
+
+        while len(selected) < slots:
+            eligible = [
+                seller_id for seller_id, jobs in queues.items()
+                if jobs and planned[seller_id] < self.max_jobs_per_seller
+            ]
+            if not eligible:
+                break
+            # Least-loaded seller first; ties keep the order the queue returned
+            seller_id = min(eligible, key=lambda s: planned[s])
+            selected.append(queues[seller_id].pop(0))
+            planned[seller_id] += 1
+
+        return selected
+
+    def acquire(self, job: DetectionJob):
+        self.active_by_seller[job.seller_id] += 1
+
+    def release(self, job: DetectionJob):
+        remaining = self.active_by_seller.get(job.seller_id, 0) - 1
+        if remaining > 0:
+            self.active_by_seller[job.seller_id] = remaining
+        else:
+            self.active_by_seller.pop(job.seller_id, None)
+
@@ -1,6 +1,8 @@
 import asyncio
+import json
 import logging
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import time
 
@@ -9,11 +11,14 @@ from psycopg2.extras import RealDictCursor
 import boto3
 
 from .types import (
-    DetectionJob, DetectionResult, RuleInput, RuleContext,
+    Anomaly, DetectionJob, DetectionResult, RuleInput, RuleContext,
     Threshold, WhitelistItem, RuleType, AnomalySeverity
 )
-from .rules import ALL_RULES
 from .evidence import EvidenceBuilder
+from .sharding import (
+    FairShareScheduler, apply_rules, count_shardable_items, merge_anomalies,
+    shard_rule_input
+)
 
 
 class DetectionWorker:
@@ -44,8 +49,20 @@ class DetectionWorker:
         
         self.is_running = False
         self.active_workers = 0
+        self.active_tasks = set()
         self.logger = logging.getLogger(__name__)
 
+        # Fair-share scheduling keeps one large seller from taking every slot
+        self.scheduler = FairShareScheduler(
+            worker_config.get('max_jobs_per_seller', 1)
+        )
+
+        # Rule execution for large inputs is split into SKU-range shards that
+        # run in a process pool; small inputs stay inline
+        self.shard_size = worker_config.get('shard_size', 5000)
+        self.shard_processes = worker_config.get('shard_processes', 0)
+        self._shard_pool: Optional[ProcessPoolExecutor] = None
+
     async def start(self):
         """Start the detection worker."""
         if self.is_running:
@@ -57,21 +74,14 @@ class DetectionWorker:
 
         while self.is_running:
             try:
-                if self.active_workers < self.worker_config['max_concurrency']:
-                    job = await self._get_next_job()
-                    
-                    if job:
-                        self.active_workers += 1
-                        asyncio.create_task(
-                            self._process_job(job).finally(
-                                lambda: setattr(self, 'active_workers', self.active_workers - 1)
-                            )
-                        )
-                    else:
-                        # No jobs available, wait before polling again
-                        await asyncio.sleep(self.worker_config['poll_interval_ms'] / 1000)
-                else:
-                    # Max concurrency reached, wait before checking again
+                free_slots = self.worker_config['max_concurrency'] - self.active_workers
+                jobs = await self._claim_jobs(free_slots) if free_slots > 0 else []
+
+                for job in jobs:
+                    self._launch_job(job)
+
+                if not jobs:
+                    # No jobs available or max concurrency reached, wait before polling again
                     await asyncio.sleep(self.worker_config['poll_interval_ms'] / 1000)
             except Exception as e:
                 self.logger.error(f"Error in detection worker main loop: {e}")
@@ -85,20 +95,55 @@ class DetectionWorker:
         # Wait for active workers to complete
         while self.active_workers > 0:
             await asyncio.sleep(1)
+
+        if self._shard_pool is not None:
+            self._shard_pool.shutdown(wait=True)
+            self._shard_pool = None
         
         self.logger.info("Detection worker stopped")
 
-    async def _get_next_job(self) -> DetectionJob:
+    def _launch_job(self, job: DetectionJob):
+        """Run a claimed job in the background and track its slot."""
+        self.active_workers += 1
+        self.scheduler.acquire(job)
+        task = asyncio.create_task(self._process_job(job))
+        self.active_tasks.add(task)
+
+        def _release(finished_task):
+            self.active_tasks.discard(finished_task)
+            self.active_workers -= 1
+            self.scheduler.release(job)
+
+        task.add_done_callback(_release)
+
+    async def _get_next_job(self) -> Optional[DetectionJob]:
         """Get the next available detection job from the database."""
+        jobs = await self._claim_jobs(1)
+        return jobs[0] if jobs else None
+
+    async def _claim_jobs(self, limit: int) -> List[DetectionJob]:
+        """Claim up to ``limit`` pending jobs, fairly shared across sellers.
+
+        A window of candidates is locked with SKIP LOCKED, sellers already at
+        their concurrency cap are excluded in SQL, and the fair-share scheduler
+        picks which candidates to start. Candidates that are not picked are left
+        PENDING and their row locks are released on commit.
+        """
+        if limit <= 0:
+            return []
+
+        candidate_window = limit * self.worker_config.get('candidate_multiplier', 4)
+
         try:
             with self._get_db_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    # Get next available job with priority ordering
+                    # Get candidate jobs with priority ordering
                     cur.execute("""
                         SELECT id, seller_id, sync_id, status, priority, attempts, 
                                last_error, created_at, updated_at
                         FROM "DetectionJob"
                         WHERE status = 'PENDING'
+                          AND NOT (seller_id = ANY(%s))
                         ORDER BY 
                             CASE priority
                                 WHEN 'CRITICAL' THEN 4
@@ -107,37 +152,60 @@ class DetectionWorker:
                                 WHEN 'LOW' THEN 1
                             END DESC,
                             created_at ASC
-                        LIMIT 1
+                        LIMIT %s
                         FOR UPDATE SKIP LOCKED
-                    """)
-                    
-                    job_data = cur.fetchone()
-                    if job_data:
-                        # Mark job as processing
+                    """, (self.scheduler.busy_sellers(), candidate_window))
+
+                    candidates = [
+                        DetectionJob(
+                            id=row['id'],
+                            seller_id=row['seller_id'],
+                            sync_id=row['sync_id'],
+                            status=row['status'],
+                            priority=row['priority'],
+                            attempts=row['attempts'],
+                            last_error=row['last_error'],
+                            created_at=row['created_at'],
+                            updated_at=row['updated_at']
+                        )
+                        for row in cur.fetchall()
+                    ]
+
+                    selected = self.scheduler.select(candidates, limit)
+                    if selected:
+                        # Mark jobs as processing
                         cur.execute("""
                             UPDATE "DetectionJob"
                             SET status = 'PROCESSING', updated_at = NOW()
-                            WHERE id = %s
-                        """, (job_data['id'],))
-                        
-                        conn.commit()
-                        
-                        return DetectionJob(
-                            id=job_data['id'],
-                            seller_id=job_data['seller_id'],
-                            sync_id=job_data['sync_id'],
-                            status=job_data['status'],
-                            priority=job_data['priority'],
-                            attempts=job_data['attempts'],
-                            last_error=job_data['last_error'],
-                            created_at=job_data['created_at'],
-                            updated_at=job_data['updated_at']
-                        )
-                    
-                    return None
+                            WHERE id = ANY(%s)
+                        """, ([job.id for job in selected],))
+
+                    conn.commit()
+                    return selected
         except Exception as e:
-            self.logger.error(f"Error getting next job: {e}")
-            return None
+            self.logger.error(f"Error claiming jobs: {e}")
+            return []
+
+    async def _run_rules(self, rule_input: RuleInput, context: RuleContext) -> List[Anomaly]:
+        """Run all rules, sharding large inputs by SKU range across processes."""
+        shards = shard_rule_input(rule_input, self.shard_size)
+
+        if len(shards) == 1 or self.shard_processes <= 0:
+            return merge_anomalies(apply_rules(shard, context) for shard in shards)
+
+        if self._shard_pool is None:
+            self._shard_pool = ProcessPoolExecutor(max_workers=self.shard_processes)
+
+        self.logger.info(
+            f"Running rules for seller {rule_input.seller_id} across {len(shards)} shards "
+            f"({count_shardable_items(rule_input.data)} items)"
+        )
+        loop = asyncio.get_running_loop()
+        shard_results = await asyncio.gather(*[
+            loop.run_in_executor(self._shard_pool, apply_rules, shard, context)
+            for shard in shards
+        ])
+        return merge_anomalies(shard_results)
 
     async def _process_job(self, job: DetectionJob):
         """Process a detection job."""
@@ -169,14 +237,7 @@ class DetectionWorker:
             )
 
             # Run all rules
-            all_anomalies = []
-            
-            for rule in ALL_RULES:
-                try:
-                    anomalies = rule.apply(rule_input, context)
-                    all_anomalies.extend(anomalies)
-                except Exception as e:
-                    self.logger.error(f"Error applying rule {rule.rule_type}: {e}")
+            all_anomalies = await self._run_rules(rule_input, context)
 
             # Process anomalies and build evidence
             results = []
@@ -0,0 +1,127 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+
+from src.detection_engine.sharding import (
+    FairShareScheduler, apply_rules, merge_anomalies, shard_rule_input
+)
+from src.detection_engine.types import (
+    DetectionJob, RuleInput, RuleContext, Threshold, RuleType, ThresholdOperator
+)
+
+
+def make_job(job_id, seller_id):
+    now = datetime.utcnow()
+    return DetectionJob(
+        id=job_id,
+        seller_id=seller_id,
+        sync_id='sync',
+        status='PENDING',
+        priority='NORMAL',
+        attempts=0,
+        last_error=None,
+        created_at=now,
+        updated_at=now
+    )
+
+
+class TestShardRuleInput:
+    @pytest.fixture
+    def rule_input(self):
+        inventory = [
+            {"sku": f"SKU{i:03d}", "asin": f"B{i:09d}", "units": 5, "value": 25.0, "vendor": "Vendor A"}
+            for i in range(10)
+        ]
+        fees = [
+            {"feeType": "FBA_FEE", "amount": 15.0, "sku": f"SKU{i:03d}", "asin": f"B{i:09d}",
+             "vendor": "Vendor A", "shipmentId": f"SHIP{i}"}
+            for i in range(10)
+        ]
+        return RuleInput(
+            seller_id='seller123',
+            sync_id='sync456',
+            data={
+                "inventory": inventory,
+                "fees": fees,
+                "totalUnits": 100,
+                "totalValue": 1000.0,
+                "expectedFees": {"FBA_FEE": 12.0},
+                "totalRevenue": 2000.0
+            }
+        )
+
+    @pytest.fixture
+    def context(self):
+        return RuleContext(
+            seller_id='seller123',
+            sync_id='sync456',
+            thresholds=[
+                Threshold(
+                    id='t1', seller_id=None, rule_type=RuleType.LOST_UNITS,
+                    operator=ThresholdOperator.GT, value=Decimal('1.0'), active=True
+                ),
+                Threshold(
+                    id='t2', seller_id=None, rule_type=RuleType.OVERCHARGED_FEES,
+                    operator=ThresholdOperator.GT, value=Decimal('1.0'), active=True
+                )
+            ],
+            whitelist=[]
+        )
+
+    def test_small_input_is_not_sharded(self, rule_input):
+        assert shard_rule_input(rule_input, 100) == [rule_input]
+
+    def test_skus_stay_together_and_context_is_copied(self, rule_input):
+        shards = shard_rule_input(rule_input, 4)
+
+        assert len(shards) == 5
+        for shard in shards:
+            inventory_skus = {item["sku"] for item in shard.data["inventory"]}
+            fee_skus = {item["sku"] for item in shard.data["fees"]}
+            assert inventory_skus == fee_skus
+            assert shard.data["totalUnits"] == 100
+            assert shard.data["expectedFees"] == {"FBA_FEE": 12.0}
+
+        all_skus = [item["sku"] for shard in shards for item in shard.data["inventory"]]
+        assert sorted(all_skus) == [f"SKU{i:03d}" for i in range(10)]
+
+    def test_sharded_results_match_unsharded(self, rule_input, context):
+        expected = apply_rules(rule_input, context)
+        sharded = merge_anomalies(
+            apply_rules(shard, context) for shard in shard_rule_input(rule_input, 3)
+        )
+
+        assert len(expected) == 20
+        assert sorted(a.dedupe_hash for a in sharded) == sorted(a.dedupe_hash for a in expected)
+
+    def test_merge_drops_duplicates(self, rule_input, context):
+        anomalies = apply_rules(rule_input, context)
+        assert len(merge_anomalies([anomalies, anomalies])) == len(anomalies)
+
+
+class TestFairShareScheduler:
+    def test_round_robin_across_sellers(self):
+        scheduler = FairShareScheduler(max_jobs_per_seller=2)
+        candidates = [make_job(f"big-{i}", "big") for i in range(5)] + [make_job("small-1", "small")]
+
+        selected = scheduler.select(candidates, 3)
+
+        assert [job.id for job in selected] == ["big-0", "small-1", "big-1"]
+
+    def test_respects_active_jobs_and_cap(self):
+        scheduler = FairShareScheduler(max_jobs_per_seller=1)
+        scheduler.acquire(make_job("running", "big"))
+
+        selected = scheduler.select([make_job("big-1", "big"), make_job("small-1", "small")], 5)
+
+        assert [job.id for job in selected] == ["small-1"]
+        assert scheduler.busy_sellers() == ["big"]
+
+    def test_release_frees_seller(self):
+        scheduler = FairShareScheduler(max_jobs_per_seller=1)
+        job = make_job("running", "big")
+        scheduler.acquire(job)
+        scheduler.release(job)
+
+        assert scheduler.busy_sellers() == []
+        assert scheduler.select([make_job("big-1", "big")], 1)[0].id == "big-1"
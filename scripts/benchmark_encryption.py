@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Encryption throughput benchmark
+
+Measures record encryption (per call vs bulk), record decryption and
+streaming file encryption against an in-memory key, so no database is
+touched. Run from the repository root:
+
+    python scripts/benchmark_encryption.py --records 20000 --file-mb 256
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.security.encryption_service import EncryptionService  # noqa: E402
+
+
+def rate(count: float, seconds: float) -> str:
+    return f"{count / seconds:,.0f}/s"
+
+
+def bench_records(service: EncryptionService, count: int):
+    records = [{"claim_id": f"claim-{i}", "amount": i * 1.5, "note": "x" * 200} for i in range(count)]
+
+    started = time.perf_counter()
+    for record in records:
+        service.encrypt_data(record)
+    print(f"encrypt_data   {count:>8} records  {rate(count, time.perf_counter() - started)}")
+
+    started = time.perf_counter()
+    encrypted = service.encrypt_many(records)
+    print(f"encrypt_many   {count:>8} records  {rate(count, time.perf_counter() - started)}")
+
+    started = time.perf_counter()
+    service.decrypt_many(encrypted)
+    print(f"decrypt_many   {count:>8} records  {rate(count, time.perf_counter() - started)}")
+
+
+def bench_file(service: EncryptionService, size_mb: int):
+    with tempfile.TemporaryDirectory() as directory:
+        plain = os.path.join(directory, "plain.bin")
+        with open(plain, "wb") as f:
+            for _ in range(size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        for label, run in (
+            ("encrypt_file", lambda: service.encrypt_file(plain, plain + ".enc")),
+            ("decrypt_file", lambda: service.decrypt_file(plain + ".enc", plain + ".out")),
+        ):
+            tracemalloc.start()
+            started = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{label:<14} {size_mb:>5} MiB  {size_mb / elapsed:,.0f} MiB/s  peak {peak / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--file-mb", type=int, default=64)
+    args = parser.parse_args()
+
+    service = EncryptionService()
+    service._remember_key("default", os.urandom(32))
+    bench_records(service, args.records)
+    bench_file(service, args.file_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+API cold-start benchmark and import budget check
+
+Imports ``src.app`` in fresh interpreters with ``python -X importtime``,
+reports the median import time and the slowest modules, and fails when the
+import exceeds the budget or pulls in a heavy library that should only load
+on first use. Run from the repository root:
+
+    python scripts/benchmark_startup.py --runs 5 --budget-ms 1500
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Libraries that must be imported lazily, behind the code paths that need them
+LAZY_MODULES = (
+    "reportlab", "pdfplumber", "PyPDF2", "pytesseract", "PIL",
+    "boto3", "botocore", "aiohttp", "sklearn", "pandas", "numpy", "joblib",
+)
+
+CHECK_LAZY = (
+    "import sys, src.app; "
+    f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+)
+
+
+def import_profile() -> dict:
+    """One cold import of src.app; returns {module: (self_us, cumulative_us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.app"],
+        cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import src.app failed:\n{result.stderr[-2000:]}")
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def eagerly_imported() -> list:
+    result = subprocess.run([sys.executable, "-c", CHECK_LAZY], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"import src.app failed:\n{result.stderr[-2000:]}")
+    output = result.stdout.strip().splitlines()
+    return [name for name in (output[-1] if output else "").split(",") if name]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1500")))
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    totals_ms = [profile["src.app"][1] / 1000 for profile in profiles]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"import src.app   median {median_ms:,.0f} ms   min {min(totals_ms):,.0f} ms   "
+          f"max {max(totals_ms):,.0f} ms   ({args.runs} runs)")
+    print("\nslowest modules (self time, last run):")
+    for name, (self_us, cumulative_us) in sorted(profiles[-1].items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+    failures = []
+    if median_ms > args.budget_ms:
+        failures.append(f"cold import took {median_ms:,.0f} ms, budget is {args.budget_ms:,.0f} ms")
+    eager = eagerly_imported()
+    if eager:
+        failures.append(f"heavy libraries imported at startup: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    if not failures:
+        print(f"\nOK: within {args.budget_ms:,.0f} ms budget, no heavy libraries imported eagerly")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,8 @@
 import logging
+import os
+from pydantic import BaseModel
 from src.common.db_postgresql import DatabaseManager
+from src.common.job_queue import Job, PermanentJobError, QueueConfig, register_queue, register_worker
 
 # Initialize database manager
 db = DatabaseManager()
@@ -11,63 +14,102 @@ logger = logging.getLogger(__name__)
 # Initialize SP-API adapter
 adapter = SPAmazonAdapter()
 
-def enqueue_filing(claim_id: str):
-    """Enqueue a filing job (pseudo-enqueue for now)"""
-    # TODO: Replace with proper background job queue (RQ/Arq/APScheduler)
+class FileClaimJob(BaseModel):
+    """Payload of a ``claim_filing`` job"""
+    claim_id: str
+
+# Rate limited to stay within the SP-API submission quota
+filing_queue = register_queue(QueueConfig(
+    name="claim_filing",
+    payload_model=FileClaimJob,
+    max_attempts=6,
+    backoff_base_seconds=60,
+    concurrency=int(os.getenv("CLAIM_FILING_CONCURRENCY", "2")),
+    rate_per_second=float(os.getenv("CLAIM_FILING_RATE_PER_SECOND", "0.5")),
+))
+
+def enqueue_filing(claim_id: str) -> str:
+    """Queue a filing job; a claim has at most one waiting job"""
     logger.info(f"Enqueuing filing for claim {claim_id}")
-    # For now, run filing immediately
-    file_claim(claim_id)
+    return filing_queue.enqueue(FileClaimJob(claim_id=claim_id), dedupe_key=claim_id)
 
 def file_claim(claim_id: str):
-    """File a claim by building packet and submitting via SP-API"""
+    """File a claim now, recording any error on the claim instead of raising"""
+    try:
+        _submit_claim(claim_id)
+    except Exception as e:
+        logger.error(f"Error during filing of claim {claim_id}: {str(e)}")
+        # Update claim status to failed
+        db.update_claim_status(claim_id, "filing_failed")
+
+def run_filing_job(job: Job[FileClaimJob]):
+    """Queue handler: file one claim; rejections and errors before submission are retried"""
+    result = _submit_claim(job.payload.claim_id)
+    if result is not None and not result.submitted:
+        raise RuntimeError(f"Submission rejected: {result.message}")
+
+def on_filing_dead(job: Job[FileClaimJob], error: str):
+    """Queue dead-letter hook: no retries left"""
+    db.update_claim_status(job.payload.claim_id, "filing_failed")
+
+def _submit_claim(claim_id: str):
+    """Build the packet and submit it via SP-API; returns the FilingResult"""
+    logger.info(f"Starting filing process for claim {claim_id}")
+    
+    # Load claim and validation data
+    claim = db.load_claim(claim_id)
+    if not claim:
+        raise PermanentJobError(f"Claim {claim_id} not found in database")
+    
+    validation = db.load_latest_validation(claim_id)
+    if not validation:
+        raise PermanentJobError(f"No validation found for claim {claim_id}")
+    
+    # Fetch evidence links
+    evidence_links = db.fetch_evidence_links(claim_id)
+    
+    # Build claim packet
+    from src.common.schemas import ClaimDetection, FilingResult, ValidationResult
+    claim_obj = ClaimDetection(**claim)
+    validation_obj = ValidationResult(**validation)
+    
+    packet = build_packet(claim_obj, validation_obj, evidence_links)
+    
+    # A retried job must never file the same claim twice
+    existing = db.load_submitted_filing(claim_id)
+    if existing:
+        logger.info(f"Claim {claim_id} already submitted (Case ID: {existing['amazon_case_id']}), skipping")
+        db.update_claim_status(claim_id, "submitted")
+        return FilingResult(
+            claim_id=claim_id,
+            submitted=True,
+            amazon_case_id=existing['amazon_case_id'],
+            status="submitted",
+            message="Already submitted"
+        )
+    
+    # Submit via SP-API adapter
+    result = adapter.submit(packet)
+    
+    # Past this point the claim may be filed with Amazon, so nothing may raise
+    # into the queue: a retry would submit it again
     try:
-        logger.info(f"Starting filing process for claim {claim_id}")
-        
-        # Load claim and validation data
-        claim = db.load_claim(claim_id)
-        if not claim:
-            logger.error(f"Claim {claim_id} not found in database")
-            return
-        
-        validation = db.load_latest_validation(claim_id)
-        if not validation:
-            logger.error(f"No validation found for claim {claim_id}")
-            return
-        
-        # Fetch evidence links
-        evidence_links = db.fetch_evidence_links(claim_id)
-        
-        # Build claim packet
-        from src.common.schemas import ClaimDetection, ValidationResult
-        claim_obj = ClaimDetection(**claim)
-        validation_obj = ValidationResult(**validation)
-        
-        packet = build_packet(claim_obj, validation_obj, evidence_links)
-        
-        # Submit via SP-API adapter
-        result = adapter.submit(packet)
-        
-        # Save filing result and update claim status
         db.save_filing(claim_id, result, packet)
-        
+    except Exception as e:
+        logger.error(
+            f"Claim {claim_id} submission (submitted={result.submitted}, "
+            f"Case ID: {result.amazon_case_id}) could not be saved: {e}"
+        )
+    
+    try:
         if result.submitted:
             db.update_claim_status(claim_id, "submitted")
             logger.info(f"Claim {claim_id} successfully submitted to Amazon (Case ID: {result.amazon_case_id})")
         else:
-            # For failed submissions, mark as failed
-            # TODO: Implement retry policy with backoff
             db.update_claim_status(claim_id, "failed")
             logger.warning(f"Claim {claim_id} failed to submit: {result.message}")
-            
     except Exception as e:
-        logger.error(f"Error during filing of claim {claim_id}: {str(e)}")
-        # Update claim status to failed
-        db.update_claim_status(claim_id, "filing_failed")
-
-
-
-
-
-
-
+        logger.error(f"Error updating status of claim {claim_id} after submission: {e}")
+    return result
 
+register_worker(filing_queue, run_filing_job, on_dead=on_filing_dead)
@@ -5,10 +5,14 @@ Handles JWT token validation and user extraction for all API endpoints
 
 import jwt
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from fastapi import HTTPException, Depends, status, Request
 from fastapi import WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional
+from typing import Optional, Tuple
 import logging
 from src.common.config import settings
 
@@ -22,10 +26,25 @@ class JWTError(Exception):
     """Custom JWT error"""
     pass
 
+# Verified token claims keyed by SHA-256 of the token, kept until the token's
+# exp (or JWT_CACHE_TTL_SECONDS for tokens without one). Failures are not cached.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_CACHE_TTL_SECONDS = float(os.getenv("JWT_CACHE_TTL_SECONDS", "300"))
+_verified_tokens: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+_verified_tokens_lock = threading.Lock()
+
+def clear_token_cache():
+    """Forget all verified tokens, e.g. after rotating a signing secret"""
+    with _verified_tokens_lock:
+        _verified_tokens.clear()
+
 def verify_jwt_token(token: str) -> dict:
     """
     Verify and decode JWT token
     
+    Verified claims are cached until the token expires, so repeat requests
+    with the same token skip signature checks entirely.
+    
     Args:
         token: JWT token string
         
@@ -35,6 +54,28 @@ def verify_jwt_token(token: str) -> dict:
     Raises:
         JWTError: If token is invalid or expired
     """
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+    with _verified_tokens_lock:
+        cached = _verified_tokens.get(cache_key)
+        if cached is not None:
+            if cached[1] > now:
+                _verified_tokens.move_to_end(cache_key)
+                return dict(cached[0])
+            del _verified_tokens[cache_key]
+    
+    payload = _decode_jwt_token(token)
+    
+    exp = payload.get("exp")
+    expires_at = float(exp) if isinstance(exp, (int, float)) else now + JWT_CACHE_TTL_SECONDS
+    with _verified_tokens_lock:
+        _verified_tokens[cache_key] = (dict(payload), expires_at)
+        while len(_verified_tokens) > JWT_CACHE_SIZE:
+            _verified_tokens.popitem(last=False)
+    return payload
+
+def _decode_jwt_token(token: str) -> dict:
+    """Decode a token against each configured secret"""
     try:
         secrets_to_try = [settings.JWT_SECRET]
         if SERVICE_JWT_SECRET and SERVICE_JWT_SECRET != settings.JWT_SECRET:
@@ -171,7 +171,8 @@ async def get_detection_history(
             "data": {
                 "detections": [result],  # Single detection for now
                 "total": 1,
-                "has_more": False
+                "has_more": False,
+                "next_cursor": None
             }
         }
         
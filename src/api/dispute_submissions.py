@@ -16,6 +16,7 @@ from src.integrations.amazon_spapi_service import amazon_spapi_service
 from src.evidence.auto_submit_engine import auto_submit_engine
 from src.websocket.websocket_manager import websocket_manager
 from src.common.config import settings
+from src.common.pagination import CursorError
 
 logger = logging.getLogger(__name__)
 
@@ -265,7 +266,8 @@ async def retry_failed_submissions(
 async def get_user_submissions(
     status: Optional[str] = Query(None, description="Filter by submission status"),
     limit: int = Query(50, ge=1, le=200),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
     user: dict = Depends(get_current_user)
 ):
     """Get user's dispute submissions"""
@@ -274,24 +276,22 @@ async def get_user_submissions(
         user_id = user["user_id"]
         logger.info(f"Getting submissions for user {user_id}")
         
-        # Get submissions
+        # Get submissions; the status filter runs in SQL so pages stay full
         result = await amazon_spapi_service.get_user_submissions(
             user_id=user_id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            status=status
         )
         
-        # Filter by status if specified
-        if status:
-            result["submissions"] = [
-                s for s in result["submissions"] if s["status"] == status
-            ]
-        
         return {
             "ok": True,
             "data": result
         }
         
+    except CursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Failed to get user submissions: {e}")
         raise HTTPException(status_code=500, detail="Failed to get user submissions")
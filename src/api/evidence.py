@@ -3,18 +3,211 @@ Evidence/Documents API endpoints - Production Implementation
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Request, BackgroundTasks
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
+import hashlib
 import json
 import os
+import uuid
 from src.api.auth_middleware import get_current_user
-from src.api.schemas import Document, DocumentListResponse, DocumentViewResponse, DocumentDownloadResponse, DocumentUploadResponse
+from src.api.schemas import (
+    Document, DocumentListResponse, DocumentViewResponse, DocumentDownloadResponse, DocumentUploadResponse,
+    ResumableUploadInitRequest, ResumableUploadStatus
+)
 from src.services.cost_docs_client import cost_docs_client
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Parser types understood by the parser worker, by content type
+PARSER_TYPES = {
+    "application/pdf": "pdf",
+    "message/rfc822": "email",
+    "application/vnd.ms-outlook": "email",
+}
+
+_storage = None
+_resumable_uploads = None
+
+def _get_storage():
+    """Shared object-store client for uploads"""
+    global _storage
+    if _storage is None:
+        from src.storage.s3_manager import S3Manager
+        _storage = S3Manager()
+    return _storage
+
+def _get_resumable_uploads():
+    """Resumable upload manager; upload state lives in the database, shared by all instances"""
+    global _resumable_uploads
+    if _resumable_uploads is None:
+        from src.storage.resumable_uploads import ResumableUploadManager, ResumableUploadStore
+        _resumable_uploads = ResumableUploadManager(_get_storage(), ResumableUploadStore(_get_db()))
+    return _resumable_uploads
+
+def _get_db():
+    from src.common.db_postgresql import DatabaseManager, db
+    return db or DatabaseManager()
+
+def _upload_bucket() -> str:
+    from src.common.config import settings
+    return os.getenv("S3_BUCKET_NAME", "") or settings.S3_BUCKET_NAME or "default-bucket"
+
+def _parser_type(content_type: str) -> Optional[str]:
+    if content_type.startswith("image/"):
+        return "image"
+    return PARSER_TYPES.get(content_type)
+
+async def _stream_upload_to_storage(file: UploadFile, user_id: str, bucket_name: str) -> Dict[str, Any]:
+    """
+    Copy an uploaded file to object storage chunk by chunk, hashing it on the way
+    
+    Only one chunk plus the in-flight multipart parts are held in memory,
+    whatever the file size.
+    """
+    filename = file.filename or f"document_{datetime.utcnow().timestamp()}"
+    content_type = file.content_type or "application/octet-stream"
+    key = f"evidence/{user_id}/{uuid.uuid4()}/{os.path.basename(filename)}"
+    digest = hashlib.sha256()
+    
+    async def chunks():
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                return
+            digest.update(chunk)
+            yield chunk
+    
+    size_bytes = await _get_storage().upload_stream(chunks(), bucket_name, key, content_type)
+    return {
+        "filename": filename,
+        "content_type": content_type,
+        "key": key,
+        "size_bytes": size_bytes,
+        "content_hash": digest.hexdigest(),
+    }
+
+def _find_documents_by_hash(db, user_id: str, content_hashes: List[str]) -> Dict[str, Optional[str]]:
+    """Map already-stored content hashes to their document IDs in one query"""
+    with db._get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT content_hash, id FROM evidence_documents
+                WHERE user_id = %s AND content_hash = ANY(%s)
+            """, (user_id, list(set(content_hashes))))
+            return {row[0]: str(row[1]) for row in cursor.fetchall()}
+
+def _insert_documents(db, user_id: str, claim_id: Optional[str], bucket_name: str,
+                      uploads: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Insert all document rows with a single statement
+    
+    Returns content hash -> new document ID. A row whose content the user
+    already stored (e.g. a concurrent upload of the same file won the race)
+    is skipped and missing from the result.
+    """
+    if not uploads:
+        return {}
+    from psycopg2.extras import execute_values
+    
+    now = datetime.utcnow()
+    rows = [
+        (
+            user_id,
+            'manual_upload',
+            upload["filename"],
+            upload["content_type"],
+            upload["size_bytes"],
+            upload["content_hash"],
+            f"s3://{bucket_name}/{upload['key']}",
+            'pending',
+            now,
+            json.dumps({
+                'claim_id': claim_id,
+                'upload_method': 'manual',
+                'original_filename': upload["filename"],
+                **upload.get("metadata", {})
+            })
+        )
+        for upload in uploads
+    ]
+    with db._get_connection() as conn:
+        with conn.cursor() as cursor:
+            returned = execute_values(cursor, """
+                INSERT INTO evidence_documents (
+                    user_id, provider, filename, content_type, size_bytes,
+                    content_hash, download_url, processing_status, created_at, metadata
+                ) VALUES %s
+                ON CONFLICT (user_id, content_hash) WHERE content_hash IS NOT NULL DO NOTHING
+                RETURNING id, content_hash
+            """, rows, fetch=True)
+        conn.commit()
+    return {row[1]: str(row[0]) for row in returned}
+
+async def _store_documents(db, user_id: str, claim_id: Optional[str], bucket_name: str,
+                           uploads: List[Dict[str, Any]]) -> Tuple[List[Any], List[Any]]:
+    """Register staged uploads and queue their parsing
+    
+    Returns (stored, duplicates) as lists of (document ID, upload). The
+    staged objects of duplicates are deleted, and so are all of them if the
+    insert fails.
+    """
+    try:
+        inserted = _insert_documents(db, user_id, claim_id, bucket_name, uploads)
+    except Exception:
+        await _delete_staged(bucket_name, uploads)
+        raise
+    
+    stored = [(inserted[u["content_hash"]], u) for u in uploads if u["content_hash"] in inserted]
+    raced = [u for u in uploads if u["content_hash"] not in inserted]
+    duplicates = []
+    if raced:
+        existing = _find_documents_by_hash(db, user_id, [u["content_hash"] for u in raced])
+        duplicates = [(existing.get(u["content_hash"]), u) for u in raced]
+        await _delete_staged(bucket_name, raced)
+    if stored:
+        _enqueue_parser_jobs(db, user_id, stored)
+    return stored, duplicates
+
+async def _delete_staged(bucket_name: str, uploads: List[Dict[str, Any]]):
+    """Best-effort removal of staged objects that will not be registered"""
+    for upload in uploads:
+        try:
+            await _get_storage().delete_object(bucket_name, upload["key"])
+        except Exception as e:
+            logger.warning(f"Failed to delete staged upload {upload['key']}: {e}")
+
+def _enqueue_parser_jobs(db, user_id: str, documents: List[Any]):
+    """Queue parsing for every new document in one transaction"""
+    from psycopg2.extras import execute_values
+    from src.parsers.parser_worker import ParseDocumentJob, parser_queue
+    
+    now = datetime.utcnow()
+    rows = [
+        (str(uuid.uuid4()), document_id, user_id, parser_type, 'pending', now)
+        for document_id, upload in documents
+        for parser_type in [_parser_type(upload["content_type"])]
+        if parser_type
+    ]
+    if not rows:
+        return
+    with db._get_connection() as conn:
+        with conn.cursor() as cursor:
+            execute_values(cursor, """
+                INSERT INTO parser_jobs (id, document_id, user_id, parser_type, status, started_at)
+                VALUES %s
+            """, rows)
+            # The parser worker only consumes the document_parsing queue
+            for job_id, document_id, _, parser_type, _, _ in rows:
+                parser_queue.enqueue(
+                    ParseDocumentJob(document_id=document_id, parser_type=parser_type),
+                    job_id=job_id,
+                    cursor=cursor
+                )
+        conn.commit()
+
 @router.get("/api/documents", response_model=DocumentListResponse)
 async def get_documents(
     claim_id: Optional[str] = Query(None, description="Filter by claim ID"),
@@ -190,109 +383,60 @@ async def upload_document(
         
         logger.info(f"Uploading documents for user {user_id}, files: {len(files)}, claim_id={claim_id}, filenames: {[f.filename for f in files]}")
         
-        # Store files directly in evidence_documents table and trigger parsing
-        # Since cost_docs_client doesn't have upload_documents, we'll implement direct storage
-        document_ids = []
+        # Stream each file to object storage, hashing as it goes
+        bucket_name = _upload_bucket()
+        uploads = []
         for file in files:
             try:
-                # Read file content
-                content = await file.read()
-                filename = file.filename or f"document_{datetime.utcnow().timestamp()}"
-                content_type = file.content_type or "application/octet-stream"
-                
-                # Store in database (evidence_documents table)
-                from src.common.db_postgresql import DatabaseManager
-                db = DatabaseManager()
-                
-                with db._get_connection() as conn:
-                    with conn.cursor() as cursor:
-                        # Insert document record
-                        cursor.execute("""
-                            INSERT INTO evidence_documents (
-                                user_id, provider, filename, content_type, 
-                                size_bytes, processing_status, created_at, metadata
-                            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                            RETURNING id
-                        """, (
-                            user_id,
-                            'manual_upload',
-                            filename,
-                            content_type,
-                            len(content),
-                            'pending',
-                            datetime.utcnow(),
-                            json.dumps({
-                                'claim_id': claim_id,
-                                'upload_method': 'manual',
-                                'original_filename': filename
-                            })
-                        ))
-                        
-                        document_id = str(cursor.fetchone()[0])
-                        document_ids.append(document_id)
-                        
-                        # TODO: Store file content in Supabase Storage or S3
-                        # For now, we'll just store metadata
-                        logger.info(f"Document {document_id} stored for user {user_id}")
-                        
-                        # Trigger parsing using background task
-                        # Import parser worker to trigger parsing directly
-                        async def trigger_parsing(doc_id: str, uid: str, content_t: str, file_name: str):
-                            try:
-                                # Try to use parser worker directly if available
-                                try:
-                                    from src.parsers.parser_worker import parser_worker
-                                    if parser_worker:
-                                        logger.info(f"Triggering parsing for document {doc_id} using parser worker")
-                                        # Trigger parsing job directly
-                                        await parser_worker.parse_document(doc_id, uid)
-                                        logger.info(f"Parsing job started for document {doc_id}")
-                                        return
-                                except ImportError:
-                                    logger.debug("Parser worker not available, using HTTP endpoint")
-                                
-                                # Fallback: Call parser endpoint via HTTP
-                                import httpx
-                                python_api_url = os.getenv('PYTHON_API_URL', 'http://localhost:8000')
-                                if python_api_url.startswith('http://localhost') or python_api_url.startswith('https://'):
-                                    # Use full URL for external calls
-                                    parse_url = f"{python_api_url}/api/v1/evidence/parse/{doc_id}"
-                                else:
-                                    # Use relative URL for internal calls
-                                    parse_url = f"/api/v1/evidence/parse/{doc_id}"
-                                
-                                async with httpx.AsyncClient(timeout=30.0) as client:
-                                    response = await client.post(
-                                        parse_url,
-                                        headers={
-                                            'X-User-Id': uid,
-                                            'Content-Type': 'application/json'
-                                        }
-                                    )
-                                    if response.status_code == 200:
-                                        logger.info(f"Parsing triggered for document {doc_id}: {response.json()}")
-                                    else:
-                                        logger.warn(f"Failed to trigger parsing for document {doc_id}: {response.status_code} - {response.text}")
-                            except Exception as e:
-                                logger.error(f"Error triggering parsing for document {doc_id}: {e}", exc_info=True)
-                        
-                        # Schedule parsing as background task
-                        background_tasks.add_task(trigger_parsing, document_id, user_id, content_type, filename)
-                        logger.info(f"Parsing scheduled for document {document_id}")
-                
+                uploads.append(await _stream_upload_to_storage(file, user_id, bucket_name))
             except Exception as file_error:
                 logger.error(f"Error processing file {file.filename}: {file_error}")
                 continue
         
-        if not document_ids:
+        if not uploads:
             raise HTTPException(status_code=500, detail="Failed to upload any documents")
         
+        db = _get_db()
+        
+        # Reject duplicates by content hash, within this request and against stored documents
+        existing = _find_documents_by_hash(db, user_id, [u["content_hash"] for u in uploads])
+        new_uploads, duplicates = [], []
+        for upload in uploads:
+            if upload["content_hash"] in existing:
+                duplicates.append((existing[upload["content_hash"]], upload))
+            else:
+                existing[upload["content_hash"]] = None
+                new_uploads.append(upload)
+        await _delete_staged(bucket_name, [upload for _, upload in duplicates])
+        
+        # Duplicates that slipped past the check concurrently are caught by the insert
+        stored, raced = await _store_documents(db, user_id, claim_id, bucket_name, new_uploads)
+        duplicates += raced
+        document_ids = [document_id for document_id, _ in stored]
+        if document_ids:
+            logger.info(f"Stored {len(document_ids)} documents for user {user_id} and queued parsing")
+        
+        if duplicates:
+            logger.info(f"Skipped {len(duplicates)} duplicate uploads for user {user_id}")
+        
+        if not document_ids:
+            return DocumentUploadResponse(
+                id=duplicates[0][0],
+                status="duplicate",
+                uploaded_at=datetime.utcnow().isoformat() + "Z",
+                message=f"All {len(duplicates)} files were already uploaded",
+                processing_status="completed"
+            )
+        
         # Return success response
+        message = f"Documents uploaded successfully ({len(document_ids)} files)"
+        if duplicates:
+            message += f", {len(duplicates)} duplicates skipped"
         return DocumentUploadResponse(
             id=document_ids[0],  # Return first document ID
             status="uploaded",
             uploaded_at=datetime.utcnow().isoformat() + "Z",
-            message=f"Documents uploaded successfully ({len(document_ids)} files)",
+            message=message,
             processing_status="processing"
         )
         
@@ -302,7 +446,157 @@ async def upload_document(
         logger.error(f"Unexpected error in upload_document: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+async def start_resumable_upload(user_id: str, body: ResumableUploadInitRequest,
+                                 metadata: Dict[str, Any]) -> ResumableUploadStatus:
+    """Start a resumable upload; shared by the document and recovery upload routes"""
+    from src.storage.resumable_uploads import UploadError
+    
+    try:
+        upload = await _get_resumable_uploads().init(
+            user_id=user_id,
+            bucket_name=_upload_bucket(),
+            filename=body.filename,
+            content_type=body.content_type,
+            size_bytes=body.size_bytes,
+            chunk_size=body.chunk_size,
+            metadata={'claim_id': body.claim_id, 'upload_method': 'resumable', **metadata}
+        )
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ResumableUploadStatus(**upload.status())
+
+@router.post("/api/documents/uploads", response_model=ResumableUploadStatus)
+async def init_resumable_upload(
+    body: ResumableUploadInitRequest,
+    user: dict = Depends(get_current_user)
+):
+    """Start a resumable chunked upload for a large document"""
+    
+    try:
+        return await start_resumable_upload(user["user_id"], body, {})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in init_resumable_upload: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.get("/api/documents/uploads/{upload_id}", response_model=ResumableUploadStatus)
+async def get_resumable_upload(
+    upload_id: str,
+    user: dict = Depends(get_current_user)
+):
+    """Which chunks have been received, so an interrupted upload can resume"""
+    
+    try:
+        upload = await _get_resumable_uploads().get_status(upload_id, user["user_id"])
+        return ResumableUploadStatus(**upload.status())
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
 
+@router.put("/api/documents/uploads/{upload_id}/chunks/{index}")
+async def put_resumable_upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    user: dict = Depends(get_current_user)
+):
+    """Upload one chunk (raw request body); safe to retry and to send in parallel"""
+    from src.storage.resumable_uploads import UploadError
+    
+    uploads = _get_resumable_uploads()
+    try:
+        upload = await uploads.get(upload_id, user["user_id"])
+        declared = request.headers.get("content-length")
+        if not 0 <= index < upload.total_chunks:
+            raise UploadError(f"Chunk index must be between 0 and {upload.total_chunks - 1}")
+        if declared is not None and int(declared) != upload.expected_size(index):
+            raise UploadError(f"Chunk {index} must be {upload.expected_size(index)} bytes")
+        
+        await uploads.put_chunk(upload_id, user["user_id"], index, await request.body())
+        return {"ok": True, "upload_id": upload_id, "index": index}
+        
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error in put_resumable_upload_chunk: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.post("/api/documents/uploads/{upload_id}/complete", response_model=DocumentUploadResponse)
+async def complete_resumable_upload(
+    upload_id: str,
+    user: dict = Depends(get_current_user)
+):
+    """Assemble the uploaded chunks and register the document"""
+    from src.storage.resumable_uploads import UploadError
+    
+    try:
+        user_id = user["user_id"]
+        upload = await _get_resumable_uploads().complete(upload_id, user_id)
+        
+        # Whole-file SHA-256, so it dedupes against direct uploads too
+        content_hash = upload.content_hash
+        db = _get_db()
+        existing = _find_documents_by_hash(db, user_id, [content_hash])
+        if content_hash in existing:
+            await _get_storage().delete_object(upload.bucket_name, upload.key)
+            return DocumentUploadResponse(
+                id=existing[content_hash],
+                status="duplicate",
+                uploaded_at=datetime.utcnow().isoformat() + "Z",
+                message="File was already uploaded",
+                processing_status="completed"
+            )
+        
+        metadata = dict(upload.metadata)
+        document = {
+            "filename": upload.filename,
+            "content_type": upload.content_type,
+            "key": upload.key,
+            "size_bytes": upload.size_bytes,
+            "content_hash": content_hash,
+            "metadata": metadata,
+        }
+        stored, duplicates = await _store_documents(
+            db, user_id, metadata.pop('claim_id', None), upload.bucket_name, [document]
+        )
+        if duplicates:
+            return DocumentUploadResponse(
+                id=duplicates[0][0],
+                status="duplicate",
+                uploaded_at=datetime.utcnow().isoformat() + "Z",
+                message="File was already uploaded",
+                processing_status="completed"
+            )
+        
+        return DocumentUploadResponse(
+            id=stored[0][0],
+            status="uploaded",
+            uploaded_at=datetime.utcnow().isoformat() + "Z",
+            message=f"Document uploaded successfully ({upload.total_chunks} chunks)",
+            processing_status="processing"
+        )
+        
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in complete_resumable_upload: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
 
+@router.delete("/api/documents/uploads/{upload_id}")
+async def abort_resumable_upload(
+    upload_id: str,
+    user: dict = Depends(get_current_user)
+):
+    """Abandon a resumable upload and discard its chunks"""
+    
+    try:
+        await _get_resumable_uploads().abort(upload_id, user["user_id"])
+        return {"ok": True, "upload_id": upload_id}
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Upload not found")
@@ -125,7 +125,6 @@ async def dismiss_smart_prompt(
 
 @router.post("/api/internal/evidence/matching/start")
 async def start_evidence_matching(
-    background_tasks: BackgroundTasks,
     user: dict = Depends(get_current_user)
 ):
     """Start evidence matching for the user"""
@@ -134,21 +133,15 @@ async def start_evidence_matching(
         user_id = user["user_id"]
         logger.info(f"Starting evidence matching for user {user_id}")
         
-        # Create matching job
+        # Queue a matching job; joins the user's waiting job if there is one
         job_id = await evidence_matching_worker.create_matching_job(user_id)
         
-        # Start background processing
-        background_tasks.add_task(
-            evidence_matching_worker._process_job,
-            {"id": job_id, "user_id": user_id, "status": "pending", "started_at": datetime.utcnow().isoformat() + "Z"}
-        )
-        
         return {
             "ok": True,
             "data": {
                 "job_id": job_id,
-                "status": "started",
-                "message": "Evidence matching started"
+                "status": "queued",
+                "message": "Evidence matching queued"
             }
         }
         
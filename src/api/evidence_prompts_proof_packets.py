@@ -15,15 +15,11 @@ from src.api.schemas import (
 )
 from src.evidence.smart_prompt_service_v2 import smart_prompt_service_v2
 from src.evidence.proof_packet_worker import proof_packet_worker
-from src.websocket.websocket_manager import WebSocketManager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# Initialize WebSocket manager
-websocket_manager = WebSocketManager()
-
 @router.post("/api/v1/evidence/prompts", response_model=SmartPromptResponse)
 async def create_smart_prompt(
     request: SmartPromptRequest,
@@ -160,7 +156,6 @@ async def cancel_smart_prompt(
 @router.post("/api/v1/evidence/proof-packets/{claim_id}/generate")
 async def generate_proof_packet(
     claim_id: str,
-    background_tasks: BackgroundTasks,
     payout_details: Optional[Dict[str, Any]] = None,
     user: dict = Depends(get_current_user)
 ):
@@ -170,18 +165,14 @@ async def generate_proof_packet(
         user_id = user["user_id"]
         logger.info(f"Generating proof packet for claim {claim_id} by user {user_id}")
         
-        # Start background task for packet generation
-        background_tasks.add_task(
-            _generate_proof_packet_async,
-            claim_id,
-            user_id,
-            payout_details or {}
-        )
+        # Queue packet generation; the user is notified over WebSocket when it finishes
+        job_id = proof_packet_worker.enqueue_proof_packet(claim_id, user_id, payout_details)
         
         return {
             "ok": True,
             "message": "Proof packet generation started",
-            "claim_id": claim_id
+            "claim_id": claim_id,
+            "job_id": job_id
         }
         
     except Exception as e:
@@ -340,59 +331,3 @@ async def get_claim_audit_log(
     except Exception as e:
         logger.error(f"Failed to get audit log: {e}")
         raise HTTPException(status_code=500, detail="Failed to get audit log")
-
-async def _generate_proof_packet_async(
-    claim_id: str, 
-    user_id: str, 
-    payout_details: Dict[str, Any]
-):
-    """Background task to generate proof packet"""
-    try:
-        result = await proof_packet_worker.generate_proof_packet(
-            claim_id=claim_id,
-            user_id=user_id,
-            payout_details=payout_details
-        )
-        
-        if result["success"]:
-            logger.info(f"Proof packet generated successfully for claim {claim_id}")
-            
-            # Broadcast completion event
-            await websocket_manager.broadcast_to_user(
-                user_id=user_id,
-                event="packet.generated",
-                data={
-                    "claim_id": claim_id,
-                    "packet_id": result["packet_id"],
-                    "pdf_url": result["pdf_url"],
-                    "zip_url": result["zip_url"],
-                    "generated_at": result["generated_at"]
-                }
-            )
-        else:
-            logger.error(f"Proof packet generation failed for claim {claim_id}: {result['error']}")
-            
-            # Broadcast failure event
-            await websocket_manager.broadcast_to_user(
-                user_id=user_id,
-                event="packet.failed",
-                data={
-                    "claim_id": claim_id,
-                    "error": result["error"],
-                    "failed_at": result["failed_at"]
-                }
-            )
-            
-    except Exception as e:
-        logger.error(f"Background proof packet generation failed for claim {claim_id}: {e}")
-        
-        # Broadcast failure event
-        await websocket_manager.broadcast_to_user(
-            user_id=user_id,
-            event="packet.failed",
-            data={
-                "claim_id": claim_id,
-                "error": str(e),
-                "failed_at": datetime.utcnow().isoformat() + "Z"
-            }
-        )
@@ -17,6 +17,7 @@ from src.api.schemas import (
 )
 from src.evidence.ingestion_service import EvidenceIngestionService
 from src.common.config import settings
+from src.common.pagination import CursorError
 
 logger = logging.getLogger(__name__)
 
@@ -111,7 +112,8 @@ async def disconnect_evidence_source(
 async def list_evidence_documents(
     source_id: str,
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
     user: dict = Depends(get_current_user)
 ):
     """List evidence documents from a specific source"""
@@ -124,11 +126,14 @@ async def list_evidence_documents(
             user_id=user_id,
             source_id=source_id,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         return EvidenceDocumentListResponse(**result)
         
+    except CursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Unexpected error in list_evidence_documents: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -136,7 +141,8 @@ async def list_evidence_documents(
 @router.get("/api/v1/integrations/evidence/documents", response_model=EvidenceDocumentListResponse)
 async def list_all_evidence_documents(
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
     user: dict = Depends(get_current_user)
 ):
     """List all evidence documents from all sources"""
@@ -149,11 +155,14 @@ async def list_all_evidence_documents(
             user_id=user_id,
             source_id=None,
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor
         )
         
         return EvidenceDocumentListResponse(**result)
         
+    except CursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error(f"Unexpected error in list_all_evidence_documents: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -5,15 +5,32 @@ Metrics API endpoints - Production Implementation
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
+import asyncio
 import logging
 from src.api.auth_middleware import get_current_user
 from src.api.schemas import RecoveryMetrics, DashboardMetrics, DashboardOverview, DashboardActivity, QuickStats
 from src.services.refund_engine_client import refund_engine_client
 from src.services.stripe_client import stripe_client
+from src.common.response_cache import response_cache
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+def _succeeded(result: Any) -> bool:
+    return isinstance(result, dict) and "error" not in result
+
+async def _cached_claim_stats(user_id: str) -> Dict[str, Any]:
+    """Refund engine claim stats, shared per user by the metrics and dashboard endpoints"""
+    return await response_cache.get_or_fetch(
+        "claim_stats", user_id, lambda: refund_engine_client.get_claim_stats(user_id), cacheable=_succeeded
+    )
+
+async def _cached_transactions(user_id: str, limit: int) -> Dict[str, Any]:
+    return await response_cache.get_or_fetch(
+        "stripe_transactions", user_id, lambda: stripe_client.get_transactions(user_id, limit=limit, offset=0),
+        params=limit, cacheable=_succeeded
+    )
+
 @router.get("/api/metrics/recoveries", response_model=RecoveryMetrics)
 async def get_recovery_metrics(
     period: str = Query("30d", description="Time period (7d, 30d, 90d, 1y)"),
@@ -25,11 +42,10 @@ async def get_recovery_metrics(
         user_id = user["user_id"]
         logger.info(f"Getting recovery metrics for user {user_id}, period={period}")
         
-        # Call real refund engine service for claim stats with timeout
-        import asyncio
+        # Claim stats are cached per user; a timed-out fetch keeps running and fills the cache
         try:
             result = await asyncio.wait_for(
-                refund_engine_client.get_claim_stats(user_id),
+                _cached_claim_stats(user_id),
                 timeout=10.0  # 10 second timeout
             )
         except asyncio.TimeoutError:
@@ -187,8 +203,13 @@ async def get_dashboard_metrics(
         user_id = user["user_id"]
         logger.info(f"Getting dashboard metrics for user {user_id}, window={window}")
         
+        # Both upstream calls are cached per user and run concurrently
+        recovery_result, payment_result = await asyncio.gather(
+            _cached_claim_stats(user_id),
+            _cached_transactions(user_id, 50)
+        )
+        
         # Get recovery metrics
-        recovery_result = await refund_engine_client.get_claim_stats(user_id)
         if "error" in recovery_result:
             logger.warning(f"Recovery metrics failed: {recovery_result['error']}")
             recovery_metrics = {}
@@ -196,7 +217,6 @@ async def get_dashboard_metrics(
             recovery_metrics = recovery_result
         
         # Get payment metrics
-        payment_result = await stripe_client.get_transactions(user_id, limit=50, offset=0)
         if "error" in payment_result:
             logger.warning(f"Payment metrics failed: {payment_result['error']}")
             payment_metrics = {}
@@ -3,7 +3,7 @@ Document Parser API endpoints
 Handles document parsing requests and job management
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
@@ -22,6 +22,7 @@ except Exception as _parser_err:
     logger.warning(f"Parser worker unavailable at startup: {_parser_err}")
     parser_worker = None  # type: ignore
 from src.common.db_postgresql import DatabaseManager
+from src.common.pagination import CursorError, KeysetPage
 
 logger = logging.getLogger(__name__)
 
@@ -30,10 +31,12 @@ router = APIRouter()
 # Initialize database manager
 db = DatabaseManager()
 
+# Document search counts at most this many matches unless include_total=true
+SEARCH_TOTAL_CAP = 1000
+
 @router.post("/api/v1/evidence/parse/{document_id}", response_model=ParserJobResponse)
 async def force_parse_document(
     document_id: str,
-    background_tasks: BackgroundTasks,
     request: Request,
     user: Optional[dict] = Depends(get_optional_user)
 ):
@@ -64,12 +67,9 @@ async def force_parse_document(
         
         if parser_worker is None:
             raise HTTPException(status_code=503, detail="Parser subsystem unavailable")
-        # Create parser job
+        # Create parser job; a document_parsing queue worker picks it up
         job_id = await parser_worker.create_parser_job(document_id, user_id, parser_type)
         
-        # Start background processing
-        background_tasks.add_task(_process_document_async, job_id, document_id, parser_type)
-        
         return ParserJobResponse(
             job_id=job_id,
             status="pending",
@@ -162,7 +162,8 @@ async def get_parser_job_status(
 async def list_parser_jobs(
     status: Optional[str] = Query(None, description="Filter by job status"),
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
     user: dict = Depends(get_current_user)
 ):
     """List parser jobs for the user"""
@@ -171,6 +172,12 @@ async def list_parser_jobs(
         user_id = user["user_id"]
         logger.info(f"Listing parser jobs for user {user_id}")
         
+        try:
+            page = KeysetPage("pj.created_at", "pj.id", cursor, offset, limit,
+                              scope=f"parser_jobs:{user_id}:{status}")
+        except CursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        
         # Build query
         where_clause = "WHERE pj.user_id = %s"
         params = [user_id]
@@ -179,23 +186,26 @@ async def list_parser_jobs(
             where_clause += " AND pj.status = %s"
             params.append(status)
         
+        page_clause, page_params = page.where()
+        
         # Get jobs
         with db._get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(f"""
+            with conn.cursor() as db_cursor:
+                db_cursor.execute(f"""
                     SELECT pj.id, pj.document_id, pj.status, pj.parser_type, 
                            pj.started_at, pj.completed_at,
                            pj.error_message, pj.confidence_score,
-                           ed.filename, ed.content_type
+                           ed.filename, ed.content_type, pj.created_at
                     FROM parser_jobs pj
                     JOIN evidence_documents ed ON pj.document_id = ed.id
-                    {where_clause}
-                    ORDER BY pj.created_at DESC
-                    LIMIT %s OFFSET %s
-                """, params + [limit, offset])
+                    {where_clause} {page_clause}
+                    {page.order_by()}
+                    {page.limit_clause()}
+                """, params + page_params + page.limit_params())
                 
+                rows, has_more, next_cursor = page.finish(db_cursor.fetchall(), key=lambda row: (row[10], row[0]))
                 jobs = []
-                for row in cursor.fetchall():
+                for row in rows:
                     jobs.append({
                         "id": str(row[0]),
                         "document_id": str(row[1]),
@@ -212,28 +222,33 @@ async def list_parser_jobs(
                     })
                 
                 # Get total count
-                cursor.execute(f"""
+                db_cursor.execute(f"""
                     SELECT COUNT(*) 
                     FROM parser_jobs pj
                     {where_clause}
                 """, params)
-                total = cursor.fetchone()[0]
+                total = db_cursor.fetchone()[0]
         
         return {
             "ok": True,
             "data": {
                 "jobs": jobs,
                 "total": total,
-                "has_more": offset + len(jobs) < total,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
                 "pagination": {
                     "limit": limit,
-                    "offset": offset,
+                    "offset": page.offset,
                     "total": total,
-                    "has_more": offset + len(jobs) < total
+                    "total_is_exact": total_is_exact,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor
                 }
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in list_parser_jobs: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -243,12 +258,23 @@ async def search_documents(
     supplier: Optional[str] = Query(None, description="Search by supplier name"),
     date_from: Optional[str] = Query(None, description="Search from date (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Search to date (YYYY-MM-DD)"),
-    sku: Optional[str] = Query(None, description="Search by SKU"),
+    sku: Optional[str] = Query(None, description="Search by SKU or ASIN"),
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
+    include_total: bool = Query(False, description=f"Count every match instead of stopping at {SEARCH_TOTAL_CAP} (slower on large accounts)"),
     user: dict = Depends(get_current_user)
 ):
-    """Search documents by parsed metadata"""
+    """Search documents by parsed metadata
+    
+    Supplier names match on a trigram index, SKUs/ASINs go through the
+    parser_result_identifiers side table, and pages are keyset-paginated on
+    (created_at, id) so later pages cost the same as the first.
+    
+    ``total`` stops counting at ``SEARCH_TOTAL_CAP`` matches unless
+    ``include_total`` is set; ``pagination.total_is_exact`` says whether it
+    was cut off.
+    """
     
     try:
         user_id = user["user_id"]
@@ -256,11 +282,11 @@ async def search_documents(
         
         # Build search query
         where_conditions = ["ed.user_id = %s", "ed.parser_status = 'completed'"]
-        params = [user_id]
+        params: List[Any] = [user_id]
         
         if supplier:
             where_conditions.append("pjr.supplier_name ILIKE %s")
-            params.append(f"%{supplier}%")
+            params.append(f"%{_escape_like(supplier)}%")
         
         if date_from:
             where_conditions.append("pjr.invoice_date >= %s")
@@ -271,28 +297,40 @@ async def search_documents(
             params.append(date_to)
         
         if sku:
-            where_conditions.append("pjr.line_items::text ILIKE %s")
-            params.append(f"%{sku}%")
+            where_conditions.append("""ed.id IN (
+                SELECT pri.document_id FROM parser_result_identifiers pri
+                WHERE pri.user_id = %s AND pri.value LIKE %s
+            )""")
+            params.extend([user_id, f"%{_escape_like(sku.strip().upper())}%"])
+        
+        try:
+            page = KeysetPage("ed.created_at", "ed.id", cursor, offset, limit,
+                              scope=f"document_search:{user_id}:{supplier}:{date_from}:{date_to}:{sku}")
+        except CursorError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
         
         where_clause = "WHERE " + " AND ".join(where_conditions)
+        page_clause, page_params = page.where()
         
         # Get documents
         with db._get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(f"""
+            with conn.cursor() as db_cursor:
+                # One extra row tells whether another page exists
+                db_cursor.execute(f"""
                     SELECT ed.id, ed.filename, ed.content_type, ed.created_at,
                            ed.parser_status, ed.parser_confidence,
                            pjr.supplier_name, pjr.invoice_number, pjr.invoice_date,
                            pjr.total_amount, pjr.currency, pjr.line_items
                     FROM evidence_documents ed
                     LEFT JOIN parser_job_results pjr ON ed.id = pjr.document_id
-                    {where_clause}
-                    ORDER BY ed.created_at DESC
-                    LIMIT %s OFFSET %s
-                """, params + [limit, offset])
+                    {where_clause} {page_clause}
+                    {page.order_by()}
+                    {page.limit_clause()}
+                """, params + page_params + page.limit_params())
                 
+                rows, has_more, next_cursor = page.finish(db_cursor.fetchall(), key=lambda row: (row[3], row[0]))
                 documents = []
-                for row in cursor.fetchall():
+                for row in rows:
                     documents.append({
                         "id": str(row[0]),
                         "filename": row[1],
@@ -310,34 +348,48 @@ async def search_documents(
                         } if row[6] else None
                     })
                 
-                # Get total count
-                cursor.execute(f"""
-                    SELECT COUNT(*) 
+                count_sql = f"""
+                    SELECT 1
                     FROM evidence_documents ed
                     LEFT JOIN parser_job_results pjr ON ed.id = pjr.document_id
                     {where_clause}
-                """, params)
-                total = cursor.fetchone()[0]
+                """
+                if include_total:
+                    db_cursor.execute(f"SELECT COUNT(*) FROM ({count_sql}) matches", params)
+                else:
+                    db_cursor.execute(f"SELECT COUNT(*) FROM ({count_sql} LIMIT %s) matches",
+                                      params + [SEARCH_TOTAL_CAP])
+                total = db_cursor.fetchone()[0]
+                total_is_exact = include_total or total < SEARCH_TOTAL_CAP
         
         return {
             "ok": True,
             "data": {
                 "documents": documents,
                 "total": total,
-                "has_more": offset + len(documents) < total,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
                 "pagination": {
                     "limit": limit,
-                    "offset": offset,
+                    "offset": page.offset,
                     "total": total,
-                    "has_more": offset + len(documents) < total
+                    "total_is_exact": total_is_exact,
+                    "has_more": has_more,
+                    "next_cursor": next_cursor
                 }
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error in search_documents: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 async def _get_document(document_id: str, user_id: str) -> Optional[Dict[str, Any]]:
     """Get document by ID and user"""
     with db._get_connection() as conn:
@@ -424,18 +476,3 @@ def _get_estimated_completion(parser_type: str) -> str:
         'image': '3-8 minutes'
     }
     return estimates.get(parser_type, '5-10 minutes')
-
-async def _process_document_async(job_id: str, document_id: str, parser_type: str):
-    """Background task to process document"""
-    try:
-        if parser_worker is None:
-            logger.error("Parser subsystem unavailable in background task")
-            return
-        await parser_worker._process_job({
-            'id': job_id,
-            'document_id': document_id,
-            'parser_type': parser_type
-        })
-    except Exception as e:
-        logger.error(f"Background processing failed for job {job_id}: {e}")
-        await parser_worker._mark_job_failed(job_id, str(e))
@@ -8,7 +8,10 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 from src.api.auth_middleware import get_current_user
-from src.api.schemas import Recovery, RecoveryListResponse, RecoveryStatusResponse, ClaimSubmissionResponse
+from src.api.schemas import (
+    Recovery, RecoveryListResponse, RecoveryStatusResponse, ClaimSubmissionResponse,
+    ResumableUploadInitRequest, ResumableUploadStatus
+)
 from src.services.refund_engine_client import refund_engine_client
 from src.services.cost_docs_client import cost_docs_client
 
@@ -19,7 +22,8 @@ router = APIRouter()
 async def get_recoveries(
     status: Optional[str] = Query(None, description="Filter by status"),
     limit: int = Query(20, ge=1, le=100, description="Number of recoveries to return"),
-    offset: int = Query(0, ge=0, description="Number of recoveries to skip"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor"),
     user: dict = Depends(get_current_user)
 ):
     """Get list of recoveries/claims for the authenticated user"""
@@ -29,7 +33,7 @@ async def get_recoveries(
         logger.info(f"Getting recoveries for user {user_id}, status={status}, limit={limit}, offset={offset}")
         
         # Call real refund engine service
-        result = await refund_engine_client.get_claims(user_id, status, limit, offset)
+        result = await refund_engine_client.get_claims(user_id, status, limit, offset, cursor)
         
         if "error" in result:
             logger.error(f"Get recoveries failed: {result['error']}")
@@ -41,11 +45,13 @@ async def get_recoveries(
             recoveries=recoveries,
             total=result.get("total", 0),
             has_more=result.get("has_more", False),
+            next_cursor=result.get("next_cursor"),
             pagination={
                 "limit": limit,
-                "offset": offset,
+                "offset": 0 if cursor else offset,
                 "total": result.get("total", 0),
-                "has_more": result.get("has_more", False)
+                "has_more": result.get("has_more", False),
+                "next_cursor": result.get("next_cursor")
             }
         )
         
@@ -213,3 +219,24 @@ async def upload_recovery_documents(
     except Exception as e:
         logger.error(f"Unexpected error in upload_recovery_documents: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+@router.post("/api/recoveries/{id}/documents/uploads", response_model=ResumableUploadStatus)
+async def init_recovery_resumable_upload(
+    id: str,
+    body: ResumableUploadInitRequest,
+    user: dict = Depends(get_current_user)
+):
+    """Start a resumable chunked upload for a recovery document
+    
+    Chunks are then sent to /api/documents/uploads/{upload_id}/chunks/{index}
+    and the upload is finished with /api/documents/uploads/{upload_id}/complete.
+    """
+    
+    try:
+        from src.api.evidence import start_resumable_upload
+        return await start_resumable_upload(user["user_id"], body, {'recovery_id': id})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in init_recovery_resumable_upload: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
@@ -18,6 +18,7 @@ class PaginationMeta(BaseModel):
     offset: int
     total: int
     has_more: bool
+    next_cursor: Optional[str] = None
 
 class TimestampMixin(BaseModel):
     """Mixin for ISO 8601 timestamps"""
@@ -183,6 +184,7 @@ class RecoveryListResponse(BaseModel):
     recoveries: List[Recovery]
     total: int
     has_more: bool
+    next_cursor: Optional[str] = None
     pagination: PaginationMeta
 
 class RecoveryStatusResponse(BaseModel):
@@ -280,6 +282,25 @@ class DocumentUploadResponse(BaseModel):
     message: str
     processing_status: str
 
+class ResumableUploadInitRequest(BaseModel):
+    """Start a resumable chunked upload"""
+    filename: str
+    size_bytes: int
+    content_type: str = "application/octet-stream"
+    chunk_size: Optional[int] = None
+    claim_id: Optional[str] = None
+
+class ResumableUploadStatus(BaseModel):
+    """Progress of a resumable upload"""
+    upload_id: str
+    filename: str
+    size_bytes: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[int]
+    missing_chunks: List[int]
+    complete: bool
+
 # ============================================================================
 # EVIDENCE VALIDATOR (EV) SCHEMAS
 # ============================================================================
@@ -355,6 +376,7 @@ class EvidenceDocumentListResponse(BaseModel):
     documents: List[EvidenceDocument]
     total: int
     has_more: bool
+    next_cursor: Optional[str] = None
     pagination: PaginationMeta
 
 class EvidenceIngestionJob(BaseModel):
@@ -363,6 +363,23 @@ async def get_audit_statistics(
         logger.error(f"Failed to get audit statistics: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve audit statistics")
 
+@router.get("/api/v1/security/audit/writer", response_model=Dict[str, Any], tags=["security"])
+async def get_audit_writer_metrics(user: dict = Depends(get_current_user)):
+    """
+    Get audit writer backlog, drop and flush-latency metrics.
+    Requires audit or admin permissions.
+    """
+    user_id = user["user_id"]
+    
+    # Check permissions
+    has_permission = await access_control_service.check_permission(
+        user_id, Permission.AUDIT_READ
+    )
+    if not has_permission:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    return audit_service.get_writer_metrics()
+
 @router.get("/api/v1/security/incidents", response_model=Dict[str, Any], tags=["security"])
 async def get_security_incidents(
     severity: Optional[AuditSeverity] = Query(None, description="Filter by severity"),
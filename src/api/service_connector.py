@@ -9,8 +9,10 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 import asyncio
-import aiohttp
 import json
+from src.common.resilience import (
+    UPSTREAM_WRITE_TIMEOUT_SECONDS, UpstreamPolicy, UpstreamRejected, deadline_headers
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +38,21 @@ class ServiceConnector:
                 'enabled': True
             }
         }
+        # Circuit breaker and concurrency limit per upstream
+        self.policies = {name: UpstreamPolicy(name) for name in self.services}
     
-    async def call_service(self, service_name: str, endpoint: str, method: str = 'GET', data: Dict = None, headers: Dict[str, str] = None) -> Dict[str, Any]:
-        """Call a microservice endpoint"""
+    async def call_service(self, service_name: str, endpoint: str, method: str = 'GET', data: Dict = None,
+                           headers: Dict[str, str] = None, hedge: bool = False,
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Call a microservice endpoint
+
+        GETs time out after ``timeout`` (default ``UPSTREAM_TIMEOUT_SECONDS``)
+        or with the inbound request's deadline, whichever is sooner, and
+        ``hedge=True`` allows a second attempt for a slow one (see
+        ``UpstreamPolicy``). POST/PUT calls are not idempotent, so they are not
+        cut short by the request deadline and default to
+        ``UPSTREAM_WRITE_TIMEOUT_SECONDS``.
+        """
         if service_name not in self.services:
             raise ValueError(f"Unknown service: {service_name}")
         
@@ -48,20 +62,35 @@ class ServiceConnector:
             return {"error": f"Service {service_name} is disabled"}
         
         url = f"{service['base_url']}{endpoint}"
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PUT'):
+            logger.error(f"Error calling {service_name}: Unsupported method: {method}")
+            return {"error": f"Unsupported method: {method}"}
+        idempotent = method == 'GET'
+        if idempotent:
+            headers = {**deadline_headers(), **(headers or {})}
+        elif timeout is None:
+            timeout = UPSTREAM_WRITE_TIMEOUT_SECONDS
+        
+        async def attempt(budget: float):
+            import aiohttp
+            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=budget)) as session:
+                body = None if method == 'GET' else data
+                async with session.request(method, url, json=body, headers=headers) as response:
+                    return response.status, await response.json()
         
         try:
-            async with aiohttp.ClientSession() as session:
-                if method.upper() == 'GET':
-                    async with session.get(url, headers=headers) as response:
-                        return await response.json()
-                elif method.upper() == 'POST':
-                    async with session.post(url, json=data, headers=headers) as response:
-                        return await response.json()
-                elif method.upper() == 'PUT':
-                    async with session.put(url, json=data, headers=headers) as response:
-                        return await response.json()
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
+            status, payload = await self.policies[service_name].call(
+                attempt,
+                hedge=hedge and idempotent,
+                is_failure=lambda result: result[0] >= 500,
+                timeout=timeout,
+                clip_to_deadline=idempotent
+            )
+            return payload
+        except UpstreamRejected as e:
+            logger.warning(f"Call to {service_name} refused: {e.reason}")
+            return {"error": f"Service {service_name} unavailable ({e.reason})"}
         except Exception as e:
             logger.error(f"Error calling {service_name}: {e}")
             return {"error": str(e)}
@@ -81,7 +110,8 @@ class ServiceConnector:
         return await self.call_service(
             'smart_sync',
             f'/api/v1/sync/status/{sync_id}',
-            'GET'
+            'GET',
+            hedge=True
         )
     
     async def get_sync_activity(self, user_id: str, limit: int = 10) -> Dict[str, Any]:
@@ -89,7 +119,8 @@ class ServiceConnector:
         return await self.call_service(
             'smart_sync',
             f'/api/v1/sync/activity?userId={user_id}&limit={limit}',
-            'GET'
+            'GET',
+            hedge=True
         )
     
     # Dispute Automation Integration
@@ -134,7 +165,8 @@ class ServiceConnector:
         return await self.call_service(
             'cost_documentation',
             f'/api/v1/cost-docs/status/{job_id}',
-            'GET'
+            'GET',
+            hedge=True
         )
     
     # Stripe Payments Integration
@@ -157,7 +189,8 @@ class ServiceConnector:
         return await self.call_service(
             'stripe_payments',
             f'/api/v1/stripe/transaction/{transaction_id}',
-            'GET'
+            'GET',
+            hedge=True
         )
 
     # OAuth processing via integrations-backend
@@ -168,6 +201,7 @@ class ServiceConnector:
         if api_key:
             headers['x-internal-api-key'] = api_key
         try:
+            import aiohttp
             async with aiohttp.ClientSession() as session:
                 url = f"{base}/integrations-api/amazon/oauth/process"
                 async with session.post(url, json={'code': code, 'state': state}, headers=headers, timeout=15) as resp:
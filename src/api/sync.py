@@ -4,6 +4,7 @@ Handles sync operations for integrations and data synchronization
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from collections import OrderedDict
 from typing import Optional
 import logging
 from src.api.auth_middleware import get_current_user
@@ -15,6 +16,20 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Sync jobs already announced as completed (bounded; polling repeats the same id)
+_completed_syncs: "OrderedDict[str, None]" = OrderedDict()
+_COMPLETED_SYNCS_MAX = 10000
+
+async def _announce_sync_completed(sync_id: str, user_id: str):
+    """Emit sync_completed once per job so cached dashboards are refreshed"""
+    if sync_id in _completed_syncs:
+        return
+    _completed_syncs[sync_id] = None
+    if len(_completed_syncs) > _COMPLETED_SYNCS_MAX:
+        _completed_syncs.popitem(last=False)
+    from src.events.event_system import event_system, EVENT_TYPES
+    await event_system.emit_event(EVENT_TYPES["SYNC_COMPLETED"], {"sync_id": sync_id, "user_id": user_id}, user_id)
+
 @router.post("/api/sync/start", response_model=SyncJob)
 async def start_sync(
     background_tasks: BackgroundTasks,
@@ -101,6 +116,9 @@ async def get_sync_status(
                     detail=sync_status.get("error", "Failed to get sync status")
                 )
             
+            if sync_status.get("status") == "completed":
+                await _announce_sync_completed(id, user_id)
+            
             return SyncJob(**sync_status)
         else:
             # No id provided - get active sync status
@@ -39,6 +39,20 @@ proof_packet_worker.add_event_handler(
     lambda event_type, data: event_system.emit_event(event_type, data, data.get('user_id'))
 )
 
+@router.post("/api/internal/events/data-changed", response_model=Dict[str, Any])
+async def report_data_changed(
+    event_type: str = Query(..., description="sync_completed or recovery_completed"),
+    user: dict = Depends(get_current_user)
+):
+    """Report that a sync or recovery finished upstream so the user's cached views are refreshed"""
+
+    if event_type not in (EVENT_TYPES["SYNC_COMPLETED"], EVENT_TYPES["RECOVERY_COMPLETED"]):
+        raise HTTPException(status_code=400, detail=f"Unsupported event type: {event_type}")
+
+    user_id = user["user_id"]
+    await event_system.emit_event(event_type, {"user_id": user_id}, user_id)
+    return {"ok": True, "data": {"event_type": event_type}}
+
 @router.post("/api/internal/events/smart-prompts", response_model=Dict[str, Any])
 async def create_smart_prompt(
     dispute_id: str,
@@ -2,13 +2,18 @@
 Background worker for claim validation processing
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 def enqueue_validation(claim_id: str):
     """
     Enqueue a claim for validation processing
-    This is a stub implementation for the missing worker module
+
+    Nothing in this service validates claims yet, so the request is only
+    logged; a ``claim_validation`` queue is registered together with its
+    consumer once a validator exists (see ``src/acg/filer.py``).
     """
-    # In a real implementation, this would add the claim to a job queue
-    # for background processing by validation workers
-    print(f"Enqueuing claim {claim_id} for validation")
+    logger.info(f"Claim {claim_id} detected; no claim validator is configured, skipping validation")
     return True
-
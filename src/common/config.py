@@ -75,6 +75,8 @@ class Settings(BaseModel):
     S3_ACCESS_KEY: str = os.getenv("S3_ACCESS_KEY", "")
     S3_SECRET_KEY: str = os.getenv("S3_SECRET_KEY", "")
     S3_REGION: str = os.getenv("S3_REGION", "us-east-1")
+    # Set for S3-compatible stores such as MinIO
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
 
     # Amazon SP-API configuration
     # Use AMAZON_CLIENT_ID as fallback if AMAZON_SPAPI_CLIENT_ID not set (for consistency)
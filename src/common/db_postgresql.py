@@ -14,6 +14,7 @@ from src.common.schemas import ClaimDetection, ValidationResult, FilingResult, C
 from src.common.config import settings
 import os
 import tempfile
+import threading
 from cryptography.fernet import Fernet
 from contextlib import contextmanager
 from glob import glob
@@ -57,24 +58,63 @@ def _get_fernet() -> Fernet:
 _fernet = _get_fernet()
 
 class DatabaseManager:
+    """Database access for the API
+
+    Many modules create their own ``DatabaseManager()`` at import time, so
+    connecting, running migrations and building the pool are deferred to the
+    first query, and done once per database URL: every instance for the same
+    URL shares one connection pool.
+    """
+
+    # db_url -> (is_postgresql, connection_pool) once initialized
+    _shared: Dict[str, tuple] = {}
+    _init_lock = threading.RLock()
+
     def __init__(self, db_url: str = None):
         self.db_url = db_url or settings.DB_URL
-        self.is_postgresql = settings.is_postgresql
+        self._is_postgresql = settings.is_postgresql
         self.connection_pool = None
+        self._initialized = False
+        self._initializing = False
         # Allow disabling DB entirely
         if os.getenv("DISABLE_DB", "").lower() in ("true", "1", "yes"):
             print("Database initialization disabled by DISABLE_DB env var")
-            self.connection_pool = None
-        else:
-            # Enforce PostgreSQL in production to avoid accidental SQLite fallback
-            if settings.ENV.lower() == "production" and not self.is_postgresql:
-                raise RuntimeError("PostgreSQL is required in production. Set DATABASE_URL.")
-            try:
-                self._init_db()
-            except Exception as e:
-                print(f"Database initialization failed: {e}")
-                print("Continuing without database...")
-                self.connection_pool = None
+            self._initialized = True
+        # Enforce PostgreSQL in production to avoid accidental SQLite fallback
+        elif settings.ENV.lower() == "production" and not self._is_postgresql:
+            raise RuntimeError("PostgreSQL is required in production. Set DATABASE_URL.")
+
+    @property
+    def is_postgresql(self) -> bool:
+        self._ensure_initialized()
+        return self._is_postgresql
+
+    @is_postgresql.setter
+    def is_postgresql(self, value: bool):
+        self._is_postgresql = value
+
+    def _ensure_initialized(self):
+        """Connect on first use, or adopt the pool another instance already built"""
+        if self._initialized:
+            return
+        with DatabaseManager._init_lock:
+            # _initializing: the init below queries through this instance
+            if self._initialized or self._initializing:
+                return
+            shared = DatabaseManager._shared.get(self.db_url)
+            if shared is None:
+                self._initializing = True
+                try:
+                    self._init_db()
+                except Exception as e:
+                    print(f"Database initialization failed: {e}")
+                    print("Continuing without database...")
+                    self.connection_pool = None
+                finally:
+                    self._initializing = False
+                shared = DatabaseManager._shared[self.db_url] = (self._is_postgresql, self.connection_pool)
+            self._is_postgresql, self.connection_pool = shared
+            self._initialized = True
     
     def _init_db(self):
         """Initialize database with appropriate connection method"""
@@ -417,6 +457,41 @@ class DatabaseManager:
         
         self._execute_query(query, (status, datetime.utcnow().isoformat(), claim_id))
     
+    # Filing methods
+    def save_filing(self, claim_id: str, result: FilingResult, packet: ClaimPacket):
+        """Save a filing result to the database"""
+        query = """
+            INSERT INTO filings (claim_id, amazon_case_id, status, message, packet)
+            VALUES (%s, %s, %s, %s, %s)
+        """ if self.is_postgresql else """
+            INSERT INTO filings (claim_id, amazon_case_id, status, message, packet)
+            VALUES (?, ?, ?, ?, ?)
+        """
+        
+        params = (
+            claim_id,
+            result.amazon_case_id,
+            result.status,
+            result.message,
+            json.dumps(packet.dict(), default=str)
+        )
+        
+        self._execute_query(query, params)
+    
+    def load_submitted_filing(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        """Load the successful filing for a claim, if it was already submitted"""
+        query = """
+            SELECT claim_id, amazon_case_id, status, message, created_at
+            FROM filings WHERE claim_id = %s AND status = 'submitted'
+            ORDER BY created_at DESC LIMIT 1
+        """ if self.is_postgresql else """
+            SELECT claim_id, amazon_case_id, status, message, created_at
+            FROM filings WHERE claim_id = ? AND status = 'submitted'
+            ORDER BY created_at DESC LIMIT 1
+        """
+        
+        return self._execute_query(query, (claim_id,), fetch=True, fetch_one=True)
+    
     # User management methods
     def upsert_user(self, user_id: str, amazon_seller_id: str, company_name: str, marketplaces: List[str]):
         """Create or update user profile"""
@@ -613,9 +688,13 @@ class DatabaseManager:
         self._execute_query(query, (key, claim_id, datetime.utcnow().isoformat()))
     
     def close(self):
-        """Close database connections"""
-        if self.connection_pool:
-            self.connection_pool.closeall()
+        """Close database connections (the pool is shared by every instance for this URL)"""
+        with DatabaseManager._init_lock:
+            if self.connection_pool:
+                self.connection_pool.closeall()
+            DatabaseManager._shared.pop(self.db_url, None)
+            self.connection_pool = None
+            self._initialized = False
 
 # Global database instance
 try:
@@ -0,0 +1,533 @@
+"""
+Durable Postgres-backed job queue for background workers
+
+Every background job (document parsing, evidence matching and ingestion,
+proof packets and claim filing) is a row in ``job_queue``:
+
+- queues are typed: each has a pydantic payload model, validated on enqueue
+  and handed to the handler already parsed;
+- workers lease jobs with ``FOR UPDATE SKIP LOCKED`` in priority order, so any
+  number of API/worker processes can poll the same queue without contention;
+  a running job's worker keeps renewing its lease, and a lease that outlives
+  a crashed worker is picked up again. Every lease is identified by the
+  job's attempt number, so a worker that lost its lease cannot complete or
+  fail the newer attempt;
+- a failed job is retried with exponential backoff and jitter, and after
+  ``max_attempts`` (or a ``PermanentJobError``) it is dead-lettered with its
+  last error, where it stays until ``requeue_dead`` is called;
+- a queue may be rate limited (e.g. SP-API filing) and has a concurrency cap
+  per worker process;
+- each queue reports throughput, run latency and queue wait, both for this
+  process and, from the table, across all workers.
+
+Enqueueing can join the caller's transaction (``cursor=``), so a status row
+and its job are committed together.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel
+
+from src.common.db_postgresql import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+P = TypeVar("P", bound=BaseModel)
+
+JOB_WORKERS_ENABLED = os.getenv("JOB_WORKERS_ENABLED", "true").lower() in ("true", "1", "yes")
+JOB_RETENTION_DAYS = int(os.getenv("JOB_RETENTION_DAYS", "7"))
+JOB_PURGE_INTERVAL_SECONDS = float(os.getenv("JOB_PURGE_INTERVAL_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+
+# A job going back to 'queued' drops its dedupe key if another job already waits under it
+_YIELD_DEDUPE_KEY = """,
+                        dedupe_key = CASE WHEN EXISTS (
+                            SELECT 1 FROM job_queue waiting
+                            WHERE waiting.queue = job_queue.queue AND waiting.dedupe_key = job_queue.dedupe_key
+                              AND waiting.status = 'queued' AND waiting.id <> job_queue.id
+                        ) THEN NULL ELSE dedupe_key END"""
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job is dead-lettered at once"""
+
+
+@dataclass
+class QueueConfig(Generic[P]):
+    """Settings for one typed queue"""
+    name: str
+    payload_model: Type[P]
+    max_attempts: int = 5
+    default_priority: int = 0
+    backoff_base_seconds: float = 30.0
+    backoff_max_seconds: float = 3600.0
+    # Jobs run at once by one worker process
+    concurrency: int = 2
+    # Job starts per second per worker process; None for unlimited
+    rate_per_second: Optional[float] = None
+    lease_seconds: float = 600.0
+    # How often a running job's lease is extended; defaults to a third of lease_seconds
+    heartbeat_seconds: Optional[float] = None
+    poll_interval_seconds: float = 5.0
+
+
+@dataclass
+class Job(Generic[P]):
+    """A leased job"""
+    id: str
+    queue: str
+    payload: P
+    attempts: int
+    max_attempts: int
+    priority: int
+    enqueued_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+
+class JobQueue(Generic[P]):
+    """Enqueue, lease, complete and dead-letter jobs of one queue"""
+
+    def __init__(self, config: QueueConfig[P], db: Optional[DatabaseManager] = None):
+        self.config = config
+        self.name = config.name
+        self.db = db or DatabaseManager()
+        self._run_seconds = deque(maxlen=500)
+        self._wait_seconds = deque(maxlen=500)
+        self._started_at = time.monotonic()
+        self.stats = {"enqueued": 0, "deduplicated": 0, "leased": 0, "completed": 0,
+                      "retried": 0, "dead_lettered": 0}
+
+    def enqueue(self, payload: Union[P, Dict[str, Any]], priority: Optional[int] = None,
+                delay_seconds: float = 0, dedupe_key: Optional[str] = None,
+                job_id: Optional[str] = None, cursor=None) -> str:
+        """Add a job; returns its id
+
+        With ``dedupe_key``, a job still waiting in this queue under the same
+        key absorbs the new one and its id is returned instead. With ``cursor``
+        the insert joins the caller's transaction and the caller commits.
+        """
+        if not isinstance(payload, self.config.payload_model):
+            payload = self.config.payload_model(**payload)
+        params = (
+            job_id or str(uuid.uuid4()), self.name, json.dumps(payload.dict(), default=str),
+            self.config.default_priority if priority is None else priority,
+            self.config.max_attempts, max(0.0, delay_seconds), dedupe_key,
+        )
+        if cursor is not None:
+            queued_id = self._insert(cursor, params)
+        else:
+            with self.db._get_connection() as conn:
+                with conn.cursor() as own_cursor:
+                    queued_id = self._insert(own_cursor, params)
+                conn.commit()
+
+        if queued_id == params[0]:
+            self.stats["enqueued"] += 1
+        else:
+            self.stats["deduplicated"] += 1
+        return queued_id
+
+    @staticmethod
+    def _insert(cursor, params: tuple) -> str:
+        # The no-op update makes RETURNING yield the existing job on a dedupe hit
+        cursor.execute("""
+            INSERT INTO job_queue (id, queue, payload, priority, max_attempts, run_at, dedupe_key)
+            VALUES (%s, %s, %s, %s, %s, NOW() + make_interval(secs => %s), %s)
+            ON CONFLICT (queue, dedupe_key) WHERE status = 'queued'
+            DO UPDATE SET updated_at = job_queue.updated_at
+            RETURNING id
+        """, params)
+        return str(cursor.fetchone()[0])
+
+    def lease(self, limit: int) -> List[Job[P]]:
+        """Claim up to ``limit`` runnable jobs, highest priority first"""
+        if limit <= 0:
+            return []
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                # Leases that expired on their last attempt will not be retried
+                cursor.execute("""
+                    UPDATE job_queue
+                    SET status = 'dead', lease_expires_at = NULL, updated_at = NOW(),
+                        last_error = COALESCE(last_error, 'lease expired')
+                    WHERE queue = %s AND status = 'running'
+                      AND lease_expires_at < NOW() AND attempts >= max_attempts
+                """, (self.name,))
+                expired_dead = cursor.rowcount
+                cursor.execute("""
+                    UPDATE job_queue
+                    SET status = 'running', attempts = attempts + 1, leased_at = NOW(),
+                        lease_expires_at = NOW() + make_interval(secs => %s), updated_at = NOW()
+                    WHERE id IN (
+                        SELECT id FROM job_queue
+                        WHERE queue = %s
+                          AND ((status = 'queued' AND run_at <= NOW())
+                               OR (status = 'running' AND lease_expires_at < NOW() AND attempts < max_attempts))
+                        ORDER BY priority DESC, run_at
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, payload, attempts, max_attempts, priority, enqueued_at, last_error,
+                              EXTRACT(EPOCH FROM (NOW() - run_at))
+                """, (self.config.lease_seconds, self.name, limit))
+                rows = cursor.fetchall()
+            conn.commit()
+
+        if expired_dead:
+            self.stats["dead_lettered"] += expired_dead
+            logger.error(f"Queue {self.name}: {expired_dead} job(s) dead-lettered after an expired final lease")
+
+        jobs = []
+        for row in sorted(rows, key=lambda r: -r[4]):
+            payload = row[1] if isinstance(row[1], dict) else json.loads(row[1])
+            jobs.append(Job(
+                id=str(row[0]), queue=self.name, payload=self.config.payload_model(**payload),
+                attempts=row[2], max_attempts=row[3], priority=row[4], enqueued_at=row[5],
+                last_error=row[6],
+            ))
+            self._wait_seconds.append(max(0.0, float(row[7] or 0)))
+        self.stats["leased"] += len(jobs)
+        return jobs
+
+    def renew_lease(self, job: Job[P]) -> bool:
+        """Push back the lease expiry of a running job; False if the lease was lost"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE job_queue
+                    SET lease_expires_at = NOW() + make_interval(secs => %s), updated_at = NOW()
+                    WHERE id = %s AND status = 'running' AND attempts = %s
+                """, (self.config.lease_seconds, job.id, job.attempts))
+                renewed = cursor.rowcount == 1
+            conn.commit()
+        return renewed
+
+    def complete(self, job: Job[P], run_seconds: Optional[float] = None) -> bool:
+        """Mark the job done; False if this lease was lost and the update skipped"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE job_queue
+                    SET status = 'done', completed_at = NOW(), lease_expires_at = NULL, updated_at = NOW()
+                    WHERE id = %s AND status = 'running' AND attempts = %s
+                """, (job.id, job.attempts))
+                owned = cursor.rowcount == 1
+            conn.commit()
+        if not owned:
+            logger.warning(f"Job {job.id} on {self.name} finished after losing its lease (attempt {job.attempts})")
+            return False
+        self.stats["completed"] += 1
+        if run_seconds is not None:
+            self._run_seconds.append(run_seconds)
+        return True
+
+    def fail(self, job: Job[P], error: str, permanent: bool = False) -> Optional[str]:
+        """Schedule a retry with backoff, or dead-letter the job; returns the new status
+
+        Returns None when this lease was lost and the job is no longer ours.
+        """
+        if permanent or job.attempts >= job.max_attempts:
+            status, delay = DEAD, 0.0
+        else:
+            status, delay = QUEUED, self.retry_delay(job.attempts)
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    UPDATE job_queue
+                    SET status = %s, run_at = NOW() + make_interval(secs => %s), last_error = %s,
+                        lease_expires_at = NULL, updated_at = NOW(){_YIELD_DEDUPE_KEY}
+                    WHERE id = %s AND status = 'running' AND attempts = %s
+                """, (status, delay, error[:2000], job.id, job.attempts))
+                owned = cursor.rowcount == 1
+            conn.commit()
+
+        if not owned:
+            logger.warning(f"Job {job.id} on {self.name} failed after losing its lease "
+                           f"(attempt {job.attempts}): {error}")
+            return None
+
+        if status == DEAD:
+            self.stats["dead_lettered"] += 1
+            logger.error(f"Job {job.id} on {self.name} dead-lettered after {job.attempts} attempt(s): {error}")
+        else:
+            self.stats["retried"] += 1
+            logger.warning(f"Job {job.id} on {self.name} failed (attempt {job.attempts}/{job.max_attempts}), "
+                           f"retrying in {delay:.0f}s: {error}")
+        return status
+
+    def retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter: base * 2^(attempts-1), capped, scaled by 0.5-1.0"""
+        delay = min(self.config.backoff_max_seconds, self.config.backoff_base_seconds * 2 ** max(0, attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def requeue_dead(self, job_id: Optional[str] = None) -> int:
+        """Move dead-lettered jobs (or one of them) back onto the queue with fresh attempts"""
+        query = f"""
+            UPDATE job_queue
+            SET status = 'queued', attempts = 0, run_at = NOW(), updated_at = NOW(){_YIELD_DEDUPE_KEY}
+            WHERE queue = %s AND status = 'dead'
+        """
+        params: tuple = (self.name,)
+        if job_id:
+            query += " AND id = %s"
+            params += (job_id,)
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(query, params)
+                count = cursor.rowcount
+            conn.commit()
+        return count
+
+    def purge_finished(self, older_than_days: int = JOB_RETENTION_DAYS) -> int:
+        """Delete completed jobs past retention; dead letters are kept for inspection"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM job_queue
+                    WHERE queue = %s AND status = 'done'
+                      AND completed_at < NOW() - make_interval(days => %s)
+                """, (self.name, older_than_days))
+                count = cursor.rowcount
+            conn.commit()
+        return count
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Throughput and latency observed by this process"""
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            **self.stats,
+            "completed_per_minute": round(self.stats["completed"] * 60 / elapsed, 2),
+            "run_seconds_p50": _percentile(self._run_seconds, 0.50),
+            "run_seconds_p95": _percentile(self._run_seconds, 0.95),
+            "wait_seconds_p50": _percentile(self._wait_seconds, 0.50),
+            "wait_seconds_p95": _percentile(self._wait_seconds, 0.95),
+        }
+
+    def get_status(self, window_minutes: int = 15) -> Dict[str, Any]:
+        """Depth, backlog age, throughput and latency across all workers"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT
+                        COUNT(*) FILTER (WHERE status = 'queued'),
+                        COUNT(*) FILTER (WHERE status = 'queued' AND run_at <= NOW()),
+                        COUNT(*) FILTER (WHERE status = 'running'),
+                        COUNT(*) FILTER (WHERE status = 'dead'),
+                        EXTRACT(EPOCH FROM NOW() - MIN(run_at) FILTER (WHERE status = 'queued' AND run_at <= NOW())),
+                        COUNT(*) FILTER (WHERE status = 'done' AND completed_at >= NOW() - make_interval(mins => %s)),
+                        PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM completed_at - leased_at))
+                            FILTER (WHERE status = 'done' AND completed_at >= NOW() - make_interval(mins => %s))
+                    FROM job_queue
+                    WHERE queue = %s
+                """, (window_minutes, window_minutes, self.name))
+                row = cursor.fetchone()
+        queued, ready, running, dead, oldest_age, done_in_window, run_p95 = row
+        return {
+            "queued": queued,
+            "ready": ready,
+            "running": running,
+            "dead": dead,
+            "oldest_ready_seconds": round(float(oldest_age), 1) if oldest_age is not None else None,
+            "completed_per_minute": round(done_in_window / window_minutes, 2),
+            "run_seconds_p95": round(float(run_p95), 3) if run_p95 is not None else None,
+        }
+
+
+def _percentile(samples, fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+Handler = Callable[[Job[P]], Union[Awaitable[Any], Any]]
+DeadHandler = Callable[[Job[P], str], Union[Awaitable[Any], Any]]
+
+
+class QueueWorker(Generic[P]):
+    """Poll one queue and run its handler with bounded concurrency and rate
+
+    Sync handlers run in a thread. A handler signals failure by raising;
+    ``PermanentJobError`` skips the remaining retries. ``on_dead`` runs once a
+    job is dead-lettered, e.g. to mark the owning status row as failed.
+    """
+
+    def __init__(self, queue: JobQueue[P], handler: Handler, on_dead: Optional[DeadHandler] = None):
+        self.queue = queue
+        self.handler = handler
+        self.on_dead = on_dead
+        self.is_running = False
+        self._tasks: set = set()
+        self._tokens = float(queue.config.concurrency)
+        self._tokens_at = time.monotonic()
+        self._last_purge = 0.0
+
+    async def start(self):
+        config = self.queue.config
+        if not await asyncio.to_thread(lambda: self.queue.db.is_postgresql):
+            logger.warning(f"Queue {config.name}: job queue needs PostgreSQL, worker not started")
+            return
+        self.is_running = True
+        logger.info(f"Queue worker {config.name} started (concurrency {config.concurrency}, "
+                    f"rate {config.rate_per_second or 'unlimited'}/s)")
+        while self.is_running:
+            try:
+                if await self.run_once() == 0:
+                    await asyncio.sleep(config.poll_interval_seconds)
+                await self._maybe_purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Queue worker {config.name} error: {e}")
+                await asyncio.sleep(config.poll_interval_seconds * 2)
+
+    async def stop(self):
+        """Stop polling and let running jobs finish"""
+        self.is_running = False
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        logger.info(f"Queue worker {self.queue.name} stopped")
+
+    async def run_once(self) -> int:
+        """Lease what capacity and rate allow and start those jobs; returns how many started"""
+        while len(self._tasks) >= self.queue.config.concurrency:
+            await asyncio.wait(self._tasks, return_when=asyncio.FIRST_COMPLETED)
+        limit = self.queue.config.concurrency - len(self._tasks)
+
+        rate = self.queue.config.rate_per_second
+        if rate:
+            self._refill_tokens(rate)
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / rate)
+                self._refill_tokens(rate)
+            limit = min(limit, max(1, int(self._tokens)))
+
+        jobs = await asyncio.to_thread(self.queue.lease, limit)
+        for job in jobs:
+            if rate:
+                self._tokens -= 1
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(jobs)
+
+    def _refill_tokens(self, rate: float):
+        now = time.monotonic()
+        burst = float(self.queue.config.concurrency)
+        self._tokens = min(burst, self._tokens + (now - self._tokens_at) * rate)
+        self._tokens_at = now
+
+    async def _run(self, job: Job[P]):
+        start = time.monotonic()
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await _call(self.handler, job)
+        except Exception as e:
+            error, permanent = f"{type(e).__name__}: {e}", isinstance(e, PermanentJobError)
+        else:
+            error, permanent = None, False
+        finally:
+            heartbeat.cancel()
+
+        if error is None:
+            await asyncio.to_thread(self.queue.complete, job, time.monotonic() - start)
+            return
+        status = await asyncio.to_thread(self.queue.fail, job, error, permanent)
+        if status == DEAD and self.on_dead:
+            try:
+                await _call(self.on_dead, job, error)
+            except Exception as dead_error:
+                logger.error(f"Dead-letter hook for job {job.id} on {self.queue.name} failed: {dead_error}")
+
+    async def _heartbeat(self, job: Job[P]):
+        """Keep the lease of a running job alive until the handler returns"""
+        config = self.queue.config
+        interval = config.heartbeat_seconds or config.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await asyncio.to_thread(self.queue.renew_lease, job)
+            except Exception as e:
+                logger.error(f"Lease renewal for job {job.id} on {self.queue.name} failed: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Job {job.id} on {self.queue.name} lost its lease; another worker may rerun it")
+                return
+
+    async def _maybe_purge(self):
+        if time.monotonic() - self._last_purge < JOB_PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        purged = await asyncio.to_thread(self.queue.purge_finished)
+        if purged:
+            logger.info(f"Queue {self.queue.name}: purged {purged} completed job(s)")
+
+
+async def _call(func: Callable, *args):
+    if asyncio.iscoroutinefunction(func):
+        return await func(*args)
+    return await asyncio.to_thread(func, *args)
+
+
+# name -> queue, and name -> worker for queues consumed in this process
+job_queues: Dict[str, JobQueue] = {}
+queue_workers: Dict[str, QueueWorker] = {}
+_worker_tasks: List[asyncio.Task] = []
+
+
+def register_queue(config: QueueConfig[P]) -> JobQueue[P]:
+    """Create the queue once per process; later calls with the same name return it"""
+    if config.name not in job_queues:
+        job_queues[config.name] = JobQueue(config)
+    return job_queues[config.name]
+
+
+def register_worker(queue: JobQueue[P], handler: Handler, on_dead: Optional[DeadHandler] = None) -> QueueWorker[P]:
+    worker = QueueWorker(queue, handler, on_dead)
+    queue_workers[queue.name] = worker
+    return worker
+
+
+async def start_workers():
+    """Start a polling task per registered worker (called from the app lifespan)"""
+    if not JOB_WORKERS_ENABLED:
+        logger.info("Job queue workers disabled by JOB_WORKERS_ENABLED")
+        return
+    for worker in queue_workers.values():
+        _worker_tasks.append(asyncio.create_task(worker.start()))
+
+
+async def stop_workers():
+    for worker in queue_workers.values():
+        await worker.stop()
+    for task in _worker_tasks:
+        task.cancel()
+    await asyncio.gather(*_worker_tasks, return_exceptions=True)
+    _worker_tasks.clear()
+
+
+async def get_job_queue_status() -> Dict[str, Any]:
+    """Per-queue depth and latency from the table plus this process's metrics"""
+    status = {}
+    for name, queue in job_queues.items():
+        try:
+            shared = await asyncio.to_thread(queue.get_status)
+        except Exception as e:
+            shared = {"error": str(e)}
+        status[name] = {"consumed_here": name in queue_workers, **shared, "process": queue.get_metrics()}
+    return status
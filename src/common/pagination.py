@@ -0,0 +1,121 @@
+"""
+Keyset (cursor) pagination helpers
+
+List queries page on (sort key, id) instead of LIMIT/OFFSET, so every page
+costs the same index range scan and rows inserted between requests do not
+shift later pages. Cursors are opaque to clients: a base64 payload with the
+last row's sort values plus an HMAC that binds it to one list and filter
+set, so a cursor cannot be edited or replayed against another query.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from src.common.config import settings
+
+_SIGNATURE_BYTES = 16
+
+
+class CursorError(ValueError):
+    """Raised when a pagination cursor is malformed, tampered with or from another list."""
+
+
+def _secret() -> bytes:
+    return (os.getenv("PAGINATION_CURSOR_SECRET") or settings.JWT_SECRET).encode("utf-8")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(scope: str, payload: bytes) -> bytes:
+    return hmac.new(_secret(), scope.encode("utf-8") + b"\0" + payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(values: Sequence[Any], scope: str) -> str:
+    """Sign the sort values of the last row returned"""
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in values],
+        separators=(",", ":"), default=str
+    ).encode("utf-8")
+    return f"{_b64encode(payload)}.{_b64encode(_signature(scope, payload))}"
+
+
+def decode_cursor(cursor: str, scope: str, size: int) -> List[Any]:
+    """Verify a cursor and return its ``size`` sort values (datetimes come back as ISO strings)"""
+    try:
+        encoded_payload, encoded_signature = cursor.split(".", 1)
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, TypeError) as e:
+        raise CursorError(f"Malformed cursor: {e}")
+    if not hmac.compare_digest(signature, _signature(scope, payload)):
+        raise CursorError("Cursor signature does not match this list")
+    values = json.loads(payload)
+    if not isinstance(values, list) or len(values) != size:
+        raise CursorError("Cursor does not match this list")
+    return values
+
+
+class KeysetPage:
+    """One page of a list ordered by ``sort_column`` then ``id_column``
+
+    Usage::
+
+        page = KeysetPage("pj.created_at", "pj.id", cursor, offset, limit, scope=f"parser_jobs:{user_id}")
+        where_sql, where_params = page.where()
+        cursor.execute(f"... WHERE ... {where_sql} {page.order_by()} {page.limit_clause()}",
+                       params + where_params + page.limit_params())
+        rows, has_more, next_cursor = page.finish(cursor.fetchall(), key=lambda row: (row[4], row[0]))
+
+    Without a cursor the deprecated ``offset`` is still honoured; with one,
+    ``offset`` is ignored. One extra row is fetched to tell whether another
+    page exists.
+    """
+
+    def __init__(self, sort_column: str, id_column: str, cursor: Optional[str], offset: int,
+                 limit: int, scope: str, descending: bool = True):
+        self.sort_column = sort_column
+        self.id_column = id_column
+        self.limit = limit
+        self.scope = scope
+        self.descending = descending
+        self.after = decode_cursor(cursor, scope, 2) if cursor else None
+        self.offset = 0 if cursor else offset
+
+    def where(self, prefix: str = "AND") -> Tuple[str, List[Any]]:
+        """Row-comparison predicate for rows after the cursor ("" on the first page)"""
+        if self.after is None:
+            return "", []
+        operator = "<" if self.descending else ">"
+        return f"{prefix} ({self.sort_column}, {self.id_column}) {operator} (%s, %s)", list(self.after)
+
+    def order_by(self) -> str:
+        direction = "DESC" if self.descending else "ASC"
+        return f"ORDER BY {self.sort_column} {direction}, {self.id_column} {direction}"
+
+    def limit_clause(self) -> str:
+        return "LIMIT %s OFFSET %s"
+
+    def limit_params(self) -> List[Any]:
+        return [self.limit + 1, self.offset]
+
+    def finish(self, rows: Sequence[Any], key: Callable[[Any], Tuple[Any, Any]]) -> Tuple[List[Any], bool, Optional[str]]:
+        """Trim the look-ahead row; returns (rows, has_more, next_cursor)"""
+        rows = list(rows)
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        next_cursor = None
+        if has_more:
+            sort_value, row_id = key(rows[-1])
+            next_cursor = encode_cursor([sort_value, str(row_id)], self.scope)
+        return rows, has_more, next_cursor
@@ -0,0 +1,301 @@
+"""
+Upstream call resilience: circuit breakers, bulkheads, deadlines and hedging
+
+Every outbound call to a dependency (Node.js backend, refund engine, MCDE, ...)
+goes through that dependency's ``UpstreamPolicy``:
+
+- a circuit breaker, fed by call outcomes and by the health monitor, fails
+  fast while the dependency is down instead of waiting for timeouts;
+- a bulkhead caps concurrent calls per dependency, so one slow upstream
+  cannot hold every API worker;
+- the timeout is clipped to the inbound request's remaining deadline
+  (``DeadlineMiddleware``), so upstream waits never outlive the client;
+  callers can opt out for non-idempotent writes, which get their own longer
+  timeout because abandoning one mid-flight leaves its outcome unknown;
+- idempotent GETs can be hedged: if the first attempt is slower than the
+  recent p95, a second one is sent and the first to succeed wins.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+UPSTREAM_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "10"))
+UPSTREAM_WRITE_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_WRITE_TIMEOUT_SECONDS", "300"))
+UPSTREAM_MAX_CONCURRENT = int(os.getenv("UPSTREAM_MAX_CONCURRENT", "20"))
+UPSTREAM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("UPSTREAM_QUEUE_TIMEOUT_SECONDS", "0.25"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.05"))
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
+
+DEADLINE_HEADER = "X-Request-Timeout-Ms"
+
+# Absolute time.monotonic() deadline of the inbound request being served, if any
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class UpstreamRejected(Exception):
+    """Raised when a call is refused before reaching the upstream
+
+    ``reason`` is ``circuit_open``, ``bulkhead_full`` or ``deadline_exceeded``.
+    """
+
+    def __init__(self, service: str, reason: str):
+        super().__init__(f"{service}: {reason}")
+        self.service = service
+        self.reason = reason
+
+
+def set_deadline(budget_seconds: float):
+    """Start a deadline for the current context; returns a token for ``reset_deadline``"""
+    deadline = time.monotonic() + budget_seconds
+    current = _deadline.get()
+    return _deadline.set(deadline if current is None else min(current, deadline))
+
+
+def reset_deadline(token):
+    _deadline.reset(token)
+
+
+def remaining_budget(default: float) -> float:
+    """Seconds an upstream call may take: ``default`` clipped to the request deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return min(default, deadline - time.monotonic())
+
+
+def deadline_headers() -> Dict[str, str]:
+    """Header forwarding the remaining budget so upstreams can give up in time"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return {}
+    return {DEADLINE_HEADER: str(max(0, int((deadline - time.monotonic()) * 1000)))}
+
+
+class DeadlineMiddleware:
+    """Attach a deadline to every HTTP request
+
+    Clients may ask for a shorter budget with ``X-Request-Timeout-Ms``; it is
+    capped at ``REQUEST_DEADLINE_SECONDS``.
+    """
+
+    def __init__(self, app, budget_seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.budget_seconds = budget_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.budget_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budget_seconds
+        for name, value in scope.get("headers", []):
+            if name == DEADLINE_HEADER.lower().encode("latin-1"):
+                try:
+                    budget = min(budget, max(0.0, int(value) / 1000))
+                except ValueError:
+                    pass
+                break
+
+        token = set_deadline(budget)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            reset_deadline(token)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self._open()
+
+    def release_probe(self):
+        """The half-open probe ended without an outcome (e.g. it was cancelled)"""
+        self._probing = False
+
+    def record_health(self, healthy: bool):
+        """Feed from the health monitor: a failed check opens the circuit, a passing one allows a probe"""
+        if not healthy:
+            self._open()
+        elif self._opened_at is not None:
+            self._opened_at = time.monotonic() - self.reset_timeout
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class UpstreamPolicy:
+    """Circuit breaker, bulkhead, deadline and optional hedging for one upstream"""
+
+    def __init__(self, name: str, timeout: float = UPSTREAM_TIMEOUT_SECONDS,
+                 max_concurrent: int = UPSTREAM_MAX_CONCURRENT,
+                 queue_timeout: float = UPSTREAM_QUEUE_TIMEOUT_SECONDS,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.name = name
+        self.timeout = timeout
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._active = 0
+        self._latencies = deque(maxlen=200)
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "hedged": 0, "hedge_wins": 0}
+
+    async def call(self, attempt: Callable[[float], Awaitable[T]], hedge: bool = False,
+                   is_failure: Callable[[T], bool] = lambda result: False,
+                   timeout: Optional[float] = None, clip_to_deadline: bool = True) -> T:
+        """Run ``attempt(timeout_seconds)`` under this policy
+
+        ``is_failure`` marks results that count against the circuit (e.g. 5xx
+        responses) without raising. ``clip_to_deadline=False`` gives the call
+        its full ``timeout`` even if the inbound request's deadline is sooner.
+        Raises ``UpstreamRejected`` when the call is refused, otherwise
+        whatever ``attempt`` raises.
+        """
+        budget = self.timeout if timeout is None else timeout
+        if clip_to_deadline:
+            budget = remaining_budget(budget)
+        if budget <= 0:
+            self.stats["rejected"] += 1
+            raise UpstreamRejected(self.name, "deadline_exceeded")
+        if not self.breaker.allow_request():
+            self.stats["rejected"] += 1
+            raise UpstreamRejected(self.name, "circuit_open")
+
+        deadline = time.monotonic() + budget
+        delay = self.hedge_delay() if hedge else None
+        if delay is None or delay >= budget:
+            return await self._attempt(attempt, deadline, is_failure)
+        return await self._hedged(attempt, deadline, delay, is_failure)
+
+    def hedge_delay(self) -> Optional[float]:
+        """p95 of recent successful latencies, or None until enough samples exist"""
+        if len(self._latencies) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._latencies)
+        return max(HEDGE_MIN_DELAY_SECONDS, ordered[int(len(ordered) * 0.95) - 1])
+
+    async def _attempt(self, attempt: Callable[[float], Awaitable[T]], deadline: float,
+                       is_failure: Callable[[T], bool]) -> T:
+        if self._semaphore.locked():
+            # Queue briefly for a slot, then shed load rather than pile up
+            wait = min(self.queue_timeout, deadline - time.monotonic())
+            try:
+                if wait <= 0:
+                    raise asyncio.TimeoutError()
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=wait)
+            except asyncio.TimeoutError:
+                self.stats["rejected"] += 1
+                self.breaker.release_probe()
+                raise UpstreamRejected(self.name, "bulkhead_full")
+        else:
+            await self._semaphore.acquire()
+
+        self._active += 1
+        self.stats["calls"] += 1
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(attempt(deadline - start), timeout=deadline - start)
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._active -= 1
+            self._semaphore.release()
+
+        if is_failure(result):
+            self.stats["failures"] += 1
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self._latencies.append(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, attempt: Callable[[float], Awaitable[T]], deadline: float, delay: float,
+                      is_failure: Callable[[T], bool]) -> T:
+        primary = asyncio.ensure_future(self._attempt(attempt, deadline, is_failure))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        # No hedge when the upstream is already saturated or recovering
+        if done or self._semaphore.locked() or self.breaker.state != CircuitBreaker.CLOSED:
+            return await primary
+
+        self.stats["hedged"] += 1
+        backup = asyncio.ensure_future(self._attempt(attempt, deadline, is_failure))
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and not is_failure(task.result()):
+                        if task is backup:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+            # Neither attempt succeeded: report the primary's outcome
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_status(self) -> Dict[str, Any]:
+        hedge_delay = self.hedge_delay()
+        return {
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "active_calls": self._active,
+            "max_concurrent": self.max_concurrent,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+            **self.stats,
+        }
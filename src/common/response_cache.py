@@ -0,0 +1,157 @@
+"""
+Per-user upstream response cache
+
+Dashboard and proxy endpoints call the refund engine, Stripe and the Node
+backend on every page load. ``ResponseCache`` keeps their results per user:
+
+- fresh entries (younger than ``ttl``) are returned directly;
+- stale entries (up to ``stale_ttl`` older) are returned immediately while one
+  background task refreshes them (stale-while-revalidate);
+- concurrent misses for the same key share one upstream call (single-flight).
+  The call runs as its own task, so a caller that times out or disconnects
+  does not cancel it for the others, and its result still lands in the cache.
+
+Entries are invalidated per user when events report that their data changed
+(see ``src.events.event_system``).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+RESPONSE_CACHE_STALE_SECONDS = float(os.getenv("RESPONSE_CACHE_STALE_SECONDS", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+
+CacheKey = Tuple[str, str, Hashable]
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class ResponseCache:
+    """TTL + stale-while-revalidate cache with single-flight upstream calls"""
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL_SECONDS, stale_ttl: float = RESPONSE_CACHE_STALE_SECONDS,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Task] = {}
+        # Bumped on invalidation so a fetch that started earlier cannot repopulate old data
+        self._generations: Dict[str, int] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                      "refresh_errors": 0, "invalidations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get_or_fetch(
+        self,
+        namespace: str,
+        user_id: str,
+        fetch: Callable[[], Awaitable[Any]],
+        params: Hashable = None,
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        ttl: Optional[float] = None,
+    ) -> Any:
+        """Return the cached value for (namespace, user_id, params), fetching it if needed
+
+        ``cacheable`` decides whether a fetched value is stored; error and
+        fallback payloads should not be. Exceptions from ``fetch`` propagate
+        to every caller waiting on it.
+        """
+        key: CacheKey = (namespace, str(user_id), params)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                self._start_fetch(key, fetch, cacheable, ttl)
+            return entry.value
+
+        self.stats["misses"] += 1
+        if key in self._in_flight:
+            self.stats["coalesced"] += 1
+        task = self._start_fetch(key, fetch, cacheable, ttl)
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key: CacheKey, fetch: Callable[[], Awaitable[Any]],
+                     cacheable: Callable[[Any], bool], ttl: Optional[float]) -> asyncio.Task:
+        task = self._in_flight.get(key)
+        if task is None:
+            # The generation is taken now, before the task first runs
+            generation = self._generations.get(key[1], 0)
+            task = asyncio.create_task(self._fetch(key, fetch, cacheable, ttl, generation))
+            # Background refreshes may fail with nobody awaiting them; already logged
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._in_flight[key] = task
+        return task
+
+    async def _fetch(self, key: CacheKey, fetch: Callable[[], Awaitable[Any]],
+                     cacheable: Callable[[Any], bool], ttl: Optional[float], generation: int) -> Any:
+        try:
+            value = await fetch()
+        except Exception as e:
+            self.stats["refresh_errors"] += 1
+            logger.warning(f"Upstream fetch for {key[0]} (user {key[1]}) failed: {e}")
+            raise
+        finally:
+            if self._in_flight.get(key) is asyncio.current_task():
+                del self._in_flight[key]
+
+        if cacheable(value) and self._generations.get(key[1], 0) == generation:
+            now = time.monotonic()
+            fresh_until = now + (self.ttl if ttl is None else ttl)
+            self._entries[key] = _Entry(value, fresh_until, fresh_until + self.stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate_user(self, user_id: str, namespace: Optional[str] = None) -> int:
+        """Drop a user's cached responses (optionally one namespace); returns the count"""
+        user_id = str(user_id)
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        matches = lambda key: key[1] == user_id and (namespace is None or key[0] == namespace)
+        # Later requests must not join a fetch that started before the change
+        for key in [key for key in self._in_flight if matches(key)]:
+            del self._in_flight[key]
+        keys = [key for key in self._entries if matches(key)]
+        for key in keys:
+            del self._entries[key]
+        self.stats["invalidations"] += 1
+        return len(keys)
+
+    def clear(self):
+        self._entries.clear()
+        self._generations.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "in_flight": len(self._in_flight),
+            "hit_rate": (self.stats["hits"] + self.stats["stale_hits"]) / lookups if lookups else 0.0,
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
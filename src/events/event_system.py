@@ -97,6 +97,7 @@ class EventSystem:
             "id": str(uuid.uuid4()),
             "type": event_type,
             "data": data,
+            "user_id": user_id,
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
         
@@ -226,7 +227,9 @@ EVENT_TYPES = {
     "AUTO_SUBMIT_FAILED": "auto_submit_failed",
     "PROOF_PACKET_READY": "proof_packet_ready",
     "EVIDENCE_MATCHED": "evidence_matched",
-    "DISPUTE_STATUS_UPDATED": "dispute_status_updated"
+    "DISPUTE_STATUS_UPDATED": "dispute_status_updated",
+    "SYNC_COMPLETED": "sync_completed",
+    "RECOVERY_COMPLETED": "recovery_completed"
 }
 
 # Event handlers for zero-effort evidence loop
@@ -246,9 +249,19 @@ async def handle_proof_packet_ready(event: Dict[str, Any]):
     """Handle proof packet ready event"""
     logger.info(f"Proof packet ready: {event['data']['packet_id']}")
 
+async def handle_user_data_changed(event: Dict[str, Any]):
+    """Drop the user's cached dashboard and proxy responses after their data changed"""
+    from src.common.response_cache import response_cache
+    user_id = event.get("user_id") or event["data"].get("user_id")
+    if user_id:
+        dropped = response_cache.invalidate_user(user_id)
+        logger.info(f"Invalidated {dropped} cached responses for user {user_id} after {event['type']}")
+
 # Register event handlers
 event_system.register_handler(EVENT_TYPES["PROMPT_CREATED"], handle_prompt_created)
 event_system.register_handler(EVENT_TYPES["PROMPT_ANSWERED"], handle_prompt_answered)
 event_system.register_handler(EVENT_TYPES["AUTO_SUBMIT_TRIGGERED"], handle_auto_submit_triggered)
 event_system.register_handler(EVENT_TYPES["PROOF_PACKET_READY"], handle_proof_packet_ready)
+for _event_type in ("SYNC_COMPLETED", "RECOVERY_COMPLETED", "AUTO_SUBMIT_SUCCESS", "DISPUTE_STATUS_UPDATED"):
+    event_system.register_handler(EVENT_TYPES[_event_type], handle_user_data_changed)
 
@@ -573,13 +573,10 @@ class AutoSubmitEngine:
             logger.error(f"Failed to broadcast submission update: {e}")
     
     async def _trigger_proof_packet_generation(self, dispute_id: str, user_id: str):
-        """Trigger proof packet generation after successful submission"""
+        """Queue proof packet generation after successful submission"""
         try:
             # This would typically be triggered by a payout webhook
-            # For now, we'll simulate it after a delay
-            await asyncio.sleep(5)  # Simulate processing time
-            
-            result = await proof_packet_worker.generate_proof_packet(
+            proof_packet_worker.enqueue_proof_packet(
                 claim_id=dispute_id,
                 user_id=user_id,
                 payout_details={
@@ -587,23 +584,9 @@ class AutoSubmitEngine:
                     "amount": 0,  # Would be filled by actual payout
                     "currency": "USD",
                     "payout_date": datetime.utcnow().isoformat() + "Z"
-                }
+                },
+                delay_seconds=5
             )
-            
-            if result["success"]:
-                # Broadcast proof packet generation
-                await websocket_manager.broadcast_to_user(
-                    user_id=user_id,
-                    event="proof_packet.generated",
-                    data={
-                        "dispute_id": dispute_id,
-                        "packet_id": result["packet_id"],
-                        "pdf_url": result["pdf_url"],
-                        "zip_url": result["zip_url"],
-                        "generated_at": result["generated_at"]
-                    }
-                )
-                
         except Exception as e:
             logger.error(f"Failed to trigger proof packet generation: {e}")
     
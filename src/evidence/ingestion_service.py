@@ -5,16 +5,34 @@ Handles metadata-first ingestion from external evidence sources
 
 import httpx
 import json
+import os
 import uuid
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import logging
+from pydantic import BaseModel
+
 from src.common.db_postgresql import DatabaseManager
+from src.common.job_queue import Job, QueueConfig, register_queue, register_worker
+from src.common.pagination import KeysetPage
 from src.evidence.oauth_connectors import get_connector
 from src.api.schemas import EvidenceDocument, EvidenceIngestionJob, EvidenceSource
 
 logger = logging.getLogger(__name__)
 
+class IngestSourceJob(BaseModel):
+    """Payload of an ``evidence_ingestion`` job; the job id is the ``evidence_ingestion_jobs`` id"""
+    source_id: str
+    user_id: str
+
+evidence_ingestion_queue = register_queue(QueueConfig(
+    name="evidence_ingestion",
+    payload_model=IngestSourceJob,
+    max_attempts=5,
+    backoff_base_seconds=60,
+    concurrency=int(os.getenv("EVIDENCE_INGESTION_CONCURRENCY", "2")),
+))
+
 class EvidenceIngestionService:
     """Service for ingesting evidence documents from external sources"""
     
@@ -181,9 +199,15 @@ class EvidenceIngestionService:
         user_id: str, 
         source_id: Optional[str] = None,
         limit: int = 10,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
-        """List evidence documents for a user"""
+        """List evidence documents for a user, newest first
+        
+        Raises ``CursorError`` for a cursor that is not from this list.
+        """
+        page = KeysetPage("ed.ingested_at", "ed.id", cursor, offset, limit,
+                          scope=f"evidence_documents:{user_id}:{source_id}")
         try:
             with self.db._get_connection() as conn:
                 with conn.cursor() as cursor:
@@ -204,20 +228,22 @@ class EvidenceIngestionService:
                     total = cursor.fetchone()[0]
                     
                     # Get documents
+                    page_clause, page_params = page.where()
                     cursor.execute(f"""
                         SELECT ed.id, ed.source_id, ed.provider, ed.external_id, ed.filename,
                                ed.size_bytes, ed.content_type, ed.created_at, ed.modified_at,
                                ed.sender, ed.subject, ed.message_id, ed.folder_path,
                                ed.download_url, ed.thumbnail_url, ed.metadata, ed.processing_status,
-                               ed.ocr_text, ed.extracted_data
+                               ed.ocr_text, ed.extracted_data, ed.ingested_at
                         FROM evidence_documents ed
-                        {where_clause}
-                        ORDER BY ed.ingested_at DESC
-                        LIMIT %s OFFSET %s
-                    """, params + [limit, offset])
+                        {where_clause} {page_clause}
+                        {page.order_by()}
+                        {page.limit_clause()}
+                    """, params + page_params + page.limit_params())
                     
+                    rows, has_more, next_cursor = page.finish(cursor.fetchall(), key=lambda row: (row[19], row[0]))
                     documents = []
-                    for row in cursor.fetchall():
+                    for row in rows:
                         documents.append(EvidenceDocument(
                             id=str(row[0]),
                             source_id=str(row[1]),
@@ -243,12 +269,14 @@ class EvidenceIngestionService:
                     return {
                         "documents": documents,
                         "total": total,
-                        "has_more": offset + len(documents) < total,
+                        "has_more": has_more,
+                        "next_cursor": next_cursor,
                         "pagination": {
                             "limit": limit,
-                            "offset": offset,
+                            "offset": page.offset,
                             "total": total,
-                            "has_more": offset + len(documents) < total
+                            "has_more": has_more,
+                            "next_cursor": next_cursor
                         }
                     }
                     
@@ -257,7 +285,7 @@ class EvidenceIngestionService:
             raise
     
     async def _start_ingestion_job(self, source_id: str, user_id: str) -> str:
-        """Start a background ingestion job for a source"""
+        """Queue an ingestion job for a source"""
         job_id = str(uuid.uuid4())
         
         with self.db._get_connection() as conn:
@@ -267,62 +295,68 @@ class EvidenceIngestionService:
                     (id, source_id, user_id, status, started_at)
                     VALUES (%s, %s, %s, %s, %s)
                 """, (job_id, source_id, user_id, "pending", datetime.utcnow()))
-        
-        # TODO: Queue actual ingestion task
-        # For now, just mark as completed
-        await self._process_ingestion_job(job_id)
+                evidence_ingestion_queue.enqueue(
+                    IngestSourceJob(source_id=str(source_id), user_id=user_id),
+                    job_id=job_id,
+                    cursor=cursor
+                )
+            conn.commit()
         
         return job_id
     
+    async def run_job(self, job: Job[IngestSourceJob]):
+        """Queue handler for ``evidence_ingestion`` jobs"""
+        await self._process_ingestion_job(job.id)
+    
+    async def on_job_dead(self, job: Job[IngestSourceJob], error: str):
+        """Queue dead-letter hook: no retries left"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE evidence_ingestion_jobs 
+                    SET status = 'failed', completed_at = NOW(),
+                        errors = %s
+                    WHERE id = %s
+                """, (json.dumps([error]), job.id))
+            conn.commit()
+    
     async def _process_ingestion_job(self, job_id: str):
-        """Process an ingestion job (placeholder for background task)"""
-        try:
-            # Get job details
-            with self.db._get_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT ej.id, ej.source_id, ej.user_id, es.provider, es.account_email,
-                               es.encrypted_access_token, es.metadata
-                        FROM evidence_ingestion_jobs ej
-                        JOIN evidence_sources es ON ej.source_id = es.id
-                        WHERE ej.id = %s
-                    """, (job_id,))
-                    
-                    result = cursor.fetchone()
-                    if not result:
-                        return
-                    
-                    job_id, source_id, user_id, provider, account_email, encrypted_access_token, metadata = result
-                    
-                    # Decrypt access token
-                    access_token = self._decrypt_token(encrypted_access_token)
-                    
-                    # Fetch documents based on provider
-                    documents = await self._fetch_documents(provider, access_token, source_id)
-                    
-                    # Store documents
-                    for doc in documents:
-                        await self._store_document(source_id, user_id, provider, doc)
-                    
-                    # Update job status
-                    cursor.execute("""
-                        UPDATE evidence_ingestion_jobs 
-                        SET status = 'completed', completed_at = NOW(),
-                            documents_found = %s, documents_processed = %s, progress = 100
-                        WHERE id = %s
-                    """, (len(documents), len(documents), job_id))
-                    
-        except Exception as e:
-            logger.error(f"Failed to process ingestion job {job_id}: {e}")
-            # Update job with error
-            with self.db._get_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("""
-                        UPDATE evidence_ingestion_jobs 
-                        SET status = 'failed', completed_at = NOW(),
-                            errors = %s
-                        WHERE id = %s
-                    """, (json.dumps([str(e)]), job_id))
+        """Process an ingestion job; errors propagate so the queue retries it"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT ej.id, ej.source_id, ej.user_id, es.provider, es.account_email,
+                           es.encrypted_access_token, es.metadata
+                    FROM evidence_ingestion_jobs ej
+                    JOIN evidence_sources es ON ej.source_id = es.id
+                    WHERE ej.id = %s
+                """, (job_id,))
+                
+                result = cursor.fetchone()
+                if not result:
+                    logger.warning(f"Ingestion job {job_id} or its source no longer exists")
+                    return
+                
+                job_id, source_id, user_id, provider, account_email, encrypted_access_token, metadata = result
+                
+                # Decrypt access token
+                access_token = self._decrypt_token(encrypted_access_token)
+                
+                # Fetch documents based on provider
+                documents = await self._fetch_documents(provider, access_token, source_id)
+                
+                # Store documents
+                for doc in documents:
+                    await self._store_document(source_id, user_id, provider, doc)
+                
+                # Update job status
+                cursor.execute("""
+                    UPDATE evidence_ingestion_jobs 
+                    SET status = 'completed', completed_at = NOW(),
+                        documents_found = %s, documents_processed = %s, progress = 100
+                    WHERE id = %s
+                """, (len(documents), len(documents), job_id))
+            conn.commit()
     
     async def _fetch_documents(self, provider: str, access_token: str, source_id: str) -> List[Dict[str, Any]]:
         """Fetch documents from external source (metadata only)"""
@@ -442,3 +476,7 @@ class EvidenceIngestionService:
         key = base64.urlsafe_b64encode(raw)
         fernet = Fernet(key)
         return fernet.decrypt(encrypted_token.encode()).decode()
+
+# Global instance consuming the evidence_ingestion queue
+evidence_ingestion_service = EvidenceIngestionService()
+register_worker(evidence_ingestion_queue, evidence_ingestion_service.run_job, on_dead=evidence_ingestion_service.on_job_dead)
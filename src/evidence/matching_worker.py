@@ -1,16 +1,20 @@
 """
 Evidence Matching Worker
-Background worker for processing evidence matching jobs
+Handler for evidence matching jobs on the ``evidence_matching`` job queue
 """
 
 import asyncio
 import uuid
 import json
+import os
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from pydantic import BaseModel
+
 from src.common.db_postgresql import DatabaseManager
+from src.common.job_queue import Job, QueueConfig, register_queue, register_worker
 from src.evidence.matching_engine import EvidenceMatchingEngine
 from src.evidence.auto_submit_service import AutoSubmitService
 from src.evidence.smart_prompts_service import SmartPromptsService
@@ -18,8 +22,20 @@ from src.api.schemas import EvidenceMatchingJob, EvidenceMatchingResult
 
 logger = logging.getLogger(__name__)
 
+class MatchEvidenceJob(BaseModel):
+    """Payload of an ``evidence_matching`` job; the job id is the ``evidence_matching_jobs`` id"""
+    user_id: str
+
+evidence_matching_queue = register_queue(QueueConfig(
+    name="evidence_matching",
+    payload_model=MatchEvidenceJob,
+    max_attempts=3,
+    backoff_base_seconds=60,
+    concurrency=int(os.getenv("EVIDENCE_MATCHING_CONCURRENCY", "2")),
+))
+
 class EvidenceMatchingWorker:
-    """Background worker for evidence matching"""
+    """Handler for evidence matching jobs, plus smart prompt housekeeping"""
     
     def __init__(self):
         self.db = DatabaseManager()
@@ -27,16 +43,15 @@ class EvidenceMatchingWorker:
         self.auto_submit_service = AutoSubmitService()
         self.smart_prompts_service = SmartPromptsService()
         self.is_running = False
-        self.processing_interval = 60  # Process every 60 seconds
+        self.processing_interval = 60  # Clean up every 60 seconds
     
     async def start(self):
-        """Start the evidence matching worker"""
+        """Start the expired smart prompt cleanup loop"""
         self.is_running = True
         logger.info("Evidence matching worker started")
         
         while self.is_running:
             try:
-                await self._process_pending_jobs()
                 await self._cleanup_expired_prompts()
                 await asyncio.sleep(self.processing_interval)
             except Exception as e:
@@ -49,58 +64,47 @@ class EvidenceMatchingWorker:
         logger.info("Evidence matching worker stopped")
     
     async def create_matching_job(self, user_id: str) -> str:
-        """Create a new evidence matching job"""
+        """Queue an evidence matching job
+
+        A user has at most one waiting job: while one is queued, its id is
+        returned instead of creating another (a sync parsing many documents
+        triggers one matching run, not one per document).
+        """
         job_id = str(uuid.uuid4())
         
         with self.db._get_connection() as conn:
             with conn.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO evidence_matching_jobs 
-                    (id, user_id, status, started_at)
-                    VALUES (%s, %s, %s, %s)
-                """, (job_id, user_id, 'pending', datetime.utcnow()))
+                queued_id = evidence_matching_queue.enqueue(
+                    MatchEvidenceJob(user_id=user_id),
+                    dedupe_key=user_id,
+                    job_id=job_id,
+                    cursor=cursor
+                )
+                if queued_id == job_id:
+                    cursor.execute("""
+                        INSERT INTO evidence_matching_jobs 
+                        (id, user_id, status, started_at)
+                        VALUES (%s, %s, %s, %s)
+                    """, (job_id, user_id, 'pending', datetime.utcnow()))
+            conn.commit()
         
-        logger.info(f"Created evidence matching job {job_id} for user {user_id}")
-        return job_id
+        if queued_id != job_id:
+            logger.info(f"Evidence matching job {queued_id} already queued for user {user_id}")
+        else:
+            logger.info(f"Created evidence matching job {job_id} for user {user_id}")
+        return queued_id
     
-    async def _process_pending_jobs(self):
-        """Process pending evidence matching jobs"""
+    async def run_job(self, job: Job[MatchEvidenceJob]):
+        """Queue handler: match one user's evidence; raising hands the retry to the queue"""
         try:
-            # Get pending jobs
-            jobs = await self._get_pending_jobs()
-            
-            for job in jobs:
-                try:
-                    await self._process_job(job)
-                except Exception as e:
-                    logger.error(f"Failed to process job {job['id']}: {e}")
-                    await self._mark_job_failed(job['id'], str(e))
-                    
+            await self._process_job({'id': job.id, 'user_id': job.payload.user_id})
         except Exception as e:
-            logger.error(f"Error processing pending jobs: {e}")
+            await self._mark_job_retrying(job.id, str(e))
+            raise
     
-    async def _get_pending_jobs(self) -> List[Dict[str, Any]]:
-        """Get pending evidence matching jobs"""
-        with self.db._get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, user_id, status, started_at
-                    FROM evidence_matching_jobs 
-                    WHERE status = 'pending'
-                    ORDER BY started_at ASC
-                    LIMIT 5
-                """)
-                
-                jobs = []
-                for row in cursor.fetchall():
-                    jobs.append({
-                        'id': str(row[0]),
-                        'user_id': str(row[1]),
-                        'status': row[2],
-                        'started_at': row[3].isoformat() + "Z"
-                    })
-                
-                return jobs
+    async def on_job_dead(self, job: Job[MatchEvidenceJob], error: str):
+        """Queue dead-letter hook: no retries left"""
+        await self._mark_job_failed(job.id, error)
     
     async def _process_job(self, job: Dict[str, Any]):
         """Process a single evidence matching job"""
@@ -109,38 +113,33 @@ class EvidenceMatchingWorker:
         
         logger.info(f"Processing evidence matching job {job_id} for user {user_id}")
         
-        try:
-            # Mark job as processing
-            await self._mark_job_processing(job_id)
-            
-            # Run evidence matching
-            matching_result = await self.matching_engine.match_evidence_for_user(user_id)
-            
-            # Update job with results
-            await self._update_job_results(
-                job_id,
-                matching_result['matches'],
-                matching_result['auto_submits'],
-                matching_result['smart_prompts']
-            )
-            
-            # Store detailed results
-            if matching_result.get('results'):
-                await self._store_matching_results(job_id, matching_result['results'])
-            
-            # Mark job as completed
-            await self._mark_job_completed(job_id)
-            
-            logger.info(f"Job {job_id} completed: {matching_result['matches']} matches, "
-                       f"{matching_result['auto_submits']} auto-submits, "
-                       f"{matching_result['smart_prompts']} smart prompts")
-            
-            # 🎯 PHASE 4: Trigger workflow orchestrator webhook
-            await self._trigger_workflow_webhook(user_id, job_id, matching_result)
-            
-        except Exception as e:
-            logger.error(f"Job {job_id} failed: {e}")
-            await self._mark_job_failed(job_id, str(e))
+        # Mark job as processing
+        await self._mark_job_processing(job_id)
+        
+        # Run evidence matching
+        matching_result = await self.matching_engine.match_evidence_for_user(user_id)
+        
+        # Update job with results
+        await self._update_job_results(
+            job_id,
+            matching_result['matches'],
+            matching_result['auto_submits'],
+            matching_result['smart_prompts']
+        )
+        
+        # Store detailed results
+        if matching_result.get('results'):
+            await self._store_matching_results(job_id, matching_result['results'])
+        
+        # Mark job as completed
+        await self._mark_job_completed(job_id)
+        
+        logger.info(f"Job {job_id} completed: {matching_result['matches']} matches, "
+                   f"{matching_result['auto_submits']} auto-submits, "
+                   f"{matching_result['smart_prompts']} smart prompts")
+        
+        # 🎯 PHASE 4: Trigger workflow orchestrator webhook
+        await self._trigger_workflow_webhook(user_id, job_id, matching_result)
     
     async def _mark_job_processing(self, job_id: str):
         """Mark job as processing"""
@@ -151,6 +150,7 @@ class EvidenceMatchingWorker:
                     SET status = 'processing', started_at = NOW()
                     WHERE id = %s
                 """, (job_id,))
+            conn.commit()
     
     async def _mark_job_completed(self, job_id: str):
         """Mark job as completed"""
@@ -161,6 +161,7 @@ class EvidenceMatchingWorker:
                     SET status = 'completed', completed_at = NOW()
                     WHERE id = %s
                 """, (job_id,))
+            conn.commit()
     
     async def _mark_job_failed(self, job_id: str, error_message: str):
         """Mark job as failed"""
@@ -172,6 +173,19 @@ class EvidenceMatchingWorker:
                         errors = COALESCE(errors, '[]'::jsonb) || %s::jsonb
                     WHERE id = %s
                 """, (json.dumps([error_message]), job_id))
+            conn.commit()
+    
+    async def _mark_job_retrying(self, job_id: str, error_message: str):
+        """Mark job as waiting for a retry"""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE evidence_matching_jobs 
+                    SET status = 'retrying',
+                        errors = COALESCE(errors, '[]'::jsonb) || %s::jsonb
+                    WHERE id = %s
+                """, (json.dumps([error_message]), job_id))
+            conn.commit()
     
     async def _update_job_results(
         self, 
@@ -189,6 +203,7 @@ class EvidenceMatchingWorker:
                         smart_prompts_created = %s
                     WHERE id = %s
                 """, (matches, auto_submits, smart_prompts, job_id))
+            conn.commit()
     
     async def _store_matching_results(self, job_id: str, results: List[Any]):
         """Store detailed matching results"""
@@ -208,6 +223,7 @@ class EvidenceMatchingWorker:
                         result.match_type, json.dumps(result.matched_fields),
                         result.reasoning, result.action_taken
                     ))
+            conn.commit()
     
     async def _cleanup_expired_prompts(self):
         """Clean up expired smart prompts"""
@@ -387,4 +403,5 @@ class EvidenceMatchingWorker:
 
 # Global evidence matching worker instance
 evidence_matching_worker = EvidenceMatchingWorker()
+register_worker(evidence_matching_queue, evidence_matching_worker.run_job, on_dead=evidence_matching_worker.on_job_dead)
 
@@ -5,34 +5,33 @@ Phase 4: Background worker for generating proof packets (PDF + ZIP) after payout
 
 import uuid
 import json
+import hashlib
+import time
 import zipfile
-import tempfile
 import os
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, AsyncIterator, List, Optional, Callable
 from datetime import datetime
 import logging
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 import aiofiles
 import httpx
 from io import BytesIO
+from importlib.util import find_spec
 
-# PDF generation imports
-try:
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# ReportLab is imported by render_pdf_summary on first use
+PDF_AVAILABLE = find_spec("reportlab") is not None
+
+from pydantic import BaseModel
 
 from src.api.schemas import AuditAction
 from src.common.db_postgresql import DatabaseManager
 from src.common.config import settings
+from src.common.job_queue import Job, QueueConfig, register_queue, register_worker
+from src.storage.multipart import S3MultipartWriter
 # Optional S3 manager. Provide a no-op fallback if storage module is unavailable.
 try:
     from src.storage.s3_manager import S3Manager  # type: ignore
@@ -41,11 +40,86 @@ except Exception:
         async def upload_file(self, file_content: bytes, bucket_name: str, key: str, content_type: str) -> None:
             return None
 
+        async def put_object(self, file_content: bytes, bucket_name: str, key: str, content_type: str) -> None:
+            return None
+
         async def download_file(self, bucket_name: str, key: str) -> bytes | None:
             return None
 
+        async def iter_file(self, bucket_name: str, key: str, chunk_size: int = 1024 * 1024):
+            return
+            yield b""
+
+        async def create_multipart_upload(self, bucket_name: str, key: str, content_type: str) -> str:
+            return ""
+
+        async def upload_part(self, bucket_name: str, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+            return ""
+
+        async def complete_multipart_upload(self, bucket_name: str, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> None:
+            return None
+
+        async def abort_multipart_upload(self, bucket_name: str, key: str, upload_id: str) -> None:
+            return None
+
 logger = logging.getLogger(__name__)
 
+# Formats that are already compressed gain nothing from deflate; store them as-is
+STORED_CONTENT_TYPES = {
+    "application/pdf", "application/zip", "application/gzip",
+    "image/jpeg", "image/png", "image/gif", "image/webp", "image/heic",
+}
+STORED_EXTENSIONS = {".pdf", ".zip", ".gz", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic"}
+
+# Bytes handed to the ZIP writer at a time, so buffered output stays small
+ZIP_WRITE_CHUNK_SIZE = 1024 * 1024
+# Chunks read ahead per document while earlier ZIP entries are being written
+ZIP_PREFETCH_CHUNKS = 2
+
+# Marks the end of a document's chunk queue
+_END_OF_ENTRY = object()
+
+class ProofPacketJob(BaseModel):
+    """Payload of a ``proof_packets`` job"""
+    claim_id: str
+    user_id: str
+    payout_details: Dict[str, Any] = {}
+
+proof_packet_queue = register_queue(QueueConfig(
+    name="proof_packets",
+    payload_model=ProofPacketJob,
+    max_attempts=3,
+    backoff_base_seconds=120,
+    concurrency=int(os.getenv("PROOF_PACKET_CONCURRENCY", "2")),
+    lease_seconds=1800,
+))
+
+class _ZipStreamBuffer:
+    """Non-seekable sink for zipfile; output is drained after every write."""
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
 @dataclass
 class ProofPacketData:
     """Data structure for proof packet generation"""
@@ -57,6 +131,136 @@ class ProofPacketData:
     prompts: List[Dict[str, Any]]
     payout_details: Dict[str, Any]
 
+def render_pdf_summary(
+    claim_details: Dict[str, Any],
+    evidence_documents: List[Dict[str, Any]],
+    prompts: List[Dict[str, Any]]
+) -> bytes:
+    """
+    Render the proof packet summary PDF
+    
+    Module-level so it can run in a worker process.
+    """
+    if not PDF_AVAILABLE:
+        raise Exception("PDF generation libraries not available")
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    
+    # Create PDF in memory
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=A4)
+
+    # Get styles
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=12,
+        spaceBefore=20
+    )
+
+    # Build PDF content
+    story = []
+
+    # Title
+    story.append(Paragraph("Evidence Proof Packet", title_style))
+    story.append(Spacer(1, 20))
+
+    # Claim Details
+    story.append(Paragraph("Claim Details", heading_style))
+    claim_table_data = [
+        ["Field", "Value"],
+        ["Claim ID", claim_details.get("id", "N/A")],
+        ["Order ID", claim_details.get("order_id", "N/A")],
+        ["ASIN", claim_details.get("asin", "N/A")],
+        ["SKU", claim_details.get("sku", "N/A")],
+        ["Dispute Type", claim_details.get("dispute_type", "N/A")],
+        ["Amount Claimed", f"${claim_details.get('amount_claimed', 0):.2f}"],
+        ["Currency", claim_details.get("currency", "USD")],
+        ["Dispute Date", claim_details.get("dispute_date", "N/A")],
+        ["Status", claim_details.get("status", "N/A")],
+        ["Match Confidence", f"{claim_details.get('match_confidence', 0):.2%}"],
+    ]
+
+    claim_table = Table(claim_table_data, colWidths=[2*inch, 4*inch])
+    claim_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+
+    story.append(claim_table)
+    story.append(PageBreak())
+
+    # Evidence Documents
+    story.append(Paragraph("Evidence Documents", heading_style))
+    if evidence_documents:
+        doc_table_data = [["Filename", "Type", "Size", "Confidence", "Created"]]
+        for document in evidence_documents:
+            doc_table_data.append([
+                document.get("filename", "N/A"),
+                document.get("content_type", "N/A"),
+                f"{document.get('size_bytes', 0) / 1024:.1f} KB",
+                f"{document.get('parser_confidence', 0):.2%}",
+                document.get("created_at", "N/A")[:10]
+            ])
+
+        doc_table = Table(doc_table_data, colWidths=[2*inch, 1.5*inch, 1*inch, 1*inch, 1.5*inch])
+        doc_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]))
+
+        story.append(doc_table)
+    else:
+        story.append(Paragraph("No evidence documents found.", styles['Normal']))
+
+    story.append(PageBreak())
+
+    # Smart Prompts
+    story.append(Paragraph("Smart Prompts & Responses", heading_style))
+    if prompts:
+        for i, prompt in enumerate(prompts, 1):
+            story.append(Paragraph(f"Prompt {i}: {prompt.get('question', 'N/A')}", styles['Heading3']))
+            story.append(Paragraph(f"Status: {prompt.get('status', 'N/A')}", styles['Normal']))
+            if prompt.get('answer'):
+                story.append(Paragraph(f"Answer: {prompt.get('answer', 'N/A')}", styles['Normal']))
+            if prompt.get('answer_reasoning'):
+                story.append(Paragraph(f"Reasoning: {prompt.get('answer_reasoning', 'N/A')}", styles['Normal']))
+            story.append(Spacer(1, 12))
+    else:
+        story.append(Paragraph("No smart prompts found.", styles['Normal']))
+
+    # Build PDF
+    doc.build(story)
+    pdf_content = pdf_buffer.getvalue()
+    pdf_buffer.close()
+    return pdf_content
+
 class ProofPacketWorker:
     """Background worker for generating proof packets"""
     
@@ -66,6 +270,13 @@ class ProofPacketWorker:
         # Use env var if provided; default to empty or placeholder to avoid crash
         self.bucket_name = os.getenv("S3_BUCKET_NAME", "") or getattr(settings, "S3_BUCKET_NAME", "") or "default-bucket"
         self.proof_packets_prefix = "proof-packets"
+        self.fetch_concurrency = max(1, int(os.getenv("PROOF_PACKET_FETCH_CONCURRENCY", "8")))
+        self.render_processes = max(1, int(os.getenv("PROOF_PACKET_RENDER_PROCESSES", "2")))
+        self.summary_cache_size = max(1, int(os.getenv("PROOF_PACKET_SUMMARY_CACHE_SIZE", "10000")))
+        self._render_pool: Optional[ProcessPoolExecutor] = None
+        # Keys of summary PDFs known to be uploaded, in LRU order
+        self._rendered_summaries: "OrderedDict[str, None]" = OrderedDict()
+        self.summary_stats = {"renders": 0, "cache_hits": 0, "render_seconds_total": 0.0}
         
     def add_event_handler(self, event_type: str, handler: Callable):
         """Add an event handler - placeholder to satisfy integration points."""
@@ -75,6 +286,55 @@ class ProofPacketWorker:
             print(f"Event handler added for {event_type}")
         # No-op for now. Extend to store handlers and dispatch as needed.
 
+    def enqueue_proof_packet(
+        self,
+        claim_id: str,
+        user_id: str,
+        payout_details: Optional[Dict[str, Any]] = None,
+        delay_seconds: float = 0
+    ) -> str:
+        """Queue proof packet generation; a claim has at most one waiting job"""
+        return proof_packet_queue.enqueue(
+            ProofPacketJob(claim_id=claim_id, user_id=user_id, payout_details=payout_details or {}),
+            delay_seconds=delay_seconds,
+            dedupe_key=f"{user_id}:{claim_id}"
+        )
+    
+    async def run_job(self, job: Job[ProofPacketJob]):
+        """Queue handler: generate the packet and notify the user; a failure is retried"""
+        payload = job.payload
+        result = await self.generate_proof_packet(
+            claim_id=payload.claim_id,
+            user_id=payload.user_id,
+            payout_details=payload.payout_details
+        )
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+        
+        logger.info(f"Proof packet generated successfully for claim {payload.claim_id}")
+        await self._notify_user(payload.user_id, "packet.generated", {
+            "claim_id": payload.claim_id,
+            "packet_id": result["packet_id"],
+            "pdf_url": result["pdf_url"],
+            "zip_url": result["zip_url"],
+            "generated_at": result["generated_at"]
+        })
+    
+    async def on_job_dead(self, job: Job[ProofPacketJob], error: str):
+        """Queue dead-letter hook: no retries left"""
+        await self._notify_user(job.payload.user_id, "packet.failed", {
+            "claim_id": job.payload.claim_id,
+            "error": error,
+            "failed_at": datetime.utcnow().isoformat() + "Z"
+        })
+    
+    async def _notify_user(self, user_id: str, event: str, data: Dict[str, Any]):
+        try:
+            from src.websocket.websocket_manager import websocket_manager
+            await websocket_manager.broadcast_to_user(user_id=user_id, event=event, data=data)
+        except Exception as e:
+            logger.warning(f"Failed to broadcast {event} to user {user_id}: {e}")
+    
     async def generate_proof_packet(
         self, 
         claim_id: str, 
@@ -406,128 +666,86 @@ class ProofPacketWorker:
                 
                 return prompts
     
+    def _summary_fingerprint(self, packet_data: ProofPacketData) -> str:
+        """Hash of the inputs the summary PDF is rendered from"""
+        payload = json.dumps(
+            {
+                "claim_details": packet_data.claim_details,
+                "evidence_documents": packet_data.evidence_documents,
+                "prompts": packet_data.prompts
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _summary_key(self, packet_data: ProofPacketData) -> str:
+        """Content-addressed S3 key of the summary PDF"""
+        return f"{self.proof_packets_prefix}/summaries/{self._summary_fingerprint(packet_data)}.pdf"
+    
+    def _get_render_pool(self) -> ProcessPoolExecutor:
+        if self._render_pool is None:
+            self._render_pool = ProcessPoolExecutor(max_workers=self.render_processes)
+        return self._render_pool
+    
+    def get_summary_stats(self) -> Dict[str, Any]:
+        """Summary render counts, timing and cache hit rate"""
+        requests = self.summary_stats["cache_hits"] + self.summary_stats["renders"]
+        return {
+            **self.summary_stats,
+            "avg_render_seconds": (
+                self.summary_stats["render_seconds_total"] / self.summary_stats["renders"]
+                if self.summary_stats["renders"] else 0.0
+            ),
+            "cache_hit_rate": self.summary_stats["cache_hits"] / requests if requests else 0.0
+        }
+    
+    def shutdown(self):
+        """Stop the PDF render pool"""
+        if self._render_pool is not None:
+            self._render_pool.shutdown(wait=False, cancel_futures=True)
+            self._render_pool = None
+    
     async def _generate_pdf_summary(
         self, 
         packet_data: ProofPacketData, 
         packet_id: str
     ) -> str:
-        """Generate PDF summary of the proof packet"""
+        """
+        Generate PDF summary of the proof packet
+        
+        Summaries are stored under a hash of their inputs, so a packet whose
+        claim data has not changed reuses the stored PDF. New summaries are
+        rendered in a process pool to keep ReportLab off the event loop.
+        """
         if not PDF_AVAILABLE:
             raise Exception("PDF generation libraries not available")
         
         try:
-            # Create PDF in memory
-            pdf_buffer = BytesIO()
-            doc = SimpleDocTemplate(pdf_buffer, pagesize=A4)
+            pdf_key = self._summary_key(packet_data)
+            pdf_url = f"s3://{self.bucket_name}/{pdf_key}"
             
-            # Get styles
-            styles = getSampleStyleSheet()
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=30,
-                alignment=TA_CENTER
-            )
+            if pdf_key in self._rendered_summaries:
+                self._rendered_summaries.move_to_end(pdf_key)
+                self.summary_stats["cache_hits"] += 1
+                logger.info(f"Reusing cached summary PDF for packet {packet_id}")
+                return pdf_url
             
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=14,
-                spaceAfter=12,
-                spaceBefore=20
+            started = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            pdf_content = await loop.run_in_executor(
+                self._get_render_pool(),
+                render_pdf_summary,
+                packet_data.claim_details,
+                packet_data.evidence_documents,
+                packet_data.prompts
             )
-            
-            # Build PDF content
-            story = []
-            
-            # Title
-            story.append(Paragraph("Evidence Proof Packet", title_style))
-            story.append(Spacer(1, 20))
-            
-            # Claim Details
-            story.append(Paragraph("Claim Details", heading_style))
-            claim_table_data = [
-                ["Field", "Value"],
-                ["Claim ID", packet_data.claim_details.get("id", "N/A")],
-                ["Order ID", packet_data.claim_details.get("order_id", "N/A")],
-                ["ASIN", packet_data.claim_details.get("asin", "N/A")],
-                ["SKU", packet_data.claim_details.get("sku", "N/A")],
-                ["Dispute Type", packet_data.claim_details.get("dispute_type", "N/A")],
-                ["Amount Claimed", f"${packet_data.claim_details.get('amount_claimed', 0):.2f}"],
-                ["Currency", packet_data.claim_details.get("currency", "USD")],
-                ["Dispute Date", packet_data.claim_details.get("dispute_date", "N/A")],
-                ["Status", packet_data.claim_details.get("status", "N/A")],
-                ["Match Confidence", f"{packet_data.claim_details.get('match_confidence', 0):.2%}"],
-            ]
-            
-            claim_table = Table(claim_table_data, colWidths=[2*inch, 4*inch])
-            claim_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            story.append(claim_table)
-            story.append(PageBreak())
-            
-            # Evidence Documents
-            story.append(Paragraph("Evidence Documents", heading_style))
-            if packet_data.evidence_documents:
-                doc_table_data = [["Filename", "Type", "Size", "Confidence", "Created"]]
-                for doc in packet_data.evidence_documents:
-                    doc_table_data.append([
-                        doc.get("filename", "N/A"),
-                        doc.get("content_type", "N/A"),
-                        f"{doc.get('size_bytes', 0) / 1024:.1f} KB",
-                        f"{doc.get('parser_confidence', 0):.2%}",
-                        doc.get("created_at", "N/A")[:10]
-                    ])
-                
-                doc_table = Table(doc_table_data, colWidths=[2*inch, 1.5*inch, 1*inch, 1*inch, 1.5*inch])
-                doc_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, -1), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                story.append(doc_table)
-            else:
-                story.append(Paragraph("No evidence documents found.", styles['Normal']))
-            
-            story.append(PageBreak())
-            
-            # Smart Prompts
-            story.append(Paragraph("Smart Prompts & Responses", heading_style))
-            if packet_data.prompts:
-                for i, prompt in enumerate(packet_data.prompts, 1):
-                    story.append(Paragraph(f"Prompt {i}: {prompt.get('question', 'N/A')}", styles['Heading3']))
-                    story.append(Paragraph(f"Status: {prompt.get('status', 'N/A')}", styles['Normal']))
-                    if prompt.get('answer'):
-                        story.append(Paragraph(f"Answer: {prompt.get('answer', 'N/A')}", styles['Normal']))
-                    if prompt.get('answer_reasoning'):
-                        story.append(Paragraph(f"Reasoning: {prompt.get('answer_reasoning', 'N/A')}", styles['Normal']))
-                    story.append(Spacer(1, 12))
-            else:
-                story.append(Paragraph("No smart prompts found.", styles['Normal']))
-            
-            # Build PDF
-            doc.build(story)
-            pdf_content = pdf_buffer.getvalue()
-            pdf_buffer.close()
+            render_seconds = time.perf_counter() - started
+            self.summary_stats["renders"] += 1
+            self.summary_stats["render_seconds_total"] += render_seconds
+            logger.info(f"Rendered summary PDF for packet {packet_id} in {render_seconds:.2f}s")
             
             # Upload to S3
-            pdf_key = f"{self.proof_packets_prefix}/{packet_id}/summary.pdf"
             await self.s3_manager.upload_file(
                 file_content=pdf_content,
                 bucket_name=self.bucket_name,
@@ -535,78 +753,195 @@ class ProofPacketWorker:
                 content_type="application/pdf"
             )
             
-            return f"s3://{self.bucket_name}/{pdf_key}"
+            self._rendered_summaries[pdf_key] = None
+            while len(self._rendered_summaries) > self.summary_cache_size:
+                self._rendered_summaries.popitem(last=False)
+            
+            return pdf_url
             
         except Exception as e:
             logger.error(f"Failed to generate PDF summary: {e}")
             raise
     
+    def _object_key(self, download_url: str) -> str:
+        """Object key for a document URL (s3://bucket/key, or a bare key name)"""
+        if download_url.startswith("s3://"):
+            return download_url.split("/", 3)[3] if download_url.count("/") >= 3 else ""
+        return download_url.split('/')[-1]  # Extract key from URL
+    
+    @staticmethod
+    def _zip_compression(filename: str, content_type: Optional[str]) -> int:
+        """Store already-compressed formats, deflate everything else"""
+        if (content_type or "").split(";")[0].strip().lower() in STORED_CONTENT_TYPES:
+            return zipfile.ZIP_STORED
+        if os.path.splitext(filename or "")[1].lower() in STORED_EXTENSIONS:
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
+    
+    async def _fetch_zip_entries(self, entries: List[Dict[str, Any]]):
+        """
+        Stream ZIP entries in order, reading ahead on the next few documents
+        
+        Up to ``fetch_concurrency`` documents are read at once with
+        ``S3Manager.iter_file``, each into a queue of at most
+        ``ZIP_PREFETCH_CHUNKS`` chunks, so buffered evidence stays bounded
+        whatever the file sizes. Yields (entry, chunks); chunks is None when
+        the document could not be opened or is empty.
+        """
+        def start(entry: Dict[str, Any]):
+            queue = asyncio.Queue(maxsize=ZIP_PREFETCH_CHUNKS)
+            return entry, queue, asyncio.create_task(self._read_zip_entry(entry, queue))
+        
+        upcoming = iter(entries)
+        pending = deque(start(entry) for _, entry in zip(range(self.fetch_concurrency), upcoming))
+        try:
+            while pending:
+                entry, queue, task = pending[0]
+                first = await queue.get()
+                if isinstance(first, Exception):
+                    logger.warning(f"Failed to add document {entry['source']} to ZIP: {first}")
+                    yield entry, None
+                elif first is _END_OF_ENTRY:
+                    yield entry, None
+                else:
+                    yield entry, self._queued_chunks(first, queue)
+                task.cancel()
+                pending.popleft()
+                next_entry = next(upcoming, None)
+                if next_entry is not None:
+                    pending.append(start(next_entry))
+        finally:
+            for _, _, task in pending:
+                task.cancel()
+    
+    async def _read_zip_entry(self, entry: Dict[str, Any], queue: asyncio.Queue):
+        """Producer for one document: its chunks, then the end marker or the error"""
+        try:
+            async for chunk in self.s3_manager.iter_file(
+                bucket_name=self.bucket_name,
+                key=entry["key"],
+                chunk_size=ZIP_WRITE_CHUNK_SIZE
+            ):
+                await queue.put(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_END_OF_ENTRY)
+    
+    @staticmethod
+    async def _queued_chunks(first: bytes, queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        chunk = first
+        while chunk is not _END_OF_ENTRY:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+            chunk = await queue.get()
+    
+    async def _write_zip_entry(
+        self,
+        zip_file: zipfile.ZipFile,
+        sink: _ZipStreamBuffer,
+        writer: S3MultipartWriter,
+        name: str,
+        chunks: AsyncIterator[bytes],
+        compress_type: int,
+        size: Optional[int] = None
+    ):
+        """Write one entry chunk by chunk, uploading compressed output as it is produced
+        
+        Without a known ``size`` the entry gets ZIP64 headers, since it may
+        turn out larger than 4 GiB.
+        """
+        info = zipfile.ZipInfo(name, date_time=datetime.utcnow().timetuple()[:6])
+        info.compress_type = compress_type
+        if size is not None:
+            info.file_size = size
+        
+        with zip_file.open(info, "w", force_zip64=size is None) as entry:
+            async for chunk in chunks:
+                view = memoryview(chunk)
+                for offset in range(0, len(chunk), ZIP_WRITE_CHUNK_SIZE):
+                    entry.write(view[offset:offset + ZIP_WRITE_CHUNK_SIZE])
+                    await writer.write(sink.drain())
+        await writer.write(sink.drain())
+    
     async def _generate_zip_archive(
         self, 
         packet_data: ProofPacketData, 
         packet_id: str
     ) -> str:
-        """Generate ZIP archive with all supporting files"""
+        """
+        Generate ZIP archive with all supporting files
+        
+        The summary PDF and evidence documents are streamed from storage
+        through the ZIP writer straight into a multipart upload, so neither
+        the archive, a document nor a temp file is ever held whole.
+        """
+        zip_key = f"{self.proof_packets_prefix}/{packet_id}/proof_packet.zip"
+        writer = S3MultipartWriter(
+            self.s3_manager,
+            bucket_name=self.bucket_name,
+            key=zip_key,
+            content_type="application/zip"
+        )
+        
         try:
-            # Create temporary directory for ZIP
-            with tempfile.TemporaryDirectory() as temp_dir:
-                zip_path = os.path.join(temp_dir, f"proof_packet_{packet_id}.zip")
-                
-                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                    # Add PDF summary
-                    pdf_key = f"{self.proof_packets_prefix}/{packet_id}/summary.pdf"
-                    pdf_content = await self.s3_manager.download_file(
-                        bucket_name=self.bucket_name,
-                        key=pdf_key
-                    )
-                    if pdf_content:
-                        zip_file.writestr("summary.pdf", pdf_content)
-                    
-                    # Add evidence documents
-                    for i, doc in enumerate(packet_data.evidence_documents, 1):
-                        try:
-                            # Download document content
-                            doc_content = await self.s3_manager.download_file(
-                                bucket_name=self.bucket_name,
-                                key=doc['download_url'].split('/')[-1]  # Extract key from URL
-                            )
-                            
-                            if doc_content:
-                                # Create safe filename
-                                safe_filename = f"evidence_{i:02d}_{doc['filename']}"
-                                zip_file.writestr(safe_filename, doc_content)
-                        except Exception as e:
-                            logger.warning(f"Failed to add document {doc['filename']} to ZIP: {e}")
-                            continue
-                    
-                    # Add metadata file
-                    metadata = {
-                        "claim_id": packet_data.claim_id,
-                        "generated_at": datetime.utcnow().isoformat() + "Z",
-                        "evidence_documents_count": len(packet_data.evidence_documents),
-                        "prompts_count": len(packet_data.prompts),
-                        "claim_details": packet_data.claim_details,
-                        "payout_details": packet_data.payout_details
-                    }
-                    
-                    zip_file.writestr("metadata.json", json.dumps(metadata, indent=2))
+            entries = [{
+                "name": "summary.pdf",
+                "source": "summary.pdf",
+                "key": self._summary_key(packet_data),
+                "content_type": "application/pdf"
+            }]
+            for i, doc in enumerate(packet_data.evidence_documents, 1):
+                entries.append({
+                    # Create safe filename
+                    "name": f"evidence_{i:02d}_{doc['filename']}",
+                    "source": doc['filename'],
+                    "key": self._object_key(doc['download_url']),
+                    "content_type": doc.get('content_type'),
+                    "size": doc.get('size_bytes')
+                })
+            
+            sink = _ZipStreamBuffer()
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                async for entry, chunks in self._fetch_zip_entries(entries):
+                    if chunks is not None:
+                        await self._write_zip_entry(
+                            zip_file, sink, writer, entry["name"], chunks,
+                            self._zip_compression(entry["name"], entry["content_type"]),
+                            size=entry.get("size")
+                        )
                 
-                # Upload ZIP to S3
-                with open(zip_path, 'rb') as f:
-                    zip_content = f.read()
+                # Add metadata file
+                metadata = {
+                    "claim_id": packet_data.claim_id,
+                    "generated_at": datetime.utcnow().isoformat() + "Z",
+                    "evidence_documents_count": len(packet_data.evidence_documents),
+                    "prompts_count": len(packet_data.prompts),
+                    "claim_details": packet_data.claim_details,
+                    "payout_details": packet_data.payout_details
+                }
                 
-                zip_key = f"{self.proof_packets_prefix}/{packet_id}/proof_packet.zip"
-                await self.s3_manager.upload_file(
-                    file_content=zip_content,
-                    bucket_name=self.bucket_name,
-                    key=zip_key,
-                    content_type="application/zip"
+                metadata_bytes = json.dumps(metadata, indent=2).encode("utf-8")
+                await self._write_zip_entry(
+                    zip_file, sink, writer, "metadata.json",
+                    _single_chunk(metadata_bytes), zipfile.ZIP_DEFLATED, size=len(metadata_bytes)
                 )
-                
-                return f"s3://{self.bucket_name}/{zip_key}"
-                
+            
+            # Central directory is written when the archive closes
+            await writer.write(sink.drain())
+            await writer.close()
+            
+            return f"s3://{self.bucket_name}/{zip_key}"
+            
         except Exception as e:
             logger.error(f"Failed to generate ZIP archive: {e}")
+            try:
+                await writer.abort()
+            except Exception as abort_error:
+                logger.warning(f"Failed to abort ZIP upload {zip_key}: {abort_error}")
             raise
     
     async def _log_audit_event(
@@ -632,4 +967,5 @@ class ProofPacketWorker:
             logger.error(f"Failed to log audit event: {e}")
 
 # Global instance
-proof_packet_worker = ProofPacketWorker()
\ No newline at end of file
+proof_packet_worker = ProofPacketWorker()
+register_worker(proof_packet_queue, proof_packet_worker.run_job, on_dead=proof_packet_worker.on_job_dead)
\ No newline at end of file
@@ -16,6 +16,7 @@ from enum import Enum
 
 from src.common.config import settings
 from src.common.db_postgresql import DatabaseManager
+from src.common.pagination import KeysetPage
 from src.api.schemas import AuditAction
 
 logger = logging.getLogger(__name__)
@@ -300,25 +301,40 @@ class AmazonSPAPIService:
         self, 
         user_id: str, 
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        status: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Get user's dispute submissions"""
+        """Get user's dispute submissions, newest first
+        
+        Raises ``CursorError`` for a cursor that is not from this list.
+        """
+        page = KeysetPage("created_at", "id", cursor, offset, limit,
+                          scope=f"dispute_submissions:{user_id}:{status}")
         try:
+            where_clause = "WHERE user_id = %s"
+            params: List[Any] = [user_id]
+            if status:
+                where_clause += " AND status = %s"
+                params.append(status)
+            page_clause, page_params = page.where()
+            
             with self.db._connection() as conn:
                 with conn.cursor() as cursor:
-                    cursor.execute("""
+                    cursor.execute(f"""
                         SELECT id, submission_id, amazon_case_id, order_id, asin, sku,
                                claim_type, amount_claimed, currency, status, confidence_score,
                                submission_timestamp, resolution_timestamp, error_message,
                                created_at, updated_at
                         FROM dispute_submissions 
-                        WHERE user_id = %s
-                        ORDER BY created_at DESC
-                        LIMIT %s OFFSET %s
-                    """, (user_id, limit, offset))
+                        {where_clause} {page_clause}
+                        {page.order_by()}
+                        {page.limit_clause()}
+                    """, params + page_params + page.limit_params())
                     
+                    rows, has_more, next_cursor = page.finish(cursor.fetchall(), key=lambda row: (row[14], row[0]))
                     submissions = []
-                    for row in cursor.fetchall():
+                    for row in rows:
                         submissions.append({
                             "id": str(row[0]),
                             "submission_id": row[1],
@@ -339,15 +355,16 @@ class AmazonSPAPIService:
                         })
                     
                     # Get total count
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM dispute_submissions WHERE user_id = %s
-                    """, (user_id,))
+                    cursor.execute(f"""
+                        SELECT COUNT(*) FROM dispute_submissions {where_clause}
+                    """, params)
                     total = cursor.fetchone()[0]
                     
                     return {
                         "submissions": submissions,
                         "total": total,
-                        "has_more": offset + len(submissions) < total
+                        "has_more": has_more,
+                        "next_cursor": next_cursor
                     }
                     
         except Exception as e:
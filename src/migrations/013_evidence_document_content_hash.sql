@@ -0,0 +1,10 @@
+-- Evidence Document Content Hash Migration
+-- Stores the SHA-256 of uploaded document bytes so re-uploads of the same file can be rejected
+
+ALTER TABLE evidence_documents
+ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+
+-- One copy of each file per user; documents ingested before this migration have no hash
+CREATE UNIQUE INDEX IF NOT EXISTS idx_evidence_documents_user_content_hash
+    ON evidence_documents(user_id, content_hash)
+    WHERE content_hash IS NOT NULL;
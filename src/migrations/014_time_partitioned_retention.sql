@@ -0,0 +1,168 @@
+-- Time-Partitioned Retention Migration
+-- Range-partitions the high-volume append-only tables by time so retention can
+-- detach and drop whole partitions instead of running large DELETEs
+
+-- Create the partitions covering the current period and the next p_ahead periods
+CREATE OR REPLACE FUNCTION ensure_time_partitions(
+    p_table TEXT,
+    p_interval TEXT,
+    p_ahead INTEGER DEFAULT 3
+)
+RETURNS INTEGER AS $$
+DECLARE
+    step INTERVAL := ('1 ' || p_interval)::INTERVAL;
+    name_format TEXT := CASE WHEN p_interval = 'day' THEN 'YYYYMMDD' ELSE 'YYYYMM' END;
+    period_start TIMESTAMPTZ := date_trunc(p_interval, NOW());
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    FOR i IN 0..p_ahead LOOP
+        partition_name := p_table || '_p' || to_char(period_start, name_format);
+        -- Skip periods already covered, including the range held by a legacy partition
+        IF to_regclass(partition_name) IS NULL AND NOT EXISTS (
+            SELECT 1
+            FROM pg_inherits inh
+            JOIN pg_class part ON part.oid = inh.inhrelid
+            WHERE inh.inhparent = p_table::regclass
+              AND pg_get_expr(part.relpartbound, part.oid) LIKE '%MINVALUE%'
+              AND (regexp_match(pg_get_expr(part.relpartbound, part.oid), 'TO \(''([^'']+)''\)'))[1]::TIMESTAMPTZ > period_start
+        ) THEN
+            EXECUTE format(
+                'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, p_table, period_start, period_start + step
+            );
+            created := created + 1;
+        END IF;
+        period_start := period_start + step;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions whose whole range ends at or before the cutoff
+CREATE OR REPLACE FUNCTION expired_time_partitions(
+    p_table TEXT,
+    p_cutoff TIMESTAMPTZ
+)
+RETURNS TABLE(partition_name TEXT, upper_bound TIMESTAMPTZ, estimated_rows BIGINT) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT bounds.relname::TEXT, bounds.upper_bound, GREATEST(bounds.reltuples, 0)::BIGINT
+    FROM (
+        SELECT part.relname, part.reltuples,
+               (regexp_match(pg_get_expr(part.relpartbound, part.oid), 'TO \(''([^'']+)''\)'))[1]::TIMESTAMPTZ AS upper_bound
+        FROM pg_inherits inh
+        JOIN pg_class part ON part.oid = inh.inhrelid
+        WHERE inh.inhparent = p_table::regclass
+    ) bounds
+    WHERE bounds.upper_bound <= p_cutoff
+    ORDER BY bounds.upper_bound;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Convert a plain table into a range-partitioned one without copying rows: the
+-- existing table is attached as a legacy partition for everything before the
+-- next period, and new rows go to per-period partitions
+CREATE OR REPLACE FUNCTION partition_table_by_time(
+    p_table TEXT,
+    p_column TEXT,
+    p_interval TEXT,
+    p_ahead INTEGER DEFAULT 3
+)
+RETURNS VOID AS $$
+DECLARE
+    legacy_name TEXT := p_table || '_legacy';
+    legacy_end TIMESTAMPTZ := date_trunc(p_interval, NOW()) + ('1 ' || p_interval)::INTERVAL;
+    idx RECORD;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = p_table::regclass) THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format('ALTER TABLE %I RENAME TO %I', p_table, legacy_name);
+    FOR idx IN SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND tablename = legacy_name LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', idx.indexname, left(idx.indexname, 56) || '_legacy');
+    END LOOP;
+
+    -- The partition key must be part of the primary key
+    EXECUTE format(
+        'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS, PRIMARY KEY (id, %I)) PARTITION BY RANGE (%I)',
+        p_table, legacy_name, p_column, p_column
+    );
+    EXECUTE format(
+        'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (MINVALUE) TO (%L)',
+        p_table, legacy_name, legacy_end
+    );
+    EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', p_table || '_default', p_table);
+    PERFORM ensure_time_partitions(p_table, p_interval, p_ahead);
+END;
+$$ LANGUAGE plpgsql;
+
+-- Security audit log: monthly partitions on created_at
+SELECT partition_table_by_time('security_audit_log', 'created_at', 'month', 3);
+
+ALTER TABLE security_audit_log DROP CONSTRAINT IF EXISTS security_audit_log_user_id_fkey;
+ALTER TABLE security_audit_log
+    ADD CONSTRAINT security_audit_log_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL;
+ALTER TABLE security_audit_log DROP CONSTRAINT IF EXISTS security_audit_log_service_account_id_fkey;
+ALTER TABLE security_audit_log
+    ADD CONSTRAINT security_audit_log_service_account_id_fkey FOREIGN KEY (service_account_id) REFERENCES service_accounts(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_user_id ON security_audit_log(user_id);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_action ON security_audit_log(action);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_resource_type ON security_audit_log(resource_type);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_severity ON security_audit_log(severity);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_created_at ON security_audit_log(created_at);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_ip_address ON security_audit_log(ip_address);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_user_action ON security_audit_log(user_id, action);
+CREATE INDEX IF NOT EXISTS idx_security_audit_log_severity_created ON security_audit_log(severity, created_at);
+
+-- Metrics data: daily partitions on timestamp
+SELECT partition_table_by_time('metrics_data', 'timestamp', 'day', 7);
+
+ALTER TABLE metrics_data DROP CONSTRAINT IF EXISTS metrics_data_user_id_fkey;
+ALTER TABLE metrics_data
+    ADD CONSTRAINT metrics_data_user_id_fkey FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_metrics_data_name ON metrics_data(name);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_category ON metrics_data(category);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_metric_type ON metrics_data(metric_type);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_user_id ON metrics_data(user_id);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_timestamp ON metrics_data(timestamp);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_labels_gin ON metrics_data USING GIN(labels);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_metadata_gin ON metrics_data USING GIN(metadata);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_category_name_timestamp ON metrics_data(category, name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_metrics_data_user_timestamp ON metrics_data(user_id, timestamp);
+
+-- Metrics were only trimmed by cleanup_old_metrics; give them a retention policy
+INSERT INTO data_retention_policies (table_name, retention_days, cleanup_frequency_days)
+SELECT 'metrics_data', 30, 1
+WHERE NOT EXISTS (SELECT 1 FROM data_retention_policies WHERE table_name = 'metrics_data');
+
+-- Keep the existing helper but drop whole partitions first
+CREATE OR REPLACE FUNCTION cleanup_old_metrics(
+    p_retention_days INTEGER DEFAULT 30
+)
+RETURNS INTEGER AS $$
+DECLARE
+    cutoff TIMESTAMPTZ := NOW() - INTERVAL '1 day' * p_retention_days;
+    expired RECORD;
+    deleted_count INTEGER := 0;
+    batch_count INTEGER;
+BEGIN
+    FOR expired IN SELECT * FROM expired_time_partitions('metrics_data', cutoff) LOOP
+        EXECUTE format('ALTER TABLE metrics_data DETACH PARTITION %I', expired.partition_name);
+        EXECUTE format('DROP TABLE %I', expired.partition_name);
+        deleted_count := deleted_count + expired.estimated_rows;
+    END LOOP;
+
+    -- Only the legacy and default partitions can still hold expired rows
+    DELETE FROM metrics_data WHERE timestamp < cutoff;
+    GET DIAGNOSTICS batch_count = ROW_COUNT;
+
+    RETURN deleted_count + batch_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION ensure_time_partitions(TEXT, TEXT, INTEGER) IS 'Create upcoming range partitions for a time-partitioned table';
+COMMENT ON FUNCTION expired_time_partitions(TEXT, TIMESTAMPTZ) IS 'List partitions whose whole range is older than the cutoff';
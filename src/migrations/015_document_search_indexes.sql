@@ -0,0 +1,71 @@
+-- Document Search Indexes Migration
+-- Indexed supplier, SKU/ASIN and date search over parsed invoices, with a
+-- keyset-friendly ordering index per seller
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- SKUs and ASINs pulled out of parser_job_results.line_items, one row per identifier
+CREATE TABLE IF NOT EXISTS parser_result_identifiers (
+    result_id UUID NOT NULL REFERENCES parser_job_results(id) ON DELETE CASCADE,
+    document_id UUID NOT NULL REFERENCES evidence_documents(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    kind VARCHAR(10) NOT NULL CHECK (kind IN ('sku', 'asin')),
+    value VARCHAR(255) NOT NULL,
+    PRIMARY KEY (result_id, kind, value)
+);
+
+CREATE INDEX IF NOT EXISTS idx_parser_result_identifiers_user_value ON parser_result_identifiers(user_id, value);
+CREATE INDEX IF NOT EXISTS idx_parser_result_identifiers_value_trgm ON parser_result_identifiers USING GIN(value gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_parser_result_identifiers_document_id ON parser_result_identifiers(document_id);
+
+-- Identifiers are upper-cased; ASINs are also picked out of descriptions
+CREATE OR REPLACE FUNCTION sync_parser_result_identifiers()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM parser_result_identifiers WHERE result_id = NEW.id;
+
+    INSERT INTO parser_result_identifiers (result_id, document_id, user_id, kind, value)
+    SELECT DISTINCT NEW.id, NEW.document_id, ed.user_id, ident.kind, left(upper(btrim(ident.value)), 255)
+    FROM evidence_documents ed
+    CROSS JOIN LATERAL (
+        SELECT 'sku' AS kind, item->>'sku' AS value
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(NEW.line_items) = 'array' THEN NEW.line_items ELSE '[]'::jsonb END) item
+        UNION ALL
+        SELECT 'asin', item->>'asin'
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(NEW.line_items) = 'array' THEN NEW.line_items ELSE '[]'::jsonb END) item
+        UNION ALL
+        SELECT 'asin', match[1]
+        FROM jsonb_array_elements(CASE WHEN jsonb_typeof(NEW.line_items) = 'array' THEN NEW.line_items ELSE '[]'::jsonb END) item,
+             regexp_matches(upper(coalesce(item->>'description', '')), '\m(B0[0-9A-Z]{8})\M', 'g') AS match
+    ) ident
+    WHERE ed.id = NEW.document_id
+      AND coalesce(btrim(ident.value), '') <> '';
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS sync_parser_result_identifiers ON parser_job_results;
+CREATE TRIGGER sync_parser_result_identifiers
+    AFTER INSERT OR UPDATE OF line_items ON parser_job_results
+    FOR EACH ROW EXECUTE FUNCTION sync_parser_result_identifiers();
+
+-- Backfill existing results through the trigger
+UPDATE parser_job_results SET line_items = line_items
+WHERE NOT EXISTS (SELECT 1 FROM parser_result_identifiers pri WHERE pri.result_id = parser_job_results.id)
+  AND jsonb_typeof(line_items) = 'array'
+  -- AND operands may be evaluated in any order, so guard the length call as well
+  AND jsonb_array_length(CASE WHEN jsonb_typeof(line_items) = 'array' THEN line_items ELSE '[]'::jsonb END) > 0;
+
+-- Substring supplier search
+CREATE INDEX IF NOT EXISTS idx_parser_job_results_supplier_trgm ON parser_job_results USING GIN(supplier_name gin_trgm_ops);
+
+-- Date-range filters probe results per document
+CREATE INDEX IF NOT EXISTS idx_parser_job_results_document_date ON parser_job_results(document_id, invoice_date);
+
+-- Keyset order for a seller's parsed documents: (created_at, id) descending
+CREATE INDEX IF NOT EXISTS idx_evidence_documents_user_parsed_created
+    ON evidence_documents(user_id, created_at DESC, id DESC)
+    WHERE parser_status = 'completed';
+
+COMMENT ON TABLE parser_result_identifiers IS 'SKUs and ASINs extracted from parsed invoice line items for indexed search';
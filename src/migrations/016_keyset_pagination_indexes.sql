@@ -0,0 +1,25 @@
+-- Keyset Pagination Indexes Migration
+-- Each list endpoint filters by owner (and optionally one more column) and
+-- pages on (sort key, id); these indexes serve the filter, the order and the
+-- cursor predicate in one range scan
+
+-- Parser jobs: list_parser_jobs
+CREATE INDEX IF NOT EXISTS idx_parser_jobs_user_created_id
+    ON parser_jobs(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_parser_jobs_user_status_created_id
+    ON parser_jobs(user_id, status, created_at DESC, id DESC);
+
+-- Evidence documents: EvidenceIngestionService.list_evidence_documents
+CREATE INDEX IF NOT EXISTS idx_evidence_documents_user_ingested_id
+    ON evidence_documents(user_id, ingested_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_evidence_documents_user_source_ingested_id
+    ON evidence_documents(user_id, source_id, ingested_at DESC, id DESC);
+
+-- Dispute submissions: get_user_submissions
+CREATE INDEX IF NOT EXISTS idx_dispute_submissions_user_created_id
+    ON dispute_submissions(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_dispute_submissions_user_status_created_id
+    ON dispute_submissions(user_id, status, created_at DESC, id DESC);
+
+-- Superseded by idx_dispute_submissions_user_created_id
+DROP INDEX IF EXISTS idx_dispute_submissions_user_created;
@@ -0,0 +1,61 @@
+-- Job Queue Migration
+-- One durable queue table shared by every background worker (src/common/job_queue.py).
+-- Workers lease rows with FOR UPDATE SKIP LOCKED; failed jobs come back with
+-- backoff via run_at and end up 'dead' after max_attempts
+
+CREATE TABLE IF NOT EXISTS job_queue (
+    id UUID PRIMARY KEY,
+    queue VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    priority INTEGER NOT NULL DEFAULT 0,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'dead')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    run_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    dedupe_key TEXT,
+    last_error TEXT,
+    enqueued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    leased_at TIMESTAMP WITH TIME ZONE,
+    lease_expires_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Lease scan: runnable jobs of one queue by priority, then due time
+CREATE INDEX IF NOT EXISTS idx_job_queue_ready
+    ON job_queue(queue, priority DESC, run_at) WHERE status = 'queued';
+-- Lease reclaim: running jobs whose worker stopped renewing
+CREATE INDEX IF NOT EXISTS idx_job_queue_lease
+    ON job_queue(queue, lease_expires_at) WHERE status = 'running';
+-- Throughput/latency window and retention purge
+CREATE INDEX IF NOT EXISTS idx_job_queue_completed
+    ON job_queue(queue, completed_at) WHERE status = 'done';
+CREATE INDEX IF NOT EXISTS idx_job_queue_dead
+    ON job_queue(queue, updated_at) WHERE status = 'dead';
+-- At most one waiting job per dedupe key
+CREATE UNIQUE INDEX IF NOT EXISTS idx_job_queue_dedupe
+    ON job_queue(queue, dedupe_key) WHERE status = 'queued';
+
+-- Carry over work the old polling loops had not picked up yet
+INSERT INTO job_queue (id, queue, payload)
+SELECT id, 'document_parsing',
+       jsonb_build_object('document_id', document_id::text, 'parser_type', parser_type::text)
+FROM parser_jobs
+WHERE status IN ('pending', 'retrying')
+ON CONFLICT (id) DO NOTHING;
+
+INSERT INTO job_queue (id, queue, payload, dedupe_key)
+SELECT DISTINCT ON (user_id) id, 'evidence_matching',
+       jsonb_build_object('user_id', user_id::text), user_id::text
+FROM evidence_matching_jobs
+WHERE status = 'pending'
+ORDER BY user_id, started_at DESC
+ON CONFLICT DO NOTHING;
+
+INSERT INTO job_queue (id, queue, payload)
+SELECT id, 'evidence_ingestion',
+       jsonb_build_object('source_id', source_id::text, 'user_id', user_id::text)
+FROM evidence_ingestion_jobs
+WHERE status = 'pending'
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,26 @@
+-- Resumable Uploads Migration
+-- State of in-flight resumable uploads (src/storage/resumable_uploads.py), so any
+-- API instance can accept a chunk or complete an upload started on another one.
+-- Received chunks are not stored: S3 is asked for the multipart upload's parts
+
+CREATE TABLE IF NOT EXISTS resumable_uploads (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL,
+    bucket_name TEXT NOT NULL,
+    object_key TEXT NOT NULL,
+    s3_upload_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    content_type TEXT NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    metadata JSONB NOT NULL DEFAULT '{}',
+    status VARCHAR(20) NOT NULL DEFAULT 'open'
+        CHECK (status IN ('open', 'completing')),
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Expiry sweep aborts abandoned multipart uploads
+CREATE INDEX IF NOT EXISTS idx_resumable_uploads_expires_at
+    ON resumable_uploads(expires_at);
@@ -1,9 +1,8 @@
 """
 Document Parser Worker
-Background task system for processing document parsing jobs
+Handler for document parsing jobs on the ``document_parsing`` job queue
 """
 
-import asyncio
 import json
 import uuid
 from typing import Dict, Any, Optional, List
@@ -12,7 +11,10 @@ import logging
 import os
 import tempfile
 
+from pydantic import BaseModel
+
 from src.common.db_postgresql import DatabaseManager
+from src.common.job_queue import Job, PermanentJobError, QueueConfig, register_queue, register_worker
 from src.evidence.matching_worker import evidence_matching_worker
 from src.api.schemas import ParserStatus, ParserJob, ParsedInvoiceData
 
@@ -53,110 +55,47 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+class ParseDocumentJob(BaseModel):
+    """Payload of a ``document_parsing`` job; the job id is the ``parser_jobs`` id"""
+    document_id: str
+    parser_type: str
+
+# Retries back off from 1 minute to 15 minutes
+parser_queue = register_queue(QueueConfig(
+    name="document_parsing",
+    payload_model=ParseDocumentJob,
+    max_attempts=4,
+    backoff_base_seconds=60,
+    backoff_max_seconds=900,
+    concurrency=int(os.getenv("PARSER_CONCURRENCY", "2")),
+))
+
 class ParserWorker:
-    """Background worker for processing document parsing jobs"""
+    """Handler for document parsing jobs on the ``document_parsing`` queue"""
     
     def __init__(self):
         self.db = DatabaseManager()
         self.pdf_parser = PDFParser() if PDF_AVAILABLE and PDFParser else None
         self.email_parser = EmailParser() if EmailParser else None
         self.image_parser = ImageParser() if OCR_AVAILABLE and ImageParser else None
-        self.is_running = False
-        self.retry_delays = [60, 300, 900]  # 1 min, 5 min, 15 min
-    
-    async def start(self):
-        """Start the parser worker"""
-        self.is_running = True
-        logger.info("Parser worker started")
-        
-        while self.is_running:
-            try:
-                await self._process_pending_jobs()
-                await asyncio.sleep(10)  # Check every 10 seconds
-            except Exception as e:
-                logger.error(f"Parser worker error: {e}")
-                await asyncio.sleep(30)  # Wait longer on error
-    
-    async def stop(self):
-        """Stop the parser worker"""
-        self.is_running = False
-        logger.info("Parser worker stopped")
     
-    async def _process_pending_jobs(self):
-        """Process pending parser jobs"""
+    async def run_job(self, job: Job[ParseDocumentJob]):
+        """Queue handler: parse one document; raising hands the retry to the queue"""
         try:
-            # Get pending jobs
-            jobs = await self._get_pending_jobs()
-            
-            for job in jobs:
-                try:
-                    await self._process_job(job)
-                except Exception as e:
-                    logger.error(f"Failed to process job {job['id']}: {e}")
-                    await self._mark_job_failed(job['id'], str(e))
-            
-            # Process retry jobs
-            retry_jobs = await self._get_retry_jobs()
-            for job in retry_jobs:
-                try:
-                    await self._process_job(job)
-                except Exception as e:
-                    logger.error(f"Failed to retry job {job['id']}: {e}")
-                    await self._handle_job_retry(job)
-                    
-        except Exception as e:
-            logger.error(f"Error processing pending jobs: {e}")
-    
-    async def _get_pending_jobs(self) -> List[Dict[str, Any]]:
-        """Get pending parser jobs"""
-        with self.db._get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT id, document_id, parser_type
-                    FROM parser_jobs 
-                    WHERE status = 'pending'
-                    ORDER BY created_at ASC
-                    LIMIT 10
-                """)
-                
-                jobs = []
-                for row in cursor.fetchall():
-                    jobs.append({
-                        'id': str(row[0]),
-                        'document_id': str(row[1]),
-                        'parser_type': row[2],
-                        'retry_count': 0,
-                        'max_retries': 3
-                    })
-                
-                return jobs
+            await self._process_job({
+                'id': job.id,
+                'document_id': job.payload.document_id,
+                'parser_type': job.payload.parser_type
+            })
+        except PermanentJobError:
+            raise
+        except Exception:
+            await self._mark_job_retrying(job.id)
+            raise
     
-    async def _get_retry_jobs(self) -> List[Dict[str, Any]]:
-        """Get jobs that need retrying"""
-        with self.db._get_connection() as conn:
-            with conn.cursor() as cursor:
-                # Note: error_message column may not exist in older schemas
-                cursor.execute("""
-                    SELECT id, document_id, parser_type
-                    FROM parser_jobs 
-                    WHERE status = 'retrying' 
-                    AND updated_at < NOW() - INTERVAL '%s seconds'
-                    ORDER BY updated_at ASC
-                    LIMIT 5
-                """, (self.retry_delays[0],))  # Use first retry delay
-                
-                jobs = []
-                for row in cursor.fetchall():
-                    jobs.append({
-                        'id': str(row[0]),
-                        'document_id': str(row[1]),
-                        'parser_type': row[2],
-                        'retry_count': 0,
-                        'max_retries': 3,
-                        'error_message': None  # Column not in schema
-                    })
-                
-                return jobs
+    async def on_job_dead(self, job: Job[ParseDocumentJob], error: str):
+        """Queue dead-letter hook: no retries left"""
+        await self._mark_job_failed(job.id, error)
     
     async def _process_job(self, job: Dict[str, Any]):
         """Process a single parser job"""
@@ -166,38 +105,32 @@ class ParserWorker:
         
         logger.info(f"Processing job {job_id} for document {document_id} with parser {parser_type}")
         
-        try:
-            # Mark job as processing
-            await self._mark_job_processing(job_id)
-            
-            # Get document details
-            document = await self._get_document(document_id)
-            if not document:
-                raise Exception(f"Document {document_id} not found")
-            
-            # Parse document based on type
-            result = await self._parse_document(document, parser_type)
-            
-            if result.success:
-                # Save parsing results
-                await self._save_parsing_results(job_id, document_id, result)
-                await self._mark_job_completed(job_id, result.confidence)
+        # Mark job as processing
+        await self._mark_job_processing(job_id)
+        
+        # Get document details
+        document = await self._get_document(document_id)
+        if not document:
+            raise PermanentJobError(f"Document {document_id} not found")
+        
+        # Parse document based on type
+        result = await self._parse_document(document, parser_type)
+        if not result.success:
+            # The same input fails the same way; do not retry
+            raise PermanentJobError(result.error or "Parsing failed")
+        
+        # Save parsing results
+        await self._save_parsing_results(job_id, document_id, result)
+        await self._mark_job_completed(job_id, result.confidence)
 
-                # 🎯 STEP 5 → STEP 6: Trigger evidence matching
-                try:
-                    await self._trigger_evidence_matching(document_id)
-                    logger.info(
-                        f"Job {job_id} completed successfully with confidence {result.confidence}"
-                    )
-                except Exception as e:
-                    logger.warning(f"Post-parse hook failed for job {job_id}: {e}")
-            else:
-                # Handle parsing failure
-                await self._handle_parsing_failure(job_id, result.error)
-                
+        # 🎯 STEP 5 → STEP 6: Trigger evidence matching
+        try:
+            await self._trigger_evidence_matching(document_id)
+            logger.info(
+                f"Job {job_id} completed successfully with confidence {result.confidence}"
+            )
         except Exception as e:
-            logger.error(f"Job {job_id} failed: {e}")
-            await self._handle_job_retry(job)
+            logger.warning(f"Post-parse hook failed for job {job_id}: {e}")
     
     async def _parse_document(self, document: Dict[str, Any], parser_type: str) -> ParsingResult:
         """Parse document using appropriate parser"""
@@ -208,19 +141,19 @@ class ParserWorker:
             if self.pdf_parser:
                 return self.pdf_parser.parse_document(file_path, file_content)
             else:
-                raise Exception("PDF parser not available")
+                raise PermanentJobError("PDF parser not available")
         elif parser_type == 'email':
             if self.email_parser:
                 return self.email_parser.parse_document(file_path, file_content)
             else:
-                raise Exception("Email parser not available")
+                raise PermanentJobError("Email parser not available")
         elif parser_type == 'image':
             if self.image_parser:
                 return self.image_parser.parse_document(file_path, file_content)
             else:
-                raise Exception("Image parser not available")
+                raise PermanentJobError("Image parser not available")
         else:
-            raise Exception(f"Unknown parser type: {parser_type}")
+            raise PermanentJobError(f"Unknown parser type: {parser_type}")
     
     async def _get_document(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get document details from database"""
@@ -284,6 +217,7 @@ class ParserWorker:
                     result.confidence,
                     result.processing_time_ms
                 ))
+            conn.commit()
 
     async def _trigger_evidence_matching(self, document_id: str) -> None:
         """Trigger evidence matching job for the document's owner, if available."""
@@ -305,7 +239,7 @@ class ParserWorker:
             if not user_id:
                 return
 
-            # Create a matching job for this user; worker loop will process it
+            # Queue a matching job for this user
             await evidence_matching_worker.create_matching_job(user_id)
         except Exception as e:
             # Best-effort hook; log and continue
@@ -320,6 +254,7 @@ class ParserWorker:
                     SET status = 'processing', started_at = NOW()
                     WHERE id = %s
                 """, (job_id,))
+            conn.commit()
     
     async def _mark_job_completed(self, job_id: str, confidence: float):
         """Mark job as completed"""
@@ -330,6 +265,7 @@ class ParserWorker:
                     SET status = 'completed', completed_at = NOW(), confidence_score = %s
                     WHERE id = %s
                 """, (confidence, job_id))
+            conn.commit()
     
     async def _mark_job_failed(self, job_id: str, error_message: str):
         """Mark job as failed"""
@@ -341,44 +277,22 @@ class ParserWorker:
                     SET status = 'failed', completed_at = NOW()
                     WHERE id = %s
                 """, (job_id,))
-                logger.error(f"Job {job_id} marked as failed: {error_message}")
+            conn.commit()
+        logger.error(f"Job {job_id} marked as failed: {error_message}")
     
-    async def _handle_parsing_failure(self, job_id: str, error: str):
-        """Handle parsing failure - mark as failed (no retry columns in DB)"""
+    async def _mark_job_retrying(self, job_id: str):
+        """Mark job as waiting for a retry"""
         with self.db._get_connection() as conn:
             with conn.cursor() as cursor:
-                # Mark as failed directly since error_message column doesn't exist
                 cursor.execute("""
                     UPDATE parser_jobs 
-                    SET status = 'failed', completed_at = NOW()
+                    SET status = 'retrying', updated_at = NOW()
                     WHERE id = %s
                 """, (job_id,))
-                logger.error(f"Job {job_id} marked as failed: {error}")
-    
-    async def _handle_job_retry(self, job: Dict[str, Any]):
-        """Handle job retry with exponential backoff"""
-        job_id = job['id']
-        # Use .get() with default 0 to avoid KeyError if retry_count not in job
-        retry_count = job.get('retry_count', 0)
-        
-        if retry_count < len(self.retry_delays):
-            delay = self.retry_delays[retry_count]
-        else:
-            delay = self.retry_delays[-1]
-        
-        # Update retry timestamp
-        with self.db._get_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE parser_jobs 
-                    SET updated_at = NOW() + INTERVAL '%s seconds'
-                    WHERE id = %s
-                """, (delay, job_id))
-        
-        logger.info(f"Job {job_id} scheduled for retry in {delay} seconds")
+            conn.commit()
     
     async def create_parser_job(self, document_id: str, user_id: str, parser_type: str) -> str:
-        """Create a new parser job"""
+        """Create a new parser job and queue it"""
         job_id = str(uuid.uuid4())
         
         with self.db._get_connection() as conn:
@@ -388,6 +302,12 @@ class ParserWorker:
                     (id, document_id, user_id, parser_type, status, started_at)
                     VALUES (%s, %s, %s, %s, %s, %s)
                 """, (job_id, document_id, user_id, parser_type, 'pending', datetime.utcnow()))
+                parser_queue.enqueue(
+                    ParseDocumentJob(document_id=document_id, parser_type=parser_type),
+                    job_id=job_id,
+                    cursor=cursor
+                )
+            conn.commit()
         
         logger.info(f"Created parser job {job_id} for document {document_id}")
         return job_id
@@ -421,4 +341,5 @@ class ParserWorker:
 
 # Global parser worker instance
 parser_worker = ParserWorker()
+register_worker(parser_queue, parser_worker.run_job, on_dead=parser_worker.on_job_dead)
 
@@ -12,29 +12,14 @@ from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import logging
 from dataclasses import dataclass
+from importlib.util import find_spec
 
-# PDF processing imports
-try:
-    import PyPDF2
-    import pdfplumber
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+# PDF and OCR libraries are imported on first use; only check they are installed
+PDF_AVAILABLE = find_spec("PyPDF2") is not None and find_spec("pdfplumber") is not None
+OCR_AVAILABLE = find_spec("pytesseract") is not None and find_spec("PIL") is not None
 
-# OCR imports
-try:
-    import pytesseract
-    from PIL import Image
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
-
-# ML imports
-try:
-    import requests
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+# ML/OCR API clients
+ML_AVAILABLE = find_spec("requests") is not None
 
 from src.api.schemas import ParsedInvoiceData, LineItem
 
@@ -106,6 +91,8 @@ class PDFParser:
         """Extract text from PDF using multiple methods"""
         if not PDF_AVAILABLE:
             raise ImportError("PDF processing libraries not available")
+        import pdfplumber
+        import PyPDF2
         
         text = ""
         
@@ -180,6 +167,8 @@ class PDFParser:
     def _extract_with_ocr(self, file_path: str, file_content: bytes = None) -> ParsingResult:
         """Extract invoice data using OCR"""
         try:
+            import pytesseract
+            
             # Convert PDF to images and run OCR
             images = self._pdf_to_images(file_path, file_content)
             ocr_text = ""
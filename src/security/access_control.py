@@ -3,9 +3,12 @@ Access Control Service
 Phase 6: Row-Level Security (RLS) and Role-Based Access Control (RBAC)
 """
 
+import os
+import time
 import uuid
 import json
-from typing import Dict, Any, List, Optional, Set
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set, FrozenSet, Tuple
 from datetime import datetime, timedelta
 import logging
 from enum import Enum
@@ -58,12 +61,58 @@ class Role(str, Enum):
     READONLY = "readonly"
     SERVICE = "service"
 
+class _UserPermissionCache:
+    """Cached permission data for one user
+    
+    ``permissions`` is the user's full permission set once it has been
+    loaded; until then individual ``check_user_permission`` answers are kept
+    in ``decisions``.
+    """
+    
+    __slots__ = ("permissions", "has_admin", "decisions", "expires_at")
+    
+    def __init__(self, expires_at: float):
+        self.permissions: Optional[FrozenSet[Permission]] = None
+        self.has_admin = False
+        self.decisions: Dict[Tuple[str, Optional[str]], bool] = {}
+        self.expires_at = expires_at
+
 class AccessControlService:
-    """Service for managing access control and permissions"""
+    """Service for managing access control and permissions
+    
+    Permission lookups are cached per user for ``PERMISSION_CACHE_TTL_SECONDS``
+    (and never past the expiry of a role they were computed from). Role
+    changes made through this service invalidate the user's entry at once;
+    the TTL bounds staleness for changes made elsewhere.
+    """
     
     def __init__(self):
         self.db = DatabaseManager()
         self.role_permissions = self._initialize_role_permissions()
+        self.permission_cache_ttl = float(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "60"))
+        self.permission_cache_size = int(os.getenv("PERMISSION_CACHE_SIZE", "10000"))
+        self._permission_cache: "OrderedDict[str, _UserPermissionCache]" = OrderedDict()
+    
+    def _cache_entry(self, user_id: str, create: bool = False) -> Optional[_UserPermissionCache]:
+        entry = self._permission_cache.get(user_id)
+        if entry is not None and entry.expires_at <= time.time():
+            del self._permission_cache[user_id]
+            entry = None
+        if entry is None and create:
+            entry = _UserPermissionCache(time.time() + self.permission_cache_ttl)
+            self._permission_cache[user_id] = entry
+            while len(self._permission_cache) > self.permission_cache_size:
+                self._permission_cache.popitem(last=False)
+        elif entry is not None:
+            self._permission_cache.move_to_end(user_id)
+        return entry
+    
+    def invalidate_permissions(self, user_id: Optional[str] = None):
+        """Drop cached permissions for one user, or for everyone"""
+        if user_id is None:
+            self._permission_cache.clear()
+        else:
+            self._permission_cache.pop(str(user_id), None)
         
     def _initialize_role_permissions(self) -> Dict[Role, Set[Permission]]:
         """Initialize role-based permissions"""
@@ -137,6 +186,7 @@ class AccessControlService:
                         granted_by, expires_at, json.dumps(metadata or {})
                     ))
             
+            self.invalidate_permissions(user_id)
             logger.info(f"Assigned role {role.value} to user {user_id}")
             return role_id
             
@@ -153,9 +203,17 @@ class AccessControlService:
                         UPDATE user_roles 
                         SET is_active = FALSE, updated_at = NOW()
                         WHERE id = %s
+                        RETURNING user_id
                     """, (role_id,))
                     
-                    return cursor.rowcount > 0
+                    revoked = cursor.rowcount > 0
+                    if revoked:
+                        row = cursor.fetchone()
+                        if row:
+                            self.invalidate_permissions(row[0])
+                        else:
+                            self.invalidate_permissions()
+                    return revoked
                     
         except Exception as e:
             logger.error(f"Failed to revoke role {role_id}: {e}")
@@ -168,6 +226,14 @@ class AccessControlService:
         resource_type: Optional[str] = None
     ) -> bool:
         """Check if user has a specific permission"""
+        entry = self._cache_entry(user_id)
+        if entry is not None:
+            if entry.permissions is not None:
+                return entry.has_admin or permission in entry.permissions
+            decision = entry.decisions.get((permission.value, resource_type))
+            if decision is not None:
+                return decision
+        
         try:
             with self.db._get_connection() as conn:
                 with conn.cursor() as cursor:
@@ -176,38 +242,58 @@ class AccessControlService:
                     """, (user_id, permission.value, resource_type))
                     
                     result = cursor.fetchone()
-                    return result[0] if result else False
+                    decision = bool(result[0]) if result else False
                     
         except Exception as e:
             logger.error(f"Failed to check permission {permission.value} for user {user_id}: {e}")
             return False
+        
+        self._cache_entry(user_id, create=True).decisions[(permission.value, resource_type)] = decision
+        return decision
     
     async def get_user_permissions(self, user_id: str) -> Set[Permission]:
         """Get all permissions for a user"""
+        entry = self._cache_entry(user_id)
+        if entry is not None and entry.permissions is not None:
+            return set(entry.permissions)
+        
         try:
             permissions = set()
+            has_admin = False
+            expires_at = time.time() + self.permission_cache_ttl
             
             with self.db._get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("""
-                        SELECT permissions FROM user_roles 
+                        SELECT permissions, expires_at FROM user_roles 
                         WHERE user_id = %s AND is_active = TRUE 
                         AND (expires_at IS NULL OR expires_at > NOW())
                     """, (user_id,))
                     
-                    for row in cursor.fetchall():
-                        role_permissions = json.loads(row[0])
+                    for role_permissions, role_expires_at in cursor.fetchall():
+                        if isinstance(role_permissions, str):
+                            role_permissions = json.loads(role_permissions)
+                        if role_expires_at is not None:
+                            expires_at = min(expires_at, role_expires_at.timestamp())
                         for perm in role_permissions:
+                            if perm == "admin":
+                                has_admin = True
+                                continue
                             try:
                                 permissions.add(Permission(perm))
                             except ValueError:
                                 logger.warning(f"Unknown permission: {perm}")
             
-            return permissions
-            
         except Exception as e:
             logger.error(f"Failed to get permissions for user {user_id}: {e}")
             return set()
+        
+        entry = self._cache_entry(user_id, create=True)
+        entry.permissions = frozenset(permissions)
+        entry.has_admin = has_admin
+        entry.decisions.clear()
+        entry.expires_at = min(entry.expires_at, expires_at)
+        return permissions
     
     async def get_user_roles(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all roles for a user"""
@@ -3,9 +3,17 @@ Enhanced Audit Service
 Phase 6: Comprehensive audit logging with security context and encryption
 """
 
+import asyncio
+import atexit
+import os
+import tempfile
+import threading
+import time
 import uuid
+import weakref
 import json
-from typing import Dict, Any, Optional, List
+from collections import deque
+from typing import Dict, Any, Optional, List, Deque
 from datetime import datetime, timedelta
 import logging
 from enum import Enum
@@ -77,12 +85,272 @@ class AuditAction(str, Enum):
     DATA_DELETE = "data_delete"
     DATA_ANONYMIZE = "data_anonymize"
 
+AUDIT_LOG_COLUMNS = (
+    "id", "user_id", "service_account_id", "session_id", "action", "resource_type",
+    "resource_id", "severity", "ip_address", "user_agent", "request_id", "response_status",
+    "response_time_ms", "error_message", "security_context", "encrypted_data", "created_at"
+)
+
+AUDIT_LOG_ROW_TEMPLATE = (
+    "(%s, %s, %s, %s, %s, %s, %s, %s::audit_severity, %s::inet, %s, %s, %s, %s, %s,"
+    " %s::jsonb, %s::jsonb, %s::timestamptz)"
+)
+
+# Writers whose buffers are flushed at interpreter exit (one atexit hook for all)
+_live_writers: "weakref.WeakSet[AuditLogWriter]" = weakref.WeakSet()
+
+def _flush_writers_at_exit():
+    for writer in list(_live_writers):
+        try:
+            writer.flush_sync()
+        except Exception as e:
+            logger.error(f"Failed to flush audit events at exit: {e}")
+
+atexit.register(_flush_writers_at_exit)
+
+class AuditLogWriter:
+    """Buffers audit events in memory and writes them in batches off the request path
+    
+    ``submit`` only appends to the buffer. A background task flushes a batch when
+    ``batch_size`` events are waiting or ``flush_interval`` seconds after the first
+    one arrived: sensitive payloads in the batch are encrypted with a single key
+    lookup and the rows go in with one multi-row INSERT.
+    
+    When the buffer is full, low/medium events are dropped (and counted) while
+    high/critical events are written inline. Batches that cannot be written are
+    appended, already encrypted, to a local spool file that is replayed after the
+    next successful write, and whatever is still buffered at interpreter exit is
+    flushed synchronously.
+    """
+    
+    def __init__(
+        self,
+        db: DatabaseManager,
+        encryption: Any,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_buffer: Optional[int] = None,
+        spool_path: Optional[str] = None
+    ):
+        self.db = db
+        self.encryption = encryption
+        self.batch_size = batch_size or int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+        self.flush_interval = (
+            flush_interval if flush_interval is not None
+            else float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "250")) / 1000
+        )
+        self.max_buffer = max_buffer or int(os.getenv("AUDIT_MAX_BUFFER", "10000"))
+        self.spool_path = spool_path or os.getenv(
+            "AUDIT_SPOOL_PATH", os.path.join(tempfile.gettempdir(), "audit_spool.jsonl")
+        )
+        
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "written_inline": 0,
+            "spooled": 0,
+            "replayed": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "encryption_failures": 0,
+            "max_backlog": 0,
+            "flush_ms_total": 0.0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0
+        }
+        _live_writers.add(self)
+    
+    def __len__(self) -> int:
+        return len(self._buffer)
+    
+    async def submit(self, event: Dict[str, Any], critical: bool = False) -> bool:
+        """Queue an event for the background writer; returns False if it was dropped"""
+        if len(self._buffer) >= self.max_buffer:
+            if not critical:
+                self.stats["dropped"] += 1
+                if self.stats["dropped"] % 1000 == 1:
+                    logger.warning(
+                        f"Audit buffer full ({self.max_buffer} events); "
+                        f"{self.stats['dropped']} low/medium events dropped so far"
+                    )
+                return False
+            self.stats["written_inline"] += 1
+            await asyncio.to_thread(self.write_batch, [event])
+            return True
+        
+        self._buffer.append(event)
+        self.stats["enqueued"] += 1
+        self.stats["max_backlog"] = max(self.stats["max_backlog"], len(self._buffer))
+        self._ensure_running()
+        if len(self._buffer) == 1 or len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+    
+    def _ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._run())
+    
+    async def _run(self):
+        while True:
+            # Woken by the first event of a batch, then by a full batch or the interval
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if len(self._buffer) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Audit writer flush failed: {e}")
+    
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        return [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+    
+    async def flush(self):
+        """Write every buffered event"""
+        while self._buffer:
+            await asyncio.to_thread(self.write_batch, self._take_batch())
+    
+    def flush_sync(self):
+        """Write every buffered event from the calling thread (used at exit)"""
+        while self._buffer:
+            self.write_batch(self._take_batch())
+    
+    async def shutdown(self):
+        """Stop the background task and flush what is left"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+    
+    def write_batch(self, events: List[Dict[str, Any]]):
+        """Encrypt and insert a batch of events; failed batches go to the spool"""
+        with self._write_lock:
+            started = time.perf_counter()
+            rows = self._encrypt_rows(events)
+            if self._insert(rows):
+                self.stats["written"] += len(rows)
+                if os.path.exists(self.spool_path):
+                    self._replay_spool()
+            else:
+                self._spool(rows)
+            
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.stats["batches"] += 1
+            self.stats["last_flush_ms"] = elapsed_ms
+            self.stats["flush_ms_total"] += elapsed_ms
+            self.stats["max_flush_ms"] = max(self.stats["max_flush_ms"], elapsed_ms)
+    
+    def _encrypt_rows(self, events: List[Dict[str, Any]]) -> List[List[Any]]:
+        sensitive = [event for event in events if event.get("sensitive_data")]
+        encrypted: Dict[int, Dict[str, Any]] = {}
+        if sensitive:
+            try:
+                payloads = self.encryption.encrypt_many([event["sensitive_data"] for event in sensitive])
+                encrypted = {id(event): payload for event, payload in zip(sensitive, payloads)}
+            except Exception as e:
+                # Never persist plaintext: keep the event, flag the missing payload
+                self.stats["encryption_failures"] += len(sensitive)
+                logger.error(f"Failed to encrypt {len(sensitive)} audit payloads: {e}")
+                for event in sensitive:
+                    event["security_context"]["sensitive_data_unavailable"] = True
+        
+        rows = []
+        for event in events:
+            payload = encrypted.get(id(event))
+            row = dict(
+                event,
+                security_context=json.dumps(event["security_context"]),
+                encrypted_data=json.dumps(payload) if payload else None
+            )
+            rows.append([row.get(column) for column in AUDIT_LOG_COLUMNS])
+        return rows
+    
+    def _insert(self, rows: List[List[Any]]) -> bool:
+        from psycopg2.extras import execute_values
+        
+        try:
+            with self.db._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    execute_values(
+                        cursor,
+                        f"INSERT INTO security_audit_log ({', '.join(AUDIT_LOG_COLUMNS)}) VALUES %s"
+                        " ON CONFLICT DO NOTHING",
+                        rows,
+                        template=AUDIT_LOG_ROW_TEMPLATE,
+                        page_size=len(rows)
+                    )
+                conn.commit()
+            return True
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"Failed to write {len(rows)} audit events: {e}")
+            return False
+    
+    def _spool(self, rows: List[List[Any]]):
+        try:
+            with open(self.spool_path, "a", encoding="utf-8") as spool:
+                for row in rows:
+                    spool.write(json.dumps(row) + "\n")
+            self.stats["spooled"] += len(rows)
+        except OSError as e:
+            self.stats["dropped"] += len(rows)
+            logger.critical(f"Failed to spool {len(rows)} audit events to {self.spool_path}: {e}")
+    
+    def _replay_spool(self):
+        replay_path = f"{self.spool_path}.replay"
+        try:
+            os.replace(self.spool_path, replay_path)
+            with open(replay_path, encoding="utf-8") as spool:
+                rows = [json.loads(line) for line in spool if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read audit spool {self.spool_path}: {e}")
+            return
+        
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if self._insert(batch):
+                self.stats["replayed"] += len(batch)
+            else:
+                self._spool(rows[start:])
+                break
+        os.remove(replay_path)
+        logger.info(f"Replayed {self.stats['replayed']} spooled audit events")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Backlog, drop and flush-latency metrics"""
+        batches = self.stats["batches"]
+        spool_bytes = os.path.getsize(self.spool_path) if os.path.exists(self.spool_path) else 0
+        return {
+            **{key: value for key, value in self.stats.items() if key != "flush_ms_total"},
+            "backlog": len(self._buffer),
+            "max_buffer": self.max_buffer,
+            "avg_flush_ms": self.stats["flush_ms_total"] / batches if batches else 0.0,
+            "spool_bytes": spool_bytes
+        }
+
 class AuditService:
     """Enhanced audit service with security context and encryption"""
     
     def __init__(self):
         self.db = DatabaseManager()
         self.encryption_service = encryption_service
+        self.async_writes = os.getenv("AUDIT_ASYNC_WRITES", "true").lower() == "true"
+        self.writer = AuditLogWriter(self.db, self.encryption_service)
         
     async def log_event(
         self,
@@ -102,36 +370,50 @@ class AuditService:
         sensitive_data: Optional[Dict[str, Any]] = None,
         session_id: Optional[str] = None
     ) -> str:
-        """Log an audit event with full context"""
+        """Log an audit event with full context
+        
+        The event is queued for the batched background writer (see
+        ``AuditLogWriter``) unless ``AUDIT_ASYNC_WRITES`` is off, in which case
+        it is written before returning. The returned id is the row's id.
+        """
         try:
             event_id = str(uuid.uuid4())
             
-            # Encrypt sensitive data if provided
-            encrypted_data = None
-            if sensitive_data:
-                encrypted_data = self.encryption_service.encrypt_data(sensitive_data)
-            
             # Prepare security context
-            security_context = security_context or {}
+            security_context = dict(security_context or {})
             security_context.update({
                 "timestamp": datetime.utcnow().isoformat() + "Z",
                 "action": action.value,
                 "severity": severity.value
             })
             
-            with self.db._get_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT log_security_event(
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                    """, (
-                        user_id, service_account_id, session_id, action.value,
-                        resource_type, resource_id, severity.value, ip_address,
-                        user_agent, request_id, response_status, response_time_ms,
-                        error_message, json.dumps(security_context), 
-                        json.dumps(encrypted_data) if encrypted_data else None
-                    ))
+            # Sensitive data is encrypted by the writer, once per batch
+            event = {
+                "id": event_id,
+                "user_id": user_id,
+                "service_account_id": service_account_id,
+                "session_id": session_id,
+                "action": action.value,
+                "resource_type": resource_type,
+                "resource_id": resource_id,
+                "severity": severity.value,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "request_id": request_id,
+                "response_status": response_status,
+                "response_time_ms": response_time_ms,
+                "error_message": error_message,
+                "security_context": security_context,
+                "sensitive_data": sensitive_data,
+                "created_at": security_context["timestamp"]
+            }
+            
+            if self.async_writes:
+                await self.writer.submit(
+                    event, critical=severity in (AuditSeverity.HIGH, AuditSeverity.CRITICAL)
+                )
+            else:
+                await asyncio.to_thread(self.writer.write_batch, [event])
             
             # Log to application logger
             self._log_to_application_logger(
@@ -144,6 +426,18 @@ class AuditService:
             logger.error(f"Failed to log audit event: {e}")
             raise
     
+    async def flush(self):
+        """Write all queued audit events now"""
+        await self.writer.flush()
+    
+    async def shutdown(self):
+        """Stop the background writer after flushing queued events"""
+        await self.writer.shutdown()
+    
+    def get_writer_metrics(self) -> Dict[str, Any]:
+        """Audit writer backlog, drop and flush-latency metrics"""
+        return self.writer.get_metrics()
+    
     async def get_audit_events(
         self,
         user_id: Optional[str] = None,
@@ -156,6 +450,9 @@ class AuditService:
         offset: int = 0
     ) -> Dict[str, Any]:
         """Get audit events with filtering"""
+        # Make events queued by this process visible to the query
+        await self.writer.flush()
+        
         try:
             where_conditions = []
             params = []
@@ -434,6 +731,9 @@ class AuditService:
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get audit statistics"""
+        # Make events queued by this process visible to the query
+        await self.writer.flush()
+        
         try:
             where_conditions = []
             params = []
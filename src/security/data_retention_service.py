@@ -5,7 +5,9 @@ Phase 6: Automatic data retention and cleanup policies with GDPR/CCPA compliance
 
 import asyncio
 import json
-from typing import Dict, Any, List, Optional
+import os
+import re
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
@@ -14,12 +16,29 @@ from src.security.audit_service import audit_service, AuditAction, AuditSeverity
 
 logger = logging.getLogger(__name__)
 
+# Range-partitioned tables (see migration 014): (partition column, interval, periods created ahead)
+PARTITIONED_TABLES: Dict[str, Tuple[str, str, int]] = {
+    "security_audit_log": ("created_at", "month", 3),
+    "metrics_data": ("timestamp", "day", 7)
+}
+
+_IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
 class DataRetentionService:
-    """Service for managing data retention and cleanup policies"""
+    """Service for managing data retention and cleanup policies
+    
+    Partitioned tables are trimmed by detaching and dropping partitions whose
+    whole range is past the cutoff. Other tables are deleted from in small
+    keyset-ordered batches, each in its own transaction with a pause in
+    between, so no single statement holds locks or generates WAL for long.
+    """
     
     def __init__(self):
         self.db = DatabaseManager()
         self.cleanup_running = False
+        self.delete_batch_size = int(os.getenv("RETENTION_DELETE_BATCH_SIZE", "5000"))
+        self.delete_pause_seconds = float(os.getenv("RETENTION_DELETE_PAUSE_MS", "50")) / 1000
+        self.lock_timeout = os.getenv("RETENTION_LOCK_TIMEOUT", "5s")
         
     async def run_cleanup_job(self) -> Dict[str, Any]:
         """Run the data cleanup job"""
@@ -52,7 +71,9 @@ class DataRetentionService:
                     cleanup_results["tables_cleaned"].append({
                         "table": policy["table_name"],
                         "deleted_count": result["deleted_count"],
-                        "retention_days": policy["retention_days"]
+                        "retention_days": policy["retention_days"],
+                        "method": result.get("method"),
+                        "partitions_dropped": result.get("partitions_dropped", [])
                     })
                     
                     # Update last cleanup time
@@ -136,39 +157,28 @@ class DataRetentionService:
         """Clean up old audit logs (7 years default)"""
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
+            result = await self._cleanup_table({
+                "table_name": "security_audit_log",
+                "retention_days": retention_days
+            })
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            
+            # Log the cleanup
+            await audit_service.log_event(
+                action=AuditAction.DATA_DELETE,
+                severity=AuditSeverity.LOW,
+                resource_type="security_audit_log",
+                security_context={
+                    "retention_days": retention_days,
+                    "cutoff_date": cutoff_date.isoformat() + "Z",
+                    "deleted_count": result["deleted_count"],
+                    "partitions_dropped": result["partitions_dropped"]
+                }
+            )
+            
+            return result["deleted_count"]
             
-            with self.db._get_connection() as conn:
-                with conn.cursor() as cursor:
-                    # Count records to be deleted
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM security_audit_log 
-                        WHERE created_at < %s
-                    """, (cutoff_date,))
-                    count_before = cursor.fetchone()[0]
-                    
-                    # Delete old records
-                    cursor.execute("""
-                        DELETE FROM security_audit_log 
-                        WHERE created_at < %s
-                    """, (cutoff_date,))
-                    
-                    deleted_count = cursor.rowcount
-                    
-                    # Log the cleanup
-                    await audit_service.log_event(
-                        action=AuditAction.DATA_DELETE,
-                        severity=AuditSeverity.LOW,
-                        resource_type="security_audit_log",
-                        security_context={
-                            "retention_days": retention_days,
-                            "cutoff_date": cutoff_date.isoformat() + "Z",
-                            "deleted_count": deleted_count,
-                            "count_before": count_before
-                        }
-                    )
-                    
-                    return deleted_count
-                    
         except Exception as e:
             logger.error(f"Failed to cleanup old audit logs: {e}")
             return 0
@@ -178,30 +188,27 @@ class DataRetentionService:
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
             
-            with self.db._get_connection() as conn:
-                with conn.cursor() as cursor:
-                    # Delete old parser jobs
-                    cursor.execute("""
-                        DELETE FROM parser_jobs 
-                        WHERE created_at < %s AND status IN ('completed', 'failed')
-                    """, (cutoff_date,))
-                    
-                    deleted_count = cursor.rowcount
-                    
-                    # Log the cleanup
-                    await audit_service.log_event(
-                        action=AuditAction.DATA_DELETE,
-                        severity=AuditSeverity.LOW,
-                        resource_type="parser_jobs",
-                        security_context={
-                            "retention_days": retention_days,
-                            "cutoff_date": cutoff_date.isoformat() + "Z",
-                            "deleted_count": deleted_count
-                        }
-                    )
-                    
-                    return deleted_count
-                    
+            # Delete old parser jobs
+            result = await self._delete_in_batches(
+                "parser_jobs", "created_at", cutoff_date,
+                extra_condition="status IN ('completed', 'failed')"
+            )
+            deleted_count = result["deleted_count"]
+            
+            # Log the cleanup
+            await audit_service.log_event(
+                action=AuditAction.DATA_DELETE,
+                severity=AuditSeverity.LOW,
+                resource_type="parser_jobs",
+                security_context={
+                    "retention_days": retention_days,
+                    "cutoff_date": cutoff_date.isoformat() + "Z",
+                    "deleted_count": deleted_count
+                }
+            )
+            
+            return deleted_count
+            
         except Exception as e:
             logger.error(f"Failed to cleanup old parser jobs: {e}")
             return 0
@@ -332,29 +339,17 @@ class DataRetentionService:
             retention_days = policy["retention_days"]
             cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
             
-            with self.db._get_connection() as conn:
-                with conn.cursor() as cursor:
-                    # Count records to be deleted
-                    cursor.execute(f"""
-                        SELECT COUNT(*) FROM {table_name} 
-                        WHERE created_at < %s
-                    """, (cutoff_date,))
-                    count_before = cursor.fetchone()[0]
-                    
-                    # Delete old records
-                    cursor.execute(f"""
-                        DELETE FROM {table_name} 
-                        WHERE created_at < %s
-                    """, (cutoff_date,))
-                    
-                    deleted_count = cursor.rowcount
-                    
-                    return {
-                        "table_name": table_name,
-                        "deleted_count": deleted_count,
-                        "count_before": count_before,
-                        "cutoff_date": cutoff_date.isoformat() + "Z"
-                    }
+            if table_name in PARTITIONED_TABLES and await self._is_partitioned(table_name):
+                result = await self._drop_expired_partitions(table_name, cutoff_date)
+            else:
+                column = PARTITIONED_TABLES.get(table_name, ("created_at",))[0]
+                result = await self._delete_in_batches(table_name, column, cutoff_date)
+            
+            return {
+                "table_name": table_name,
+                "cutoff_date": cutoff_date.isoformat() + "Z",
+                **result
+            }
                     
         except Exception as e:
             logger.error(f"Failed to cleanup table {policy['table_name']}: {e}")
@@ -364,6 +359,132 @@ class DataRetentionService:
                 "error": str(e)
             }
     
+    async def _is_partitioned(self, table_name: str) -> bool:
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT EXISTS (
+                        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)
+                    )
+                """, (table_name,))
+                return bool(cursor.fetchone()[0])
+    
+    async def _drop_expired_partitions(self, table_name: str, cutoff_date: datetime) -> Dict[str, Any]:
+        """Detach and drop partitions older than the cutoff, creating upcoming ones first
+        
+        ``deleted_count`` for dropped partitions is the planner's row estimate,
+        since counting them exactly would mean scanning them.
+        """
+        column, interval, ahead = PARTITIONED_TABLES[table_name]
+        
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT ensure_time_partitions(%s, %s, %s)", (table_name, interval, ahead))
+                cursor.execute("""
+                    SELECT partition_name, estimated_rows
+                    FROM expired_time_partitions(%s, %s)
+                """, (table_name, cutoff_date))
+                expired = cursor.fetchall()
+            conn.commit()
+        
+        deleted_count = 0
+        dropped = []
+        for partition_name, estimated_rows in expired:
+            self._check_identifier(partition_name)
+            # Fail fast rather than queue behind long-running readers
+            with self.db._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL lock_timeout = %s", (self.lock_timeout,))
+                    cursor.execute(f"ALTER TABLE {table_name} DETACH PARTITION {partition_name}")
+                    cursor.execute(f"DROP TABLE {partition_name}")
+                conn.commit()
+            dropped.append(partition_name)
+            deleted_count += estimated_rows or 0
+            logger.info(f"Dropped expired partition {partition_name} (~{estimated_rows} rows)")
+        
+        # Rows past the cutoff can otherwise only remain in the legacy and default partitions
+        batches = 0
+        for partition_name in (f"{table_name}_legacy", f"{table_name}_default"):
+            if partition_name in dropped or not await self._table_exists(partition_name):
+                continue
+            result = await self._delete_in_batches(partition_name, column, cutoff_date)
+            deleted_count += result["deleted_count"]
+            batches += result["batches"]
+        
+        return {
+            "method": "partition_drop",
+            "deleted_count": deleted_count,
+            "partitions_dropped": dropped,
+            "batches": batches
+        }
+    
+    async def _table_exists(self, table_name: str) -> bool:
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (table_name,))
+                return bool(cursor.fetchone()[0])
+    
+    async def _delete_in_batches(
+        self,
+        table_name: str,
+        column: str,
+        cutoff_date: datetime,
+        extra_condition: str = ""
+    ) -> Dict[str, Any]:
+        """Delete rows older than the cutoff in keyset-ordered batches
+        
+        Each batch resumes after the last (``column``, id) it deleted, so it
+        never rescans index entries for rows that are already gone, and commits
+        on its own before pausing for ``delete_pause_seconds``.
+        """
+        self._check_identifier(table_name)
+        self._check_identifier(column)
+        condition = f"AND {extra_condition}" if extra_condition else ""
+        
+        deleted_count = 0
+        batches = 0
+        last_key = None
+        while True:
+            keyset = f"AND ({column}, id) > (%s, %s)" if last_key else ""
+            params = [cutoff_date, *(last_key or ()), self.delete_batch_size]
+            with self.db._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"""
+                        WITH batch AS (
+                            SELECT id FROM {table_name}
+                            WHERE {column} < %s {condition} {keyset}
+                            ORDER BY {column}, id
+                            LIMIT %s
+                        )
+                        DELETE FROM {table_name} target
+                        USING batch
+                        WHERE target.id = batch.id
+                        RETURNING target.{column}, target.id
+                    """, params)
+                    deleted = cursor.fetchall()
+                conn.commit()
+            
+            if not deleted:
+                break
+            deleted_count += len(deleted)
+            batches += 1
+            last_key = max(deleted)
+            if len(deleted) < self.delete_batch_size:
+                break
+            await asyncio.sleep(self.delete_pause_seconds)
+        
+        return {
+            "method": "batched_delete",
+            "deleted_count": deleted_count,
+            "partitions_dropped": [],
+            "batches": batches
+        }
+    
+    @staticmethod
+    def _check_identifier(name: str):
+        if not _IDENTIFIER.match(name):
+            raise ValueError(f"Invalid table or column name: {name}")
+    
     async def _update_cleanup_timestamp(self, table_name: str):
         """Update the last cleanup timestamp for a table"""
         try:
@@ -8,13 +8,19 @@ import base64
 import binascii
 import json
 import hashlib
-from typing import Dict, Any, Optional, Union
+import struct
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, BinaryIO, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import logging
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 import secrets
 
@@ -23,125 +29,145 @@ from src.common.db_postgresql import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Key-encryption keys come from encryption_keys; keep them in memory this long
+KEY_CACHE_TTL_SECONDS = int(os.getenv("ENCRYPTION_KEY_CACHE_TTL_SECONDS", "300"))
+# A data key encrypts at most this many records (random 96-bit nonces) before a new one is made
+DATA_KEY_MAX_MESSAGES = int(os.getenv("ENCRYPTION_DATA_KEY_MAX_MESSAGES", "100000"))
+DATA_KEY_CACHE_SIZE = 1024
+FILE_SEGMENT_SIZE = int(os.getenv("ENCRYPTION_FILE_SEGMENT_SIZE", str(1024 * 1024)))
+
+# Streaming file format: header, then segments sealed with nonce = prefix || index || last flag
+FILE_MAGIC = b"OPSE"
+FILE_FORMAT_VERSION = 1
+_FILE_HEADER = struct.Struct(">4sBI7sH")
+_LENGTH = struct.Struct(">H")
+_SEGMENT_NONCE = struct.Struct(">IB")
+TAG_SIZE = 16
+
+
+class _DataKey:
+    """A data key in use for envelope encryption, with its wrapped form."""
+
+    __slots__ = ("aesgcm", "wrapped_key", "expires_at", "uses")
+
+    def __init__(self, aesgcm: AESGCM, wrapped_key: str, expires_at: float):
+        self.aesgcm = aesgcm
+        self.wrapped_key = wrapped_key
+        self.expires_at = expires_at
+        self.uses = 0
+
+
 class EncryptionService:
-    """Service for AES-256 encryption and secure key management"""
+    """Service for AES-256 encryption and secure key management
+
+    Records and files use envelope encryption: payloads are sealed with a
+    random data key, and only the data key is sealed ("wrapped") with the
+    key-encryption key stored in ``encryption_keys``. Key-encryption keys are
+    cached for ``KEY_CACHE_TTL_SECONDS``, a record data key is reused for up
+    to ``DATA_KEY_MAX_MESSAGES`` records within the same TTL, and unwrapped
+    data keys are cached so decrypting records that share one unwraps once.
+    """
     
     def __init__(self):
         self.db = DatabaseManager()
         self.master_key = self._get_or_create_master_key()
         self.key_rotation_days = 90  # Rotate keys every 90 days
         self.encryption_algorithm = "AES-256-GCM"
+        self.file_segment_size = FILE_SEGMENT_SIZE
+        self._cache_lock = threading.Lock()
+        self._key_cache: Dict[str, Tuple[bytes, float]] = {}
+        self._data_keys: Dict[str, _DataKey] = {}
+        self._unwrapped_keys: "OrderedDict[Tuple[str, str], Tuple[AESGCM, float]]" = OrderedDict()
         
+    @staticmethod
+    def _to_bytes(data: Union[str, Dict[str, Any]]) -> bytes:
+        if isinstance(data, dict):
+            return json.dumps(data, sort_keys=True).encode('utf-8')
+        return str(data).encode('utf-8')
+    
+    @staticmethod
+    def _from_bytes(data: bytes) -> Union[str, Dict[str, Any]]:
+        # Try to parse as JSON, fallback to string
+        try:
+            return json.loads(data.decode('utf-8'))
+        except json.JSONDecodeError:
+            return data.decode('utf-8')
+    
     def encrypt_data(self, data: Union[str, Dict[str, Any]], key_id: Optional[str] = None) -> Dict[str, Any]:
-        """Encrypt data using AES-256-GCM"""
+        """Encrypt data using AES-256-GCM under an envelope data key"""
+        return self.encrypt_many([data], key_id)[0]
+    
+    def encrypt_many(self, items: List[Union[str, Dict[str, Any]]], key_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Encrypt several payloads with one cached data key; output matches ``encrypt_data``"""
         try:
-            # Convert data to bytes
-            if isinstance(data, dict):
-                data_bytes = json.dumps(data, sort_keys=True).encode('utf-8')
-            else:
-                data_bytes = str(data).encode('utf-8')
-            
-            # Get encryption key
-            encryption_key = self._get_encryption_key(key_id)
-            
-            # Generate random IV
-            iv = os.urandom(12)  # 96-bit IV for GCM
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(encryption_key),
-                modes.GCM(iv),
-                backend=default_backend()
-            )
-            encryptor = cipher.encryptor()
-            
-            # Encrypt data
-            ciphertext = encryptor.update(data_bytes) + encryptor.finalize()
-            
-            # Get authentication tag
-            tag = encryptor.tag
-            
-            # Create encrypted data structure
-            encrypted_data = {
-                "ciphertext": base64.b64encode(ciphertext).decode('utf-8'),
-                "iv": base64.b64encode(iv).decode('utf-8'),
-                "tag": base64.b64encode(tag).decode('utf-8'),
-                "algorithm": self.encryption_algorithm,
-                "key_id": key_id or "default",
-                "encrypted_at": datetime.utcnow().isoformat() + "Z"
-            }
-            
-            return encrypted_data
+            key_id = key_id or "default"
+            data_key = self._current_data_key(key_id, len(items))
+            encrypted_at = datetime.utcnow().isoformat() + "Z"
+            
+            encrypted_items = []
+            for data in items:
+                iv = os.urandom(12)  # 96-bit IV for GCM
+                # AESGCM appends the 16-byte tag to the ciphertext
+                sealed = data_key.aesgcm.encrypt(iv, self._to_bytes(data), None)
+                encrypted_items.append({
+                    "ciphertext": base64.b64encode(sealed[:-TAG_SIZE]).decode('utf-8'),
+                    "iv": base64.b64encode(iv).decode('utf-8'),
+                    "tag": base64.b64encode(sealed[-TAG_SIZE:]).decode('utf-8'),
+                    "wrapped_key": data_key.wrapped_key,
+                    "algorithm": self.encryption_algorithm,
+                    "key_id": key_id,
+                    "encrypted_at": encrypted_at
+                })
+            
+            return encrypted_items
             
         except Exception as e:
-            logger.error(f"Failed to encrypt data: {e}")
+            logger.error(f"Failed to encrypt {len(items)} items: {e}")
             raise
     
     def decrypt_data(self, encrypted_data: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
         """Decrypt data using AES-256-GCM"""
+        return self.decrypt_many([encrypted_data])[0]
+    
+    def decrypt_many(self, encrypted_items: List[Dict[str, Any]]) -> List[Union[str, Dict[str, Any]]]:
+        """Decrypt payloads from ``encrypt_many``/``encrypt_data``, unwrapping each data key once
+        
+        Payloads without ``wrapped_key`` were sealed directly with the stored key
+        and are still accepted.
+        """
         try:
-            # Extract components
-            ciphertext = base64.b64decode(encrypted_data["ciphertext"])
-            iv = base64.b64decode(encrypted_data["iv"])
-            tag = base64.b64decode(encrypted_data["tag"])
-            key_id = encrypted_data.get("key_id", "default")
-            
-            # Get decryption key
-            decryption_key = self._get_encryption_key(key_id)
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(decryption_key),
-                modes.GCM(iv, tag),
-                backend=default_backend()
-            )
-            decryptor = cipher.decryptor()
-            
-            # Decrypt data
-            decrypted_bytes = decryptor.update(ciphertext) + decryptor.finalize()
-            
-            # Try to parse as JSON, fallback to string
-            try:
-                return json.loads(decrypted_bytes.decode('utf-8'))
-            except json.JSONDecodeError:
-                return decrypted_bytes.decode('utf-8')
+            decrypted_items = []
+            for encrypted_data in encrypted_items:
+                ciphertext = base64.b64decode(encrypted_data["ciphertext"])
+                iv = base64.b64decode(encrypted_data["iv"])
+                tag = base64.b64decode(encrypted_data["tag"])
+                key_id = encrypted_data.get("key_id", "default")
+                
+                wrapped_key = encrypted_data.get("wrapped_key")
+                if wrapped_key:
+                    aesgcm = self._unwrap_data_key(key_id, wrapped_key)
+                else:
+                    aesgcm = AESGCM(self._get_encryption_key(key_id))
+                decrypted_items.append(self._from_bytes(aesgcm.decrypt(iv, ciphertext + tag, None)))
+            
+            return decrypted_items
                 
         except Exception as e:
             logger.error(f"Failed to decrypt data: {e}")
             raise
     
     def encrypt_file(self, file_path: str, output_path: str, key_id: Optional[str] = None) -> Dict[str, Any]:
-        """Encrypt a file and save to output path"""
+        """Encrypt a file segment by segment and save to output path"""
         try:
-            with open(file_path, 'rb') as f:
-                file_data = f.read()
-            
-            # Get encryption key
-            encryption_key = self._get_encryption_key(key_id)
-            
-            # Generate random IV
-            iv = os.urandom(12)
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(encryption_key),
-                modes.GCM(iv),
-                backend=default_backend()
-            )
-            encryptor = cipher.encryptor()
-            
-            # Encrypt file data
-            ciphertext = encryptor.update(file_data) + encryptor.finalize()
-            tag = encryptor.tag
-            
-            # Write encrypted file
-            with open(output_path, 'wb') as f:
-                f.write(iv + tag + ciphertext)
+            with open(file_path, 'rb') as source, open(output_path, 'wb') as target:
+                size = self.encrypt_stream(source, target, key_id)
             
             return {
                 "success": True,
                 "output_path": output_path,
                 "key_id": key_id or "default",
+                "size_bytes": size,
+                "segment_size": self.file_segment_size,
                 "encrypted_at": datetime.utcnow().isoformat() + "Z"
             }
             
@@ -150,45 +176,210 @@ class EncryptionService:
             raise
     
     def decrypt_file(self, encrypted_file_path: str, output_path: str, key_id: Optional[str] = None) -> Dict[str, Any]:
-        """Decrypt a file and save to output path"""
+        """Decrypt a file and save to output path
+        
+        Plaintext is written to a temporary file that only replaces
+        ``output_path`` once every segment has authenticated. ``key_id`` is
+        only needed for files written before the streaming format; newer
+        files name their key in the header.
+        """
+        temp_path = f"{output_path}.{uuid.uuid4().hex}.part"
         try:
-            with open(encrypted_file_path, 'rb') as f:
-                encrypted_data = f.read()
-            
-            # Extract IV, tag, and ciphertext
-            iv = encrypted_data[:12]
-            tag = encrypted_data[12:28]
-            ciphertext = encrypted_data[28:]
-            
-            # Get decryption key
-            decryption_key = self._get_encryption_key(key_id)
-            
-            # Create cipher
-            cipher = Cipher(
-                algorithms.AES(decryption_key),
-                modes.GCM(iv, tag),
-                backend=default_backend()
-            )
-            decryptor = cipher.decryptor()
-            
-            # Decrypt file data
-            decrypted_data = decryptor.update(ciphertext) + decryptor.finalize()
-            
-            # Write decrypted file
-            with open(output_path, 'wb') as f:
-                f.write(decrypted_data)
+            with open(encrypted_file_path, 'rb') as source:
+                streaming = source.read(len(FILE_MAGIC)) == FILE_MAGIC
+                source.seek(0)
+                with open(temp_path, 'wb') as target:
+                    if streaming:
+                        size = self.decrypt_stream(source, target)
+                    else:
+                        size = self._decrypt_legacy_file(source, target, key_id)
+            os.replace(temp_path, output_path)
             
             return {
                 "success": True,
                 "output_path": output_path,
                 "key_id": key_id or "default",
+                "size_bytes": size,
                 "decrypted_at": datetime.utcnow().isoformat() + "Z"
             }
             
         except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
             logger.error(f"Failed to decrypt file {encrypted_file_path}: {e}")
             raise
     
+    def encrypt_stream(self, source: BinaryIO, target: BinaryIO, key_id: Optional[str] = None,
+                       segment_size: Optional[int] = None) -> int:
+        """Encrypt ``source`` into ``target`` in fixed-size authenticated segments
+        
+        Each file gets its own data key. Every segment is sealed with AES-GCM
+        using a nonce built from a random prefix, the segment index and a
+        final-segment flag, with the header as associated data, so reordered,
+        dropped, truncated or spliced segments fail to decrypt. Memory use is
+        about two segments regardless of file size. Returns the plaintext size.
+        """
+        key_id = key_id or "default"
+        segment_size = segment_size or self.file_segment_size
+        data_key, wrapped_key = self._wrap_new_data_key(key_id)
+        aesgcm = AESGCM(data_key)
+        nonce_prefix = os.urandom(7)
+        
+        encoded_key_id = key_id.encode('utf-8')
+        header = (
+            _FILE_HEADER.pack(FILE_MAGIC, FILE_FORMAT_VERSION, segment_size, nonce_prefix, len(encoded_key_id))
+            + encoded_key_id + _LENGTH.pack(len(wrapped_key)) + wrapped_key
+        )
+        target.write(header)
+        
+        total = 0
+        index = 0
+        segment = self._read_exact(source, segment_size)
+        while True:
+            # Read one segment ahead so the final one can be flagged
+            next_segment = self._read_exact(source, segment_size) if len(segment) == segment_size else b""
+            last = not next_segment
+            nonce = nonce_prefix + _SEGMENT_NONCE.pack(index, int(last))
+            target.write(aesgcm.encrypt(nonce, segment, header))
+            total += len(segment)
+            if last:
+                return total
+            segment = next_segment
+            index += 1
+    
+    def decrypt_stream(self, source: BinaryIO, target: BinaryIO) -> int:
+        """Decrypt a stream written by ``encrypt_stream``; returns the plaintext size
+        
+        Raises ``cryptography.exceptions.InvalidTag`` on tampering or
+        truncation. Segments are written as they authenticate, so callers
+        writing somewhere visible should discard ``target`` on error.
+        """
+        fixed = self._read_exact(source, _FILE_HEADER.size)
+        if len(fixed) < _FILE_HEADER.size:
+            raise ValueError("Encrypted stream is truncated")
+        magic, version, segment_size, nonce_prefix, key_id_length = _FILE_HEADER.unpack(fixed)
+        if magic != FILE_MAGIC or version != FILE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported encrypted stream format (version {version})")
+        encoded_key_id = self._read_exact(source, key_id_length)
+        wrapped_length = self._read_exact(source, _LENGTH.size)
+        if len(encoded_key_id) < key_id_length or len(wrapped_length) < _LENGTH.size:
+            raise ValueError("Encrypted stream is truncated")
+        wrapped_key = self._read_exact(source, _LENGTH.unpack(wrapped_length)[0])
+        header = fixed + encoded_key_id + wrapped_length + wrapped_key
+        
+        aesgcm = AESGCM(self._unwrap_key(encoded_key_id.decode('utf-8'), wrapped_key))
+        sealed_size = segment_size + TAG_SIZE
+        
+        total = 0
+        index = 0
+        chunk = self._read_exact(source, sealed_size)
+        while True:
+            next_chunk = self._read_exact(source, sealed_size) if len(chunk) == sealed_size else b""
+            last = not next_chunk
+            nonce = nonce_prefix + _SEGMENT_NONCE.pack(index, int(last))
+            # A missing or short final segment fails authentication here
+            plaintext = aesgcm.decrypt(nonce, chunk, header)
+            target.write(plaintext)
+            total += len(plaintext)
+            if last:
+                return total
+            chunk = next_chunk
+            index += 1
+    
+    def _decrypt_legacy_file(self, source: BinaryIO, target: BinaryIO, key_id: Optional[str]) -> int:
+        """Decrypt the original whole-file format: IV, tag, then ciphertext"""
+        iv = source.read(12)
+        tag = source.read(TAG_SIZE)
+        decryptor = Cipher(
+            algorithms.AES(self._get_encryption_key(key_id)),
+            modes.GCM(iv, tag),
+            backend=default_backend()
+        ).decryptor()
+        
+        # Plaintext is only trusted once finalize() verifies the tag
+        total = 0
+        for chunk in iter(lambda: source.read(self.file_segment_size), b""):
+            decrypted = decryptor.update(chunk)
+            target.write(decrypted)
+            total += len(decrypted)
+        target.write(decryptor.finalize())
+        return total
+    
+    @staticmethod
+    def _read_exact(source: BinaryIO, size: int) -> bytes:
+        """Read ``size`` bytes, or fewer only at end of stream"""
+        data = source.read(size)
+        if len(data) == size or not data:
+            return data
+        parts = [data]
+        remaining = size - len(data)
+        while remaining:
+            chunk = source.read(remaining)
+            if not chunk:
+                break
+            parts.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(parts)
+    
+    def _wrap_new_data_key(self, key_id: str) -> Tuple[bytes, bytes]:
+        """Generate a data key and seal it with the key-encryption key ``key_id``"""
+        data_key = AESGCM.generate_key(bit_length=256)
+        nonce = os.urandom(12)
+        wrapped = nonce + AESGCM(self._get_encryption_key(key_id)).encrypt(nonce, data_key, key_id.encode('utf-8'))
+        return data_key, wrapped
+    
+    def _unwrap_key(self, key_id: str, wrapped: bytes) -> bytes:
+        return AESGCM(self._get_encryption_key(key_id)).decrypt(wrapped[:12], wrapped[12:], key_id.encode('utf-8'))
+    
+    def _current_data_key(self, key_id: str, messages: int) -> _DataKey:
+        """Data key for ``messages`` more records, rolling to a new one when used up or expired"""
+        now = time.monotonic()
+        with self._cache_lock:
+            data_key = self._data_keys.get(key_id)
+            if data_key is not None and data_key.expires_at > now and data_key.uses + messages <= DATA_KEY_MAX_MESSAGES:
+                data_key.uses += messages
+                return data_key
+        
+        raw_key, wrapped = self._wrap_new_data_key(key_id)
+        data_key = _DataKey(AESGCM(raw_key), base64.b64encode(wrapped).decode('utf-8'), now + KEY_CACHE_TTL_SECONDS)
+        data_key.uses = messages
+        with self._cache_lock:
+            self._data_keys[key_id] = data_key
+            self._remember_unwrapped((key_id, data_key.wrapped_key), data_key.aesgcm, data_key.expires_at)
+        return data_key
+    
+    def _unwrap_data_key(self, key_id: str, wrapped_key: str) -> AESGCM:
+        cache_key = (key_id, wrapped_key)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._unwrapped_keys.get(cache_key)
+            if cached is not None and cached[1] > now:
+                self._unwrapped_keys.move_to_end(cache_key)
+                return cached[0]
+        
+        aesgcm = AESGCM(self._unwrap_key(key_id, base64.b64decode(wrapped_key)))
+        with self._cache_lock:
+            self._remember_unwrapped(cache_key, aesgcm, now + KEY_CACHE_TTL_SECONDS)
+        return aesgcm
+    
+    def _remember_unwrapped(self, cache_key: Tuple[str, str], aesgcm: AESGCM, expires_at: float):
+        # Caller holds _cache_lock
+        self._unwrapped_keys[cache_key] = (aesgcm, expires_at)
+        self._unwrapped_keys.move_to_end(cache_key)
+        while len(self._unwrapped_keys) > DATA_KEY_CACHE_SIZE:
+            self._unwrapped_keys.popitem(last=False)
+    
+    def _remember_key(self, key_id: str, key: bytes):
+        with self._cache_lock:
+            self._key_cache[key_id] = (key, time.monotonic() + KEY_CACHE_TTL_SECONDS)
+    
+    def clear_key_cache(self):
+        """Forget cached key-encryption keys and data keys (e.g. after rotation)"""
+        with self._cache_lock:
+            self._key_cache.clear()
+            self._data_keys.clear()
+            self._unwrapped_keys.clear()
+    
     def _get_or_create_master_key(self) -> bytes:
         """Get or create master encryption key. Handles invalid base64 env values gracefully."""
         try:
@@ -242,6 +433,10 @@ class EncryptionService:
         try:
             key_id = key_id or "default"
             
+            cached = self._key_cache.get(key_id)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+            
             with self.db._get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute("""
@@ -250,11 +445,11 @@ class EncryptionService:
                     """, (key_id,))
                     
                     result = cursor.fetchone()
-                    if result:
-                        return base64.b64decode(result[0])
             
             # Generate new key if not found
-            return self._generate_new_key(key_id)
+            key = base64.b64decode(result[0]) if result else self._generate_new_key(key_id)
+            self._remember_key(key_id, key)
+            return key
             
         except Exception as e:
             logger.error(f"Failed to get encryption key {key_id}: {e}")
@@ -329,6 +524,9 @@ class EncryptionService:
                             "key_type": key_type
                         })
             
+            if rotated_keys:
+                self.clear_key_cache()
+            
             return {
                 "success": True,
                 "rotated_keys": rotated_keys,
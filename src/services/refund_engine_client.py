@@ -38,18 +38,22 @@ class RefundEngineClient:
             logger.error(f"Create claim failed: {e}")
             return {"error": str(e)}
     
-    async def get_claims(self, user_id: str, status: Optional[str] = None, limit: int = 20, offset: int = 0) -> Dict[str, Any]:
-        """Get user's claims"""
+    async def get_claims(self, user_id: str, status: Optional[str] = None, limit: int = 20, offset: int = 0,
+                         cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Get user's claims; ``cursor`` is the refund engine's own next_cursor"""
         try:
             params = {"userId": user_id, "limit": limit, "offset": offset}
             if status:
                 params["status"] = status
+            if cursor:
+                params["cursor"] = cursor
                 
             response = await service_directory.call_service(
                 self.service_name,
                 "GET",
                 "/api/v1/claims",
-                params=params
+                params=params,
+                hedge=True
             )
             
             if response and response.status_code == 200:
@@ -69,7 +73,8 @@ class RefundEngineClient:
                 self.service_name,
                 "GET",
                 f"/api/v1/claims/{claim_id}",
-                params={"userId": user_id}
+                params={"userId": user_id},
+                hedge=True
             )
             
             if response and response.status_code == 200:
@@ -89,7 +94,8 @@ class RefundEngineClient:
                 self.service_name,
                 "GET",
                 "/api/v1/discrepancies",
-                params={"userId": user_id, "limit": limit, "offset": offset}
+                params={"userId": user_id, "limit": limit, "offset": offset},
+                hedge=True
             )
             
             if response and response.status_code == 200:
@@ -108,7 +114,8 @@ class RefundEngineClient:
                 self.service_name,
                 "GET",
                 "/api/v1/ledger",
-                params={"userId": user_id, "limit": limit, "offset": offset}
+                params={"userId": user_id, "limit": limit, "offset": offset},
+                hedge=True
             )
             
             if response and response.status_code == 200:
@@ -127,7 +134,8 @@ class RefundEngineClient:
                 self.service_name,
                 "GET",
                 "/api/v1/claims/stats",
-                params={"userId": user_id}
+                params={"userId": user_id},
+                hedge=True
             )
             
             if response and response.status_code == 200:
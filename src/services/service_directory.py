@@ -9,6 +9,9 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 import logging
 from src.common.config import settings
+from src.common.resilience import (
+    UPSTREAM_WRITE_TIMEOUT_SECONDS, UpstreamPolicy, UpstreamRejected, deadline_headers
+)
 
 logger = logging.getLogger(__name__)
 
@@ -29,13 +32,26 @@ class ServiceDirectory:
 
     def __init__(self):
         self.services: Dict[str, ServiceInfo] = {}
-        self._http_client = httpx.AsyncClient(timeout=10.0)
+        # Circuit breaker, bulkhead and hedging state per registered service
+        self.policies: Dict[str, UpstreamPolicy] = {}
+        self._client: Optional[httpx.AsyncClient] = None
         self._health_check_interval = 60  # Reduce frequency to avoid rate limiting
         self._max_errors = 3
 
         # Register all microservices
         self._register_services()
 
+    @property
+    def _http_client(self) -> httpx.AsyncClient:
+        # Created on first use: building the client's SSL context is slow at import time
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+        return self._client
+
+    @_http_client.setter
+    def _http_client(self, client: httpx.AsyncClient):
+        self._client = client
+
     def _register_services(self):
         """Register external services (all Python services are now consolidated internally)"""
         # Only register the Node.js backend as an external service
@@ -57,6 +73,7 @@ class ServiceDirectory:
                     base_url=integrations_url,
                     health_endpoint="/health"
                 )
+        self.policies = {name: UpstreamPolicy(name) for name in self.services}
 
     async def check_service_health(self, service_name: str) -> bool:
         """Check health of a specific service with multiple endpoint attempts"""
@@ -90,6 +107,7 @@ class ServiceDirectory:
                     service.response_time_ms = response_time
                     service.error_count = 0
                     service.last_error = f"Endpoint {endpoint} returned {response.status_code}"
+                    self.policies[service_name].breaker.record_health(True)
                     logger.info(f"Service {service_name} is reachable via {endpoint} (status: {response.status_code})")
                     return True
 
@@ -101,6 +119,7 @@ class ServiceDirectory:
         service.last_checked = datetime.utcnow()
         service.error_count += 1
         service.last_error = "All health check endpoints failed"
+        self.policies[service_name].breaker.record_health(False)
         logger.warning(f"Service {service_name} health check failed: All endpoints failed")
         return False
 
@@ -150,12 +169,22 @@ class ServiceDirectory:
                 "last_checked": service.last_checked.isoformat() if service.last_checked else None,
                 "response_time_ms": service.response_time_ms,
                 "error_count": service.error_count,
-                "last_error": service.last_error
+                "last_error": service.last_error,
+                **self.policies[name].get_status()
             }
         return status
 
-    async def call_service(self, service_name: str, method: str, endpoint: str, **kwargs) -> Optional[httpx.Response]:
-        """Make a call to a specific service"""
+    async def call_service(self, service_name: str, method: str, endpoint: str, hedge: bool = False,
+                           **kwargs) -> Optional[httpx.Response]:
+        """Make a call to a specific service
+
+        Calls go through the service's circuit breaker and concurrency limit.
+        GETs time out with the inbound request's deadline, and ``hedge=True``
+        lets one send a second attempt when the first is slower than the
+        service's recent p95. Writes are not idempotent, so they are not cut
+        short by the deadline and default to ``UPSTREAM_WRITE_TIMEOUT_SECONDS``.
+        Returns None when the call fails or is refused.
+        """
         if not self.is_service_healthy(service_name):
             logger.warning(f"Service {service_name} is not healthy, attempting call anyway")
 
@@ -165,21 +194,31 @@ class ServiceDirectory:
             return None
 
         full_url = f"{service_url}{endpoint}"
+        method = method.upper()
+        if method not in ("GET", "POST", "PUT", "DELETE"):
+            logger.error(f"Failed to call {service_name} at {full_url}: Unsupported HTTP method: {method}")
+            return None
+        idempotent = method == "GET"
+        timeout = kwargs.pop("timeout", None)
+        if idempotent:
+            kwargs["headers"] = {**deadline_headers(), **(kwargs.get("headers") or {})}
+        elif timeout is None:
+            timeout = UPSTREAM_WRITE_TIMEOUT_SECONDS
 
-        try:
-            if method.upper() == "GET":
-                response = await self._http_client.get(full_url, **kwargs)
-            elif method.upper() == "POST":
-                response = await self._http_client.post(full_url, **kwargs)
-            elif method.upper() == "PUT":
-                response = await self._http_client.put(full_url, **kwargs)
-            elif method.upper() == "DELETE":
-                response = await self._http_client.delete(full_url, **kwargs)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            return response
+        async def attempt(budget: float) -> httpx.Response:
+            return await self._http_client.request(method, full_url, timeout=budget, **kwargs)
 
+        try:
+            return await self.policies[service_name].call(
+                attempt,
+                hedge=hedge and idempotent,
+                is_failure=lambda response: response.status_code >= 500,
+                timeout=timeout,
+                clip_to_deadline=idempotent
+            )
+        except UpstreamRejected as e:
+            logger.warning(f"Call to {service_name} at {full_url} refused: {e.reason}")
+            return None
         except Exception as e:
             logger.error(f"Failed to call {service_name} at {full_url}: {e}")
             return None
@@ -196,7 +235,9 @@ class ServiceDirectory:
 
     async def close(self):
         """Close the HTTP client"""
-        await self._http_client.aclose()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 # Global service directory instance
 service_directory = ServiceDirectory()
@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+# S3 requires every multipart part except the last to be at least 5 MiB
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+
+class S3MultipartWriter:
+    """Incrementally upload a stream of bytes to one S3 object.
+
+    Data is buffered until a full part is available and then sent as a
+    multipart part. Up to ``max_concurrency`` parts upload in parallel, so
+    memory stays at roughly ``max_concurrency + 1`` parts. Objects smaller
+    than one part are sent with a single ``put_object`` call instead.
+    """
+
+    def __init__(self, s3_manager: Any, bucket_name: str, key: str, content_type: str,
+                 part_size: int = DEFAULT_PART_SIZE, max_concurrency: int = 1):
+        self.s3_manager = s3_manager
+        self.bucket_name = bucket_name
+        self.key = key
+        self.content_type = content_type
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_concurrency = max(1, max_concurrency)
+        self.upload_id: Optional[str] = None
+        self.parts: List[Dict[str, Any]] = []
+        self.bytes_written = 0
+        self._buffer = bytearray()
+        self._next_part_number = 1
+        self._in_flight: Set[asyncio.Task] = set()
+
+    async def write(self, data: bytes) -> None:
+        if not data:
+            return
+        self._buffer += data
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            await self._submit_part(part)
+
+    async def _submit_part(self, data: bytes) -> None:
+        if self.upload_id is None:
+            self.upload_id = await self.s3_manager.create_multipart_upload(
+                bucket_name=self.bucket_name, key=self.key, content_type=self.content_type
+            )
+        while len(self._in_flight) >= self.max_concurrency:
+            done, self._in_flight = await asyncio.wait(
+                self._in_flight, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+        part_number = self._next_part_number
+        self._next_part_number += 1
+        self._in_flight.add(asyncio.create_task(self._upload_part(part_number, data)))
+
+    async def _upload_part(self, part_number: int, data: bytes) -> None:
+        etag = await self.s3_manager.upload_part(
+            bucket_name=self.bucket_name, key=self.key, upload_id=self.upload_id,
+            part_number=part_number, data=data
+        )
+        self.parts.append({"PartNumber": part_number, "ETag": etag})
+
+    async def _wait_in_flight(self) -> None:
+        in_flight, self._in_flight = self._in_flight, set()
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def close(self) -> None:
+        """Flush the remaining bytes and finish the upload."""
+        if self.upload_id is None:
+            await self.s3_manager.put_object(
+                file_content=bytes(self._buffer), bucket_name=self.bucket_name,
+                key=self.key, content_type=self.content_type
+            )
+        else:
+            if self._buffer:
+                await self._submit_part(bytes(self._buffer))
+            await self._wait_in_flight()
+            self.parts.sort(key=lambda part: part["PartNumber"])
+            await self.s3_manager.complete_multipart_upload(
+                bucket_name=self.bucket_name, key=self.key,
+                upload_id=self.upload_id, parts=self.parts
+            )
+        self._buffer.clear()
+
+    async def abort(self) -> None:
+        """Discard buffered data and any parts already uploaded."""
+        self._buffer.clear()
+        for task in self._in_flight:
+            task.cancel()
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._in_flight = set()
+        if self.upload_id is not None:
+            await self.s3_manager.abort_multipart_upload(
+                bucket_name=self.bucket_name, key=self.key, upload_id=self.upload_id
+            )
+            self.upload_id = None
@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from src.storage.multipart import DEFAULT_PART_SIZE, MIN_PART_SIZE
+
+logger = logging.getLogger(__name__)
+
+# S3 allows at most 10,000 parts per multipart upload
+MAX_CHUNKS = 10000
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+DEFAULT_UPLOAD_TTL_SECONDS = 24 * 3600
+# Uploads aborted per expiry sweep
+CLEANUP_BATCH_SIZE = 100
+
+
+class UploadError(Exception):
+    """Raised for invalid resumable-upload requests."""
+
+
+class ResumableUpload:
+    """State of one in-flight upload, as stored in ``resumable_uploads``.
+
+    Neither part ETags nor received chunks are stored: S3 is asked for the
+    parts of the multipart upload, which are the one source of truth whichever
+    instance received them. ``received`` is only filled by
+    ``ResumableUploadManager.get_status``. ``content_hash`` is the SHA-256 of
+    the whole file, set once the object is assembled.
+    """
+
+    __slots__ = (
+        "upload_id", "user_id", "bucket_name", "key", "s3_upload_id", "filename",
+        "content_type", "size_bytes", "chunk_size", "total_chunks", "metadata",
+        "received", "content_hash", "expires_at",
+    )
+
+    def __init__(self, upload_id: str, user_id: str, bucket_name: str, key: str, s3_upload_id: str,
+                 filename: str, content_type: str, size_bytes: int, chunk_size: int,
+                 metadata: Dict[str, Any], expires_at: float):
+        self.upload_id = upload_id
+        self.user_id = user_id
+        self.bucket_name = bucket_name
+        self.key = key
+        self.s3_upload_id = s3_upload_id
+        self.filename = filename
+        self.content_type = content_type
+        self.size_bytes = size_bytes
+        self.chunk_size = chunk_size
+        self.total_chunks = max(1, math.ceil(size_bytes / chunk_size))
+        self.metadata = metadata
+        self.received: List[int] = []
+        self.content_hash: Optional[str] = None
+        self.expires_at = expires_at
+
+    def expected_size(self, index: int) -> int:
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.size_bytes - self.chunk_size * (self.total_chunks - 1)
+
+    def missing_chunks(self) -> List[int]:
+        received = set(self.received)
+        return [index for index in range(self.total_chunks) if index not in received]
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "upload_id": self.upload_id,
+            "filename": self.filename,
+            "size_bytes": self.size_bytes,
+            "chunk_size": self.chunk_size,
+            "total_chunks": self.total_chunks,
+            "received_chunks": list(self.received),
+            "missing_chunks": self.missing_chunks(),
+            "complete": len(self.received) == self.total_chunks,
+        }
+
+
+class ResumableUploadStore:
+    """``resumable_uploads`` rows, shared by every API instance."""
+
+    _COLUMNS = """
+        id, user_id, bucket_name, object_key, s3_upload_id, filename, content_type,
+        size_bytes, chunk_size, metadata, EXTRACT(EPOCH FROM expires_at)
+    """
+
+    def __init__(self, db: Any):
+        self.db = db
+
+    def insert(self, upload: ResumableUpload):
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO resumable_uploads (
+                        id, user_id, bucket_name, object_key, s3_upload_id, filename, content_type,
+                        size_bytes, chunk_size, metadata, expires_at
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, to_timestamp(%s))
+                """, (
+                    upload.upload_id, upload.user_id, upload.bucket_name, upload.key,
+                    upload.s3_upload_id, upload.filename, upload.content_type, upload.size_bytes,
+                    upload.chunk_size, json.dumps(upload.metadata, default=str), upload.expires_at,
+                ))
+            conn.commit()
+
+    def load(self, upload_id: str) -> Optional[ResumableUpload]:
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT {self._COLUMNS} FROM resumable_uploads WHERE id = %s", (upload_id,))
+                row = cursor.fetchone()
+        return self._from_row(row) if row else None
+
+    def touch(self, upload_id: str, expires_at: float):
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE resumable_uploads SET expires_at = to_timestamp(%s), updated_at = NOW()
+                    WHERE id = %s
+                """, (expires_at, upload_id))
+            conn.commit()
+
+    def claim_completion(self, upload_id: str) -> bool:
+        """Mark the upload as completing; False if another request already is."""
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE resumable_uploads SET status = 'completing', updated_at = NOW()
+                    WHERE id = %s AND status = 'open'
+                """, (upload_id,))
+                claimed = cursor.rowcount == 1
+            conn.commit()
+        return claimed
+
+    def release_completion(self, upload_id: str):
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE resumable_uploads SET status = 'open', updated_at = NOW()
+                    WHERE id = %s
+                """, (upload_id,))
+            conn.commit()
+
+    def delete(self, upload_id: str):
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("DELETE FROM resumable_uploads WHERE id = %s", (upload_id,))
+            conn.commit()
+
+    def expired(self, limit: int) -> List[ResumableUpload]:
+        with self.db._get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT {self._COLUMNS} FROM resumable_uploads
+                    WHERE expires_at < NOW() ORDER BY expires_at LIMIT %s
+                """, (limit,))
+                rows = cursor.fetchall()
+        return [self._from_row(row) for row in rows]
+
+    @staticmethod
+    def _from_row(row) -> ResumableUpload:
+        metadata = row[9] if isinstance(row[9], dict) else json.loads(row[9] or "{}")
+        return ResumableUpload(
+            str(row[0]), str(row[1]), row[2], row[3], row[4], row[5], row[6],
+            int(row[7]), int(row[8]), metadata, float(row[10])
+        )
+
+
+class ResumableUploadManager:
+    """Resumable, parallel chunked uploads backed by S3 multipart uploads.
+
+    ``init`` starts a multipart upload and records it in the store, each
+    chunk is uploaded as its own part (re-sending a chunk overwrites the part,
+    so retries are idempotent and chunks may arrive in any order, in parallel
+    and at any instance), and ``complete`` asks S3 for the part list,
+    assembles the object and hashes it. Abandoned uploads expire and are
+    aborted by ``cleanup_expired``.
+    """
+
+    def __init__(self, s3_manager: Any, store: ResumableUploadStore,
+                 default_chunk_size: int = DEFAULT_PART_SIZE,
+                 ttl_seconds: float = DEFAULT_UPLOAD_TTL_SECONDS):
+        self.s3_manager = s3_manager
+        self.store = store
+        self.default_chunk_size = default_chunk_size
+        self.ttl_seconds = ttl_seconds
+        self._last_cleanup = time.time()
+
+    async def init(self, user_id: str, bucket_name: str, filename: str, content_type: str,
+                   size_bytes: int, chunk_size: Optional[int] = None,
+                   metadata: Optional[Dict[str, Any]] = None) -> ResumableUpload:
+        if size_bytes <= 0:
+            raise UploadError("size_bytes must be positive")
+        chunk_size = chunk_size or self.default_chunk_size
+        if not MIN_PART_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise UploadError(f"chunk_size must be between {MIN_PART_SIZE} and {MAX_CHUNK_SIZE} bytes")
+        if math.ceil(size_bytes / chunk_size) > MAX_CHUNKS:
+            raise UploadError(f"File needs more than {MAX_CHUNKS} chunks; use a larger chunk_size")
+
+        if time.time() - self._last_cleanup > 60:
+            await self.cleanup_expired()
+
+        upload_id = str(uuid.uuid4())
+        key = f"evidence/{user_id}/{upload_id}/{filename.rsplit('/', 1)[-1]}"
+        s3_upload_id = await self.s3_manager.create_multipart_upload(
+            bucket_name=bucket_name, key=key, content_type=content_type
+        )
+        upload = ResumableUpload(
+            upload_id, user_id, bucket_name, key, s3_upload_id, filename, content_type,
+            size_bytes, chunk_size, metadata or {}, time.time() + self.ttl_seconds
+        )
+        try:
+            await asyncio.to_thread(self.store.insert, upload)
+        except Exception:
+            await self.s3_manager.abort_multipart_upload(
+                bucket_name=bucket_name, key=key, upload_id=s3_upload_id
+            )
+            raise
+        logger.info(f"Started resumable upload {upload_id} ({upload.total_chunks} chunks) for user {user_id}")
+        return upload
+
+    async def get(self, upload_id: str, user_id: str) -> ResumableUpload:
+        upload = await asyncio.to_thread(self.store.load, upload_id)
+        if upload is None or upload.user_id != user_id or upload.expires_at < time.time():
+            raise KeyError(upload_id)
+        return upload
+
+    async def get_status(self, upload_id: str, user_id: str) -> ResumableUpload:
+        """The upload with ``received`` filled in from S3's part list."""
+        upload = await self.get(upload_id, user_id)
+        parts = await self.s3_manager.list_parts(
+            bucket_name=upload.bucket_name, key=upload.key, upload_id=upload.s3_upload_id
+        )
+        upload.received = sorted(part["PartNumber"] - 1 for part in parts)
+        return upload
+
+    async def put_chunk(self, upload_id: str, user_id: str, index: int, data: bytes) -> ResumableUpload:
+        upload = await self.get(upload_id, user_id)
+        if not 0 <= index < upload.total_chunks:
+            raise UploadError(f"Chunk index must be between 0 and {upload.total_chunks - 1}")
+        if len(data) != upload.expected_size(index):
+            raise UploadError(f"Chunk {index} must be {upload.expected_size(index)} bytes, got {len(data)}")
+
+        await self.s3_manager.upload_part(
+            bucket_name=upload.bucket_name, key=upload.key, upload_id=upload.s3_upload_id,
+            part_number=index + 1, data=data
+        )
+        upload.expires_at = time.time() + self.ttl_seconds
+        await asyncio.to_thread(self.store.touch, upload_id, upload.expires_at)
+        return upload
+
+    async def complete(self, upload_id: str, user_id: str) -> ResumableUpload:
+        upload = await self.get(upload_id, user_id)
+        if not await asyncio.to_thread(self.store.claim_completion, upload_id):
+            raise UploadError("Upload is already being completed")
+        try:
+            parts = await self.s3_manager.list_parts(
+                bucket_name=upload.bucket_name, key=upload.key, upload_id=upload.s3_upload_id
+            )
+            upload.received = sorted(part["PartNumber"] - 1 for part in parts)
+            missing = upload.missing_chunks()
+            if missing:
+                raise UploadError(f"Upload is missing {len(missing)} chunks")
+            await self.s3_manager.complete_multipart_upload(
+                bucket_name=upload.bucket_name, key=upload.key,
+                upload_id=upload.s3_upload_id, parts=parts
+            )
+        except BaseException:
+            await asyncio.to_thread(self.store.release_completion, upload_id)
+            raise
+        # The multipart upload no longer exists; the row must go whatever happens next
+        await asyncio.to_thread(self.store.delete, upload_id)
+        upload.content_hash = await self._hash_object(upload)
+        logger.info(f"Completed resumable upload {upload_id} for user {user_id}")
+        return upload
+
+    async def _hash_object(self, upload: ResumableUpload) -> str:
+        """Whole-file SHA-256, the same content hash a direct upload records."""
+        digest = hashlib.sha256()
+        async for chunk in self.s3_manager.iter_file(upload.bucket_name, upload.key, chunk_size=upload.chunk_size):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    async def abort(self, upload_id: str, user_id: str):
+        upload = await self.get(upload_id, user_id)
+        await asyncio.to_thread(self.store.delete, upload_id)
+        await self.s3_manager.abort_multipart_upload(
+            bucket_name=upload.bucket_name, key=upload.key, upload_id=upload.s3_upload_id
+        )
+
+    async def cleanup_expired(self) -> int:
+        """Abort uploads that have not received a chunk within the TTL."""
+        self._last_cleanup = time.time()
+        expired = await asyncio.to_thread(self.store.expired, CLEANUP_BATCH_SIZE)
+        for upload in expired:
+            try:
+                await self.s3_manager.abort_multipart_upload(
+                    bucket_name=upload.bucket_name, key=upload.key, upload_id=upload.s3_upload_id
+                )
+            except Exception as e:
+                logger.warning(f"Failed to abort expired upload {upload.upload_id}: {e}")
+            await asyncio.to_thread(self.store.delete, upload.upload_id)
+        return len(expired)
@@ -1,11 +1,292 @@
-from typing import Optional
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.common.config import settings
+from src.storage.multipart import DEFAULT_PART_SIZE, MIN_PART_SIZE, S3MultipartWriter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
 
 class S3Manager:
+    """Async object-store client.
+
+    A single boto3 client (thread-safe, with its own HTTP connection pool) is
+    shared by every call, and blocking calls run on a bounded thread pool of
+    the same size so the event loop never waits on the network. Uploads at or
+    above ``multipart_threshold`` go through parallel multipart uploads, and
+    downloads can be streamed or ranged so large evidence files never need to
+    be held whole.
+    """
+
+    def __init__(
+        self,
+        region_name: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        max_pool_connections: int = 32,
+        multipart_threshold: int = DEFAULT_PART_SIZE,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = 8,
+        presign_cache_size: int = 1024,
+        client: Any = None,
+    ):
+        self.region_name = region_name or settings.S3_REGION or "us-east-1"
+        self.endpoint_url = endpoint_url or settings.S3_ENDPOINT_URL or None
+        self.max_pool_connections = max_pool_connections
+        # Parts below S3's minimum are rounded up by the writer, and anything
+        # smaller than one part is a single PUT, so the threshold never sits
+        # below the part size
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.multipart_threshold = max(multipart_threshold, self.part_size)
+        self.max_concurrency = max_concurrency
+        self.presign_cache_size = presign_cache_size
+        self._client = client
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._presigned: "OrderedDict[Tuple[str, str, int], Tuple[str, float]]" = OrderedDict()
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            # boto3/botocore are imported here so importing this module stays cheap
+            import boto3
+            from botocore.config import Config
+
+            credentials = {}
+            if settings.S3_ACCESS_KEY and settings.S3_SECRET_KEY:
+                credentials = {
+                    "aws_access_key_id": settings.S3_ACCESS_KEY,
+                    "aws_secret_access_key": settings.S3_SECRET_KEY,
+                }
+            self._client = boto3.client(
+                "s3",
+                region_name=self.region_name,
+                endpoint_url=self.endpoint_url,
+                config=Config(
+                    max_pool_connections=self.max_pool_connections,
+                    retries={"max_attempts": 5, "mode": "adaptive"},
+                ),
+                **credentials,
+            )
+        return self._client
+
+    async def _call(self, method: str, **kwargs: Any) -> Any:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_pool_connections, thread_name_prefix="s3"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(getattr(self.client, method), **kwargs)
+        )
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    @staticmethod
+    def parse_url(url: str, default_bucket: Optional[str] = None) -> Tuple[str, str]:
+        """Split ``s3://bucket/key`` into (bucket, key); bare keys use ``default_bucket``."""
+        if url.startswith("s3://"):
+            parsed = urlparse(url)
+            return parsed.netloc, parsed.path.lstrip("/")
+        bucket = default_bucket or settings.S3_BUCKET_NAME or os.getenv("S3_BUCKET_NAME", "")
+        return bucket, url
+
+    @staticmethod
+    def _is_missing(error: Exception) -> bool:
+        from botocore.exceptions import ClientError
+
+        return isinstance(error, ClientError) and (
+            error.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound")
+        )
+
+    # Uploads
+
+    def multipart_writer(self, bucket_name: str, key: str, content_type: str) -> S3MultipartWriter:
+        """Writer that streams bytes into ``key`` with parallel part uploads."""
+        return S3MultipartWriter(
+            self, bucket_name=bucket_name, key=key, content_type=content_type,
+            part_size=self.part_size, max_concurrency=self.max_concurrency
+        )
+
+    async def put_object(self, file_content: bytes, bucket_name: str, key: str, content_type: str) -> None:
+        """Upload ``file_content`` with a single PUT."""
+        await self._call(
+            "put_object", Bucket=bucket_name, Key=key, Body=file_content, ContentType=content_type
+        )
+
     async def upload_file(self, file_content: bytes, bucket_name: str, key: str, content_type: str) -> None:
-        # Placeholder no-op implementation
-        return None
+        if len(file_content) < self.multipart_threshold:
+            await self.put_object(file_content, bucket_name, key, content_type)
+            return
+        await self._multipart_upload(
+            (file_content[i:i + self.part_size] for i in range(0, len(file_content), self.part_size)),
+            bucket_name, key, content_type
+        )
+
+    async def upload_fileobj(self, fileobj: BinaryIO, bucket_name: str, key: str, content_type: str) -> int:
+        """Upload a file-like object one part at a time; returns the bytes uploaded."""
+        loop = asyncio.get_running_loop()
+
+        async def chunks() -> AsyncIterator[bytes]:
+            while True:
+                chunk = await loop.run_in_executor(None, fileobj.read, self.part_size)
+                if not chunk:
+                    return
+                yield chunk
+
+        return await self.upload_stream(chunks(), bucket_name, key, content_type)
+
+    async def upload_stream(self, chunks: AsyncIterator[bytes], bucket_name: str, key: str, content_type: str) -> int:
+        """Upload an async stream of chunks; returns the bytes uploaded."""
+        writer = self.multipart_writer(bucket_name, key, content_type)
+        try:
+            async for chunk in chunks:
+                await writer.write(chunk)
+            await writer.close()
+        except BaseException:
+            await writer.abort()
+            raise
+        return writer.bytes_written
+
+    async def _multipart_upload(self, parts: Any, bucket_name: str, key: str, content_type: str) -> None:
+        writer = self.multipart_writer(bucket_name, key, content_type)
+        try:
+            for part in parts:
+                await writer.write(part)
+            await writer.close()
+        except BaseException:
+            await writer.abort()
+            raise
+
+    async def create_multipart_upload(self, bucket_name: str, key: str, content_type: str) -> str:
+        response = await self._call(
+            "create_multipart_upload", Bucket=bucket_name, Key=key, ContentType=content_type
+        )
+        return response["UploadId"]
+
+    async def upload_part(self, bucket_name: str, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        response = await self._call(
+            "upload_part", Bucket=bucket_name, Key=key, UploadId=upload_id,
+            PartNumber=part_number, Body=data
+        )
+        return response["ETag"]
+
+    async def complete_multipart_upload(self, bucket_name: str, key: str, upload_id: str, parts: List[Dict[str, Any]]) -> None:
+        await self._call(
+            "complete_multipart_upload", Bucket=bucket_name, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": parts}
+        )
+
+    async def abort_multipart_upload(self, bucket_name: str, key: str, upload_id: str) -> None:
+        await self._call("abort_multipart_upload", Bucket=bucket_name, Key=key, UploadId=upload_id)
+
+    async def list_parts(self, bucket_name: str, key: str, upload_id: str) -> List[Dict[str, Any]]:
+        """Parts uploaded so far, in the form ``complete_multipart_upload`` expects."""
+        parts: List[Dict[str, Any]] = []
+        kwargs: Dict[str, Any] = {"Bucket": bucket_name, "Key": key, "UploadId": upload_id}
+        while True:
+            response = await self._call("list_parts", **kwargs)
+            parts.extend(
+                {"PartNumber": part["PartNumber"], "ETag": part["ETag"]}
+                for part in response.get("Parts", [])
+            )
+            if not response.get("IsTruncated"):
+                return parts
+            kwargs["PartNumberMarker"] = response["NextPartNumberMarker"]
+
+    async def delete_object(self, bucket_name: str, key: str) -> None:
+        await self._call("delete_object", Bucket=bucket_name, Key=key)
+
+    # Downloads
+
+    async def head_object(self, bucket_name: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self._call("head_object", Bucket=bucket_name, Key=key)
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
 
     async def download_file(self, bucket_name: str, key: str) -> Optional[bytes]:
-        # Placeholder no-op implementation
-        return None
+        """Read a whole object; returns None if it does not exist."""
+        try:
+            response = await self._call("get_object", Bucket=bucket_name, Key=key)
+        except Exception as e:
+            if self._is_missing(e):
+                return None
+            raise
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, response["Body"].read)
+
+    async def download_range(self, bucket_name: str, key: str, start: int, end: Optional[int] = None) -> bytes:
+        """Read bytes ``start``..``end`` (inclusive); ``end=None`` reads to the end."""
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await self._call("get_object", Bucket=bucket_name, Key=key, Range=byte_range)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, response["Body"].read)
+
+    async def iter_file(
+        self,
+        bucket_name: str,
+        key: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream an object (or a byte range of it) in chunks."""
+        kwargs: Dict[str, Any] = {"Bucket": bucket_name, "Key": key}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        response = await self._call("get_object", **kwargs)
+        body = response["Body"]
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(self._executor, body.read, chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            body.close()
+
+    # Presigned URLs
+
+    async def generate_presigned_url(
+        self,
+        url_or_key: str,
+        hours_valid: int = 24,
+        bucket_name: Optional[str] = None,
+    ) -> str:
+        """Presigned GET URL for ``s3://bucket/key`` (or a key in ``bucket_name``).
+
+        URLs are cached and reused while more than half of their validity
+        remains, so repeated downloads of the same packet do not re-sign.
+        """
+        bucket, key = self.parse_url(url_or_key, bucket_name)
+        expires_in = int(hours_valid * 3600)
+        cache_key = (bucket, key, expires_in)
+        now = time.time()
+
+        cached = self._presigned.get(cache_key)
+        if cached is not None and cached[1] - now > expires_in / 2:
+            self._presigned.move_to_end(cache_key)
+            return cached[0]
 
+        signed_url = self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": bucket, "Key": key}, ExpiresIn=expires_in
+        )
+        self._presigned[cache_key] = (signed_url, now + expires_in)
+        self._presigned.move_to_end(cache_key)
+        while len(self._presigned) > self.presign_cache_size:
+            self._presigned.popitem(last=False)
+        return signed_url
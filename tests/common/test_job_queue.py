@@ -0,0 +1,171 @@
+"""
+Tests for the durable job queue and its workers
+"""
+
+import asyncio
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from src.common.job_queue import (
+    DEAD, QUEUED, Job, JobQueue, PermanentJobError, QueueConfig, QueueWorker
+)
+
+
+class Payload(BaseModel):
+    document_id: str
+
+
+def make_queue(**overrides) -> JobQueue:
+    config = QueueConfig(name="test_queue", payload_model=Payload, **overrides)
+    return JobQueue(config, db=MagicMock())
+
+
+def make_job(attempts=1, max_attempts=3, priority=0, job_id="job-1") -> Job:
+    return Job(id=job_id, queue="test_queue", payload=Payload(document_id="doc-1"),
+               attempts=attempts, max_attempts=max_attempts, priority=priority)
+
+
+def mock_cursor(queue: JobQueue) -> Mock:
+    cursor = Mock(rowcount=1)
+    conn = queue.db._get_connection.return_value.__enter__.return_value
+    conn.cursor.return_value.__enter__.return_value = cursor
+    return cursor
+
+
+class TestJobQueue:
+    """Test cases for JobQueue"""
+
+    def test_enqueue_joins_caller_transaction_and_dedupes(self):
+        queue = make_queue()
+        cursor = Mock()
+        cursor.fetchone.return_value = ("job-1",)
+
+        assert queue.enqueue({"document_id": "doc-1"}, job_id="job-1", dedupe_key="doc-1", cursor=cursor) == "job-1"
+        params = cursor.execute.call_args[0][1]
+        assert params[1] == "test_queue" and '"document_id": "doc-1"' in params[2]
+        queue.db._get_connection.assert_not_called()
+
+        # A waiting job under the same key absorbs the new one
+        assert queue.enqueue(Payload(document_id="doc-1"), job_id="job-2", dedupe_key="doc-1", cursor=cursor) == "job-1"
+        assert queue.stats["enqueued"] == 1 and queue.stats["deduplicated"] == 1
+
+    def test_enqueue_validates_payload(self):
+        with pytest.raises(ValueError):
+            make_queue().enqueue({"wrong": "field"}, cursor=Mock())
+
+    def test_lease_returns_typed_jobs_by_priority(self):
+        queue = make_queue()
+        cursor = mock_cursor(queue)
+        cursor.rowcount = 0
+        cursor.fetchall.return_value = [
+            ("low", {"document_id": "a"}, 1, 3, 0, None, None, 2.0),
+            ("high", '{"document_id": "b"}', 2, 3, 10, None, "boom", 4.0),
+        ]
+
+        jobs = queue.lease(5)
+
+        assert [job.id for job in jobs] == ["high", "low"]
+        assert jobs[0].payload == Payload(document_id="b") and jobs[0].last_error == "boom"
+        lease_sql = cursor.execute.call_args[0][0]
+        assert "FOR UPDATE SKIP LOCKED" in lease_sql and "ORDER BY priority DESC" in lease_sql
+        assert queue.get_metrics()["wait_seconds_p95"] == 4.0
+
+    def test_fail_backs_off_then_dead_letters(self):
+        queue = make_queue(backoff_base_seconds=10, backoff_max_seconds=25)
+        cursor = mock_cursor(queue)
+
+        assert queue.fail(make_job(attempts=1), "timeout") == QUEUED
+        status, delay = cursor.execute.call_args[0][1][:2]
+        assert status == QUEUED and 5 <= delay <= 10
+
+        assert queue.fail(make_job(attempts=3), "timeout") == DEAD
+        assert queue.fail(make_job(attempts=1), "bad input", permanent=True) == DEAD
+        assert queue.stats["retried"] == 1 and queue.stats["dead_lettered"] == 2
+
+    def test_stale_lease_cannot_finish_a_newer_attempt(self):
+        queue = make_queue()
+        cursor = mock_cursor(queue)
+        cursor.rowcount = 0
+
+        assert queue.complete(make_job(attempts=1)) is False
+        assert cursor.execute.call_args[0][1] == ("job-1", 1)
+        assert queue.fail(make_job(attempts=1), "timeout") is None
+        assert not queue.renew_lease(make_job(attempts=1))
+        assert queue.stats["completed"] == 0 and queue.stats["retried"] == 0
+
+    def test_retry_delay_is_exponential_and_capped(self):
+        queue = make_queue(backoff_base_seconds=10, backoff_max_seconds=60)
+        with patch("src.common.job_queue.random.uniform", return_value=1.0):
+            assert [queue.retry_delay(n) for n in (1, 2, 3, 4, 5)] == [10, 20, 40, 60, 60]
+
+
+class TestQueueWorker:
+    """Test cases for QueueWorker"""
+
+    @pytest.mark.asyncio
+    async def test_runs_handler_and_completes(self):
+        queue = make_queue()
+        queue.lease = Mock(return_value=[make_job()])
+        queue.complete = Mock()
+        handled = []
+
+        async def handler(job):
+            handled.append(job.payload.document_id)
+
+        worker = QueueWorker(queue, handler)
+        assert await worker.run_once() == 1
+        await asyncio.gather(*worker._tasks)
+
+        assert handled == ["doc-1"]
+        queue.complete.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_permanent_failure_calls_dead_letter_hook(self):
+        queue = make_queue()
+        queue.lease = Mock(return_value=[make_job()])
+        queue.fail = Mock(return_value=DEAD)
+        dead = []
+
+        def handler(job):
+            raise PermanentJobError("document not found")
+
+        worker = QueueWorker(queue, handler, on_dead=lambda job, error: dead.append(error))
+        await worker.run_once()
+        await asyncio.gather(*worker._tasks)
+
+        job, error, permanent = queue.fail.call_args[0]
+        assert permanent is True and "document not found" in error
+        assert dead == [error]
+
+    @pytest.mark.asyncio
+    async def test_lease_is_renewed_while_handler_runs(self):
+        queue = make_queue(heartbeat_seconds=0.01)
+        queue.lease = Mock(return_value=[make_job()])
+        queue.renew_lease = Mock(return_value=True)
+        queue.complete = Mock()
+
+        async def handler(job):
+            await asyncio.sleep(0.05)
+
+        worker = QueueWorker(queue, handler)
+        await worker.run_once()
+        await asyncio.gather(*worker._tasks)
+        renewals = queue.renew_lease.call_count
+        await asyncio.sleep(0.03)
+
+        assert renewals >= 2
+        assert queue.renew_lease.call_count == renewals
+        queue.complete.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_caps_leased_jobs(self):
+        queue = make_queue(concurrency=4, rate_per_second=0.001)
+        queue.lease = Mock(return_value=[])
+        worker = QueueWorker(queue, Mock())
+        worker._tokens = 1.5
+
+        await worker.run_once()
+
+        assert queue.lease.call_args[0][0] == 1
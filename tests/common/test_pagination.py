@@ -0,0 +1,73 @@
+"""
+Tests for the shared keyset pagination helper
+"""
+
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.common.pagination import CursorError, KeysetPage, decode_cursor, encode_cursor
+from src.integrations.amazon_spapi_service import amazon_spapi_service
+
+
+class TestCursors:
+    """Test cases for signed cursors"""
+
+    def test_round_trip(self):
+        cursor = encode_cursor([datetime(2026, 5, 1, 8, 30), "row-1"], "jobs:user-1")
+        assert decode_cursor(cursor, "jobs:user-1", 2) == ["2026-05-01T08:30:00", "row-1"]
+
+    def test_rejects_tampering_and_other_scopes(self):
+        cursor = encode_cursor(["2026-05-01T08:30:00", "row-1"], "jobs:user-1")
+        payload, signature = cursor.split(".")
+        forged = encode_cursor(["2099-01-01T00:00:00", "row-1"], "jobs:user-1").split(".")[0] + "." + signature
+
+        for bad in (forged, "garbage", payload):
+            with pytest.raises(CursorError):
+                decode_cursor(bad, "jobs:user-1", 2)
+        with pytest.raises(CursorError):
+            decode_cursor(cursor, "jobs:user-2", 2)
+
+
+class TestKeysetPage:
+    """Test cases for page building"""
+
+    def test_first_page_honours_deprecated_offset(self):
+        page = KeysetPage("t.created_at", "t.id", None, 30, 10, scope="s")
+        assert page.where() == ("", [])
+        assert page.order_by() == "ORDER BY t.created_at DESC, t.id DESC"
+        assert page.limit_params() == [11, 30]
+
+    def test_cursor_page_ignores_offset_and_chains(self):
+        rows = [(f"id-{i}", f"2026-05-0{9 - i}") for i in range(4)]
+        first = KeysetPage("t.created_at", "t.id", None, 0, 3, scope="s")
+        kept, has_more, next_cursor = first.finish(rows, key=lambda row: (row[1], row[0]))
+        assert kept == rows[:3] and has_more is True
+
+        second = KeysetPage("t.created_at", "t.id", next_cursor, 50, 3, scope="s")
+        assert second.where() == ("AND (t.created_at, t.id) < (%s, %s)", ["2026-05-07", "id-2"])
+        assert second.limit_params() == [4, 0]
+        assert second.finish(rows[3:], key=lambda row: (row[1], row[0])) == ([rows[3]], False, None)
+
+
+class TestSubmissionPagination:
+    """Test cases for dispute submission paging"""
+
+    @pytest.mark.asyncio
+    async def test_status_filter_runs_in_sql(self):
+        created = datetime(2026, 5, 1)
+        row = ("sub-1", "S1", None, "O1", None, "SKU", "lost", 10, "USD", "submitted", 0.9,
+               None, None, None, created, created)
+        cursor = Mock()
+        cursor.fetchall.return_value = [row, row]
+        cursor.fetchone.return_value = (5,)
+
+        with patch.object(amazon_spapi_service.db, "_connection", create=True) as mock_conn:
+            mock_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+            result = await amazon_spapi_service.get_user_submissions("user-1", limit=1, status="submitted")
+
+        sql, params = cursor.execute.call_args_list[0][0]
+        assert "status = %s" in sql and params == ["user-1", "submitted", 2, 0]
+        assert len(result["submissions"]) == 1 and result["has_more"] is True
+        assert decode_cursor(result["next_cursor"], "dispute_submissions:user-1:submitted", 2)[1] == "sub-1"
@@ -0,0 +1,178 @@
+"""
+Tests for upstream circuit breakers, bulkheads, deadlines and hedging
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.common.resilience import (
+    CircuitBreaker, UpstreamPolicy, UpstreamRejected, deadline_headers, remaining_budget,
+    reset_deadline, set_deadline
+)
+from src.api.service_connector import ServiceConnector
+from src.services.service_directory import ServiceDirectory, ServiceInfo
+
+
+def slow(result, delay):
+    async def attempt(budget):
+        await asyncio.sleep(delay)
+        return result
+    return attempt
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker"""
+
+    def test_opens_after_threshold_and_allows_one_probe(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_health_monitor_feeds_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60)
+        breaker.record_health(False)
+        assert breaker.allow_request() is False
+
+        breaker.record_health(True)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow_request() is True
+
+
+class TestUpstreamPolicy:
+    """Test cases for UpstreamPolicy"""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        policy = UpstreamPolicy("refund-engine", breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        await policy.call(slow(Mock(status_code=503), 0), is_failure=lambda r: r.status_code >= 500)
+
+        attempt = AsyncMock()
+        with pytest.raises(UpstreamRejected) as exc_info:
+            await policy.call(attempt)
+        assert exc_info.value.reason == "circuit_open"
+        attempt.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_sheds_excess_calls(self):
+        policy = UpstreamPolicy("mcde", max_concurrent=2, queue_timeout=0.01)
+
+        results = await asyncio.gather(*[policy.call(slow("ok", 0.05)) for _ in range(3)], return_exceptions=True)
+
+        assert results.count("ok") == 2
+        rejected = [r for r in results if isinstance(r, UpstreamRejected)]
+        assert len(rejected) == 1 and rejected[0].reason == "bulkhead_full"
+        assert policy.breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_deadline_clips_timeout(self):
+        policy = UpstreamPolicy("refund-engine", timeout=10)
+        budgets = []
+
+        async def attempt(budget):
+            budgets.append(budget)
+            await asyncio.sleep(1)
+
+        token = set_deadline(0.05)
+        try:
+            assert remaining_budget(10) <= 0.05
+            assert 0 <= int(deadline_headers()["X-Request-Timeout-Ms"]) <= 50
+            with pytest.raises(asyncio.TimeoutError):
+                await policy.call(attempt)
+        finally:
+            reset_deadline(token)
+
+        assert budgets[0] <= 0.05
+        assert policy.breaker.failures == 1
+        assert remaining_budget(10) == 10
+
+    @pytest.mark.asyncio
+    async def test_slow_get_is_hedged(self):
+        policy = UpstreamPolicy("refund-engine")
+        policy._latencies.extend([0.01] * 20)
+        delays = iter([1.0, 0.0])
+
+        async def attempt(budget):
+            delay = next(delays)
+            await asyncio.sleep(delay)
+            return delay
+
+        assert await asyncio.wait_for(policy.call(attempt, hedge=True), timeout=0.5) == 0.0
+        assert policy.stats["hedged"] == 1 and policy.stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_unclipped_call_keeps_its_timeout(self):
+        policy = UpstreamPolicy("refund-engine", timeout=10)
+        budgets = []
+
+        async def attempt(budget):
+            budgets.append(budget)
+
+        token = set_deadline(0.05)
+        try:
+            await policy.call(attempt, timeout=300, clip_to_deadline=False)
+        finally:
+            reset_deadline(token)
+
+        assert budgets[0] > 299
+
+
+class TestServiceDirectoryResilience:
+    """Test cases for ServiceDirectory.call_service"""
+
+    @pytest.mark.asyncio
+    async def test_failed_health_check_short_circuits_calls(self):
+        directory = ServiceDirectory()
+        directory.services = {"integrations": ServiceInfo("opside-node-api", "http://node", "/health")}
+        directory.policies = {"integrations": UpstreamPolicy("integrations")}
+        directory._http_client = Mock()
+        directory._http_client.get = AsyncMock(side_effect=Exception("down"))
+        directory._http_client.request = AsyncMock()
+
+        assert await directory.check_service_health("integrations") is False
+        assert await directory.call_service("integrations", "GET", "/api/v1/claims") is None
+        directory._http_client.request.assert_not_called()
+        assert directory.get_all_services_status()["integrations"]["circuit_state"] == "open"
+
+    @pytest.mark.asyncio
+    async def test_writes_are_not_clipped_to_the_deadline(self):
+        directory = ServiceDirectory()
+        directory.services = {"refund-engine": ServiceInfo("refund-engine", "http://refunds", "/health", is_healthy=True)}
+        directory.policies = {"refund-engine": Mock()}
+        directory.policies["refund-engine"].call = AsyncMock(return_value=Mock(status_code=201))
+
+        await directory.call_service("refund-engine", "GET", "/api/v1/claims")
+        assert directory.policies["refund-engine"].call.call_args.kwargs["clip_to_deadline"] is True
+
+        await directory.call_service("refund-engine", "POST", "/api/v1/claims", json={})
+        kwargs = directory.policies["refund-engine"].call.call_args.kwargs
+        assert kwargs["clip_to_deadline"] is False
+        assert kwargs["timeout"] == 300
+
+
+class TestServiceConnectorTimeouts:
+    """Test cases for ServiceConnector.call_service timeouts"""
+
+    @pytest.mark.asyncio
+    async def test_only_gets_are_clipped_to_the_deadline(self):
+        connector = ServiceConnector()
+        policy = connector.policies["dispute_automation"] = Mock()
+        policy.call = AsyncMock(return_value=(200, {}))
+
+        await connector.call_service("dispute_automation", "/api/v1/cases/1", "GET")
+        assert policy.call.call_args.kwargs["clip_to_deadline"] is True
+        assert policy.call.call_args.kwargs["timeout"] is None
+
+        await connector.call_service("dispute_automation", "/api/v1/cases", "POST", data={})
+        assert policy.call.call_args.kwargs["clip_to_deadline"] is False
+        assert policy.call.call_args.kwargs["timeout"] == 300
+
+        await connector.call_service("dispute_automation", "/api/v1/cases", "POST", data={}, timeout=45)
+        assert policy.call.call_args.kwargs["timeout"] == 45
@@ -0,0 +1,128 @@
+"""
+Tests for the stale-while-revalidate response cache
+"""
+
+import asyncio
+
+import pytest
+
+from src.common import response_cache as response_cache_module
+from src.common.response_cache import ResponseCache
+from src.events.event_system import event_system, EVENT_TYPES
+
+
+class Upstream:
+    """Counts calls and returns successive values, optionally after a delay"""
+
+    def __init__(self, *values, delay=0.0):
+        self.values = list(values)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        value = self.values[min(self.calls, len(self.values)) - 1]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache"""
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit_skips_upstream(self):
+        cache = ResponseCache(ttl=30, stale_ttl=60)
+        upstream = Upstream({"total": 1})
+
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 1}
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 1}
+        assert upstream.calls == 1
+        assert cache.get_metrics()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_while_refreshing(self):
+        cache = ResponseCache(ttl=0, stale_ttl=60)
+        upstream = Upstream({"total": 1}, {"total": 2}, delay=0.01)
+
+        await cache.get_or_fetch("stats", "user-1", upstream)
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 1}
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 1}
+        await asyncio.sleep(0.03)
+
+        assert upstream.calls == 2
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 2}
+        assert cache.get_metrics()["stale_hits"] == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_refetched(self):
+        cache = ResponseCache(ttl=0, stale_ttl=0)
+        upstream = Upstream({"total": 1}, {"total": 2})
+
+        await cache.get_or_fetch("stats", "user-1", upstream)
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 2}
+        assert cache.get_metrics()["misses"] == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self):
+        cache = ResponseCache()
+        upstream = Upstream({"total": 1}, delay=0.01)
+
+        results = await asyncio.gather(*[cache.get_or_fetch("stats", "user-1", upstream) for _ in range(20)])
+
+        assert upstream.calls == 1
+        assert all(result == {"total": 1} for result in results)
+        assert cache.get_metrics()["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cached(self):
+        cache = ResponseCache()
+        upstream = Upstream({"error": "down"}, RuntimeError("boom"), {"total": 3})
+        cacheable = lambda value: "error" not in value
+
+        assert await cache.get_or_fetch("stats", "user-1", upstream, cacheable=cacheable) == {"error": "down"}
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("stats", "user-1", upstream, cacheable=cacheable)
+        assert await cache.get_or_fetch("stats", "user-1", upstream, cacheable=cacheable) == {"total": 3}
+        assert len(cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_caller_timeout_does_not_cancel_fetch(self):
+        cache = ResponseCache()
+        upstream = Upstream({"total": 1}, delay=0.05)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_fetch("stats", "user-1", upstream), timeout=0.01)
+        await asyncio.sleep(0.08)
+
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 1}
+        assert upstream.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidation_discards_in_flight_result(self):
+        cache = ResponseCache()
+        upstream = Upstream({"total": 1}, {"total": 2}, delay=0.01)
+        other = Upstream({"total": 9})
+        await cache.get_or_fetch("stats", "user-2", other)
+
+        pending = asyncio.ensure_future(cache.get_or_fetch("stats", "user-1", upstream))
+        await asyncio.sleep(0)
+        cache.invalidate_user("user-1")
+        assert await pending == {"total": 1}
+
+        assert await cache.get_or_fetch("stats", "user-1", upstream) == {"total": 2}
+        assert await cache.get_or_fetch("stats", "user-2", other) == {"total": 9}
+        assert other.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_completed_event_invalidates_user(self):
+        upstream = Upstream({"total": 1}, {"total": 2})
+        cache = response_cache_module.response_cache
+
+        try:
+            await cache.get_or_fetch("stats", "user-event", upstream)
+            await event_system.emit_event(EVENT_TYPES["SYNC_COMPLETED"], {"user_id": "user-event"}, "user-event")
+            assert await cache.get_or_fetch("stats", "user-event", upstream) == {"total": 2}
+        finally:
+            cache.invalidate_user("user-event")
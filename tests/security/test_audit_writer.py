@@ -0,0 +1,129 @@
+"""
+Tests for the batched audit log writer
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+
+from src.security import audit_service
+from src.security.audit_service import AUDIT_LOG_COLUMNS, AuditLogWriter, AuditService, AuditAction, AuditSeverity
+
+
+def make_event(event_id, sensitive_data=None, severity="medium"):
+    return {
+        "id": event_id,
+        "action": "login",
+        "resource_type": "user",
+        "severity": severity,
+        "security_context": {"timestamp": "2026-01-01T00:00:00Z"},
+        "sensitive_data": sensitive_data,
+        "created_at": "2026-01-01T00:00:00Z"
+    }
+
+
+@pytest.fixture
+def writer(tmp_path):
+    encryption = Mock()
+    encryption.encrypt_many.side_effect = lambda items: [{"ciphertext": f"enc:{item}"} for item in items]
+    return AuditLogWriter(
+        db=MagicMock(), encryption=encryption, batch_size=3, flush_interval=60,
+        max_buffer=4, spool_path=str(tmp_path / "audit_spool.jsonl")
+    )
+
+
+class TestAuditLogWriter:
+    """Test cases for AuditLogWriter"""
+
+    @pytest.mark.asyncio
+    async def test_batches_rows_and_encrypts_once_per_batch(self, writer):
+        with patch("psycopg2.extras.execute_values") as execute_values:
+            for index in range(4):
+                await writer.submit(make_event(f"e{index}", sensitive_data="secret" if index < 2 else None))
+            await writer.shutdown()
+
+        assert [len(call.args[2]) for call in execute_values.call_args_list] == [3, 1]
+        assert writer.encryption.encrypt_many.call_count == 1
+        first_row = execute_values.call_args_list[0].args[2][0]
+        encrypted = first_row[AUDIT_LOG_COLUMNS.index("encrypted_data")]
+        assert json.loads(encrypted) == {"ciphertext": "enc:secret"}
+        assert "secret" not in json.dumps(execute_values.call_args_list[0].args[2][2])
+
+        metrics = writer.get_metrics()
+        assert metrics["written"] == 4
+        assert metrics["backlog"] == 0
+        assert metrics["batches"] == 2
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_drops_low_severity_and_writes_critical_inline(self, writer):
+        writer.batch_size = 10
+        with patch("psycopg2.extras.execute_values") as execute_values:
+            for index in range(4):
+                await writer.submit(make_event(f"e{index}"))
+            assert await writer.submit(make_event("low")) is False
+            assert await writer.submit(make_event("critical", severity="critical"), critical=True) is True
+
+            assert execute_values.call_count == 1
+            assert execute_values.call_args.args[2][0][0] == "critical"
+            await writer.shutdown()
+
+        assert writer.get_metrics()["dropped"] == 1
+        assert writer.get_metrics()["written_inline"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_spooled_encrypted_and_replayed(self, writer):
+        with patch("psycopg2.extras.execute_values", side_effect=RuntimeError("db down")):
+            await writer.submit(make_event("e1", sensitive_data="secret"))
+            await writer.flush()
+
+        with open(writer.spool_path) as spool:
+            spooled = spool.read()
+        assert "enc:secret" in spooled and '"secret"' not in spooled
+        assert writer.get_metrics()["spooled"] == 1
+
+        with patch("psycopg2.extras.execute_values") as execute_values:
+            await writer.submit(make_event("e2"))
+            await writer.flush()
+
+        replayed_ids = [row[0] for call in execute_values.call_args_list for row in call.args[2]]
+        assert replayed_ids == ["e2", "e1"]
+        assert writer.get_metrics()["replayed"] == 1
+        assert writer.get_metrics()["spool_bytes"] == 0
+
+    def test_buffered_events_are_flushed_at_exit_without_a_hook_per_writer(self, writer):
+        writer._buffer.append(make_event("e1"))
+        with patch("atexit.register") as register, patch.object(writer, "write_batch") as write_batch:
+            AuditLogWriter(writer.db, writer.encryption, spool_path=writer.spool_path)
+            audit_service._flush_writers_at_exit()
+        register.assert_not_called()
+        assert write_batch.call_args.args[0][0]["id"] == "e1"
+
+    @pytest.mark.asyncio
+    async def test_log_event_returns_before_the_write(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("AUDIT_SPOOL_PATH", str(tmp_path / "audit_spool.jsonl"))
+        service = AuditService()
+        service.writer = AuditLogWriter(service.db, Mock(), flush_interval=60)
+        with patch("psycopg2.extras.execute_values") as execute_values:
+            event_id = await service.log_event(action=AuditAction.LOGIN, user_id="user123",
+                                               severity=AuditSeverity.LOW)
+            assert execute_values.call_count == 0
+            assert len(service.writer) == 1
+
+            with patch.object(service.db, "_get_connection"):
+                await service.shutdown()
+        assert execute_values.call_args.args[2][0][0] == event_id
+
+    @pytest.mark.asyncio
+    async def test_app_shutdown_flushes_the_audit_writer(self):
+        from src import app as app_module
+        from src.security.audit_service import audit_service as service
+
+        with patch.object(app_module, "start_job_workers", AsyncMock()), \
+                patch.object(app_module, "stop_job_workers", AsyncMock()), \
+                patch.object(app_module.service_directory, "services", {}), \
+                patch.object(app_module.service_directory, "close", AsyncMock()), \
+                patch.object(service, "shutdown", AsyncMock()) as shutdown:
+            async with app_module.lifespan(app_module.app):
+                shutdown.assert_not_awaited()
+        shutdown.assert_awaited_once()
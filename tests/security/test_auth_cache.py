@@ -0,0 +1,118 @@
+"""
+Tests for the verified-token and permission caches on the auth path
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import jwt
+import pytest
+
+from src.api import auth_middleware
+from src.api.auth_middleware import JWTError, clear_token_cache, create_jwt_token, verify_jwt_token
+from src.security.access_control import AccessControlService, Permission, Role
+
+
+@pytest.fixture(autouse=True)
+def fresh_token_cache():
+    clear_token_cache()
+    yield
+    clear_token_cache()
+
+
+def mock_cursor_for(service):
+    patcher = patch.object(service.db, "_get_connection")
+    mock_conn = patcher.start()
+    cursor = Mock()
+    mock_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+    return patcher, cursor
+
+
+class TestTokenCache:
+    """Test cases for verified JWT caching"""
+
+    def test_repeat_verification_skips_decode(self):
+        token = create_jwt_token({"user_id": "user123", "exp": int(time.time()) + 3600})
+
+        with patch.object(auth_middleware.jwt, "decode", wraps=jwt.decode) as decode:
+            first = verify_jwt_token(token)
+            second = verify_jwt_token(token)
+
+        assert decode.call_count == 1
+        assert first == second
+        assert first["user_id"] == "user123"
+
+        # Callers get their own copy of the claims
+        second["user_id"] = "tampered"
+        assert verify_jwt_token(token)["user_id"] == "user123"
+
+    def test_entries_expire_with_the_token(self):
+        token = create_jwt_token({"user_id": "user123", "exp": int(time.time()) + 3600})
+        verify_jwt_token(token)
+
+        # Past exp the cached claims are discarded and the token is checked again
+        with patch.object(auth_middleware.time, "time", return_value=time.time() + 7200), \
+                patch.object(auth_middleware.jwt, "decode", side_effect=jwt.ExpiredSignatureError) as decode:
+            with pytest.raises(JWTError):
+                verify_jwt_token(token)
+        assert decode.called
+
+    def test_invalid_tokens_are_not_cached(self):
+        with pytest.raises(JWTError):
+            verify_jwt_token("not-a-token")
+        assert len(auth_middleware._verified_tokens) == 0
+
+
+class TestPermissionCache:
+    """Test cases for per-user permission caching"""
+
+    @pytest.mark.asyncio
+    async def test_permission_set_answers_checks_without_db(self):
+        service = AccessControlService()
+        patcher, cursor = mock_cursor_for(service)
+        try:
+            cursor.fetchall.return_value = [(["evidence:read", "dispute:read"], None)]
+            permissions = await service.get_user_permissions("user123")
+            assert permissions == {Permission.EVIDENCE_READ, Permission.DISPUTE_READ}
+
+            cursor.execute.reset_mock()
+            assert await service.check_permission("user123", Permission.EVIDENCE_READ) is True
+            assert await service.check_permission("user123", Permission.ADMIN_WRITE) is False
+            assert await service.get_user_permissions("user123") == permissions
+            cursor.execute.assert_not_called()
+        finally:
+            patcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_permission_set_expires_with_earliest_role(self):
+        service = AccessControlService()
+        patcher, cursor = mock_cursor_for(service)
+        try:
+            soon = datetime.now(timezone.utc) + timedelta(seconds=5)
+            cursor.fetchall.return_value = [(["evidence:read"], soon)]
+            await service.get_user_permissions("user123")
+            assert service._permission_cache["user123"].expires_at <= soon.timestamp()
+        finally:
+            patcher.stop()
+
+    @pytest.mark.asyncio
+    async def test_decisions_are_cached_and_invalidated_on_role_changes(self):
+        service = AccessControlService()
+        patcher, cursor = mock_cursor_for(service)
+        try:
+            cursor.fetchone.return_value = (False,)
+            assert await service.check_permission("user123", Permission.EVIDENCE_WRITE) is False
+            assert await service.check_permission("user123", Permission.EVIDENCE_WRITE) is False
+            assert cursor.execute.call_count == 1
+
+            role_id = await service.assign_role("user123", Role.SELLER, granted_by="admin")
+            cursor.fetchone.return_value = (True,)
+            assert await service.check_permission("user123", Permission.EVIDENCE_WRITE) is True
+
+            cursor.rowcount = 1
+            cursor.fetchone.return_value = ("user123",)
+            assert await service.revoke_role(role_id, "admin") is True
+            assert "user123" not in service._permission_cache
+        finally:
+            patcher.stop()
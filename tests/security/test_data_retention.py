@@ -0,0 +1,76 @@
+"""
+Tests for partition-drop and batched-delete retention
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.security.data_retention_service import DataRetentionService
+
+
+def scripted_db(results):
+    """DatabaseManager stand-in whose cursor answers fetch calls from ``results`` in order"""
+    db = MagicMock()
+    cursor = db._get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+    cursor.fetchall.side_effect = lambda: results.pop(0)
+    cursor.fetchone.side_effect = lambda: results.pop(0)
+    return db, cursor
+
+
+@pytest.fixture
+def retention_svc():
+    service = DataRetentionService()
+    service.delete_batch_size = 2
+    service.delete_pause_seconds = 0
+    return service
+
+
+class TestRetention:
+    """Test cases for DataRetentionService cleanup strategies"""
+
+    @pytest.mark.asyncio
+    async def test_batched_delete_resumes_after_last_key(self, retention_svc):
+        t0 = datetime(2026, 1, 1)
+        retention_svc.db, cursor = scripted_db([
+            [(t0, "a"), (t0, "b")],
+            [(t0 + timedelta(hours=1), "c")],
+        ])
+
+        result = await retention_svc._delete_in_batches("parser_jobs", "created_at", datetime(2026, 6, 1))
+
+        assert result["deleted_count"] == 3
+        assert result["batches"] == 2
+        first_sql, first_params = cursor.execute.call_args_list[0].args
+        second_sql, second_params = cursor.execute.call_args_list[1].args
+        assert "(created_at, id) >" not in first_sql
+        assert "(created_at, id) >" in second_sql
+        assert second_params == [datetime(2026, 6, 1), t0, "b", 2]
+        assert "COUNT(*)" not in first_sql
+
+    @pytest.mark.asyncio
+    async def test_partitioned_table_drops_expired_partitions(self, retention_svc):
+        retention_svc.db, cursor = scripted_db([
+            (True,),                                          # is partitioned
+            [("security_audit_log_p201801", 1200)],           # expired partitions
+            (False,),                                         # no legacy partition
+            (True,),                                          # default partition exists
+            [],                                               # nothing expired in default
+        ])
+
+        result = await retention_svc._cleanup_table({"table_name": "security_audit_log", "retention_days": 2555})
+
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert result["method"] == "partition_drop"
+        assert result["partitions_dropped"] == ["security_audit_log_p201801"]
+        assert result["deleted_count"] == 1200
+        assert any("DETACH PARTITION security_audit_log_p201801" in sql for sql in statements)
+        assert any("DROP TABLE security_audit_log_p201801" in sql for sql in statements)
+        assert not any(sql.lstrip().startswith("DELETE FROM security_audit_log ") for sql in statements)
+
+    @pytest.mark.asyncio
+    async def test_rejects_unsafe_table_names(self, retention_svc):
+        result = await retention_svc._cleanup_table({"table_name": "users; DROP TABLE users", "retention_days": 1})
+        assert result["deleted_count"] == 0
+        assert "Invalid table" in result["error"]
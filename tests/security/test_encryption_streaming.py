@@ -0,0 +1,138 @@
+"""
+Tests for envelope encryption, key caching and streaming file encryption
+"""
+
+import base64
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from src.security import encryption_service as encryption_module
+from src.security.encryption_service import FILE_MAGIC, EncryptionService
+
+
+@pytest.fixture
+def service():
+    svc = EncryptionService()
+    svc.file_segment_size = 1024
+    svc._remember_key("default", os.urandom(32))
+    return svc
+
+
+def write_encrypted(service, tmp_path, content):
+    plain = tmp_path / "plain.bin"
+    plain.write_bytes(content)
+    encrypted = tmp_path / "plain.enc"
+    service.encrypt_file(str(plain), str(encrypted))
+    return encrypted
+
+
+class TestEnvelopeEncryption:
+    """Test cases for record encryption"""
+
+    def test_encrypt_many_round_trip(self, service):
+        items = ["secret", {"account": "A1", "amount": 12.5}, ""]
+        encrypted = service.encrypt_many(items)
+
+        assert len({item["wrapped_key"] for item in encrypted}) == 1
+        assert service.decrypt_many(encrypted) == items
+        assert service.decrypt_data(service.encrypt_data("one")) == "one"
+
+    def test_payloads_without_wrapped_key_still_decrypt(self, service):
+        key = service._get_encryption_key("default")
+        iv = os.urandom(12)
+        sealed = AESGCM(key).encrypt(iv, b'{"legacy": true}', None)
+        legacy = {
+            "ciphertext": base64.b64encode(sealed[:-16]).decode(),
+            "iv": base64.b64encode(iv).decode(),
+            "tag": base64.b64encode(sealed[-16:]).decode(),
+            "key_id": "default",
+        }
+
+        assert service.decrypt_data(legacy) == {"legacy": True}
+
+    def test_key_lookup_is_cached(self, service):
+        stored_key = base64.b64encode(os.urandom(32)).decode()
+        with patch.object(service.db, "_get_connection") as mock_conn:
+            cursor = Mock()
+            cursor.fetchone.return_value = (stored_key,)
+            mock_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+
+            encrypted = [service.encrypt_data(f"value {i}", "tenant-key") for i in range(5)]
+            service.clear_key_cache()
+            assert service.decrypt_many(encrypted) == [f"value {i}" for i in range(5)]
+
+        # One lookup to encrypt, one more after the cache was cleared
+        assert cursor.execute.call_count == 2
+
+    def test_data_key_rolls_over_after_max_messages(self, service):
+        with patch.object(encryption_module, "DATA_KEY_MAX_MESSAGES", 2):
+            encrypted = service.encrypt_many(["a", "b"]) + service.encrypt_many(["c"])
+
+        assert encrypted[0]["wrapped_key"] == encrypted[1]["wrapped_key"] != encrypted[2]["wrapped_key"]
+        assert service.decrypt_many(encrypted) == ["a", "b", "c"]
+
+    def test_tampered_ciphertext_is_rejected(self, service):
+        encrypted = service.encrypt_data("secret")
+        encrypted["ciphertext"] = base64.b64encode(b"x" * 6).decode()
+
+        with pytest.raises(InvalidTag):
+            service.decrypt_data(encrypted)
+
+
+class TestStreamingFileEncryption:
+    """Test cases for segmented file encryption"""
+
+    @pytest.mark.parametrize("size", [0, 100, 1024, 4096, 5000])
+    def test_file_round_trip(self, service, tmp_path, size):
+        content = os.urandom(size)
+        encrypted = write_encrypted(service, tmp_path, content)
+
+        decrypted = tmp_path / "decrypted.bin"
+        result = service.decrypt_file(str(encrypted), str(decrypted))
+
+        assert encrypted.read_bytes().startswith(FILE_MAGIC)
+        assert result["size_bytes"] == size
+        assert decrypted.read_bytes() == content
+
+    def test_tampered_segment_is_rejected(self, service, tmp_path):
+        encrypted = write_encrypted(service, tmp_path, os.urandom(3000))
+        data = bytearray(encrypted.read_bytes())
+        data[-1500] ^= 1
+        encrypted.write_bytes(bytes(data))
+
+        decrypted = tmp_path / "decrypted.bin"
+        with pytest.raises(InvalidTag):
+            service.decrypt_file(str(encrypted), str(decrypted))
+        assert not decrypted.exists()
+        assert list(tmp_path.glob("*.part")) == []
+
+    def test_truncation_and_reordering_are_rejected(self, service, tmp_path):
+        encrypted = write_encrypted(service, tmp_path, os.urandom(3 * 1024))
+        data = encrypted.read_bytes()
+        sealed = 1024 + 16
+        header, segments = data[:-3 * sealed], data[-3 * sealed:]
+
+        truncated = tmp_path / "truncated.enc"
+        truncated.write_bytes(header + segments[:2 * sealed])
+        reordered = tmp_path / "reordered.enc"
+        reordered.write_bytes(header + segments[sealed:2 * sealed] + segments[:sealed] + segments[2 * sealed:])
+
+        for path in (truncated, reordered):
+            with pytest.raises(InvalidTag):
+                service.decrypt_file(str(path), str(tmp_path / "out.bin"))
+
+    def test_legacy_whole_file_format_still_decrypts(self, service, tmp_path):
+        content = os.urandom(2500)
+        iv = os.urandom(12)
+        sealed = AESGCM(service._get_encryption_key("default")).encrypt(iv, content, None)
+        legacy = tmp_path / "legacy.enc"
+        legacy.write_bytes(iv + sealed[-16:] + sealed[:-16])
+
+        decrypted = tmp_path / "decrypted.bin"
+        service.decrypt_file(str(legacy), str(decrypted))
+
+        assert decrypted.read_bytes() == content
@@ -0,0 +1,168 @@
+"""
+Tests for resumable chunked uploads, run against moto's in-process S3
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from src.storage.multipart import MIN_PART_SIZE
+from src.storage.resumable_uploads import ResumableUploadManager, UploadError
+from src.storage.s3_manager import S3Manager
+
+BUCKET = "evidence-test"
+
+
+class FakeUploadStore:
+    """The resumable_uploads table, kept in a dict"""
+
+    def __init__(self):
+        self.rows = {}
+        self.completing = set()
+
+    def insert(self, upload):
+        self.rows[upload.upload_id] = upload
+
+    def load(self, upload_id):
+        return self.rows.get(upload_id)
+
+    def touch(self, upload_id, expires_at):
+        self.rows[upload_id].expires_at = expires_at
+
+    def claim_completion(self, upload_id):
+        if upload_id in self.completing:
+            return False
+        self.completing.add(upload_id)
+        return True
+
+    def release_completion(self, upload_id):
+        self.completing.discard(upload_id)
+
+    def delete(self, upload_id):
+        self.rows.pop(upload_id, None)
+
+    def expired(self, limit):
+        return [u for u in self.rows.values() if u.expires_at < time.time()][:limit]
+
+
+@pytest.fixture
+def store():
+    return FakeUploadStore()
+
+
+@pytest.fixture
+def uploads(store):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield ResumableUploadManager(S3Manager(region_name="us-east-1"), store)
+
+
+def chunks_of(payload, size):
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+
+class TestResumableUploads:
+    """Test cases for ResumableUploadManager"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_out_of_order_chunks_with_retry(self, uploads):
+        payload = os.urandom(MIN_PART_SIZE * 2 + 4096)
+        upload = await uploads.init("user-1", BUCKET, "pods.zip", "application/zip",
+                                    len(payload), chunk_size=MIN_PART_SIZE)
+        chunks = chunks_of(payload, MIN_PART_SIZE)
+        assert upload.total_chunks == 3
+
+        await asyncio.gather(*[
+            uploads.put_chunk(upload.upload_id, "user-1", index, chunks[index])
+            for index in (2, 0)
+        ])
+        status = (await uploads.get_status(upload.upload_id, "user-1")).status()
+        assert status["received_chunks"] == [0, 2]
+        assert status["missing_chunks"] == [1]
+
+        # Resend an already-received chunk, then the missing one
+        await uploads.put_chunk(upload.upload_id, "user-1", 0, chunks[0])
+        await uploads.put_chunk(upload.upload_id, "user-1", 1, chunks[1])
+        completed = await uploads.complete(upload.upload_id, "user-1")
+
+        stored = await uploads.s3_manager.download_file(BUCKET, completed.key)
+        assert stored == payload
+        assert completed.content_hash == hashlib.sha256(payload).hexdigest()
+        assert uploads.store.rows == {}
+
+    @pytest.mark.asyncio
+    async def test_rejects_bad_chunks_and_incomplete_uploads(self, uploads):
+        upload = await uploads.init("user-1", BUCKET, "a.pdf", "application/pdf",
+                                    MIN_PART_SIZE + 10, chunk_size=MIN_PART_SIZE)
+
+        with pytest.raises(UploadError):
+            await uploads.put_chunk(upload.upload_id, "user-1", 1, b"short")
+        with pytest.raises(UploadError):
+            await uploads.complete(upload.upload_id, "user-1")
+        with pytest.raises(KeyError):
+            await uploads.get(upload.upload_id, "someone-else")
+
+        await uploads.abort(upload.upload_id, "user-1")
+        assert uploads.store.rows == {}
+
+    @pytest.mark.asyncio
+    async def test_any_instance_can_continue_an_upload(self, uploads, store):
+        payload = os.urandom(MIN_PART_SIZE + 10)
+        upload = await uploads.init("user-1", BUCKET, "a.pdf", "application/pdf",
+                                    len(payload), chunk_size=MIN_PART_SIZE)
+        chunks = chunks_of(payload, MIN_PART_SIZE)
+        await uploads.put_chunk(upload.upload_id, "user-1", 0, chunks[0])
+
+        # Another pod, or this one after a restart, sharing only the database and S3
+        other = ResumableUploadManager(uploads.s3_manager, store)
+        status = (await other.get_status(upload.upload_id, "user-1")).status()
+        assert status["received_chunks"] == [0] and status["missing_chunks"] == [1]
+
+        await other.put_chunk(upload.upload_id, "user-1", 1, chunks[1])
+        completed = await uploads.complete(upload.upload_id, "user-1")
+        assert await uploads.s3_manager.download_file(BUCKET, completed.key) == payload
+
+    @pytest.mark.asyncio
+    async def test_expired_uploads_are_aborted(self, uploads):
+        upload = await uploads.init("user-1", BUCKET, "a.pdf", "application/pdf",
+                                    MIN_PART_SIZE, chunk_size=MIN_PART_SIZE)
+        uploads.store.rows[upload.upload_id].expires_at = time.time() - 1
+
+        assert await uploads.cleanup_expired() == 1
+        assert uploads.store.rows == {}
+        with pytest.raises(Exception):
+            await uploads.s3_manager.list_parts(bucket_name=BUCKET, key=upload.key, upload_id=upload.s3_upload_id)
+
+
+class TestResumableUploadStore:
+    """Test cases for the database-backed upload state"""
+
+    def test_round_trips_rows_and_claims_completion_once(self):
+        from unittest.mock import MagicMock, Mock
+        from src.storage.resumable_uploads import ResumableUploadStore
+
+        db = MagicMock()
+        cursor = Mock(rowcount=1)
+        db._get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor
+        cursor.fetchone.return_value = (
+            "u-1", "user-1", BUCKET, "evidence/k", "s3-1", "a.pdf", "application/pdf",
+            MIN_PART_SIZE * 2, MIN_PART_SIZE, '{"claim_id": "c-1"}', 1700000000.0,
+        )
+        store = ResumableUploadStore(db)
+
+        upload = store.load("u-1")
+        assert upload.total_chunks == 2 and upload.metadata == {"claim_id": "c-1"}
+        assert upload.expires_at == 1700000000.0
+
+        assert store.claim_completion("u-1")
+        assert "status = 'open'" in cursor.execute.call_args[0][0]
+        cursor.rowcount = 0
+        assert not store.claim_completion("u-1")
@@ -0,0 +1,97 @@
+"""
+Tests for the S3 object-store layer, run against moto's in-process S3
+"""
+
+import io
+import os
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from src.storage.multipart import MIN_PART_SIZE
+from src.storage.s3_manager import S3Manager
+
+BUCKET = "evidence-test"
+
+
+@pytest.fixture
+def s3():
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        manager = S3Manager(
+            region_name="us-east-1",
+            multipart_threshold=MIN_PART_SIZE,
+            part_size=MIN_PART_SIZE,
+            max_concurrency=3,
+        )
+        yield manager
+
+
+async def _chunks(payload):
+    yield payload
+
+
+class TestS3Manager:
+    """Test cases for S3Manager"""
+
+    @pytest.mark.asyncio
+    async def test_small_upload_round_trip(self, s3):
+        await s3.upload_file(b"hello", BUCKET, "a/small.txt", "text/plain")
+
+        assert await s3.download_file(BUCKET, "a/small.txt") == b"hello"
+        assert await s3.download_file(BUCKET, "a/missing.txt") is None
+        head = await s3.head_object(BUCKET, "a/small.txt")
+        assert head["ContentType"] == "text/plain"
+
+    @pytest.mark.asyncio
+    async def test_large_upload_uses_parallel_multipart(self, s3):
+        payload = os.urandom(MIN_PART_SIZE * 3 + 123)
+
+        await s3.upload_file(payload, BUCKET, "big.bin", "application/octet-stream")
+
+        head = await s3.head_object(BUCKET, "big.bin")
+        assert head["ContentLength"] == len(payload)
+        assert head["ETag"].strip('"').endswith("-4")
+        assert await s3.download_file(BUCKET, "big.bin") == payload
+
+    @pytest.mark.asyncio
+    async def test_threshold_below_part_size_uploads_in_one_put(self):
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+        with moto.mock_aws():
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+            s3 = S3Manager(region_name="us-east-1", multipart_threshold=1024, part_size=1024)
+            payload = os.urandom(4096)
+
+            assert s3.multipart_threshold == s3.part_size == MIN_PART_SIZE
+            await s3.upload_file(payload, BUCKET, "mid.bin", "application/octet-stream")
+            await s3.upload_stream(_chunks(payload), BUCKET, "mid-stream.bin", "application/octet-stream")
+
+            assert await s3.download_file(BUCKET, "mid.bin") == payload
+            assert await s3.download_file(BUCKET, "mid-stream.bin") == payload
+
+    @pytest.mark.asyncio
+    async def test_upload_fileobj_and_streaming_reads(self, s3):
+        payload = os.urandom(MIN_PART_SIZE + 1000)
+
+        uploaded = await s3.upload_fileobj(io.BytesIO(payload), BUCKET, "stream.bin", "application/octet-stream")
+
+        assert uploaded == len(payload)
+        chunks = [chunk async for chunk in s3.iter_file(BUCKET, "stream.bin", chunk_size=1024 * 1024)]
+        assert max(len(chunk) for chunk in chunks) <= 1024 * 1024
+        assert b"".join(chunks) == payload
+        assert await s3.download_range(BUCKET, "stream.bin", 10, 19) == payload[10:20]
+
+    @pytest.mark.asyncio
+    async def test_presigned_urls_are_cached(self, s3):
+        await s3.upload_file(b"packet", BUCKET, "packets/p.zip", "application/zip")
+
+        first = await s3.generate_presigned_url(f"s3://{BUCKET}/packets/p.zip", hours_valid=1)
+        second = await s3.generate_presigned_url(f"s3://{BUCKET}/packets/p.zip", hours_valid=1)
+
+        assert first == second
+        assert "packets/p.zip" in first
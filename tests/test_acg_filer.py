@@ -0,0 +1,62 @@
+"""
+Tests for claim filing through the claim_filing queue
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.acg import filer
+from src.common.job_queue import Job
+from src.common.schemas import FilingResult
+
+
+def make_job(claim_id="CLM-1") -> Job:
+    return Job(id="job-1", queue="claim_filing", payload=filer.FileClaimJob(claim_id=claim_id),
+               attempts=1, max_attempts=6, priority=0)
+
+
+@pytest.fixture
+def filing_env():
+    db = MagicMock()
+    db.load_submitted_filing.return_value = None
+    adapter = MagicMock()
+    adapter.submit.return_value = FilingResult(
+        claim_id="CLM-1", submitted=True, amazon_case_id="CASE-1", status="submitted"
+    )
+    with patch.object(filer, "db", db), \
+         patch.object(filer, "adapter", adapter), \
+         patch.object(filer, "build_packet", return_value=MagicMock()), \
+         patch("src.common.schemas.ClaimDetection"), \
+         patch("src.common.schemas.ValidationResult"):
+        yield db, adapter
+
+
+class TestClaimFiling:
+    """Test cases for the filing job handler"""
+
+    def test_already_submitted_claim_is_not_filed_again(self, filing_env):
+        db, adapter = filing_env
+        db.load_submitted_filing.return_value = {"amazon_case_id": "CASE-1"}
+
+        filer.run_filing_job(make_job())
+
+        adapter.submit.assert_not_called()
+        db.update_claim_status.assert_called_once_with("CLM-1", "submitted")
+
+    def test_errors_after_submit_do_not_retry_the_job(self, filing_env):
+        db, adapter = filing_env
+        db.save_filing.side_effect = RuntimeError("connection lost")
+        db.update_claim_status.side_effect = RuntimeError("connection lost")
+
+        filer.run_filing_job(make_job())
+
+        adapter.submit.assert_called_once()
+
+    def test_errors_before_submit_are_retried(self, filing_env):
+        db, adapter = filing_env
+        db.fetch_evidence_links.side_effect = RuntimeError("timeout")
+
+        with pytest.raises(RuntimeError):
+            filer.run_filing_job(make_job())
+        adapter.submit.assert_not_called()
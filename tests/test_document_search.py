@@ -0,0 +1,92 @@
+"""
+Tests for indexed document search with keyset pagination
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from src.api import parser
+
+USER = {"user_id": "user-1"}
+
+
+def make_rows(count, start=datetime(2026, 3, 1, 12, 0, 0)):
+    return [
+        (uuid.uuid4(), f"invoice-{i}.pdf", "application/pdf", start - timedelta(minutes=i),
+         "completed", 0.9, "Acme Supply", f"INV-{i}", None, 10.0, "USD", [])
+        for i in range(count)
+    ]
+
+
+async def search(cursor_mock, **kwargs):
+    params = dict(supplier=None, date_from=None, date_to=None, sku=None, limit=10,
+                  cursor=None, offset=0, include_total=False, user=USER)
+    params.update(kwargs)
+    with patch.object(parser.db, "_get_connection") as mock_conn:
+        mock_conn.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value = cursor_mock
+        return await parser.search_documents(**params)
+
+
+class TestDocumentSearch:
+    """Test cases for document search"""
+
+    @pytest.mark.asyncio
+    async def test_next_cursor_continues_after_last_row(self):
+        rows = make_rows(3)
+        cursor = Mock()
+        cursor.fetchall.return_value = rows
+        cursor.fetchone.return_value = (3,)
+
+        first = (await search(cursor, limit=2))["data"]
+        assert [doc["id"] for doc in first["documents"]] == [str(rows[0][0]), str(rows[1][0])]
+        assert first["has_more"] is True and first["total"] == 3
+        sql, params = cursor.execute.call_args_list[0][0]
+        assert "ORDER BY ed.created_at DESC, ed.id DESC" in sql
+        assert params[-2:] == [3, 0]
+
+        cursor.reset_mock()
+        cursor.fetchall.return_value = rows[2:]
+        second = (await search(cursor, limit=2, cursor=first["next_cursor"], offset=40))["data"]
+        sql, params = cursor.execute.call_args_list[0][0]
+        assert "(ed.created_at, ed.id) < (%s, %s)" in sql
+        assert params[-4:] == [rows[1][3].isoformat(), str(rows[1][0]), 3, 0]
+        assert second["has_more"] is False and second["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_sku_and_supplier_use_indexed_predicates(self):
+        cursor = Mock()
+        cursor.fetchall.return_value = []
+        cursor.fetchone.return_value = (0,)
+
+        result = await search(cursor, sku=" b00_x ", supplier="50%", include_total=True)
+
+        page_sql, page_params = cursor.execute.call_args_list[0][0]
+        count_sql, count_params = cursor.execute.call_args_list[1][0]
+        assert "parser_result_identifiers" in page_sql and "line_items::text" not in page_sql
+        assert "%B00\\_X%" in page_params and "%50\\%%" in page_params
+        assert "LIMIT" not in count_sql and count_params == page_params[:-2]
+        assert result["data"]["total"] == 0
+        assert result["data"]["pagination"]["total_is_exact"] is True
+
+    @pytest.mark.asyncio
+    async def test_total_is_capped_by_default(self):
+        cursor = Mock()
+        cursor.fetchall.return_value = make_rows(11)
+        cursor.fetchone.return_value = (parser.SEARCH_TOTAL_CAP,)
+
+        result = (await search(cursor, supplier="Acme"))["data"]
+
+        count_sql, count_params = cursor.execute.call_args_list[1][0]
+        assert "LIMIT %s" in count_sql and count_params[-1] == parser.SEARCH_TOTAL_CAP
+        assert result["total"] == parser.SEARCH_TOTAL_CAP
+        assert result["pagination"]["total_is_exact"] is False
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_is_rejected(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await search(Mock(), cursor="not-a-cursor")
+        assert exc_info.value.status_code == 400
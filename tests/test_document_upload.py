@@ -0,0 +1,148 @@
+"""
+Tests for the streaming document upload path
+"""
+
+import hashlib
+import io
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from src.api import evidence
+
+
+class FakeStorage:
+    """Collects streamed chunks instead of talking to S3"""
+
+    def __init__(self):
+        self.objects = {}
+        self.max_chunk = 0
+        self.delete_object = AsyncMock()
+
+    async def upload_stream(self, chunks, bucket_name, key, content_type):
+        data = bytearray()
+        async for chunk in chunks:
+            self.max_chunk = max(self.max_chunk, len(chunk))
+            data += chunk
+        self.objects[key] = bytes(data)
+        return len(data)
+
+
+def make_upload(content: bytes, filename: str, content_type: str) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content), filename=filename,
+        headers=Headers({"content-type": content_type})
+    )
+
+
+class TestStreamingUpload:
+    """Test cases for streaming document uploads"""
+
+    @pytest.mark.asyncio
+    async def test_stream_upload_hashes_in_chunks(self):
+        storage = FakeStorage()
+        content = os.urandom(evidence.UPLOAD_CHUNK_SIZE * 2 + 17)
+
+        with patch.object(evidence, "_get_storage", return_value=storage):
+            result = await evidence._stream_upload_to_storage(
+                make_upload(content, "scan.pdf", "application/pdf"), "user-1", "bucket"
+            )
+
+        assert result["size_bytes"] == len(content)
+        assert result["content_hash"] == hashlib.sha256(content).hexdigest()
+        assert result["key"].startswith("evidence/user-1/") and result["key"].endswith("/scan.pdf")
+        assert storage.objects[result["key"]] == content
+        assert storage.max_chunk <= evidence.UPLOAD_CHUNK_SIZE
+
+    @pytest.mark.asyncio
+    async def test_duplicates_rejected_and_rows_batched(self):
+        storage = FakeStorage()
+        db = MagicMock()
+        request = MagicMock()
+        form = MagicMock()
+        form.getlist.side_effect = lambda name: [
+            make_upload(b"invoice", "a.pdf", "application/pdf"),
+            make_upload(b"invoice", "a-copy.pdf", "application/pdf"),
+            make_upload(b"stored before", "b.png", "image/png"),
+            make_upload(b"notes", "c.txt", "text/plain"),
+        ] if name == "file" else []
+        request.form = AsyncMock(return_value=form)
+        known_hash = hashlib.sha256(b"stored before").hexdigest()
+
+        with patch.object(evidence, "_get_storage", return_value=storage), \
+             patch.object(evidence, "_get_db", return_value=db), \
+             patch.object(evidence, "_find_documents_by_hash", return_value={known_hash: "doc-old"}), \
+             patch.object(evidence, "_insert_documents", side_effect=lambda *args: {
+                 u["content_hash"]: f"doc-{i}" for i, u in enumerate(args[4], 1)
+             }) as insert, \
+             patch.object(evidence, "_enqueue_parser_jobs") as enqueue:
+            response = await evidence.upload_document(
+                request, MagicMock(), claim_id=None, user={"user_id": "user-1"}
+            )
+
+        inserted = insert.call_args.args[4]
+        assert [u["filename"] for u in inserted] == ["a.pdf", "c.txt"]
+        assert insert.call_count == 1
+        assert enqueue.call_count == 1
+        assert storage.delete_object.await_count == 2
+        assert response.id == "doc-1"
+        assert "2 duplicates skipped" in response.message
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_is_reported_and_cleaned_up(self):
+        storage = FakeStorage()
+        db = MagicMock()
+        uploads = [
+            {"filename": "a.pdf", "content_type": "application/pdf", "key": "k-a", "content_hash": "hash-a"},
+            {"filename": "b.pdf", "content_type": "application/pdf", "key": "k-b", "content_hash": "hash-b"},
+        ]
+
+        # Another request stored b.pdf between the hash check and the insert
+        with patch.object(evidence, "_get_storage", return_value=storage), \
+             patch.object(evidence, "_insert_documents", return_value={"hash-a": "doc-a"}), \
+             patch.object(evidence, "_find_documents_by_hash", return_value={"hash-b": "doc-b"}), \
+             patch.object(evidence, "_enqueue_parser_jobs") as enqueue:
+            stored, duplicates = await evidence._store_documents(db, "user-1", None, "bucket", uploads)
+
+        assert stored == [("doc-a", uploads[0])]
+        assert duplicates == [("doc-b", uploads[1])]
+        enqueue.assert_called_once_with(db, "user-1", stored)
+        storage.delete_object.assert_awaited_once_with("bucket", "k-b")
+
+    @pytest.mark.asyncio
+    async def test_failed_insert_deletes_staged_objects(self):
+        storage = FakeStorage()
+        uploads = [{"key": "k-a", "content_hash": "hash-a"}, {"key": "k-b", "content_hash": "hash-b"}]
+
+        with patch.object(evidence, "_get_storage", return_value=storage), \
+             patch.object(evidence, "_insert_documents", side_effect=RuntimeError("db down")):
+            with pytest.raises(RuntimeError):
+                await evidence._store_documents(MagicMock(), "user-1", None, "bucket", uploads)
+
+        assert storage.delete_object.await_count == 2
+
+    def test_parser_jobs_are_enqueued_with_their_rows(self):
+        db = MagicMock()
+        cursor = db._get_connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+        documents = [
+            ("doc-1", {"content_type": "application/pdf"}),
+            ("doc-2", {"content_type": "text/plain"}),
+        ]
+
+        with patch("psycopg2.extras.execute_values") as execute_values, \
+             patch("src.parsers.parser_worker.parser_queue") as parser_queue:
+            evidence._enqueue_parser_jobs(db, "user-1", documents)
+
+        job_id = execute_values.call_args.args[2][0][0]
+        payload = parser_queue.enqueue.call_args.args[0]
+        assert parser_queue.enqueue.call_count == 1
+        assert payload.document_id == "doc-1" and payload.parser_type == "pdf"
+        assert parser_queue.enqueue.call_args.kwargs == {"job_id": job_id, "cursor": cursor}
+
+    def test_parser_types(self):
+        assert evidence._parser_type("application/pdf") == "pdf"
+        assert evidence._parser_type("image/jpeg") == "image"
+        assert evidence._parser_type("text/plain") is None
@@ -332,6 +332,128 @@ class TestProofPacketWorker:
         
         # Assertions
         assert result is None
+    
+    @pytest.mark.asyncio
+    async def test_zip_archive_streams_to_multipart_upload(self, worker):
+        """Test ZIP assembly streams evidence chunk by chunk into a multipart upload"""
+        import io
+        import os
+        import zipfile
+        from src.evidence.proof_packet_worker import ProofPacketData
+        
+        in_flight = {"now": 0, "max": 0}
+        contents = {
+            "summary.pdf": b"%PDF-1.4 summary",
+            "photo.jpg": os.urandom(3 * 1024 * 1024),
+            "notes.txt": b"note " * 1024 * 1024,
+        }
+        
+        async def iter_file(bucket_name, key, chunk_size):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            try:
+                if "/summaries/" in key:
+                    content = contents["summary.pdf"]
+                else:
+                    content = contents.get(key.split("/")[-1])
+                for offset in range(0, len(content), chunk_size):
+                    await asyncio.sleep(0)
+                    yield content[offset:offset + chunk_size]
+            finally:
+                in_flight["now"] -= 1
+        
+        parts = []
+        
+        async def upload_part(bucket_name, key, upload_id, part_number, data):
+            parts.append(data)
+            return f"etag-{part_number}"
+        
+        worker.fetch_concurrency = 2
+        worker.s3_manager.download_file = AsyncMock()
+        worker.s3_manager.iter_file = iter_file
+        worker.s3_manager.create_multipart_upload = AsyncMock(return_value="upload-1")
+        worker.s3_manager.upload_part = upload_part
+        worker.s3_manager.complete_multipart_upload = AsyncMock()
+        worker.s3_manager.upload_file = AsyncMock()
+        
+        documents = [
+            {"filename": "photo.jpg", "content_type": "image/jpeg", "download_url": "s3://bucket/photo.jpg"},
+            {"filename": "notes.txt", "content_type": "text/plain", "download_url": "s3://bucket/notes.txt"},
+        ] * 3
+        packet_data = ProofPacketData(
+            claim_id="claim-1", user_id="user-1", claim_details={}, evidence_documents=documents,
+            evidence_matches=[], prompts=[], payout_details={}
+        )
+        
+        url = await worker._generate_zip_archive(packet_data, "packet-1")
+        
+        assert url == "s3://test-bucket/proof-packets/packet-1/proof_packet.zip"
+        assert in_flight["max"] <= 2
+        assert len(parts) > 1
+        worker.s3_manager.download_file.assert_not_called()
+        worker.s3_manager.upload_file.assert_not_called()
+        worker.s3_manager.complete_multipart_upload.assert_awaited_once()
+        
+        with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as archive:
+            assert archive.read("summary.pdf") == contents["summary.pdf"]
+            assert archive.read("evidence_01_photo.jpg") == contents["photo.jpg"]
+            assert archive.getinfo("evidence_01_photo.jpg").compress_type == zipfile.ZIP_STORED
+            assert archive.getinfo("evidence_02_notes.txt").compress_type == zipfile.ZIP_DEFLATED
+            assert len(archive.namelist()) == 8
+    
+    @pytest.mark.asyncio
+    async def test_zip_entries_skip_documents_that_cannot_be_opened(self, worker):
+        """Test a missing document is left out of the ZIP instead of failing it"""
+        async def iter_file(bucket_name, key, chunk_size):
+            if key == "missing.pdf":
+                raise FileNotFoundError(key)
+            yield b"data-" + key.encode()
+        
+        worker.s3_manager.iter_file = iter_file
+        entries = [{"key": key, "source": key} for key in ("a.pdf", "missing.pdf", "b.pdf")]
+        
+        written = {}
+        async for entry, chunks in worker._fetch_zip_entries(entries):
+            written[entry["key"]] = None if chunks is None else b"".join([c async for c in chunks])
+        
+        assert written == {"a.pdf": b"data-a.pdf", "missing.pdf": None, "b.pdf": b"data-b.pdf"}
+    
+    @pytest.mark.asyncio
+    async def test_pdf_summary_cached_by_inputs(self, worker):
+        """Test summary PDFs render once per distinct input and are reused"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.evidence.proof_packet_worker import ProofPacketData, PDF_AVAILABLE
+        
+        if not PDF_AVAILABLE:
+            pytest.skip("reportlab not installed")
+        
+        worker._render_pool = ThreadPoolExecutor(max_workers=1)
+        worker.s3_manager.upload_file = AsyncMock()
+        
+        def packet(amount):
+            return ProofPacketData(
+                claim_id="claim-1", user_id="user-1",
+                claim_details={"id": "claim-1", "amount_claimed": amount, "match_confidence": 0.9},
+                evidence_documents=[{"filename": "invoice.pdf", "content_type": "application/pdf",
+                                     "size_bytes": 2048, "parser_confidence": 0.8,
+                                     "created_at": "2025-01-01T00:00:00Z"}],
+                evidence_matches=[], prompts=[], payout_details={}
+            )
+        
+        first = await worker._generate_pdf_summary(packet(100.0), "packet-1")
+        again = await worker._generate_pdf_summary(packet(100.0), "packet-2")
+        changed = await worker._generate_pdf_summary(packet(150.0), "packet-3")
+        
+        assert first == again != changed
+        assert worker.s3_manager.upload_file.await_count == 2
+        pdf_content = worker.s3_manager.upload_file.await_args_list[0].kwargs["file_content"]
+        assert pdf_content.startswith(b"%PDF")
+        
+        stats = worker.get_summary_stats()
+        assert stats["renders"] == 2
+        assert stats["cache_hits"] == 1
+        assert stats["cache_hit_rate"] == pytest.approx(1 / 3)
+        worker.shutdown()
 
 class TestWebSocketManager:
     """Test cases for WebSocket Manager"""
@@ -0,0 +1,34 @@
+"""
+Tests for API cold start: lazy heavy imports and deferred database setup
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from src.common.db_postgresql import DatabaseManager
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from benchmark_startup import eagerly_imported  # noqa: E402
+
+
+class TestStartup:
+    """Test cases for cold-start behaviour"""
+
+    def test_app_import_does_not_load_heavy_libraries(self):
+        assert eagerly_imported() == []
+
+    def test_database_is_initialized_once_on_first_use(self):
+        url = "sqlite:///startup-test.db"
+        try:
+            with patch.object(DatabaseManager, "_init_db") as init_db:
+                first, second = DatabaseManager(url), DatabaseManager(url)
+                init_db.assert_not_called()
+
+                assert first.is_postgresql == second.is_postgresql
+                init_db.assert_called_once()
+                assert second.connection_pool is first.connection_pool
+        finally:
+            DatabaseManager._shared.pop(url, None)